@@ -0,0 +1,68 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+"""
+Micro-benchmarks for the Composition hot paths. Run with
+
+    python dev_scripts/benchmarks/bench_composition.py
+
+to get the average time per call of formula parsing, arithmetic, reduction,
+sorting and of a full PhaseDiagram construction from the Li-Fe-P-O entries
+in test_files.
+"""
+
+import os
+import timeit
+
+from monty.serialization import loadfn
+
+from pymatgen.analysis.phase_diagram import PhaseDiagram
+from pymatgen.core.composition import Composition
+
+test_dir = os.path.join(os.path.dirname(__file__), "..", "..", "test_files")
+
+
+def time_call(func, budget):
+    """
+    Returns the best average time per call of func in seconds.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    repeat = max(1, int(budget / (timer.timeit(number) / number) / number))
+    return min(timer.repeat(repeat=min(repeat, 5), number=number)) / number
+
+
+def run_benchmarks(budget=0.5):
+    """
+    Times the Composition hot paths.
+
+    Args:
+        budget: Approximate time in seconds to spend on each measurement.
+
+    Returns:
+        List of (name, seconds per call).
+    """
+    entries = loadfn(os.path.join(test_dir, "Li-Fe-P-O_entries.json"))
+    comps = [e.composition for e in entries]
+    formulas = [c.formula for c in comps]
+    a, b = Composition("Li3Fe2(PO4)3"), Composition("Fe2O3")
+
+    def fresh_comps():
+        # New objects so that no per-instance caches are hit.
+        return [Composition(c) for c in comps]
+
+    cases = [
+        ("parse formulas", lambda: [Composition(f) for f in formulas]),
+        ("add/sub/mul", lambda: (a + b - b) * 2 / 3),
+        ("reduced_formula", lambda: [c.reduced_formula for c in fresh_comps()]),
+        ("sort", lambda: sorted(fresh_comps())),
+        ("hash/eq", lambda: len(set(fresh_comps()))),
+        ("PhaseDiagram", lambda: PhaseDiagram(entries)),
+    ]
+    return [(name, time_call(func, budget)) for name, func in cases]
+
+
+if __name__ == "__main__":
+    for name, t in run_benchmarks():
+        print("%-16s %10.3f ms" % (name, t * 1e3))
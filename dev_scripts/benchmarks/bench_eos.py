@@ -0,0 +1,93 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+"""
+Benchmarks for batched EOS fitting. Run with
+
+    python dev_scripts/benchmarks/bench_eos.py
+
+to compare EOS.fit_batch with one EOS.fit call per dataset for all the
+supported models, on randomly scaled and perturbed copies of an E(V) curve
+of Si.
+"""
+
+import time
+import warnings
+
+import numpy as np
+
+from pymatgen.analysis.eos import EOS, EOSError
+
+# Si data from Cormac, also used in the EOS unit tests
+VOLUMES = np.array([25.987454833, 26.9045702104, 27.8430241908, 28.8029649591,
+                    29.7848370694, 30.7887887064, 31.814968055, 32.8638196693,
+                    33.9353435494, 35.0299842495, 36.1477417695, 37.2892088485,
+                    38.4543854865, 39.6437162376, 40.857201102, 42.095136449,
+                    43.3579668329, 44.6456922537, 45.9587572656, 47.2973100535,
+                    48.6614988019, 50.0517680652, 51.4682660281, 52.9112890601,
+                    54.3808371612, 55.8775030703, 57.4014349722, 58.9526328669])
+ENERGIES = np.array([-7.63622156576, -8.16831294894, -8.63871612686, -9.05181213218,
+                     -9.41170988374, -9.72238224345, -9.98744832526, -10.210309552,
+                     -10.3943401353, -10.5427238068, -10.6584266073, -10.7442240979,
+                     -10.8027285713, -10.8363890521, -10.8474912964, -10.838157792,
+                     -10.8103477586, -10.7659387815, -10.7066179666, -10.6339907853,
+                     -10.5495538639, -10.4546677714, -10.3506386542, -10.2386366017,
+                     -10.1197772808, -9.99504030111, -9.86535084973, -9.73155247952])
+
+
+def get_datasets(ndatasets, seed=0):
+    """
+    Random E(V) datasets of 8 to 28 points, with scaled volumes and energies
+    and 1 meV noise.
+    """
+    rng = np.random.RandomState(seed)
+    volumes, energies = [], []
+    for _ in range(ndatasets):
+        n = rng.randint(8, len(VOLUMES) + 1)
+        idx = np.sort(rng.choice(len(VOLUMES), n, replace=False))
+        volumes.append(VOLUMES[idx] * rng.uniform(0.8, 1.2))
+        energies.append(ENERGIES[idx] * rng.uniform(0.8, 1.2) + rng.normal(0, 1e-3, n))
+    return volumes, energies
+
+
+def run_benchmarks(ndatasets=2000, nproc=None):
+    """
+    Times the batched and the one-by-one fits.
+
+    Args:
+        ndatasets (int): Number of E(V) datasets per model.
+        nproc (int): Number of processes for fit_batch.
+
+    Returns:
+        List of (model, seconds for fit_batch, seconds for fit, max relative
+        difference of the parameters).
+    """
+    volumes, energies = get_datasets(ndatasets)
+    results = []
+    for eos_name in EOS.MODELS:
+        eos = EOS(eos_name=eos_name)
+        t = time.perf_counter()
+        batch = eos.fit_batch(volumes, energies, nproc=nproc)
+        t_batch = time.perf_counter() - t
+
+        t = time.perf_counter()
+        single = []
+        for v, e in zip(volumes, energies):
+            try:
+                single.append(eos.fit(v, e).results)
+            except EOSError:
+                single.append(dict(e0=np.nan, b0=np.nan, b1=np.nan, v0=np.nan))
+        t_single = time.perf_counter() - t
+
+        diff = max(np.nanmax(np.abs(batch[k] / [r[k] for r in single] - 1))
+                   for k in ("e0", "b0", "b1", "v0"))
+        results.append((eos_name, t_batch, t_single, diff))
+    return results
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore")
+    for eos_name, t_batch, t_single, diff in run_benchmarks():
+        print("%-18s fit_batch %7.3f s   fit %7.3f s   max rel. diff %.1e"
+              % (eos_name, t_batch, t_single, diff))
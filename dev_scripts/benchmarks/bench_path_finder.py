@@ -0,0 +1,91 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+"""
+Benchmarks for the NEBPathfinder potential fields. Run with
+
+    python dev_scripts/benchmarks/bench_path_finder.py
+
+to compare the KD-tree free volume potential and the FFT Gaussian smearing
+with the previous grid-point loops, on the structures and grids of the
+CHGCARs in test_files.
+"""
+
+import math
+import os
+import time
+
+import numpy as np
+import numpy.linalg as la
+import scipy.signal
+import scipy.stats
+
+from pymatgen.analysis.path_finder import ChgcarPotential, FreeVolumePotential
+from pymatgen.io.vasp import Chgcar
+
+test_dir = os.path.join(os.path.dirname(__file__), "..", "..", "test_files")
+
+
+def loop_free_volume(s, dim, r=1.5):
+    """
+    Previous approach: one get_sites_in_sphere call per grid point.
+    """
+    gauss_dist = np.zeros(dim)
+    for a_d, b_d, c_d in np.ndindex(*dim):
+        coords = s.lattice.get_cartesian_coords([a_d / dim[0], b_d / dim[1], c_d / dim[2]])
+        d_f = sorted(s.get_sites_in_sphere(coords, s.lattice.a), key=lambda x: x[1])[0][1]
+        gauss_dist[a_d, b_d, c_d] = d_f / r
+    return scipy.stats.norm.pdf(gauss_dist)
+
+
+def loop_gaussian_smear(s, v, r):
+    """
+    Previous approach: kernel filled point by point, followed by a direct
+    space convolution of the periodically padded grid.
+    """
+    v_dim = v.shape
+    r_disc = [int(math.ceil(r / length * n)) for length, n in zip(s.lattice.abc, v_dim)]
+    gauss_dist = np.zeros([rd * 4 + 1 for rd in r_disc])
+    for g in np.ndindex(*gauss_dist.shape):
+        g_frac = (np.array(g) - 2 * np.array(r_disc)) / v_dim
+        gauss_dist[g] = la.norm(s.lattice.get_cartesian_coords(g_frac)) / r
+    gauss = scipy.stats.norm.pdf(gauss_dist)
+    gauss = gauss / np.sum(gauss)
+    padded_v = np.pad(v, [(2 * rd, 2 * rd) for rd in r_disc], mode="wrap")
+    return scipy.signal.convolve(padded_v, gauss, mode="valid")
+
+
+def run_benchmarks(fnames=("CHGCAR.nospin", "CHGCAR.spin"), loop_dim=(8, 8, 8)):
+    """
+    Times the potential construction.
+
+    Args:
+        fnames: CHGCARs (relative to test_files) whose structure and grid
+            are used.
+        loop_dim: Grid for the (slow) free volume loop.
+
+    Returns:
+        List of (fname, name, grid, seconds).
+    """
+    results = []
+    for fname in fnames:
+        chgcar = Chgcar.from_file(os.path.join(test_dir, fname))
+        s, dim = chgcar.structure, chgcar.dim
+        cases = [
+            ("free volume (loop)", loop_dim, lambda: loop_free_volume(s, loop_dim)),
+            ("free volume (kdtree)", loop_dim, lambda: FreeVolumePotential(s, loop_dim)),
+            ("free volume (kdtree)", dim, lambda: FreeVolumePotential(s, dim)),
+            ("smear (loop)", dim, lambda: loop_gaussian_smear(s, chgcar.data["total"], 2.0)),
+            ("smear (fft)", dim, lambda: ChgcarPotential(chgcar, smear=True)),
+        ]
+        for name, grid, func in cases:
+            t = time.perf_counter()
+            func()
+            results.append((fname, name, grid, time.perf_counter() - t))
+    return results
+
+
+if __name__ == "__main__":
+    for fname, name, grid, t in run_benchmarks():
+        print("%-26s %-22s %-14s %8.3f s" % (fname, name, "x".join(map(str, grid)), t))
@@ -0,0 +1,64 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+"""
+Micro-benchmarks for POSCAR parsing and writing. Run with
+
+    python dev_scripts/benchmarks/bench_poscar.py
+
+to get the average time per call of Poscar.from_string, Poscar.get_string
+and the full round trip for 10, 100 and 1000 atom cells.
+"""
+
+import timeit
+
+import numpy as np
+
+from pymatgen.core.structure import Structure
+from pymatgen.io.vasp.inputs import Poscar
+
+
+def get_poscar(natoms, selective_dynamics=False):
+    """
+    Returns a random two-species Poscar with natoms sites.
+    """
+    rng = np.random.RandomState(0)
+    species = ["Fe"] * (natoms // 2) + ["O"] * (natoms - natoms // 2)
+    struct = Structure(np.diag([10.0, 11.0, 12.0]), species, rng.rand(natoms, 3))
+    sd = (rng.rand(natoms, 3) > 0.5).tolist() if selective_dynamics else None
+    return Poscar(struct, selective_dynamics=sd)
+
+
+def run_benchmarks(sizes=(10, 100, 1000), budget=0.5):
+    """
+    Times the POSCAR I/O paths.
+
+    Args:
+        sizes: Number of atoms in the benchmarked cells.
+        budget: Approximate time in seconds to spend on each measurement.
+
+    Returns:
+        List of (natoms, name, seconds per call).
+    """
+    results = []
+    for natoms in sizes:
+        poscar = get_poscar(natoms)
+        string = poscar.get_string()
+        cases = [
+            ("from_string", lambda: Poscar.from_string(string)),
+            ("get_string", poscar.get_string),
+            ("round_trip", lambda: Poscar.from_string(poscar.get_string()).get_string()),
+        ]
+        for name, func in cases:
+            timer = timeit.Timer(func)
+            number, _ = timer.autorange()
+            repeat = max(1, int(budget / (timer.timeit(number) / number) / number))
+            t = min(timer.repeat(repeat=min(repeat, 5), number=number)) / number
+            results.append((natoms, name, t))
+    return results
+
+
+if __name__ == "__main__":
+    for natoms, name, t in run_benchmarks():
+        print("%5d atoms  %-12s %10.1f us" % (natoms, name, t * 1e6))
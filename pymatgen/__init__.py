@@ -11,8 +11,9 @@ for materials analysis. This is the root package.
 # Useful aliases for commonly used objects and modules.
 # Allows from pymatgen import <class> for quick usage.
 import os
+import sys
 import warnings
-import ruamel.yaml as yaml
+from importlib import import_module
 from fnmatch import fnmatch
 
 __author__ = "Pymatgen Development Team"
@@ -27,6 +28,8 @@ SETTINGS_FILE = os.path.join(os.path.expanduser("~"), ".pmgrc.yaml")
 def _load_pmg_settings():
     try:
         with open(SETTINGS_FILE, "rt") as f:
+            # ruamel.yaml is only imported if there is a settings file.
+            import ruamel.yaml as yaml
             d = yaml.safe_load(f)
     except IOError:
         # If there are any errors, default to using environment variables
@@ -44,16 +47,67 @@ def _load_pmg_settings():
 SETTINGS = _load_pmg_settings()
 
 
-from .core.periodic_table import Element, Specie, DummySpecie
-from .core.composition import Composition
-from .core.structure import Structure, IStructure, Molecule, IMolecule
-from .core.lattice import Lattice
-from .core.sites import Site, PeriodicSite
-from .core.operations import SymmOp
-from .core.units import Unit, FloatWithUnit, ArrayWithUnit
-from .electronic_structure.core import Spin, Orbital
-from .ext.matproj import MPRester
-from monty.json import MontyEncoder, MontyDecoder, MSONable
+# The aliases are imported lazily on first access (PEP 562) so that importing
+# pymatgen, or a light submodule such as pymatgen.core.periodic_table, does
+# not pull in every heavy module and optional dependency.
+_LAZY_IMPORTS = {
+    "Element": "pymatgen.core.periodic_table",
+    "Specie": "pymatgen.core.periodic_table",
+    "DummySpecie": "pymatgen.core.periodic_table",
+    "Composition": "pymatgen.core.composition",
+    "Structure": "pymatgen.core.structure",
+    "IStructure": "pymatgen.core.structure",
+    "Molecule": "pymatgen.core.structure",
+    "IMolecule": "pymatgen.core.structure",
+    "Lattice": "pymatgen.core.lattice",
+    "Site": "pymatgen.core.sites",
+    "PeriodicSite": "pymatgen.core.sites",
+    "SymmOp": "pymatgen.core.operations",
+    "Unit": "pymatgen.core.units",
+    "FloatWithUnit": "pymatgen.core.units",
+    "ArrayWithUnit": "pymatgen.core.units",
+    "Spin": "pymatgen.electronic_structure.core",
+    "Orbital": "pymatgen.electronic_structure.core",
+    "MPRester": "pymatgen.ext.matproj",
+    "MontyEncoder": "monty.json",
+    "MontyDecoder": "monty.json",
+    "MSONable": "monty.json",
+}
+
+
+def _lazy_getattr(module_globals, lazy_imports, name):
+    """
+    Imports an attribute listed in lazy_imports and caches it in the module
+    namespace.
+
+    Args:
+        module_globals (dict): globals() of the module.
+        lazy_imports (dict): Map of attribute name to module name.
+        name (str): Attribute name.
+
+    Returns:
+        The attribute.
+    """
+    if name not in lazy_imports:
+        raise AttributeError("module {!r} has no attribute {!r}".format(
+            module_globals["__name__"], name))
+    obj = getattr(import_module(lazy_imports[name]), name)
+    module_globals[name] = obj
+    return obj
+
+
+def __getattr__(name):
+    return _lazy_getattr(globals(), _LAZY_IMPORTS, name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
+
+if sys.version_info < (3, 7):
+    # Module level __getattr__ is not supported. Import everything eagerly.
+    for _name in _LAZY_IMPORTS:
+        __getattr__(_name)
 
 
 def get_structure_from_mp(formula):
@@ -68,6 +122,8 @@ def get_structure_from_mp(formula):
         (Structure) The lowest energy structure in Materials Project with that
             formula.
     """
+    from pymatgen.ext.matproj import MPRester
+
     m = MPRester()
     entries = m.get_entries(formula, inc_structure="final")
     if len(entries) == 0:
@@ -6,7 +6,13 @@
 import warnings
 import unittest
 import os
-from pymatgen.alchemy.transmuters import CifTransmuter, PoscarTransmuter
+
+from _pytest.monkeypatch import MonkeyPatch  # type: ignore
+from monty.tempfile import ScratchDir
+
+from pymatgen import SETTINGS
+from pymatgen.alchemy.transmuters import CifTransmuter, PoscarTransmuter, \
+    batch_write_vasp_input
 from pymatgen.alchemy.filters import ContainsSpecieFilter
 from pymatgen.transformations.standard_transformations import \
     SubstitutionTransformation, RemoveSpeciesTransformation, \
@@ -97,6 +103,30 @@ class PoscarTransmuterTest(unittest.TestCase):
                          .as_dict()['other_parameters']['tags'],
                          ["world", "universe"])
 
+    def test_batch_write_vasp_input(self):
+        tsc = PoscarTransmuter.from_filenames(
+            [os.path.join(test_dir, "POSCAR")] * 3,
+            [SubstitutionTransformation({"Fe": "Mn"})])
+        with ScratchDir("."), MonkeyPatch().context() as m:
+            m.setitem(SETTINGS, "PMG_VASP_PSP_DIR", os.path.abspath(test_dir))
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                manifest = tsc.write_vasp_input(output_dir="serial")
+                parallel = batch_write_vasp_input(
+                    iter(tsc.transformed_structures), output_dir="parallel",
+                    ncores=2, chunksize=1)
+            self.assertEqual([m["index"] for m in parallel], [0, 1, 2])
+            for m1, m2 in zip(manifest, parallel):
+                self.assertEqual(m1["formula"], "Mn4P4O16")
+                self.assertEqual(os.path.basename(m1["output_dir"]),
+                                 os.path.basename(m2["output_dir"]))
+                self.assertTrue(os.path.exists(os.path.join(
+                    m2["output_dir"], "transformations.json")))
+                for f in ["INCAR", "KPOINTS", "POSCAR", "POTCAR"]:
+                    with open(os.path.join(m1["output_dir"], f)) as f1, \
+                            open(os.path.join(m2["output_dir"], f)) as f2:
+                        self.assertEqual(f1.read(), f2.read())
+
 
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
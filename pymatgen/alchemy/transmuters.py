@@ -22,6 +22,7 @@ __date__ = "Mar 4, 2012"
 
 import os
 import re
+from itertools import islice
 
 from multiprocessing import Pool
 from pymatgen.alchemy.materials import TransformedStructure
@@ -170,8 +171,11 @@ class StandardTransmuter:
 
         Args:
             \\*\\*kwargs: All kwargs supported by batch_write_vasp_input.
+
+        Returns:
+            Manifest of the written inputs (see batch_write_vasp_input).
         """
-        batch_write_vasp_input(self.transformed_structures, **kwargs)
+        return batch_write_vasp_input(self.transformed_structures, **kwargs)
 
     def set_parameter(self, key, value):
         """
@@ -349,13 +353,16 @@ class PoscarTransmuter(StandardTransmuter):
 def batch_write_vasp_input(transformed_structures, vasp_input_set=MPRelaxSet,
                            output_dir=".", create_directory=True,
                            subfolder=None,
-                           include_cif=False, **kwargs):
+                           include_cif=False, ncores=None, chunksize=16,
+                           **kwargs):
     """
     Batch write vasp input for a sequence of transformed structures to
     output_dir, following the format output_dir/{group}/{formula}_{number}.
 
     Args:
-        transformed_structures: Sequence of TransformedStructures.
+        transformed_structures: Sequence of TransformedStructures. Can also
+            be a generator, in which case the structures are consumed
+            lazily and never all held in memory at once.
         vasp_input_set: pymatgen.io.vaspio_set.VaspInputSet to creates
             vasp input files from structures.
         output_dir: Directory to output files
@@ -368,22 +375,68 @@ def batch_write_vasp_input(transformed_structures, vasp_input_set=MPRelaxSet,
         include_cif (bool): Boolean indication whether to output a CIF as
             well. CIF files are generally better supported in visualization
             programs.
+        ncores (int): Number of processes to use for writing. Uses
+            multiprocessing.Pool. Default is None, which implies serial.
+        chunksize (int): Number of structures sent to each process at a
+            time. At most ncores * chunksize structures are in flight at
+            any point, which bounds the memory use for large batches.
+        **kwargs: All keyword args supported by the VASP input set.
+
+    Returns:
+        Manifest of the written inputs as a list of dicts with the keys
+        "index", "formula" and "output_dir", in input order.
     """
-    for i, s in enumerate(transformed_structures):
-        formula = re.sub(r"\s+", "", s.final_structure.formula)
-        if subfolder is not None:
-            subdir = subfolder(s)
-            dirname = os.path.join(output_dir, subdir,
-                                   "{}_{}".format(formula, i))
-        else:
-            dirname = os.path.join(output_dir, "{}_{}".format(formula, i))
-        s.write_vasp_input(vasp_input_set, dirname,
-                           create_directory=create_directory, **kwargs)
-        if include_cif:
-            from pymatgen.io.cif import CifWriter
-
-            writer = CifWriter(s.final_structure)
-            writer.write_file(os.path.join(dirname, "{}.cif".format(formula)))
+    def tasks():
+        for i, s in enumerate(transformed_structures):
+            formula = re.sub(r"\s+", "", s.final_structure.formula)
+            if subfolder is not None:
+                subdir = subfolder(s)
+                dirname = os.path.join(output_dir, subdir,
+                                       "{}_{}".format(formula, i))
+            else:
+                dirname = os.path.join(output_dir,
+                                       "{}_{}".format(formula, i))
+            yield (i, s, formula, dirname, vasp_input_set, create_directory,
+                   include_cif, kwargs)
+
+    if not ncores:
+        return [_write_vasp_input(t) for t in tasks()]
+
+    manifest = []
+    remaining = tasks()
+    with Pool(ncores) as p:
+        while True:
+            batch = list(islice(remaining, ncores * chunksize))
+            if not batch:
+                break
+            manifest.extend(p.map(_write_vasp_input, batch, chunksize))
+    return manifest
+
+
+def _write_vasp_input(inputs):
+    """
+    Helper method for (multiprocessing of) batch_write_vasp_input. Must not
+    be nested so that it can be pickled.
+
+    Args:
+        inputs: Tuple containing the index, the transformed structure, its
+            formula, the output directory, the vasp input set, whether to
+            create the directory, whether to include a cif and the kwargs for
+            the vasp input set.
+
+    Returns:
+        Manifest entry for the written input.
+    """
+    i, s, formula, dirname, vasp_input_set, create_directory, include_cif, \
+        kwargs = inputs
+    s.write_vasp_input(vasp_input_set, dirname,
+                       create_directory=create_directory, **kwargs)
+    if include_cif:
+        from pymatgen.io.cif import CifWriter
+
+        writer = CifWriter(s.final_structure)
+        writer.write_file(os.path.join(dirname, "{}.cif".format(formula)))
+    return {"index": i, "formula": formula, "output_dir": dirname}
 
 
 def _apply_transformation(inputs):
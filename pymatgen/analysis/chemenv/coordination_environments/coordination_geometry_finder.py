@@ -24,8 +24,10 @@ __date__ = "Feb 20, 2016"
 
 import itertools
 import logging
+import os
 import time
 from collections import OrderedDict
+from multiprocessing import Pool
 from random import shuffle
 
 import numpy as np
@@ -58,6 +60,7 @@ from pymatgen.core.lattice import Lattice
 from pymatgen.core.structure import Structure
 from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
 from pymatgen.core.periodic_table import Specie
+from monty.serialization import dumpfn, loadfn
 
 debug = False
 DIST_TOLERANCES = [0.02, 0.05, 0.1, 0.2, 0.3]
@@ -245,6 +248,17 @@ class AbstractGeometry:
             return self._points_wocs_ctwocc
         return self._points_wocs_ctwocc.take(permutation, axis=0)
 
+    def points_wcs_ctwcc_permutations(self, permutations):
+        """
+        Stacked version of points_wcs_ctwcc for a list of permutations
+        :param permutations: List of permutations of the points
+        :return: Array of shape (npermutations, npoints + 1, 3)
+        """
+        permutations = np.asarray(permutations, dtype=int)
+        points = self._points_wocs_ctwcc.take(permutations, axis=0)
+        centre = np.broadcast_to(self._points_wcs_ctwcc[0], (len(permutations), 1, 3))
+        return np.concatenate((centre, points), axis=1)
+
     @property
     def cn(self):
         """
@@ -319,6 +333,67 @@ def find_scaling_factor(points_distorted, points_perfect, rot):
     return num / denom, rotated_coords, points_perfect
 
 
+def symmetry_measures(points_distorted, points_perfect):
+    """
+    Computes the continuous symmetry measures of a batch of (distorted) sets of points with respect to the same
+    (perfect) set of points "points_perfect". This is the vectorized version of symmetry_measure : the rotations
+    for all the sets of points are obtained from one stacked singular value decomposition.
+    :param points_distorted: Array of shape (nsets, npoints, 3) with the (distorted) sets of points, typically the
+        same polyhedron with its points taken in different orders (permutations).
+    :param points_perfect: List of "perfect" points describing a given model polyhedron.
+    :return: List of the continuous symmetry measures (same format as symmetry_measure), one for each set of points
+    """
+    points_distorted = np.asarray(points_distorted, dtype=float)
+    points_perfect = np.asarray(points_perfect, dtype=float)
+    nsets, npoints = points_distorted.shape[:2]
+    # When there is only one point, the symmetry measure is 0.0 by definition
+    if npoints == 1:
+        return [{'symmetry_measure': 0.0, 'scaling_factor': None, 'rotation_matrix': None} for _ in range(nsets)]
+    # Rotation matrices aligning each set of distorted points to the perfect points (see find_rotation)
+    H = np.matmul(points_distorted.transpose(0, 2, 1), points_perfect)
+    [U, S, Vt] = svd(H)
+    rots = np.matmul(Vt.transpose(0, 2, 1), U.transpose(0, 2, 1))
+    # Scaling factors (see find_scaling_factor)
+    rotated_coords = np.matmul(points_distorted, rots.transpose(0, 2, 1))
+    num = np.einsum('kij,ij->k', rotated_coords, points_perfect)
+    denom = np.einsum('kij,kij->k', rotated_coords, rotated_coords)
+    scaling_factors = num / denom
+    # Continuous symmetry measures (see symmetry_measure)
+    diff = points_perfect - scaling_factors[:, None, None] * rotated_coords
+    csms = np.einsum('kij,kij->k', diff, diff) / np.tensordot(points_perfect, points_perfect) * 100.0
+    return [{'symmetry_measure': csms[ii], 'scaling_factor': scaling_factors[ii], 'rotation_matrix': rots[ii]}
+            for ii in range(nsets)]
+
+
+# State of the worker processes used by LocalGeometryFinder.compute_structure_environments when ncores > 1
+_site_environments_worker_state = {}
+
+
+def _init_site_environments_worker(lgf, se, site_kwargs):
+    """
+    Initializer of the worker processes computing the environments of the sites in parallel.
+    :param lgf: LocalGeometryFinder with the structure set up
+    :param se: StructureEnvironments object being built
+    :param site_kwargs: Keyword arguments for LocalGeometryFinder._compute_site_environments
+    """
+    _site_environments_worker_state.update({'lgf': lgf, 'se': se, 'site_kwargs': site_kwargs})
+
+
+def _compute_site_environments_worker(isite):
+    """
+    Computes the environments of one site in a worker process.
+    :param isite: Index of the site
+    :return: The index of the site, the dict representations of its neighbors sets, its chemical environments and
+        the information about the calculation of this site
+    """
+    lgf = _site_environments_worker_state['lgf']
+    se = _site_environments_worker_state['se']
+    lgf._compute_site_environments(se=se, isite=isite, **_site_environments_worker_state['site_kwargs'])
+    nb_sets_dicts = {cn: [nb_set.as_dict() for nb_set in nb_sets]
+                     for cn, nb_sets in se.neighbors_sets[isite].items()}
+    return isite, nb_sets_dicts, se.ce_list[isite], se.info['sites_info'][isite]
+
+
 class LocalGeometryFinder:
     """
     Main class used to find the local environments in a structure
@@ -502,7 +577,10 @@ class LocalGeometryFinder:
                                        voronoi_normalized_angle_tolerance=PRESETS['DEFAULT']
                                        ['voronoi_normalized_angle_tolerance'],
                                        recompute=None,
-                                       optimization=PRESETS['DEFAULT']['optimization']):
+                                       optimization=PRESETS['DEFAULT']['optimization'],
+                                       ncores=None,
+                                       checkpoint_file=None,
+                                       checkpoint_interval=600):
         """
         Computes and returns the StructureEnvironments object containing all the information about the coordination
         environments in the structure
@@ -532,10 +610,16 @@ class LocalGeometryFinder:
         :param recompute: whether to recompute the sites already computed (when initial_structure_environments
             is not None)
         :param optimization: optimization algorithm
+        :param ncores: if larger than 1, the sites are distributed over a pool of ncores processes
+        :param checkpoint_file: if not set to None, the (partially built) StructureEnvironments object is regularly
+            saved to this json file. If the file already exists (e.g. after a job was stopped because of the timelimit
+            or killed), the calculation is resumed from it and the sites already computed are skipped
+        :param checkpoint_interval: minimum time (in secs) between two saves of the checkpoint file
         :return: The StructureEnvironments object containing all the information about the coordination
             environments in the structure
         """
         time_init = time.process_time()
+        self._last_checkpoint = time.time()
         if info is None:
             info = {}
         info.update({
@@ -618,6 +702,16 @@ class LocalGeometryFinder:
                                                          normalized_angle_tolerance=normalized_angle_tolerance)
         logging.debug('DetailedVoronoiContainer has been set up')
 
+        # Resume from the checkpoint file if it exists
+        completed_sites = set()
+        if checkpoint_file is not None and initial_structure_environments is None and os.path.exists(checkpoint_file):
+            logging.debug('Resuming from checkpoint file "{}"'.format(checkpoint_file))
+            initial_structure_environments = loadfn(checkpoint_file)
+            if recompute is None:
+                completed_sites = {isite for isite, site_info in
+                                   enumerate(initial_structure_environments.info.get('sites_info', []))
+                                   if 'time' in site_info}
+
         # Initialize the StructureEnvironments object (either from initial_structure_environments or from scratch)
         if initial_structure_environments is not None:
             se = initial_structure_environments
@@ -628,6 +722,8 @@ class LocalGeometryFinder:
                     self.detailed_voronoi = se.voronoi
                 else:
                     raise ValueError('Detailed Voronoi is not the same in initial_structure_environments')
+            if se.info is not None and 'sites_info' in se.info:
+                info['sites_info'] = se.info['sites_info']
             se.info = info
         else:
             se = StructureEnvironments(voronoi=self.detailed_voronoi, valences=self.valences,
@@ -649,122 +745,191 @@ class LocalGeometryFinder:
                 all_cns = list(set(all_cns).intersection(cns_to_recompute))
             do_recompute = True
 
-        # Variables used for checking timelimit
-        max_time_one_site = 0.0
-        breakit = False
-
         if optimization > 0:
             self.detailed_voronoi.local_planes = [None] * len(self.structure)
             self.detailed_voronoi.separations = [None] * len(self.structure)
 
-        # Loop on all the sites
+        site_kwargs = {'all_cns': all_cns, 'recompute': do_recompute, 'additional_conditions': additional_conditions,
+                       'valences': valences, 'get_from_hints': get_from_hints, 'min_cn': min_cn, 'max_cn': max_cn,
+                       'optimization': optimization}
+        isites_to_compute = []
         for isite in range(len(self.structure)):
             if isite not in sites_indices:
                 logging.debug(' ... in site #{:d}/{:d} ({}) : '
                               'skipped'.format(isite, len(self.structure),
                                                self.structure[isite].species_string))
-                continue
-            if breakit:
+            elif isite in completed_sites:
                 logging.debug(' ... in site #{:d}/{:d} ({}) : '
-                              'skipped (timelimit)'.format(isite, len(self.structure),
-                                                           self.structure[isite].species_string))
-                continue
-            logging.debug(' ... in site #{:d}/{:d} ({})'.format(isite, len(self.structure),
-                                                                self.structure[isite].species_string))
-            t1 = time.process_time()
-            if optimization > 0:
-                self.detailed_voronoi.local_planes[isite] = OrderedDict()
-                self.detailed_voronoi.separations[isite] = {}
-            se.init_neighbors_sets(isite=isite, additional_conditions=additional_conditions, valences=valences)
-
-            to_add_from_hints = []
-            nb_sets_info = {}
-
-            for cn, nb_sets in se.neighbors_sets[isite].items():
-                if cn not in all_cns:
+                              'skipped (from checkpoint)'.format(isite, len(self.structure),
+                                                                 self.structure[isite].species_string))
+            else:
+                isites_to_compute.append(isite)
+
+        if ncores is not None and ncores > 1 and len(isites_to_compute) > 1:
+            # The sites are distributed over a pool of processes. Each worker gets its own copy of this
+            # LocalGeometryFinder and of the StructureEnvironments (in the initializer) and sends back the
+            # neighbors sets and chemical environments of the sites it computed. Wall time is used for the time
+            # limit as the parent process does not do the work.
+            wall_time_init = time.time()
+            pool = Pool(ncores, initializer=_init_site_environments_worker, initargs=(self, se, site_kwargs))
+            try:
+                for isite, nb_sets_dicts, site_ce_list, site_info in pool.imap_unordered(
+                        _compute_site_environments_worker, isites_to_compute):
+                    se.neighbors_sets[isite] = {cn: [se.NeighborsSet.from_dict(dd=nb_set_dict, structure=se.structure,
+                                                                               detailed_voronoi=se.voronoi)
+                                                     for nb_set_dict in nb_sets]
+                                                for cn, nb_sets in nb_sets_dicts.items()}
+                    se.ce_list[isite] = site_ce_list
+                    se.update_site_info(isite=isite, info_dict=site_info)
+                    self._checkpoint(se, checkpoint_file, checkpoint_interval)
+                    if timelimit is not None:
+                        max_time_one_site = max(site['time'] for site in se.info['sites_info'] if 'time' in site)
+                        if timelimit - (time.time() - wall_time_init) < 2.0 * max_time_one_site:
+                            logging.debug(' ... stopping the calculation (timelimit)')
+                            break
+            finally:
+                pool.terminate()
+        else:
+            # Variables used for checking timelimit
+            max_time_one_site = 0.0
+            breakit = False
+
+            # Loop on all the sites
+            for isite in isites_to_compute:
+                if breakit:
+                    logging.debug(' ... in site #{:d}/{:d} ({}) : '
+                                  'skipped (timelimit)'.format(isite, len(self.structure),
+                                                               self.structure[isite].species_string))
                     continue
-                for inb_set, nb_set in enumerate(nb_sets):
-                    logging.debug('    ... getting environments for nb_set ({:d}, {:d})'.format(cn, inb_set))
-                    tnbset1 = time.process_time()
-                    ce = self.update_nb_set_environments(se=se, isite=isite, cn=cn, inb_set=inb_set, nb_set=nb_set,
-                                                         recompute=do_recompute, optimization=optimization)
-                    tnbset2 = time.process_time()
-                    if cn not in nb_sets_info:
-                        nb_sets_info[cn] = {}
-                    nb_sets_info[cn][inb_set] = {'time': tnbset2 - tnbset1}
-                    if get_from_hints:
-                        for cg_symbol, cg_dict in ce:
-                            cg = self.allcg[cg_symbol]
-                            # Get possibly missing neighbors sets
-                            if cg.neighbors_sets_hints is None:
-                                continue
-                            logging.debug('       ... getting hints from cg with mp_symbol "{}" ...'.format(cg_symbol))
-                            hints_info = {'csm': cg_dict['symmetry_measure'],
-                                          'nb_set': nb_set,
-                                          'permutation': cg_dict['permutation']}
-                            for nb_sets_hints in cg.neighbors_sets_hints:
-                                suggested_nb_set_voronoi_indices = nb_sets_hints.hints(hints_info)
-                                for inew, new_nb_set_voronoi_indices in enumerate(suggested_nb_set_voronoi_indices):
-                                    logging.debug('           hint # {:d}'.format(inew))
-                                    new_nb_set = se.NeighborsSet(structure=se.structure, isite=isite,
-                                                                 detailed_voronoi=se.voronoi,
-                                                                 site_voronoi_indices=new_nb_set_voronoi_indices,
-                                                                 sources={'origin': 'nb_set_hints',
-                                                                          'hints_type': nb_sets_hints.hints_type,
-                                                                          'suggestion_index': inew,
-                                                                          'cn_map_source': [cn, inb_set],
-                                                                          'cg_source_symbol': cg_symbol})
-                                    cn_new_nb_set = len(new_nb_set)
-                                    if max_cn is not None and cn_new_nb_set > max_cn:
-                                        continue
-                                    if min_cn is not None and cn_new_nb_set < min_cn:
-                                        continue
-                                    if new_nb_set in [ta['new_nb_set'] for ta in to_add_from_hints]:
-                                        has_nb_set = True
-                                    elif cn_new_nb_set not in se.neighbors_sets[isite]:
-                                        has_nb_set = False
-                                    else:
-                                        has_nb_set = new_nb_set in se.neighbors_sets[isite][cn_new_nb_set]
-                                    if not has_nb_set:
-                                        to_add_from_hints.append({'isite': isite,
-                                                                  'new_nb_set': new_nb_set,
-                                                                  'cn_new_nb_set': cn_new_nb_set})
-                                        logging.debug('              => to be computed')
-                                    else:
-                                        logging.debug('              => already present')
-            logging.debug('    ... getting environments for nb_sets added from hints')
-            for missing_nb_set_to_add in to_add_from_hints:
-                se.add_neighbors_set(isite=isite, nb_set=missing_nb_set_to_add['new_nb_set'])
-            for missing_nb_set_to_add in to_add_from_hints:
-                isite_new_nb_set = missing_nb_set_to_add['isite']
-                cn_new_nb_set = missing_nb_set_to_add['cn_new_nb_set']
-                new_nb_set = missing_nb_set_to_add['new_nb_set']
-                inew_nb_set = se.neighbors_sets[isite_new_nb_set][cn_new_nb_set].index(new_nb_set)
-                logging.debug('    ... getting environments for nb_set ({:d}, {:d}) - '
-                              'from hints'.format(cn_new_nb_set, inew_nb_set))
+                logging.debug(' ... in site #{:d}/{:d} ({})'.format(isite, len(self.structure),
+                                                                    self.structure[isite].species_string))
+                t1 = time.process_time()
+                self._compute_site_environments(se=se, isite=isite, **site_kwargs)
+                t2 = time.process_time()
+                self._checkpoint(se, checkpoint_file, checkpoint_interval)
+                if timelimit is not None:
+                    time_elapsed = t2 - time_init
+                    time_left = timelimit - time_elapsed
+                    if time_left < 2.0 * max_time_one_site:
+                        breakit = True
+                max_time_one_site = max(max_time_one_site, t2 - t1)
+                logging.debug('    ... computed in {:.2f} seconds'.format(t2 - t1))
+        self._checkpoint(se, checkpoint_file, checkpoint_interval=0)
+        time_end = time.process_time()
+        logging.debug('    ... compute_structure_environments ended in {:.2f} seconds'.format(time_end - time_init))
+        return se
+
+    def _compute_site_environments(self, se, isite, all_cns, recompute, additional_conditions, valences,
+                                   get_from_hints, min_cn, max_cn, optimization):
+        """
+        Computes the neighbors sets and the chemical environments of one site and stores them in the
+        StructureEnvironments object (see compute_structure_environments for the description of the parameters).
+        :param se: StructureEnvironments object to be updated
+        :param isite: Index of the site
+        """
+        t1 = time.process_time()
+        if optimization > 0:
+            self.detailed_voronoi.local_planes[isite] = OrderedDict()
+            self.detailed_voronoi.separations[isite] = {}
+        se.init_neighbors_sets(isite=isite, additional_conditions=additional_conditions, valences=valences)
+
+        to_add_from_hints = []
+        nb_sets_info = {}
+
+        for cn, nb_sets in se.neighbors_sets[isite].items():
+            if cn not in all_cns:
+                continue
+            for inb_set, nb_set in enumerate(nb_sets):
+                logging.debug('    ... getting environments for nb_set ({:d}, {:d})'.format(cn, inb_set))
                 tnbset1 = time.process_time()
-                self.update_nb_set_environments(se=se,
-                                                isite=isite_new_nb_set,
-                                                cn=cn_new_nb_set,
-                                                inb_set=inew_nb_set,
-                                                nb_set=new_nb_set,
-                                                optimization=optimization)
+                ce = self.update_nb_set_environments(se=se, isite=isite, cn=cn, inb_set=inb_set, nb_set=nb_set,
+                                                     recompute=recompute, optimization=optimization)
                 tnbset2 = time.process_time()
                 if cn not in nb_sets_info:
                     nb_sets_info[cn] = {}
-                nb_sets_info[cn][inew_nb_set] = {'time': tnbset2 - tnbset1}
-            t2 = time.process_time()
-            se.update_site_info(isite=isite, info_dict={'time': t2 - t1, 'nb_sets_info': nb_sets_info})
-            if timelimit is not None:
-                time_elapsed = t2 - time_init
-                time_left = timelimit - time_elapsed
-                if time_left < 2.0 * max_time_one_site:
-                    breakit = True
-            max_time_one_site = max(max_time_one_site, t2 - t1)
-            logging.debug('    ... computed in {:.2f} seconds'.format(t2 - t1))
-        time_end = time.process_time()
-        logging.debug('    ... compute_structure_environments ended in {:.2f} seconds'.format(time_end - time_init))
-        return se
+                nb_sets_info[cn][inb_set] = {'time': tnbset2 - tnbset1}
+                if get_from_hints:
+                    for cg_symbol, cg_dict in ce:
+                        cg = self.allcg[cg_symbol]
+                        # Get possibly missing neighbors sets
+                        if cg.neighbors_sets_hints is None:
+                            continue
+                        logging.debug('       ... getting hints from cg with mp_symbol "{}" ...'.format(cg_symbol))
+                        hints_info = {'csm': cg_dict['symmetry_measure'],
+                                      'nb_set': nb_set,
+                                      'permutation': cg_dict['permutation']}
+                        for nb_sets_hints in cg.neighbors_sets_hints:
+                            suggested_nb_set_voronoi_indices = nb_sets_hints.hints(hints_info)
+                            for inew, new_nb_set_voronoi_indices in enumerate(suggested_nb_set_voronoi_indices):
+                                logging.debug('           hint # {:d}'.format(inew))
+                                new_nb_set = se.NeighborsSet(structure=se.structure, isite=isite,
+                                                             detailed_voronoi=se.voronoi,
+                                                             site_voronoi_indices=new_nb_set_voronoi_indices,
+                                                             sources={'origin': 'nb_set_hints',
+                                                                      'hints_type': nb_sets_hints.hints_type,
+                                                                      'suggestion_index': inew,
+                                                                      'cn_map_source': [cn, inb_set],
+                                                                      'cg_source_symbol': cg_symbol})
+                                cn_new_nb_set = len(new_nb_set)
+                                if max_cn is not None and cn_new_nb_set > max_cn:
+                                    continue
+                                if min_cn is not None and cn_new_nb_set < min_cn:
+                                    continue
+                                if new_nb_set in [ta['new_nb_set'] for ta in to_add_from_hints]:
+                                    has_nb_set = True
+                                elif cn_new_nb_set not in se.neighbors_sets[isite]:
+                                    has_nb_set = False
+                                else:
+                                    has_nb_set = new_nb_set in se.neighbors_sets[isite][cn_new_nb_set]
+                                if not has_nb_set:
+                                    to_add_from_hints.append({'isite': isite,
+                                                              'new_nb_set': new_nb_set,
+                                                              'cn_new_nb_set': cn_new_nb_set})
+                                    logging.debug('              => to be computed')
+                                else:
+                                    logging.debug('              => already present')
+        logging.debug('    ... getting environments for nb_sets added from hints')
+        for missing_nb_set_to_add in to_add_from_hints:
+            se.add_neighbors_set(isite=isite, nb_set=missing_nb_set_to_add['new_nb_set'])
+        for missing_nb_set_to_add in to_add_from_hints:
+            isite_new_nb_set = missing_nb_set_to_add['isite']
+            cn_new_nb_set = missing_nb_set_to_add['cn_new_nb_set']
+            new_nb_set = missing_nb_set_to_add['new_nb_set']
+            inew_nb_set = se.neighbors_sets[isite_new_nb_set][cn_new_nb_set].index(new_nb_set)
+            logging.debug('    ... getting environments for nb_set ({:d}, {:d}) - '
+                          'from hints'.format(cn_new_nb_set, inew_nb_set))
+            tnbset1 = time.process_time()
+            self.update_nb_set_environments(se=se,
+                                            isite=isite_new_nb_set,
+                                            cn=cn_new_nb_set,
+                                            inb_set=inew_nb_set,
+                                            nb_set=new_nb_set,
+                                            optimization=optimization)
+            tnbset2 = time.process_time()
+            if cn not in nb_sets_info:
+                nb_sets_info[cn] = {}
+            nb_sets_info[cn][inew_nb_set] = {'time': tnbset2 - tnbset1}
+        t2 = time.process_time()
+        se.update_site_info(isite=isite, info_dict={'time': t2 - t1, 'nb_sets_info': nb_sets_info})
+
+    def _checkpoint(self, se, checkpoint_file, checkpoint_interval):
+        """
+        Saves the (possibly incomplete) StructureEnvironments object to the checkpoint file if the last save is older
+        than checkpoint_interval seconds.
+        :param se: StructureEnvironments object
+        :param checkpoint_file: Path of the checkpoint (json) file. Nothing is done if None.
+        :param checkpoint_interval: Minimum time (in secs) between two saves
+        """
+        if checkpoint_file is None or 'sites_info' not in se.info:
+            return
+        now = time.time()
+        if now - self._last_checkpoint < checkpoint_interval:
+            return
+        # Write to a temporary file first so that a job killed while writing does not leave a corrupted checkpoint
+        tmp_file = '{}.tmp'.format(checkpoint_file)
+        dumpfn(se, tmp_file)
+        os.replace(tmp_file, checkpoint_file)
+        self._last_checkpoint = now
 
     def update_nb_set_environments(self, se, isite, cn, inb_set, nb_set, recompute=False, optimization=None):
         """
@@ -1304,7 +1469,6 @@ class LocalGeometryFinder:
         # permutations_symmetry_measures = np.zeros(len(algo.permutations),
         #                                           np.float)
         if optimization == 2:
-            permutations_symmetry_measures = [None] * len(algo.permutations)
             permutations = list()
             algos = list()
             local2perfect_maps = list()
@@ -1319,19 +1483,11 @@ class LocalGeometryFinder:
                     local2perfect_map[ii] = iperfect
                 local2perfect_maps.append(local2perfect_map)
                 perfect2local_maps.append(perfect2local_map)
-
-                points_distorted = self.local_geometry.points_wcs_ctwcc(
-                    permutation=perm)
-
-                sm_info = symmetry_measure(points_distorted=points_distorted,
-                                           points_perfect=points_perfect)
-                sm_info['translation_vector'] = self.local_geometry.centroid_with_centre
-
-                permutations_symmetry_measures[iperm] = sm_info
                 algos.append(str(algo))
+            permutations_symmetry_measures = self._permutations_symmetry_measures(permutations=permutations,
+                                                                                  points_perfect=points_perfect)
             return permutations_symmetry_measures, permutations, algos, local2perfect_maps, perfect2local_maps
         else:
-            permutations_symmetry_measures = [None] * len(algo.permutations)
             permutations = list()
             algos = list()
             local2perfect_maps = list()
@@ -1346,16 +1502,9 @@ class LocalGeometryFinder:
                     local2perfect_map[ii] = iperfect
                 local2perfect_maps.append(local2perfect_map)
                 perfect2local_maps.append(perfect2local_map)
-
-                points_distorted = self.local_geometry.points_wcs_ctwcc(
-                    permutation=perm)
-
-                sm_info = symmetry_measure(points_distorted=points_distorted,
-                                           points_perfect=points_perfect)
-                sm_info['translation_vector'] = self.local_geometry.centroid_with_centre
-
-                permutations_symmetry_measures[iperm] = sm_info
                 algos.append(str(algo))
+            permutations_symmetry_measures = self._permutations_symmetry_measures(permutations=permutations,
+                                                                                  points_perfect=points_perfect)
             return permutations_symmetry_measures, permutations, algos, local2perfect_maps, perfect2local_maps
 
     def coordination_geometry_symmetry_measures_separation_plane(self,
@@ -1676,14 +1825,8 @@ class LocalGeometryFinder:
                 if testing:
                     separation_permutations.append(sep_perm)
 
-                points_distorted = self.local_geometry.points_wcs_ctwcc(
-                    permutation=pp)
-
-                sm_info = symmetry_measure(points_distorted=points_distorted,
-                                           points_perfect=points_perfect)
-                sm_info['translation_vector'] = self.local_geometry.centroid_with_centre
-
-                permutations_symmetry_measures.append(sm_info)
+            permutations_symmetry_measures = self._permutations_symmetry_measures(permutations=permutations,
+                                                                                  points_perfect=points_perfect)
             if plane_found:
                 break
         if len(permutations_symmetry_measures) > 0:
@@ -1711,7 +1854,6 @@ class LocalGeometryFinder:
                                         separation_indices=None):
         argref_separation = sepplane.argsorted_ref_separation_perm
         permutations = []
-        permutations_symmetry_measures = []
         stop_search = False
         # TODO: do not do that several times ... also keep in memory
         if sepplane.ordered_plane:
@@ -1758,15 +1900,8 @@ class LocalGeometryFinder:
 
             permutations.append(pp)
 
-            points_distorted = self.local_geometry.points_wcs_ctwcc(
-                permutation=pp)
-
-            sm_info = symmetry_measure(points_distorted=points_distorted,
-                                       points_perfect=points_perfect)
-
-            sm_info['translation_vector'] = self.local_geometry.centroid_with_centre
-
-            permutations_symmetry_measures.append(sm_info)
+        permutations_symmetry_measures = self._permutations_symmetry_measures(permutations=permutations,
+                                                                              points_perfect=points_perfect)
 
         if len(permutations_symmetry_measures) > 0:
             return permutations_symmetry_measures, permutations, [sepplane.algorithm_type] * len(
@@ -1781,7 +1916,6 @@ class LocalGeometryFinder:
                                         separation_indices=None):
         argref_separation = sepplane.argsorted_ref_separation_perm
         permutations = []
-        permutations_symmetry_measures = []
         stop_search = False
         # TODO: do not do that several times ... also keep in memory
         if sepplane.ordered_plane:
@@ -1830,15 +1964,8 @@ class LocalGeometryFinder:
 
             permutations.append(pp)
 
-            points_distorted = self.local_geometry.points_wcs_ctwcc(
-                permutation=pp)
-
-            sm_info = symmetry_measure(points_distorted=points_distorted,
-                                       points_perfect=points_perfect)
-
-            sm_info['translation_vector'] = self.local_geometry.centroid_with_centre
-
-            permutations_symmetry_measures.append(sm_info)
+        permutations_symmetry_measures = self._permutations_symmetry_measures(permutations=permutations,
+                                                                              points_perfect=points_perfect)
 
         if len(permutations_symmetry_measures) > 0:
             return permutations_symmetry_measures, permutations, [sepplane.algorithm_type] * len(
@@ -1846,6 +1973,23 @@ class LocalGeometryFinder:
         else:
             return [], [], [], stop_search
 
+    def _permutations_symmetry_measures(self, permutations, points_perfect):
+        """
+        Returns the symmetry measures of the current local geometry (with the central site, centered on the centroid
+        including the central site) for each of the permutations, computed in one batch.
+        :param permutations: List of permutations of the neighbors
+        :param points_perfect: The "perfect" points of the model polyhedron
+        :return: List of the symmetry measures, one for each permutation
+        """
+        if len(permutations) == 0:
+            return []
+        points_distorted = self.local_geometry.points_wcs_ctwcc_permutations(permutations)
+        permutations_symmetry_measures = symmetry_measures(points_distorted=points_distorted,
+                                                           points_perfect=points_perfect)
+        for sm_info in permutations_symmetry_measures:
+            sm_info['translation_vector'] = self.local_geometry.centroid_with_centre
+        return permutations_symmetry_measures
+
     def coordination_geometry_symmetry_measures_fallback_random(self,
                                                                 coordination_geometry,
                                                                 NRANDOM=10,
@@ -1859,7 +2003,6 @@ class LocalGeometryFinder:
         :param NRANDOM: Number of random permutations to be tested
         :return: The symmetry measures for the given coordination geometry for each permutation investigated
         """
-        permutations_symmetry_measures = [None] * NRANDOM
         permutations = list()
         algos = list()
         perfect2local_maps = list()
@@ -1875,13 +2018,7 @@ class LocalGeometryFinder:
                 l2p[pp] = i_p
             perfect2local_maps.append(p2l)
             local2perfect_maps.append(l2p)
-
-            points_distorted = self.local_geometry.points_wcs_ctwcc(
-                permutation=perm)
-            sm_info = symmetry_measure(points_distorted=points_distorted,
-                                       points_perfect=points_perfect)
-            sm_info['translation_vector'] = self.local_geometry.centroid_with_centre
-
-            permutations_symmetry_measures[iperm] = sm_info
             algos.append('APPROXIMATE_FALLBACK')
+        permutations_symmetry_measures = self._permutations_symmetry_measures(permutations=permutations,
+                                                                              points_perfect=points_perfect)
         return permutations_symmetry_measures, permutations, algos, local2perfect_maps, perfect2local_maps
@@ -5,6 +5,7 @@ __author__ = 'waroquiers'
 
 import unittest
 import os
+import tempfile
 import numpy as np
 from pymatgen.util.testing import PymatgenTest
 
@@ -12,6 +13,7 @@ from pymatgen.analysis.chemenv.coordination_environments.coordination_geometry_f
 from pymatgen.analysis.chemenv.coordination_environments.coordination_geometries import AllCoordinationGeometries
 from pymatgen.analysis.chemenv.coordination_environments.coordination_geometry_finder import AbstractGeometry
 from pymatgen.analysis.chemenv.coordination_environments.coordination_geometry_finder import symmetry_measure
+from pymatgen.analysis.chemenv.coordination_environments.coordination_geometry_finder import symmetry_measures
 
 json_files_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", "..",
                               'test_files', "chemenv", "json_test_files")
@@ -210,6 +212,59 @@ class CoordinationGeometryFinderTest(PymatgenTest):
         self.assertAlmostEqual(se_hints.ce_list[0][13][0], se_nohints.ce_list[0][13][0])
         self.assertTrue(set(se_nohints.ce_list[0].keys()).issubset(set(se_hints.ce_list[0].keys())))
 
+    def test_symmetry_measures(self):
+        cg = self.lgf.allcg['O:6']
+        points_perfect = AbstractGeometry.from_cg(cg=cg, centering_type='centroid',
+                                                  include_central_site_in_centroid=True).points_wcs_ctwcc()
+        np.random.seed(42)
+        local_geometry = AbstractGeometry(central_site=[0.1, 0.0, 0.0],
+                                          bare_coords=np.array(cg.points) + 0.1 * np.random.rand(6, 3),
+                                          centering_type='centroid', include_central_site_in_centroid=True)
+        permutations = [np.random.permutation(6) for _ in range(10)]
+        points_distorted = local_geometry.points_wcs_ctwcc_permutations(permutations)
+        self.assertEqual(points_distorted.shape, (10, 7, 3))
+        batch = symmetry_measures(points_distorted, points_perfect)
+        for perm, sm_info in zip(permutations, batch):
+            ref = symmetry_measure(local_geometry.points_wcs_ctwcc(permutation=perm), points_perfect)
+            self.assertAlmostEqual(sm_info['symmetry_measure'], ref['symmetry_measure'])
+            self.assertAlmostEqual(sm_info['scaling_factor'], ref['scaling_factor'])
+            self.assertArrayAlmostEqual(sm_info['rotation_matrix'], ref['rotation_matrix'])
+
+    def test_parallel_and_checkpoint(self):
+        struct = self.get_structure('LiFePO4')
+        self.lgf.setup_structure(struct)
+        symbols = {4: 'O:6', 5: 'O:6', 8: 'T:4'}
+        kwargs = {'only_indices': sorted(symbols), 'maximum_distance_factor': 1.41, 'max_cn': 6}
+
+        def csms(se, isite):
+            return [csm['symmetry_measure'] for csm in se.get_csms(isite, symbols[isite])]
+
+        se = self.lgf.compute_structure_environments(**kwargs)
+        se_parallel = self.lgf.compute_structure_environments(ncores=2, **kwargs)
+        for isite in symbols:
+            self.assertEqual(se.neighbors_sets[isite], se_parallel.neighbors_sets[isite])
+            self.assertGreater(len(csms(se, isite)), 0)
+            self.assertArrayAlmostEqual(csms(se, isite), csms(se_parallel, isite))
+        nb_set = se_parallel.neighbors_sets[8][4][0]
+        self.assertIs(nb_set.structure, se_parallel.structure)
+        self.assertIs(nb_set.detailed_voronoi, se_parallel.voronoi)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            checkpoint_file = os.path.join(tmp_dir, 'se_checkpoint.json')
+            # The time limit stops the calculation after the first site
+            se_partial = self.lgf.compute_structure_environments(timelimit=0.0, checkpoint_file=checkpoint_file,
+                                                                 **kwargs)
+            self.assertTrue(os.path.exists(checkpoint_file))
+            computed = [isite for isite, site_info in enumerate(se_partial.info['sites_info'])
+                        if 'time' in site_info]
+            self.assertEqual(computed, [4])
+            se_resumed = self.lgf.compute_structure_environments(checkpoint_file=checkpoint_file, **kwargs)
+            for isite in symbols:
+                self.assertIn('time', se_resumed.info['sites_info'][isite])
+                self.assertArrayAlmostEqual(csms(se, isite), csms(se_resumed, isite))
+            # The site computed before the time limit is not computed again
+            self.assertEqual(se_resumed.info['sites_info'][4]['time'], se_partial.info['sites_info'][4]['time'])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -107,6 +107,8 @@ class DetailedVoronoiContainer(MSONable):
         logging.debug('Setting Voronoi list')
         if voronoi_list2 is not None:
             self.voronoi_list2 = voronoi_list2
+            self.voronoi_list_coords = [np.array([dd['site'].coords for dd in site_voronoi])
+                                        if site_voronoi is not None else None for site_voronoi in voronoi_list2]
         else:
             self.setup_voronoi_list(indices=indices, voronoi_cutoff=voronoi_cutoff)
         logging.debug('Setting neighbors distances and angles')
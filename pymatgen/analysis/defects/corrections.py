@@ -7,13 +7,14 @@ Implementation of defect correction methods.
 """
 
 import logging
+from functools import lru_cache
 import numpy as np
 import scipy
 from scipy import stats
 from pymatgen.analysis.defects.core import DefectCorrection
 from pymatgen.analysis.defects.utils import ang_to_bohr, hart_to_ev, eV_to_k, \
-    generate_reciprocal_vectors_squared, QModel, converge, tune_for_gamma, \
-    generate_R_and_G_vecs, kumagai_to_V
+    get_recip_vectors_squared, QModel, converge, tune_for_gamma, \
+    generate_R_and_G_vecs, kumagai_to_V, _get_array_key, _from_array_key, _ArrayDigestKey
 
 import matplotlib.pyplot as plt
 
@@ -147,27 +148,12 @@ class FreysoldtCorrection(DefectCorrection):
         logger.info("Running Freysoldt 2011 PC calculation (should be " "equivalent to sxdefectalign)")
         logger.debug("defect lattice constants are (in angstroms)" + str(lattice.abc))
 
-        [a1, a2, a3] = ang_to_bohr * np.array(lattice.get_cartesian_coords(1))
-        logging.debug("In atomic units, lat consts are (in bohr):" + str([a1, a2, a3]))
-        vol = np.dot(a1, np.cross(a2, a3))  # vol in bohr^3
-
-        def e_iso(encut):
-            gcut = eV_to_k(encut)  # gcut is in units of 1/A
-            return scipy.integrate.quad(lambda g: self.q_model.rho_rec(g * g) ** 2, step, gcut)[0] * (q ** 2) / np.pi
-
-        def e_per(encut):
-            eper = 0
-            for g2 in generate_reciprocal_vectors_squared(a1, a2, a3, encut):
-                eper += (self.q_model.rho_rec(g2) ** 2) / g2
-            eper *= (q ** 2) * 2 * round(np.pi, 6) / vol
-            eper += (q ** 2) * 4 * round(np.pi, 6) * self.q_model.rho_rec_limit0 / vol
-            return eper
-
-        eiso = converge(e_iso, 5, self.madetol, self.energy_cutoff)
+        # The point charge energies only depend on the host lattice and the
+        # charge, and are cached for the many defects in a supercell.
+        eiso, eper = _get_freysoldt_pc_energies(
+            _get_array_key(lattice.matrix), float(q), self.q_model.beta, self.q_model.expnorm,
+            self.q_model.gamma, self.madetol, self.energy_cutoff, step)
         logger.debug("Eisolated : %f", round(eiso, 5))
-
-        eper = converge(e_per, 5, self.madetol, self.energy_cutoff)
-
         logger.info("Eperiodic : %f hartree", round(eper, 5))
         logger.info("difference (periodic-iso) is %f hartree", round(eper - eiso, 6))
         logger.info("difference in (eV) is %f", round((eper - eiso) * hart_to_ev, 4))
@@ -513,26 +499,33 @@ class KumagaiCorrection(DefectCorrection):
         pot_dict = {}  # keys will be site index in the defect structure
         for_correction = []  # region to sample for correction
 
-        # for each atom, do the following:
-        # (a) get relative_vector from defect_site to site in defect_supercell structure
-        # (b) recalculate the recip and real summation values based on this r_vec
-        # (c) get information needed for pot align
+        # (a) get relative_vector from defect_site to each site in defect_supercell structure
+        vecs_defect_to_site = []
         for site, Vqb in site_list:
             dist, jimage = site.distance_and_image_from_frac_coords(defect_frac_coords)
             vec_defect_to_site = defect_structure.lattice.get_cartesian_coords(site.frac_coords -
                                                                                jimage - defect_frac_coords)
-            dist_to_defect = np.linalg.norm(vec_defect_to_site)
-            if abs(dist_to_defect - dist) > 0.001:
+            if abs(np.linalg.norm(vec_defect_to_site) - dist) > 0.001:
                 raise ValueError("Error in computing vector to defect")
-
-            relative_real_vectors = [r_vec - vec_defect_to_site for r_vec in r_vecs[:]]
-
-            real_sum = self.get_real_summation(gamma, relative_real_vectors)
-            recip_sum = self.get_recip_summation(gamma, g_vecs, volume, r=vec_defect_to_site[:])
-
+            vecs_defect_to_site.append(vec_defect_to_site)
+
+        # (b) recalculate the recip and real summation values based on these r_vecs. These are
+        # the same for all charge states of a defect and are cached.
+        real_sums, recip_sums = _get_kumagai_site_summations(
+            float(gamma), _get_array_key(self.dielectric), volume, _ArrayDigestKey(np.reshape(r_vecs, (-1, 3))),
+            _ArrayDigestKey(np.reshape(g_vecs, (-1, 3))), _get_array_key(np.reshape(vecs_defect_to_site, (-1, 3))))
+
+        # (c) get information needed for pot align. The sites of site_list are
+        # looked up in defect_structure by their fractional coordinates.
+        site_indices = {}
+        for i, site in enumerate(defect_structure):
+            site_indices.setdefault(tuple(site.frac_coords), i)
+        for (site, Vqb), vec_defect_to_site, real_sum, recip_sum in zip(site_list, vecs_defect_to_site,
+                                                                        real_sums, recip_sums):
+            dist_to_defect = np.linalg.norm(vec_defect_to_site)
             Vpc = (real_sum + recip_sum + potential_shift) * kumagai_to_V * q
 
-            defect_struct_index = defect_structure.index(site)
+            defect_struct_index = site_indices[tuple(site.frac_coords)]
             pot_dict[defect_struct_index] = {
                 "Vpc": Vpc,
                 "Vqb": Vqb,
@@ -581,17 +574,15 @@ class KumagaiCorrection(DefectCorrection):
 
     def get_real_summation(self, gamma, real_vectors):
         """
-        Get real summation term from list of real-space vectors
+        Get real summation term from list (or Nx3 array) of real-space vectors
         """
-        real_part = 0
+        real_vectors = np.reshape(real_vectors, (-1, 3))
         invepsilon = np.linalg.inv(self.dielectric)
         rd_epsilon = np.sqrt(np.linalg.det(self.dielectric))
 
-        for r_vec in real_vectors:
-            if np.linalg.norm(r_vec) > 1e-8:
-                loc_res = np.sqrt(np.dot(r_vec, np.dot(invepsilon, r_vec)))
-                nmr = scipy.special.erfc(gamma * loc_res)
-                real_part += nmr / loc_res
+        real_vectors = real_vectors[np.linalg.norm(real_vectors, axis=1) > 1e-8]
+        loc_res = np.sqrt(np.einsum("ij,jk,ik->i", real_vectors, invepsilon, real_vectors))
+        real_part = np.sum(scipy.special.erfc(gamma * loc_res) / loc_res)
 
         real_part /= (4 * np.pi * rd_epsilon)
 
@@ -599,16 +590,25 @@ class KumagaiCorrection(DefectCorrection):
 
     def get_recip_summation(self, gamma, recip_vectors, volume, r=[0., 0., 0.]):
         """
-        Get Reciprocal summation term from list of reciprocal-space vectors
+        Get Reciprocal summation term from list (or Nx3 array) of
+        reciprocal-space vectors. If r is an Mx3 array of positions, an array
+        with the M summations is returned.
         """
-        recip_part = 0
+        # dont need to avoid G=0, because it will not be
+        # in recip list (if generate_R_and_G_vecs is used)
+        recip_vectors = np.reshape(recip_vectors, (-1, 3))
+        Gdotdiel = np.einsum("ij,jk,ik->i", recip_vectors, self.dielectric, recip_vectors)
+        weights = np.exp(-Gdotdiel / (4 * (gamma ** 2))) / Gdotdiel
 
-        for g_vec in recip_vectors:
-            # dont need to avoid G=0, because it will not be
-            # in recip list (if generate_R_and_G_vecs is used)
-            Gdotdiel = np.dot(g_vec, np.dot(self.dielectric, g_vec))
-            summand = np.exp(-Gdotdiel / (4 * (gamma ** 2))) * np.cos(np.dot(g_vec, r)) / Gdotdiel
-            recip_part += summand
+        r = np.array(r, dtype=float)
+        if r.ndim == 1:
+            recip_part = np.dot(np.cos(np.dot(recip_vectors, r)), weights)
+        else:
+            # chunk the positions to bound the size of the cos(G.r) matrix
+            chunk = max(1, 2 ** 20 // max(len(recip_vectors), 1))
+            recip_part = np.zeros(len(r))
+            for i in range(0, len(r), chunk):
+                recip_part[i:i + chunk] = np.dot(np.cos(np.dot(r[i:i + chunk], recip_vectors.T)), weights)
 
         recip_part /= volume
 
@@ -702,6 +702,49 @@ class KumagaiCorrection(DefectCorrection):
             return plt
 
 
+@lru_cache(maxsize=64)
+def _get_freysoldt_pc_energies(lattice_key, q, beta, expnorm, gamma, madetol, energy_cutoff, step):
+    """
+    Cached isolated and periodic point charge energies (in hartree) of
+    FreysoldtCorrection.perform_es_corr, see _get_array_key for the keys.
+    """
+    q_model = QModel(beta=beta, expnorm=expnorm, gamma=gamma)
+    [a1, a2, a3] = ang_to_bohr * _from_array_key(lattice_key)
+    logging.debug("In atomic units, lat consts are (in bohr):" + str([a1, a2, a3]))
+    vol = np.dot(a1, np.cross(a2, a3))  # vol in bohr^3
+
+    def e_iso(encut):
+        gcut = eV_to_k(encut)  # gcut is in units of 1/A
+        return scipy.integrate.quad(lambda g: q_model.rho_rec(g * g) ** 2, step, gcut)[0] * (q ** 2) / np.pi
+
+    def e_per(encut):
+        g2 = get_recip_vectors_squared(a1, a2, a3, encut)
+        eper = np.sum((q_model.rho_rec(g2) ** 2) / g2)
+        eper *= (q ** 2) * 2 * round(np.pi, 6) / vol
+        eper += (q ** 2) * 4 * round(np.pi, 6) * q_model.rho_rec_limit0 / vol
+        return eper
+
+    eiso = converge(e_iso, 5, madetol, energy_cutoff)
+    eper = converge(e_per, 5, madetol, energy_cutoff)
+    return eiso, eper
+
+
+@lru_cache(maxsize=256)
+def _get_kumagai_site_summations(gamma, dielectric_key, volume, r_vecs_key, g_vecs_key, vecs_key):
+    """
+    Cached real and reciprocal space summations of
+    KumagaiCorrection.perform_pot_corr at each site, see _get_array_key and
+    _ArrayDigestKey (for the lattice vectors) for the keys.
+    """
+    kc = KumagaiCorrection(_from_array_key(dielectric_key), gamma=gamma)
+    r_vecs = r_vecs_key.array
+    vecs_defect_to_site = _from_array_key(vecs_key)
+    real_sums = [kc.get_real_summation(gamma, r_vecs - vec) for vec in vecs_defect_to_site]
+    recip_sums = kc.get_recip_summation(gamma, g_vecs_key.array, volume, r=vecs_defect_to_site)
+    recip_sums.setflags(write=False)
+    return tuple(real_sums), recip_sums
+
+
 class BandFillingCorrection(DefectCorrection):
     """
     A class for BandFillingCorrection class. Largely adapted from PyCDT code
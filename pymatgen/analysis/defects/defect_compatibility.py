@@ -9,6 +9,9 @@ defects
 """
 
 import logging
+import multiprocessing
+import time
+import numpy as np
 from monty.json import MSONable
 from pymatgen.core import Structure
 from pymatgen.analysis.defects.corrections import FreysoldtCorrection, \
@@ -188,9 +191,67 @@ class DefectCompatibility(MSONable):
 
         return defect_entry
 
+    def process_entries(self, defect_entries, perform_corrections=True, nproc=None):
+        """
+        Process many DefectEntries, e.g., all the defects of a campaign in one
+        host, with process_entry.
+
+        The host-only parts of the charge corrections (lattice sums, Ewald
+        parameter and point charge energies, and the model potentials at the
+        sites of each defect) are cached for each host supercell. They are
+        computed once for the first entry of each host before the remaining
+        entries are distributed over nproc processes, which inherit the
+        cached values where processes are forked. Like process_entry, the
+        entries are updated in place, also when they are processed in other
+        processes.
+
+        Args:
+            defect_entries ([DefectEntry]): Defects to process.
+            perform_corrections (bool): Whether to perform the corrections,
+                see process_entry.
+            nproc (int): Number of processes to use. Defaults to None, which
+                means serial.
+
+        Returns:
+            List of processed DefectEntries, in the same order as
+            defect_entries. The wall time spent on each entry (in seconds)
+            is stored as "processing_time" in its parameters, and that of
+            each correction as "correction_times" (see
+            perform_all_corrections).
+        """
+        defect_entries = list(defect_entries)
+        hosts = {}
+        for i, defect_entry in enumerate(defect_entries):
+            struct = defect_entry.parameters.get("initial_defect_structure", defect_entry.bulk_structure)
+            lattice = struct["lattice"]["matrix"] if isinstance(struct, dict) else struct.lattice.matrix
+            key = (np.array(lattice, dtype=float).tobytes(), str(defect_entry.parameters.get("dielectric")))
+            hosts.setdefault(key, i)
+
+        processed = {}
+        for i in hosts.values():
+            processed[i] = _process_entry((self, defect_entries[i], perform_corrections))
+        remaining = [i for i in range(len(defect_entries)) if i not in processed]
+        args = [(self, defect_entries[i], perform_corrections) for i in remaining]
+        if nproc is not None and len(args) > 1:
+            with multiprocessing.Pool(nproc) as p:
+                for i, defect_entry in zip(remaining, p.map(_process_entry, args)):
+                    # the worker processes return processed copies
+                    defect_entries[i].parameters.update(defect_entry.parameters)
+                    defect_entries[i].corrections.update(defect_entry.corrections)
+                    processed[i] = defect_entries[i]
+        else:
+            processed.update(zip(remaining, map(_process_entry, args)))
+
+        logger.info("Processed %d defect entries in %.2f s of processing time", len(defect_entries),
+                    sum(d.parameters["processing_time"] for d in processed.values()))
+        return [processed[i] for i in range(len(defect_entries))]
+
     def perform_all_corrections(self, defect_entry):
         """
-        Perform all corrections for a defect.
+        Perform all corrections for a defect. The wall time spent on each
+        correction that is performed (in seconds) is stored in the
+        "correction_times" dict of the parameters of the entry, with keys
+        "freysoldt", "kumagai", "bandfilling" and "bandedgeshifting".
 
         Args:
             defect_entry (DefectEntry): Defect to correct.
@@ -198,6 +259,8 @@ class DefectCompatibility(MSONable):
         Returns:
             Corrected DefectEntry
         """
+        correction_times = {}
+
         # consider running freysoldt correction
         required_frey_params = ["dielectric", "axis_grid", "bulk_planar_averages", "defect_planar_averages",
                                 "initial_defect_structure", "defect_frac_sc_coords"]
@@ -206,7 +269,9 @@ class DefectCompatibility(MSONable):
         if not run_freysoldt:
             logger.info('Insufficient DefectEntry parameters exist for Freysoldt Correction.')
         else:
+            t = time.time()
             defect_entry = self.perform_freysoldt(defect_entry)
+            correction_times["freysoldt"] = time.time() - t
 
         # consider running kumagai correction
         required_kumagai_params = ["dielectric", "bulk_atomic_site_averages", "defect_atomic_site_averages",
@@ -217,7 +282,9 @@ class DefectCompatibility(MSONable):
             logger.info('Insufficient DefectEntry parameters exist for Kumagai Correction.')
         else:
             try:
+                t = time.time()
                 defect_entry = self.perform_kumagai(defect_entry)
+                correction_times["kumagai"] = time.time() - t
             except Exception:
                 logger.info("Kumagai correction error occured! Wont perform correction.")
 
@@ -253,7 +320,9 @@ class DefectCompatibility(MSONable):
         if not run_bandfilling:
             logger.info('Insufficient DefectEntry parameters exist for BandFilling Correction.')
         else:
+            t = time.time()
             defect_entry = self.perform_bandfilling(defect_entry)
+            correction_times["bandfilling"] = time.time() - t
 
         # consider running band edge shifting correction
         required_bandedge_shifting_params = ["hybrid_cbm", "hybrid_vbm", "vbm", "cbm"]
@@ -263,8 +332,11 @@ class DefectCompatibility(MSONable):
         if not run_bandedge_shifting:
             logger.info('Insufficient DefectEntry parameters exist for BandShifting Correction.')
         else:
+            t = time.time()
             defect_entry = self.perform_band_edge_shifting(defect_entry)
+            correction_times["bandedgeshifting"] = time.time() - t
 
+        defect_entry.parameters["correction_times"] = correction_times
         return defect_entry
 
     def perform_freysoldt(self, defect_entry):
@@ -570,3 +642,21 @@ class DefectCompatibility(MSONable):
             defect_entry.parameters.update({'is_compatible': False})
 
         return defect_entry
+
+
+def _process_entry(args):
+    """
+    Processes a DefectEntry and records the time spent on it. Module level
+    to support multiprocessing.
+
+    Args:
+        args: (DefectCompatibility, DefectEntry, perform_corrections)
+
+    Returns:
+        Processed DefectEntry
+    """
+    compatibility, defect_entry, perform_corrections = args
+    t = time.time()
+    defect_entry = compatibility.process_entry(defect_entry, perform_corrections=perform_corrections)
+    defect_entry.parameters["processing_time"] = time.time() - t
+    return defect_entry
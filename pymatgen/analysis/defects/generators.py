@@ -9,6 +9,7 @@ This module defines classes to generate point defect structures
 import logging
 from abc import ABCMeta, abstractmethod
 
+import numpy as np
 from monty.json import MSONable
 
 from pymatgen.core import PeriodicSite
@@ -16,7 +17,7 @@ from pymatgen.analysis.bond_valence import BVAnalyzer
 from pymatgen.analysis.defects.core import Vacancy, Interstitial, Substitution
 from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
 from pymatgen.analysis.defects.utils import StructureMotifInterstitial, TopographyAnalyzer
-from pymatgen.analysis.structure_matcher import PointDefectComparator
+from pymatgen.analysis.structure_matcher import StructureMatcher
 
 __author__ = "Danny Broberg, Shyam Dwaraknath"
 __copyright__ = "Copyright 2018, The Materials Project"
@@ -149,30 +150,24 @@ class InterstitialGenerator(DefectGenerator):
     (PyCDT: D. Broberg et al., Comput. Phys. Commun., in press, 2018).
     """
 
-    def __init__(self, structure, element):
+    def __init__(self, structure, element, nproc=None):
         """
         Initializes an Interstitial generator using structure motifs
         Args:
             structure (Structure): pymatgen structure object
             element (str or Element or Specie): element for the interstitial
+            nproc (int): number of processes used to evaluate trial sites,
+                see StructureMotifInterstitial. Defaults to None (serial).
         """
         self.structure = structure
         self.element = element
-        interstitial_finder = StructureMotifInterstitial(self.structure, self.element)
+        interstitial_finder = StructureMotifInterstitial(self.structure, self.element, nproc=nproc)
 
-        self.unique_defect_seq = []
         # eliminate sublattice equivalent defects which may
         # have slipped through interstitial finder
-        pdc = PointDefectComparator()
-
-        for poss_site in interstitial_finder.enumerate_defectsites():
-            now_defect = Interstitial(self.structure, poss_site)
-            append_defect = True
-            for unique_defect in self.unique_defect_seq:
-                if pdc.are_equal(now_defect, unique_defect):
-                    append_defect = False
-            if append_defect:
-                self.unique_defect_seq.append(now_defect)
+        self.unique_defect_seq = [
+            Interstitial(self.structure, site)
+            for site in get_unique_interstitial_sites(self.structure, interstitial_finder.enumerate_defectsites())]
 
         self.count_def = 0  # for counting the index of the generated defect
 
@@ -221,18 +216,11 @@ class VoronoiInterstitialGenerator(DefectGenerator):
 
         # do additional screening for sublattice equivalent
         # defects which may have slipped through
-        pdc = PointDefectComparator()
-        self.unique_defect_seq = []
-        for poss_site_list in equiv_sites_list:
-            poss_site = poss_site_list[0]
-            if poss_site not in self.structure:
-                now_defect = Interstitial(self.structure, poss_site)
-                append_defect = True
-                for unique_defect in self.unique_defect_seq:
-                    if pdc.are_equal(now_defect, unique_defect):
-                        append_defect = False
-                if append_defect:
-                    self.unique_defect_seq.append(now_defect)
+        poss_sites = [poss_site_list[0] for poss_site_list in equiv_sites_list
+                      if poss_site_list[0] not in self.structure]
+        self.unique_defect_seq = [
+            Interstitial(self.structure, site)
+            for site in get_unique_interstitial_sites(self.structure, poss_sites)]
 
         self.count_def = 0  # for counting the index of the generated defect
 
@@ -251,6 +239,47 @@ class VoronoiInterstitialGenerator(DefectGenerator):
             raise StopIteration
 
 
+def get_unique_interstitial_sites(structure, sites, symprec=0.01):
+    """
+    Removes interstitial sites whose Interstitial defects are equal, as
+    determined by PointDefectComparator, to the one of an earlier site.
+
+    Interstitials on the orbit of an earlier site under the symmetry
+    operations of the host are equal and are discarded without structure
+    matching. The remaining sites are compared with StructureMatcher, with
+    the settings of PointDefectComparator.
+
+    Args:
+        structure (Structure): host structure.
+        sites ([PeriodicSite]): interstitial sites, all of the same element.
+        symprec (float): symmetry precision of the host symmetry
+            operations.
+
+    Returns:
+        [PeriodicSite] of the unique sites, in the original order.
+    """
+    ops = SpacegroupAnalyzer(structure, symprec=symprec).get_symmetry_operations()
+    rots = np.array([op.rotation_matrix for op in ops])
+    trans = np.array([op.translation_vector for op in ops])
+    sm = StructureMatcher(ltol=0.01, primitive_cell=False, scale=False)
+
+    unique_sites, unique_fcoords, unique_structs = [], [], []
+    for site in sites:
+        if unique_sites:
+            orbit = np.dot(rots, site.frac_coords) + trans
+            dist = structure.lattice.get_all_distances(orbit, unique_fcoords)
+            if np.min(dist) < symprec:
+                continue
+        # the multiplicity is not needed for the defect structure
+        defect_struct = Interstitial(structure, site, multiplicity=1).generate_defect_structure()
+        if any(sm.fit(defect_struct, s) for s in unique_structs):
+            continue
+        unique_sites.append(site)
+        unique_fcoords.append(site.frac_coords)
+        unique_structs.append(defect_struct)
+    return unique_sites
+
+
 class SimpleChargeGenerator(DefectGenerator):
     """
     Does an extremely simple/limited charge generation scheme (only one charge generated)
@@ -113,6 +113,12 @@ class DefectsCorrectionsTest(PymatgenTest):
         kc_low_diel = KumagaiCorrection(0.1 * np.identity(3), gamma=gamma)
         recip_sum = kc_low_diel.get_recip_summation(gamma, g_vecs[0], lattice.volume)
         self.assertAlmostEqual(recip_sum, 0.31117099)
+        # summations for several positions at once
+        positions = [[0., 0., 0.], [1., 2., 3.]]
+        recip_sums = kc_low_diel.get_recip_summation(gamma, g_vecs[0], lattice.volume, r=positions)
+        self.assertAlmostEqual(recip_sums[0], recip_sum)
+        self.assertAlmostEqual(recip_sums[1],
+                               kc_low_diel.get_recip_summation(gamma, g_vecs[0], lattice.volume, r=positions[1]))
 
         # test self interaction
         si_corr = kc_low_diel.get_self_interaction(gamma)
@@ -354,5 +354,49 @@ class DefectCompatibilityTest(PymatgenTest):
         self.assertAlmostEqual(defect_delocal['metadata']['relax_amount'], 0.10836054)
 
 
+class DefectCompatibilityProcessEntriesTest(PymatgenTest):
+
+    def setUp(self):
+        struc = PymatgenTest.get_structure("VO2")
+        struc.make_supercell(3)
+        self.vac = Vacancy(struc, struc.sites[0], charge=-3)
+        abc = struc.lattice.abc
+        v = Vasprun(os.path.join(test_dir, 'vasprun.charged.xml'))
+        self.params = {
+            'axis_grid': [np.arange(0., lattval, 0.2) for lattval in abc],
+            'bulk_planar_averages': [np.ones(len(np.arange(0., lattval, 0.2))) for lattval in abc],
+            'defect_planar_averages': [-1 - np.cos(2 * np.pi * np.arange(0., lattval, 0.2) / lattval)
+                                       for lattval in abc],
+            'dielectric': 15, 'initial_defect_structure': struc.copy(),
+            'defect_frac_sc_coords': struc.sites[0].frac_coords[:],
+            'eigenvalues': v.eigenvalues.copy(), 'kpoint_weights': v.actual_kpoints_weights,
+            'vbm': v.eigenvalue_band_properties[2], 'cbm': v.eigenvalue_band_properties[1],
+            'hybrid_vbm': v.eigenvalue_band_properties[2] - 0.4,
+            'hybrid_cbm': v.eigenvalue_band_properties[1] + 0.2}
+
+    def test_process_entries(self):
+        entries = []
+        for charge in [-2, -1, 0, 1, 2]:
+            vac = Vacancy(self.vac.bulk_structure, self.vac.site, charge=charge)
+            entries.append(DefectEntry(vac, 0., corrections={}, parameters=self.params.copy(), entry_id=None))
+
+        dc = DefectCompatibility()
+        for nproc in [None, 2]:
+            copies = [e.copy() for e in entries]
+            processed = dc.process_entries(copies, nproc=nproc)
+            self.assertEqual(len(processed), len(entries))
+            for entry, copy, dentry in zip(entries, copies, processed):
+                # entries are processed in place, also in worker processes
+                self.assertIs(dentry, copy)
+                self.assertEqual(dentry.charge, entry.charge)
+                self.assertGreaterEqual(dentry.parameters["processing_time"], 0.)
+                self.assertEqual(sorted(dentry.parameters["correction_times"]),
+                                 ["bandedgeshifting", "bandfilling", "freysoldt"])
+                single = dc.process_entry(entry.copy())
+                self.assertEqual(sorted(dentry.corrections), sorted(single.corrections))
+                for k, v in single.corrections.items():
+                    self.assertAlmostEqual(dentry.corrections[k], v)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -8,7 +8,9 @@ import unittest
 from pymatgen.util.testing import PymatgenTest
 from pymatgen.analysis.defects.generators import VacancyGenerator, \
     SubstitutionGenerator, InterstitialGenerator, VoronoiInterstitialGenerator, \
-    SimpleChargeGenerator
+    SimpleChargeGenerator, get_unique_interstitial_sites
+from pymatgen.core import PeriodicSite
+from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
 
 
 class VacancyGeneratorTest(PymatgenTest):
@@ -76,6 +78,18 @@ class InterstitialGeneratorTest(PymatgenTest):
         self.assertArrayAlmostEqual(ints[0].site.coords, (0.9106, 0.3078, 0.3078), decimal=4)
         self.assertArrayAlmostEqual(ints[1].site.coords, (1.5177, 1.7444, 0.3078,), decimal=4)
 
+    def test_get_unique_interstitial_sites(self):
+        struc = PymatgenTest.get_structure("VO2")
+        ints = list(InterstitialGenerator(struc, "Li"))
+        # add symmetry equivalent images of the sites
+        sites = [i.site for i in ints]
+        for op in SpacegroupAnalyzer(struc).get_symmetry_operations():
+            sites.extend(PeriodicSite("Li", op.operate(i.site.frac_coords), struc.lattice) for i in ints)
+        unique = get_unique_interstitial_sites(struc, sites)
+        self.assertEqual(len(unique), len(ints))
+        for site, i in zip(unique, ints):
+            self.assertArrayAlmostEqual(site.frac_coords, i.site.frac_coords)
+
 
 class VoronoiInterstitialGeneratorTest(PymatgenTest):
     def test_int_gen(self):
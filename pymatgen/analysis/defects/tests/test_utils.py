@@ -135,6 +135,20 @@ class DefectsUtilsTest(PymatgenTest):
         self.assertEqual(len(r_vecs[0]), 16299)
         self.assertAlmostEqual(real_summation[0], 0.00679361)
 
+        # the lattice sums are cached and the shared vectors are read-only
+        g_vecs2, recip_summation2, r_vecs2, _ = generate_R_and_G_vecs(gamma, [prec, 30],
+                                                                      lattice, epsilon)
+        self.assertAlmostEqual(recip_summation2[0], recip_summation[0])
+        self.assertTrue(len(g_vecs2[1]) > len(g_vecs2[0]))
+        g_vecs3, _, _, _ = generate_R_and_G_vecs(gamma, [prec, 30], lattice, epsilon)
+        self.assertIs(g_vecs3[0], g_vecs2[0])
+        self.assertRaises(ValueError, g_vecs3[0].__setitem__, 0, 0.)
+        # vectors do not depend on epsilon, but summations do
+        _, recip_summation4, r_vecs4, _ = generate_R_and_G_vecs(gamma, prec, lattice,
+                                                                0.1 * np.identity(3))
+        self.assertArrayAlmostEqual(r_vecs4[0], r_vecs[0])
+        self.assertNotAlmostEqual(recip_summation4[0], recip_summation[0])
+
 
 class StructureMotifInterstitialTest(PymatgenTest):
     def setUp(self):
@@ -209,6 +223,18 @@ class StructureMotifInterstitialTest(PymatgenTest):
                          self.smi.enumerate_defectsites()[0].species_string)
         self.assertEqual("tetrahedral", self.smi.get_motif_type(0))
 
+        self.assertEqual(self.smi.get_defectsite_multiplicity(0), 8)
+
+        smi = StructureMotifInterstitial(
+            self.silicon, "Si", motif_types=["tetrahedral", "octahedral"],
+            op_threshs=[0.3, 0.5], dl=0.4, doverlap=1.0, facmaxdl=1.51,
+            nproc=2)
+        self.assertEqual(len(smi.enumerate_defectsites()), 1)
+        self.assertArrayAlmostEqual(
+            smi.enumerate_defectsites()[0].frac_coords,
+            self.smi.enumerate_defectsites()[0].frac_coords)
+        self.assertAlmostEqual(smi.get_op_value(0), self.smi.get_op_value(0))
+
         elem_cn_dict = self.smi.get_coordinating_elements_cns(0)
         self.assertEqual(len(list(elem_cn_dict.keys())), 1)
         self.assertEqual(list(elem_cn_dict.keys())[0], "Si")
@@ -7,6 +7,7 @@ Utilities for defects module.
 """
 
 import math
+import multiprocessing
 
 from monty.json import MSONable
 
@@ -16,12 +17,18 @@ import numpy as np
 from numpy.linalg import norm
 import logging
 
-from collections import defaultdict
+from collections import defaultdict, namedtuple
+from functools import lru_cache
+from hashlib import md5
 from scipy.spatial import Voronoi
 from scipy.spatial.distance import squareform
 from scipy.cluster.hierarchy import linkage, fcluster
+from scipy.special import erfc
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 from pymatgen.analysis.local_env import LocalStructOrderParams, \
-    MinimumDistanceNN, cn_opt_params
+    cn_opt_params
+from pymatgen.core.lattice import Lattice
 from pymatgen.core.periodic_table import Element, get_el_sp
 from pymatgen.core.sites import PeriodicSite
 from pymatgen.core.structure import Structure
@@ -136,6 +143,20 @@ def genrecip(a1, a2, a3, encut):
     Returns:
         reciprocal lattice vectors with energy less than encut
     """
+    for vec in get_recip_vectors(a1, a2, a3, encut):
+        yield vec
+
+
+def get_recip_vectors(a1, a2, a3, encut):
+    """
+    Array version of genrecip.
+
+    Args:
+        a1, a2, a3: lattice vectors in bohr
+        encut: energy cut off in eV
+    Returns:
+        (N, 3) array of reciprocal lattice vectors with energy less than encut
+    """
     vol = np.dot(a1, np.cross(a2, a3))  # 1/bohr^3
     b1 = (2 * np.pi / vol) * np.cross(a2, a3)  # units 1/bohr
     b2 = (2 * np.pi / vol) * np.cross(a3, a1)
@@ -160,10 +181,7 @@ def genrecip(a1, a2, a3, encut):
     # Calculate radii of all vectors
     radii = np.sqrt(np.einsum('ij,ij->i', vecs, vecs))
 
-    # Yield based on radii
-    for vec, r in zip(vecs, radii):
-        if r < G_cut and r != 0:
-            yield vec
+    return vecs[(radii < G_cut) & (radii != 0)]
 
 
 def generate_reciprocal_vectors_squared(a1, a2, a3, encut):
@@ -180,8 +198,26 @@ def generate_reciprocal_vectors_squared(a1, a2, a3, encut):
         [[g1^2], [g2^2], ...] Square of reciprocal vectors (1/Bohr)^2
         determined by a1, a2, a3 and whose magntidue is less than gcut^2.
     """
-    for vec in genrecip(a1, a2, a3, encut):
-        yield np.dot(vec, vec)
+    for g2 in get_recip_vectors_squared(a1, a2, a3, encut):
+        yield g2
+
+
+def get_recip_vectors_squared(a1, a2, a3, encut):
+    """
+    Array version of generate_reciprocal_vectors_squared.
+
+    Args:
+        a1: Lattice vector a (in Bohrs)
+        a2: Lattice vector b (in Bohrs)
+        a3: Lattice vector c (in Bohrs)
+        encut: Reciprocal vector energy cutoff
+
+    Returns:
+        Array of the squares of the reciprocal vectors (1/Bohr)^2 whose
+        magnitude is less than gcut.
+    """
+    vecs = get_recip_vectors(a1, a2, a3, encut)
+    return np.einsum('ij,ij->i', vecs, vecs)
 
 
 def closestsites(struct_blk, struct_def, pos):
@@ -223,7 +259,8 @@ class StructureMotifInterstitial:
                  dl=0.2,
                  doverlap=1,
                  facmaxdl=1.01,
-                 verbose=False):
+                 verbose=False,
+                 nproc=None):
         """
         Generates symmetrically distinct interstitial sites at positions
         where the interstitial is coordinated by nearest neighbors
@@ -255,6 +292,9 @@ class StructureMotifInterstitial:
                 clustering prune step.
             verbose (bool): flag indicating whether (True) or not (False;
                 default) to print additional information to screen.
+            nproc (int): number of processes used to evaluate the order
+                parameters of the trial sites. Defaults to None, which
+                means serial.
         """
         # Initialize interstitial finding.
         self._structure = struct.copy()
@@ -299,10 +339,6 @@ class StructureMotifInterstitial:
         if verbose:
             print("Grid size: {} {} {}".format(nbins[0], nbins[1], nbins[2]))
             print("dls: {} {} {}".format(dls[0], dls[1], dls[2]))
-        struct_w_inter = struct.copy()
-        struct_w_inter.append(inter_elem, [0, 0, 0])
-        natoms = len(list(struct_w_inter.sites))
-        trialsites = []
 
         # Build index list
         i = np.arange(0, nbins[0]) + 0.5
@@ -314,113 +350,62 @@ class StructureMotifInterstitial:
         # Multiply integer vectors to get recipricol space vectors
         vecs = np.multiply(indicies, np.divide(1, nbins))
 
-        # Loop over trial positions that are based on a regular
-        # grid in fractional coordinate space
-        # within the unit cell.
-        for vec in vecs:
-            struct_w_inter.replace(natoms - 1, inter_elem, coords=vec,
-                                   coords_are_cartesian=False)
-            if len(struct_w_inter.get_sites_in_sphere(
-                    struct_w_inter.sites[natoms - 1].coords, doverlap)) == 1:
-                neighs_images_weigths = MinimumDistanceNN(tol=0.8,
-                                                          cutoff=6).get_nn_info(
-                    struct_w_inter, natoms - 1)
-                neighs_images_weigths_sorted = sorted(neighs_images_weigths,
-                                                      key=lambda x: x['weight'],
-                                                      reverse=True)
-                for nsite in range(1, len(neighs_images_weigths_sorted) + 1):
-                    if nsite not in self.target_cns:
-                        continue
-
-                    allsites = [neighs_images_weigths_sorted[i]['site'] for i in
-                                range(nsite)]
-                    indices_neighs = [i for i in range(len(allsites))]
-                    allsites.append(struct_w_inter.sites[natoms - 1])
-                    for mot, ops in self.cn_motif_lostop[nsite].items():
-                        opvals = ops.get_order_parameters(
-                            allsites, len(allsites) - 1,
-                            indices_neighs=indices_neighs)
-                        if opvals[0] > op_threshs[motif_types.index(mot)]:
-                            cns = {}
-                            for isite in range(nsite):
-                                site = neighs_images_weigths_sorted[isite][
-                                    'site']
-                                if isinstance(site.specie, Element):
-                                    elem = site.specie.symbol
-                                else:
-                                    elem = site.specie.element.symbol
-                                if elem in list(cns.keys()):
-                                    cns[elem] = cns[elem] + 1
-                                else:
-                                    cns[elem] = 1
-                            trialsites.append({
-                                "mtype": mot,
-                                "opval": opvals[0],
-                                "coords": struct_w_inter.sites[
-                                              natoms - 1].coords[:],
-                                "fracs": vec,
-                                "cns": dict(cns)
-                            })
-                            break
+        # Trial positions are based on a regular grid in fractional
+        # coordinate space within the unit cell. Their neighbors are those
+        # of MinimumDistanceNN(tol=0.8, cutoff=6), found for all trial
+        # positions at once. The evaluation of the order parameters of the
+        # remaining trial positions can be distributed over processes.
+        candidates = _get_trial_site_neighbors(
+            struct, inter_elem, vecs, doverlap, cutoff=6, tol=0.8)
+        thresholds = {mot: op_threshs[motif_types.index(mot)]
+                      for mot in motif_types}
+        chunk = max(1, -(-len(candidates) // (nproc or 1)))
+        args = [(self.cn_motif_lostop, thresholds, candidates[i:i + chunk])
+                for i in range(0, len(candidates), chunk)]
+        if nproc is not None and len(args) > 1:
+            with multiprocessing.Pool(nproc) as p:
+                trialsites = sum(p.map(_get_motif_trial_sites, args), [])
+        else:
+            trialsites = sum(map(_get_motif_trial_sites, args), [])
 
         # Prune list of trial sites by clustering and find the site
         # with the largest order parameter value in each cluster.
-        nintersites = len(trialsites)
         unique_motifs = []
         for ts in trialsites:
             if ts["mtype"] not in unique_motifs:
                 unique_motifs.append(ts["mtype"])
-        labels = {}
-        connected = []
-        for i in range(nintersites):
-            connected.append([])
-            for j in range(nintersites):
-                dist, image = struct_w_inter.lattice.get_distance_and_image(
-                    trialsites[i]["fracs"],
-                    trialsites[j]["fracs"])
-                connected[i].append(
-                    True if dist < (maxdl * facmaxdl) else False)
+        fracs = np.reshape([ts["fracs"] for ts in trialsites], (-1, 3))
+        mtypes = np.array([ts["mtype"] for ts in trialsites])
+        opvals = np.array([ts["opval"] for ts in trialsites])
         include = []
         for motif in unique_motifs:
-            labels[motif] = []
-            for i, ts in enumerate(trialsites):
-                labels[motif].append(i if ts["mtype"] == motif else -1)
-            change = True
-            while change:
-                change = False
-                for i in range(nintersites - 1):
-                    if change:
-                        break
-                    if labels[motif][i] == -1:
-                        continue
-                    for j in range(i + 1, nintersites):
-                        if labels[motif][j] == -1:
-                            continue
-                        if connected[i][j] and labels[motif][i] != \
-                                labels[motif][j]:
-                            if labels[motif][i] < labels[motif][j]:
-                                labels[motif][j] = labels[motif][i]
-                            else:
-                                labels[motif][i] = labels[motif][j]
-                            change = True
-                            break
-            unique_ids = []
-            for l in labels[motif]:
-                if l != -1 and l not in unique_ids:
-                    unique_ids.append(l)
+            # clusters are the connected components of trial sites of
+            # the motif within maxdl * facmaxdl of each other, ordered by
+            # their lowest index.
+            inds = np.where(mtypes == motif)[0]
+            rows, cols = [], []
+            for i in range(0, len(inds), 1000):
+                dist = struct.lattice.get_all_distances(fracs[inds[i:i + 1000]],
+                                                        fracs[inds])
+                r, c = np.where(dist < (maxdl * facmaxdl))
+                rows.append(r + i)
+                cols.append(c)
+            graph = coo_matrix((np.ones(sum(len(r) for r in rows)),
+                                (np.concatenate(rows), np.concatenate(cols))),
+                               shape=(len(inds), len(inds)))
+            _, labels = connected_components(graph, directed=False)
+            _, first = np.unique(labels, return_index=True)
+            unique_ids = [labels[i] for i in sorted(first)]
             if verbose:
-                print("unique_ids {} {}".format(motif, unique_ids))
+                print("unique_ids {} {}".format(
+                    motif, [inds[i] for i in sorted(first)]))
             for uid in unique_ids:
-                maxq = 0.0
-                imaxq = -1
-                for i in range(nintersites):
-                    if labels[motif][i] == uid:
-                        if imaxq < 0 or trialsites[i]["opval"] > maxq:
-                            imaxq = i
-                            maxq = trialsites[i]["opval"]
-                include.append(imaxq)
-
-        # Prune by symmetry.
+                cluster = inds[labels == uid]
+                include.append(cluster[np.argmax(opvals[cluster])])
+
+        # Prune by symmetry: trial sites that are on the orbit under the
+        # symmetry operations of the host of an earlier one of the same
+        # motif are discarded.
         multiplicity = {}
         discard = []
         for motif in unique_motifs:
@@ -430,23 +415,18 @@ class StructureMotifInterstitial:
                         i in discard_motif:
                     continue
                 multiplicity[i] = 1
-                symposlist = [
-                    trialsites[i]["fracs"].dot(np.array(m, dtype=float)) for m
-                    in rots]
-                for t in trans:
-                    symposlist.append(trialsites[i]["fracs"] + np.array(t))
-                for indj in range(indi + 1, len(include)):
-                    j = include[indj]
-                    if trialsites[j]["mtype"] != motif or \
-                            j in discard_motif:
-                        continue
-                    for sympos in symposlist:
-                        dist, image = struct.lattice.get_distance_and_image(
-                            sympos, trialsites[j]["fracs"])
-                        if dist < maxdl * facmaxdl:
-                            discard_motif.append(j)
-                            multiplicity[i] += 1
-                            break
+                symposlist = np.dot(rots, trialsites[i]["fracs"]) + trans
+                others = [j for j in include[indi + 1:]
+                          if trialsites[j]["mtype"] == motif and
+                          j not in discard_motif]
+                if not others:
+                    continue
+                dist = struct.lattice.get_all_distances(symposlist,
+                                                        fracs[others])
+                for j in np.array(others)[np.min(dist, axis=0) <
+                                          maxdl * facmaxdl]:
+                    discard_motif.append(j)
+                    multiplicity[i] += 1
             for i in discard_motif:
                 if i not in discard:
                     discard.append(i)
@@ -551,6 +531,109 @@ class StructureMotifInterstitial:
         return scs
 
 
+# Minimal site representation for LocalStructOrderParams, which only needs
+# the coordinates of the central site and its neighbors.
+_TrialSite = namedtuple("_TrialSite", ["coords"])
+
+
+def _get_trial_site_neighbors(struct, inter_elem, fracs, doverlap, cutoff, tol):
+    """
+    Finds the neighbors of interstitials at the trial positions fracs in
+    struct as MinimumDistanceNN(tol, cutoff), i.e., including the periodic
+    images of the interstitial itself, with a single neighbor query. Trial
+    positions with a host atom or image within doverlap are skipped.
+
+    Returns:
+        List of (fracs, cartesian coords, cartesian coords of the neighbors
+        sorted by decreasing weight, element symbols of the neighbors).
+    """
+    lattice = struct.lattice
+    inter_sp = get_el_sp(inter_elem)
+    symbols = [sp.symbol if isinstance(sp, Element) else sp.element.symbol
+               for sp in [site.specie for site in struct] + [inter_sp]]
+    symbols = np.array(symbols)
+
+    coords = lattice.get_cartesian_coords(fracs)
+    r = max(cutoff, doverlap)
+    centers, points, images, dists = struct.get_neighbor_list(
+        r, sites=[PeriodicSite(inter_sp, c, lattice, coords_are_cartesian=True)
+                  for c in coords],
+        exclude_self=False)
+    neigh_coords = struct.cart_coords[points] + np.dot(images, lattice.matrix)
+
+    # periodic images of the interstitial itself
+    self_images = [(image, d) for _, d, _, image in
+                   lattice.get_points_in_sphere([[0, 0, 0]], [0, 0, 0], r)
+                   if d > 1e-8]
+    self_vecs = np.dot(np.reshape([image for image, d in self_images], (-1, 3)),
+                       lattice.matrix)
+    self_dists = np.array([d for image, d in self_images])
+    if np.any(self_dists <= doverlap):
+        return []
+
+    order = np.argsort(centers, kind="stable")
+    bounds = np.searchsorted(centers[order], np.arange(len(fracs) + 1))
+    candidates = []
+    for i, (f, c) in enumerate(zip(fracs, coords)):
+        inds = order[bounds[i]:bounds[i + 1]]
+        d = np.concatenate([dists[inds], self_dists])
+        if np.any(d <= doverlap):
+            continue
+        within = d <= cutoff + 1e-8
+        if not np.any(within):
+            continue
+        nc = np.concatenate([neigh_coords[inds], c + self_vecs])[within]
+        ns = np.concatenate([symbols[points[inds]],
+                             np.repeat(symbols[-1:], len(self_dists))])[within]
+        d = d[within]
+        min_dist = np.min(d)
+        nn = np.where(d < (1.0 + tol) * min_dist)[0]
+        nn = nn[np.argsort(-min_dist / d[nn], kind="stable")]
+        candidates.append((f, c, nc[nn], ns[nn]))
+    return candidates
+
+
+def _get_motif_trial_sites(args):
+    """
+    Evaluates the motif order parameters of trial interstitial sites. Module
+    level to support multiprocessing.
+
+    Args:
+        args: (cn_motif_lostop, thresholds, candidates), with cn_motif_lostop
+            as in StructureMotifInterstitial, thresholds the OP threshold of
+            each motif, and candidates as given by _get_trial_site_neighbors.
+
+    Returns:
+        List of trial site dicts.
+    """
+    cn_motif_lostop, thresholds, candidates = args
+    trialsites = []
+    for fracs, coords, neigh_coords, neigh_symbols in candidates:
+        for nsite in sorted(cn_motif_lostop.keys()):
+            if nsite > len(neigh_coords):
+                continue
+            allsites = [_TrialSite(nc) for nc in neigh_coords[:nsite]]
+            allsites.append(_TrialSite(coords))
+            indices_neighs = list(range(nsite))
+            for mot, ops in cn_motif_lostop[nsite].items():
+                opvals = ops.get_order_parameters(
+                    allsites, len(allsites) - 1,
+                    indices_neighs=indices_neighs)
+                if opvals[0] > thresholds[mot]:
+                    cns = {}
+                    for elem in neigh_symbols[:nsite]:
+                        cns[str(elem)] = cns.get(str(elem), 0) + 1
+                    trialsites.append({
+                        "mtype": mot,
+                        "opval": opvals[0],
+                        "coords": coords[:],
+                        "fracs": fracs,
+                        "cns": cns
+                    })
+                    break
+    return trialsites
+
+
 class TopographyAnalyzer:
     """
     This is a generalized module to perform topological analyses of a crystal
@@ -653,6 +736,7 @@ class TopographyAnalyzer:
             for site in framework:
                 shifted = site.frac_coords + shift
                 coords.append(lattice.get_cartesian_coords(shifted))
+        coords = np.array(coords)
 
         # Perform the voronoi tessellation.
         voro = Voronoi(coords)
@@ -670,31 +754,22 @@ class TopographyAnalyzer:
         vnodes = []
         cation_vnodes = []
 
-        def get_mapping(poly):
-            """
-            Helper function to check if a vornoi poly is a periodic image
-            of one of the existing voronoi polys.
-            """
-            for v in vnodes:
-                if v.is_image(poly, tol):
-                    return v
-            return None
-
         # Filter all the voronoi polyhedra so that we only consider those
         # which are within the unit cell.
-        for i, vertex in enumerate(voro.vertices):
-            if i == 0:
-                continue
-            fcoord = lattice.get_fractional_coords(vertex)
-            poly = VoronoiPolyhedron(lattice, fcoord, node_points_map[i],
+        fcoords = lattice.get_fractional_coords(voro.vertices)
+        in_cell = np.all((fcoords >= -tol) & (fcoords < 1 + tol), axis=1)
+        in_cell[0] = False
+        vnode_fcoords = np.zeros((np.sum(in_cell), 3))
+        for i in np.where(in_cell)[0]:
+            poly = VoronoiPolyhedron(lattice, fcoords[i], node_points_map[i],
                                      coords, i)
-            if np.all([-tol <= c < 1 + tol for c in fcoord]):
-                if len(vnodes) == 0:
-                    vnodes.append(poly)
-                else:
-                    ref = get_mapping(poly)
-                    if ref is None:
-                        vnodes.append(poly)
+            # Check if the poly is a periodic image of one of the existing
+            # voronoi polys, only considering those at the same position.
+            frac_diff = pbc_diff(vnode_fcoords[:len(vnodes)], fcoords[i])
+            same = np.where(np.all(np.abs(frac_diff) <= tol, axis=1))[0]
+            if not any(vnodes[j].is_image(poly, tol) for j in same):
+                vnode_fcoords[len(vnodes)] = fcoords[i]
+                vnodes.append(poly)
 
         logger.debug("%d voronoi vertices in cell." % len(vnodes))
 
@@ -902,7 +977,7 @@ class VoronoiPolyhedron:
         self.lattice = lattice
         self.frac_coords = frac_coords
         self.polyhedron_indices = polyhedron_indices
-        self.polyhedron_coords = np.array(all_coords)[list(polyhedron_indices), :]
+        self.polyhedron_coords = np.asarray(all_coords)[list(polyhedron_indices), :]
         self.name = name
 
     def is_image(self, poly, tol):
@@ -1346,13 +1421,61 @@ def tune_for_gamma(lattice, epsilon):
     This tunes the gamma parameter for Kumagai anisotropic
     Ewald calculation. Method is to find a gamma parameter which generates a similar
     number of reciprocal and real lattice vectors,
-    given the suggested cut off radii by Kumagai and Oba
+    given the suggested cut off radii by Kumagai and Oba. The result is cached
+    for each (lattice, epsilon) pair.
+    """
+    return _tune_for_gamma(_get_array_key(lattice.matrix), _get_array_key(epsilon))
+
+
+def _get_array_key(a):
+    """
+    Returns a hashable (shape, bytes) key for an array-like of floats.
+    """
+    a = np.array(a, dtype=float)
+    return a.shape, a.tobytes()
+
+
+def _from_array_key(key):
+    """
+    Inverse of _get_array_key.
+    """
+    shape, data = key
+    return np.frombuffer(data, dtype=float).reshape(shape)
+
+
+class _ArrayDigestKey:
+    """
+    Hashable key for a large array of floats, which is compared by the md5
+    digest of its data instead of a copy of the data (see _get_array_key).
+    The key keeps a reference to the array, so arrays used as keys must not
+    be modified.
+    """
+
+    __slots__ = ("array", "_digest")
+
+    def __init__(self, a):
+        self.array = np.ascontiguousarray(a, dtype=float)
+        self._digest = (self.array.shape, md5(self.array).hexdigest())
+
+    def __hash__(self):
+        return hash(self._digest)
+
+    def __eq__(self, other):
+        return isinstance(other, _ArrayDigestKey) and self._digest == other._digest
+
+
+@lru_cache(maxsize=64)
+def _tune_for_gamma(lattice_key, epsilon_key):
+    """
+    Cached implementation of tune_for_gamma, see _get_array_key for the keys.
     """
     logger.debug("Converging for ewald parameter...")
     prec = 25  # a reasonable precision to tune gamma for
 
+    lattice = Lattice(_from_array_key(lattice_key))
+    epsilon = _from_array_key(epsilon_key)
     gamma = (2 * np.average(lattice.abc)) ** (-1 / 2.)
-    recip_set, _, real_set, _ = generate_R_and_G_vecs(gamma, prec, lattice, epsilon)
+    recip_set, _, real_set, _ = _get_R_and_G_vecs(gamma, (prec,), lattice.matrix, epsilon)
     recip_set = recip_set[0]
     real_set = real_set[0]
 
@@ -1363,7 +1486,7 @@ def tune_for_gamma(lattice, epsilon):
             float(len(recip_set)) / len(real_set) > 1.05:
         gamma *= (float(len(real_set)) / float(len(recip_set))) ** 0.17
         logger.debug("\tNot converged...Try modifying gamma to {}.".format(gamma))
-        recip_set, _, real_set, _ = generate_R_and_G_vecs(gamma, prec, lattice, epsilon)
+        recip_set, _, real_set, _ = _get_R_and_G_vecs(gamma, (prec,), lattice.matrix, epsilon)
         recip_set = recip_set[0]
         real_set = real_set[0]
         logger.debug("Now have {} real vecs and {} recip vecs.".format(len(real_set), len(recip_set)))
@@ -1379,6 +1502,11 @@ def generate_R_and_G_vecs(gamma, prec_set, lattice, epsilon):
     (and real/recip summation values)
     based on a list of precision values (prec_set)
 
+    The lattice sums only depend on (lattice, epsilon, gamma, prec_set) and
+    are cached, so correcting many defects in the same host supercell does
+    not repeat them. The returned vector arrays are shared between calls and
+    hence read-only.
+
     gamma (float): Ewald parameter
     prec_set (list or number): for prec values to consider (20, 25, 30 are sensible numbers)
     lattice: Lattice object of supercell in question
@@ -1387,59 +1515,79 @@ def generate_R_and_G_vecs(gamma, prec_set, lattice, epsilon):
     if type(prec_set) != list:
         prec_set = [prec_set]
 
-    [a1, a2, a3] = lattice.matrix  # Angstrom
+    recip_set, recip_summation_values, real_set, real_summation_values = _generate_R_and_G_vecs(
+        float(gamma), tuple(prec_set), _get_array_key(lattice.matrix), _get_array_key(epsilon))
+    return list(recip_set), recip_summation_values.copy(), list(real_set), real_summation_values.copy()
+
+
+@lru_cache(maxsize=32)
+def _generate_R_and_G_vecs(gamma, prec_set, lattice_key, epsilon_key):
+    """
+    Cached implementation of generate_R_and_G_vecs, see _get_array_key for
+    the keys.
+    """
+    recip_set, recip_summation_values, real_set, real_summation_values = _get_R_and_G_vecs(
+        gamma, prec_set, _from_array_key(lattice_key), _from_array_key(epsilon_key))
+    for vecs in recip_set + real_set:
+        vecs.setflags(write=False)
+    return recip_set, recip_summation_values, real_set, real_summation_values
+
+
+def _get_lattice_points(matrix, cutoff, exclude_origin=False):
+    """
+    Returns all lattice vectors i * a1 + j * a2 + k * a3 in the index box
+    |i|, |j|, |k| <= ceil(cutoff / |a_n|), in i, j, k loop order, along
+    with their norms.
+    """
+    maxes = [int(math.ceil(cutoff / np.linalg.norm(v))) for v in matrix]
+    ranges = [np.arange(-n, n + 1) for n in maxes]
+    indices = np.array(np.meshgrid(*ranges, indexing="ij")).reshape(3, -1).T
+    if exclude_origin:
+        indices = indices[np.any(indices != 0, axis=1)]
+    vecs = np.dot(indices, matrix)
+    return vecs, np.linalg.norm(vecs, axis=1)
+
+
+def _get_R_and_G_vecs(gamma, prec_set, matrix, epsilon):
+    """
+    Vectorized, uncached implementation of generate_R_and_G_vecs working
+    on the lattice matrix.
+    """
+    lattice = Lattice(matrix)
     volume = lattice.volume
-    [b1, b2, b3] = lattice.reciprocal_lattice.matrix  # 1/ Angstrom
+    recip_matrix = lattice.reciprocal_lattice.matrix  # 1/ Angstrom
     invepsilon = np.linalg.inv(epsilon)
     rd_epsilon = np.sqrt(np.linalg.det(epsilon))
 
     # generate reciprocal vector set (for each prec_set)
-    recip_set = [[] for prec in prec_set]
-    recip_summation_values = [0. for prec in prec_set]
     recip_cut_set = [(2 * gamma * prec) for prec in prec_set]
-
-    i_max = int(math.ceil(max(recip_cut_set) / np.linalg.norm(b1)))
-    j_max = int(math.ceil(max(recip_cut_set) / np.linalg.norm(b2)))
-    k_max = int(math.ceil(max(recip_cut_set) / np.linalg.norm(b3)))
-    for i in np.arange(-i_max, i_max + 1):
-        for j in np.arange(-j_max, j_max + 1):
-            for k in np.arange(-k_max, k_max + 1):
-                if not i and not j and not k:
-                    continue
-                gvec = i * b1 + j * b2 + k * b3
-                normgvec = np.linalg.norm(gvec)
-                for recip_cut_ind, recip_cut in enumerate(recip_cut_set):
-                    if normgvec <= recip_cut:
-                        recip_set[recip_cut_ind].append(gvec)
-
-                        Gdotdiel = np.dot(gvec, np.dot(epsilon, gvec))
-                        summand = math.exp(-Gdotdiel / (4 * (gamma ** 2))) / Gdotdiel
-                        recip_summation_values[recip_cut_ind] += summand
-
+    gvecs, normgvecs = _get_lattice_points(recip_matrix, max(recip_cut_set), exclude_origin=True)
+    Gdotdiel = np.einsum("ij,jk,ik->i", gvecs, epsilon, gvecs)
+    summands = np.exp(-Gdotdiel / (4 * (gamma ** 2))) / Gdotdiel
+
+    recip_set = []
+    recip_summation_values = []
+    for recip_cut in recip_cut_set:
+        inds = normgvecs <= recip_cut
+        recip_set.append(gvecs[inds])
+        recip_summation_values.append(np.sum(summands[inds]))
     recip_summation_values = np.array(recip_summation_values)
     recip_summation_values /= volume
 
     # generate real vector set (for each prec_set)
-    real_set = [[] for prec in prec_set]
-    real_summation_values = [0. for prec in prec_set]
     real_cut_set = [(prec / gamma) for prec in prec_set]
-
-    i_max = int(math.ceil(max(real_cut_set) / np.linalg.norm(a1)))
-    j_max = int(math.ceil(max(real_cut_set) / np.linalg.norm(a2)))
-    k_max = int(math.ceil(max(real_cut_set) / np.linalg.norm(a3)))
-    for i in np.arange(-i_max, i_max + 1):
-        for j in np.arange(-j_max, j_max + 1):
-            for k in np.arange(-k_max, k_max + 1):
-                rvec = i * a1 + j * a2 + k * a3
-                normrvec = np.linalg.norm(rvec)
-                for real_cut_ind, real_cut in enumerate(real_cut_set):
-                    if normrvec <= real_cut:
-                        real_set[real_cut_ind].append(rvec)
-                        if normrvec > 1e-8:
-                            sqrt_loc_res = np.sqrt(np.dot(rvec, np.dot(invepsilon, rvec)))
-                            nmr = math.erfc(gamma * sqrt_loc_res)
-                            real_summation_values[real_cut_ind] += nmr / sqrt_loc_res
-
+    rvecs, normrvecs = _get_lattice_points(matrix, max(real_cut_set))
+    loc_res = np.sqrt(np.einsum("ij,jk,ik->i", rvecs, invepsilon, rvecs))
+    nonzero = normrvecs > 1e-8
+    nmr = np.zeros(len(rvecs))
+    nmr[nonzero] = erfc(gamma * loc_res[nonzero]) / loc_res[nonzero]
+
+    real_set = []
+    real_summation_values = []
+    for real_cut in real_cut_set:
+        inds = normrvecs <= real_cut
+        real_set.append(rvecs[inds])
+        real_summation_values.append(np.sum(nmr[inds]))
     real_summation_values = np.array(real_summation_values)
     real_summation_values /= (4 * np.pi * rd_epsilon)
 
@@ -18,9 +18,11 @@ citing the following papers::
     24(1), 15-17. doi:10.1021/cm203303y
 """
 
+import multiprocessing
 import numpy as np
 import warnings
 import scipy.constants as const
+from scipy.fftpack import next_fast_len
 
 from monty.json import MSONable
 
@@ -126,11 +128,16 @@ class DiffusionAnalyzer(MSONable):
 
     .. attribute: haven_ratio
         Haven ratio defined as diffusivity / chg_diffusivity.
+
+    .. attribute: corrected_displacements
+
+        Drift corrected displacements as a [site, time step, axis] array.
+        Computed on access, since it is as large as the displacements.
     """
 
     def __init__(self, structure, displacements, specie, temperature,
                  time_step, step_skip, smoothed="max", min_obs=30,
-                 avg_nsteps=1000, lattices=None):
+                 avg_nsteps=1000, lattices=None, ncores=None):
         """
         This constructor is meant to be used with pre-processed data.
         Other convenient constructors are provided as class methods (see
@@ -184,6 +191,9 @@ class DiffusionAnalyzer(MSONable):
             lattices (array): Numpy array of lattice matrix of every step. Used
                 for NPT-AIMD. For NVT-AIMD, the lattice at each time step is
                 set to the lattice in the "structure" argument.
+            ncores (int): Number of processes used to compute the mean
+                square displacements of chunks of ions in parallel. Defaults
+                to None, which means serial.
         """
         self.structure = structure
         self.disp = displacements
@@ -213,13 +223,16 @@ class DiffusionAnalyzer(MSONable):
             self.conductivity_components = np.array([0., 0., 0.])
             self.max_framework_displacement = 0
         else:
-            framework_disp = self.disp[framework_indices]
-            drift = np.average(framework_disp, axis=0)[None, :, :]
+            nions, nsteps, dim = self.disp.shape
+            chunks = _get_chunks(nions, nsteps, ncores or 1)
+            is_diffusing = np.zeros(nions, dtype=bool)
+            is_diffusing[indices] = True
 
-            # drift corrected position
-            dc = self.disp - drift
-
-            nions, nsteps, dim = dc.shape
+            drift = np.zeros((1, nsteps, dim))
+            for chunk in chunks:
+                drift[0] += np.sum(
+                    self.disp[chunk][~is_diffusing[chunk]], axis=0)
+            drift /= len(framework_indices)
 
             if not smoothed:
                 timesteps = np.arange(0, nsteps)
@@ -238,36 +251,47 @@ class DiffusionAnalyzer(MSONable):
 
             dt = timesteps * self.time_step * self.step_skip
 
-            # calculate the smoothed msd values
-            msd = np.zeros_like(dt, dtype=np.double)
-            sq_disp_ions = np.zeros((len(dc), len(dt)), dtype=np.double)
+            # calculate the smoothed msd values, one chunk of ions at a time
+            sq_disp_ions = np.zeros((nions, len(dt)), dtype=np.double)
             msd_components = np.zeros(dt.shape + (3,))
+            self.max_ion_displacements = np.zeros(nions)
+            # sum of the displacements of all diffusing ions, for the mscd
+            chg_disp = np.zeros((1, nsteps, dim))
+
+            def get_chunk_args(chunk):
+                # drift corrected positions
+                dc = self.disp[chunk] - drift
+                chg_disp[0] += np.sum(dc[is_diffusing[chunk]], axis=0)
+                return dc, timesteps, smoothed, avg_nsteps
+
+            def add_results(chunk, results):
+                components, max_disps = results
+                sq_disp_ions[chunk] = np.sum(components, axis=2)
+                self.max_ion_displacements[chunk] = max_disps
+                msd_components[:] += np.sum(
+                    components[is_diffusing[chunk]], axis=0)
+
+            if ncores is not None and len(chunks) > 1:
+                # Dispatch ncores chunks at a time so that only ncores
+                # buffers are alive at once.
+                with multiprocessing.Pool(ncores) as p:
+                    for i in range(0, len(chunks), ncores):
+                        batch = chunks[i:i + ncores]
+                        for chunk, results in zip(batch, p.map(
+                                _get_msd_components,
+                                [get_chunk_args(chunk) for chunk in batch])):
+                            add_results(chunk, results)
+            else:
+                for chunk in chunks:
+                    add_results(chunk, _get_msd_components(get_chunk_args(chunk)))
 
-            # calculate mean square charge displacement
-            mscd = np.zeros_like(msd, dtype=np.double)
-
-            for i, n in enumerate(timesteps):
-                if not smoothed:
-                    dx = dc[:, i:i + 1, :]
-                    dcomponents = dc[:, i:i + 1, :]
-                elif smoothed == "constant":
-                    dx = dc[:, i:i + avg_nsteps, :] - dc[:, 0:avg_nsteps, :]
-                    dcomponents = dc[:, i:i + avg_nsteps, :] - dc[:, 0:avg_nsteps, :]
-                else:
-                    dx = dc[:, n:, :] - dc[:, :-n, :]
-                    dcomponents = dc[:, n:, :] - dc[:, :-n, :]
-
-                # Get msd
-                sq_disp = dx ** 2
-                sq_disp_ions[:, i] = np.average(np.sum(sq_disp, axis=2), axis=1)
-                msd[i] = np.average(sq_disp_ions[:, i][indices])
-
-                msd_components[i] = np.average(dcomponents[indices] ** 2,
-                                               axis=(0, 1))
+            msd_components /= len(indices)
+            msd = np.average(sq_disp_ions[indices], axis=0)
 
-                # Get mscd
-                sq_chg_disp = np.sum(dx[indices, :, :], axis=0) ** 2
-                mscd[i] = np.average(np.sum(sq_chg_disp, axis=1), axis=0) / len(indices)
+            # calculate mean square charge displacement
+            chg_components, _ = _get_msd_components(
+                (chg_disp, timesteps, smoothed, avg_nsteps))
+            mscd = np.sum(chg_components[0], axis=1) / len(indices)
 
             def weighted_lstsq(a, b):
                 if smoothed == "max":
@@ -329,9 +353,6 @@ class DiffusionAnalyzer(MSONable):
 
             # Drift and displacement information.
             self.drift = drift
-            self.corrected_displacements = dc
-            self.max_ion_displacements = np.max(np.sum(
-                dc ** 2, axis=-1) ** 0.5, axis=1)
             self.max_framework_displacement = \
                 np.max(self.max_ion_displacements[framework_indices])
             self.msd = msd
@@ -343,6 +364,13 @@ class DiffusionAnalyzer(MSONable):
             self.indices = indices
             self.framework_indices = framework_indices
 
+    @property
+    def corrected_displacements(self):
+        """
+        Drift corrected displacements as a [site, time step, axis] array.
+        """
+        return self.disp - self.drift
+
     def get_drift_corrected_structures(self, start=None, stop=None, step=None):
         """
         Returns an iterator for the drift-corrected structures. Use of
@@ -357,13 +385,13 @@ class DiffusionAnalyzer(MSONable):
         coords = np.array(self.structure.cart_coords)
         species = self.structure.species_and_occu
         lattices = self.lattices
-        nsites, nsteps, dim = self.corrected_displacements.shape
+        nsites, nsteps, dim = self.disp.shape
 
         for i in range(start or 0, stop or nsteps, step or 1):
             latt = lattices[0] if len(lattices) == 1 else lattices[i]
             yield Structure(
                 latt, species,
-                coords + self.corrected_displacements[:, i, :],
+                coords + self.disp[:, i, :] - self.drift[0, i, :],
                 coords_are_cartesian=True)
 
     def get_summary_dict(self, include_msd_t=False, include_mscd_t=False):
@@ -430,7 +458,7 @@ class DiffusionAnalyzer(MSONable):
                           "simulation analysis!")
 
         plt = pretty_plot(12, 8, plt=plt)
-        step = (self.corrected_displacements.shape[1] - 1) // (granularity - 1)
+        step = (self.disp.shape[1] - 1) // (granularity - 1)
         f = (matching_s or self.structure).copy()
         f.remove_species([self.specie])
         sm = StructureMatcher(primitive_cell=False, stol=0.6,
@@ -582,27 +610,25 @@ class DiffusionAnalyzer(MSONable):
             \\*\\*kwargs: kwargs supported by the :class:`DiffusionAnalyzer`_.
                 Examples include smoothed, min_obs, avg_nsteps.
         """
-        p, l = [], []
+        # The structures are consumed one at a time, so that generators
+        # (e.g., of ionic steps read from files) are never held in memory.
+        c_disp, l = [], []
         for i, s in enumerate(structures):
             if i == 0:
                 structure = s
-            p.append(np.array(s.frac_coords)[:, None])
+                if initial_structure is not None:
+                    p = initial_structure.frac_coords
+                    l.append(initial_structure.lattice.matrix)
+                else:
+                    p = s.frac_coords
+                    l.append(s.lattice.matrix)
+                f_disp = np.zeros(p.shape)
+            dp = s.frac_coords - p
+            f_disp += dp - np.round(dp)
+            p = s.frac_coords
+            c_disp.append(np.dot(f_disp, s.lattice.matrix))
             l.append(s.lattice.matrix)
-        if initial_structure is not None:
-            p.insert(0, np.array(initial_structure.frac_coords)[:, None])
-            l.insert(0, initial_structure.lattice.matrix)
-        else:
-            p.insert(0, p[0])
-            l.insert(0, l[0])
-
-        p = np.concatenate(p, axis=1)
-        dp = p[:, 1:] - p[:, :-1]
-        dp = dp - np.round(dp)
-        f_disp = np.cumsum(dp, axis=1)
-        c_disp = []
-        for i in f_disp:
-            c_disp.append([np.dot(d, m) for d, m in zip(i, l[1:])])
-        disp = np.array(c_disp)
+        disp = np.stack(c_disp, axis=1)
 
         # If is NVT-AIMD, clear lattice data.
         if np.array_equal(l[0], l[-1]):
@@ -666,7 +692,7 @@ class DiffusionAnalyzer(MSONable):
         step_skip, temperature, time_step = next(s)
 
         return cls.from_structures(
-            structures=list(s), specie=specie, temperature=temperature,
+            structures=s, specie=specie, temperature=temperature,
             time_step=time_step, step_skip=step_skip,
             initial_disp=initial_disp, initial_structure=initial_structure,
             **kwargs)
@@ -801,6 +827,71 @@ def get_conversion_factor(structure, species, temperature):
     return 1000 * n / (vol * const.N_A) * z ** 2 * (const.N_A * const.e) ** 2 / (const.R * temperature)
 
 
+# Maximum number of displacement values (ions x steps x axes) that the mean
+# square displacement of one chunk of ions is computed on at once.
+MSD_CHUNK_SIZE = 2 ** 22
+
+
+def _get_chunks(nions, nsteps, nchunks=1):
+    """
+    Splits the ion indices into at least nchunks chunks (if there are enough
+    ions) of at most MSD_CHUNK_SIZE displacement values (but at least one
+    ion).
+    """
+    chunk_size = max(1, min(MSD_CHUNK_SIZE // (3 * nsteps),
+                            -(-nions // nchunks)))
+    return [slice(i, min(i + chunk_size, nions))
+            for i in range(0, nions, chunk_size)]
+
+
+def _get_msd_components(args):
+    """
+    Mean square displacements along each axis of a set of trajectories.
+    Averages over time origins are computed with FFTs, i.e., in
+    O(nsteps log nsteps) per trajectory. Module level to support
+    multiprocessing.
+
+    Args:
+        args: (disp, timesteps, smoothed, avg_nsteps), with disp a
+            [site, time step, axis] array and the other arguments as in
+            DiffusionAnalyzer.
+
+    Returns:
+        ([site, timesteps, axis] array of mean square displacements,
+        maximum displacement of each site)
+    """
+    disp, timesteps, smoothed, avg_nsteps = args
+    nsteps = disp.shape[1]
+    max_disps = np.max(np.sum(disp ** 2, axis=-1) ** 0.5, axis=1)
+    if not smoothed:
+        return disp[:, timesteps] ** 2, max_disps
+
+    # Mean square displacements do not depend on the origin; centering the
+    # trajectories improves the accuracy of the FFT correlations.
+    x = disp - np.mean(disp, axis=1)[:, None, :]
+    # cumulative sums of squares, padded with a leading 0
+    cum_sq = np.zeros((len(x), nsteps + 1, x.shape[2]))
+    np.cumsum(x ** 2, axis=1, out=cum_sq[:, 1:])
+
+    if smoothed == "constant":
+        # average over the origins t < avg_nsteps of (x[t + n] - x[t]) ** 2
+        n_fft = next_fast_len(nsteps + avg_nsteps)
+        corr = np.fft.irfft(
+            np.conj(np.fft.rfft(x[:, :avg_nsteps], n_fft, axis=1)) *
+            np.fft.rfft(x, n_fft, axis=1), n_fft, axis=1)[:, timesteps]
+        sq = cum_sq[:, timesteps + avg_nsteps] - cum_sq[:, timesteps] + \
+            cum_sq[:, avg_nsteps][:, None]
+        return (sq - 2 * corr) / avg_nsteps, max_disps
+
+    # average over all origins t < nsteps - n of (x[t + n] - x[t]) ** 2
+    n_fft = next_fast_len(2 * nsteps)
+    f = np.fft.rfft(x, n_fft, axis=1)
+    corr = np.fft.irfft(f * np.conj(f), n_fft, axis=1)[:, timesteps]
+    sq = cum_sq[:, nsteps - timesteps] + cum_sq[:, nsteps][:, None] - \
+        cum_sq[:, timesteps]
+    return (sq - 2 * corr) / (nsteps - timesteps)[None, :, None], max_disps
+
+
 def _get_vasprun(args):
     """
     Internal method to support multiprocessing.
@@ -18,8 +18,10 @@ from scipy.special import factorial
 from scipy.integrate import quad
 from scipy.optimize import root
 from collections import OrderedDict
+from functools import lru_cache
 from monty.dev import deprecated
 import numpy as np
+import multiprocessing
 import warnings
 import itertools
 
@@ -231,23 +233,28 @@ class ElasticTensor(NthOrderElasticTensor):
         relative to a second, orthogonal direction
 
         Args:
-            n (3-d vector): principal direction
-            m (3-d vector): secondary direction orthogonal to n
+            n (3-d vector): principal direction, or Nx3 array of
+                principal directions
+            m (3-d vector): secondary direction orthogonal to n, or Nx3
+                array of secondary directions
             tol (float): tolerance for testing of orthogonality
         """
         n, m = get_uvec(n), get_uvec(m)
-        if not np.abs(np.dot(n, m)) < tol:
+        if not np.all(np.abs(np.sum(n * m, axis=-1)) < tol):
             raise ValueError("n and m must be orthogonal")
-        v = self.compliance_tensor.einsum_sequence([n] * 2 + [m] * 2)
-        v *= -1 / self.compliance_tensor.einsum_sequence([n] * 4)
+        compliance = self.compliance_tensor
+        v = np.einsum("ijkl,...i,...j,...k,...l->...", compliance, n, n, m, m)
+        v *= -1 / np.einsum("ijkl,...i,...j,...k,...l->...", compliance,
+                            n, n, n, n)
         return v
 
     def directional_elastic_mod(self, n):
         """
-        Calculates directional elastic modulus for a specific vector
+        Calculates directional elastic modulus for a specific vector,
+        or for each row of an Nx3 array of vectors
         """
         n = get_uvec(n)
-        return self.einsum_sequence([n] * 4)
+        return np.einsum("ijkl,...i,...j,...k,...l->...", self, n, n, n, n)
 
     @raise_error_if_unphysical
     def trans_v(self, structure):
@@ -422,9 +429,10 @@ class ElasticTensor(NthOrderElasticTensor):
 
     def green_kristoffel(self, u):
         """
-        Returns the Green-Kristoffel tensor for a second-order tensor
+        Returns the Green-Kristoffel tensor for a second-order tensor,
+        or the Nx3x3 Green-Kristoffel tensors for an Nx3 array of vectors
         """
-        return self.einsum_sequence([u, u], "ijkl,i,l")
+        return np.einsum("ijkl,...i,...l->...jk", self, u, u)
 
     @property
     def property_dict(self):
@@ -598,12 +606,21 @@ class ElasticTensorExpansion(TensorCollection):
         third-order elastic tensor expansion.
 
         Args:
-            n (3x1 array-like): normal mode direction
-            u (3x1 array-like): polarization direction
-        """
-        gk = self[0].einsum_sequence([n, u, n, u])
-        result = -(2 * gk * np.outer(u, u) + self[0].einsum_sequence([n, n])
-                   + self[1].einsum_sequence([n, u, n, u])) / (2 * gk)
+            n (3x1 array-like): normal mode direction, or Nx3 array of
+                directions
+            u (3x1 array-like): polarization direction, or Nx3 array of
+                polarizations
+
+        Returns:
+            3x3 GGT, or Nx3x3 array of GGTs
+        """
+        n, u = np.asarray(n), np.asarray(u)
+        gk = np.einsum("ijkl,...i,...j,...k,...l->...", self[0], n, u, n, u)
+        gk = np.asarray(gk)[..., None, None]
+        result = -(2 * gk * np.einsum("...i,...j->...ij", u, u)
+                   + np.einsum("ijkl,...k,...l->...ij", self[0], n, n)
+                   + np.einsum("ijklmn,...k,...l,...m,...n->...ij", self[1],
+                               n, u, n, u)) / (2 * gk)
         return result
 
     def get_tgt(self, temperature=None, structure=None, quad=None):
@@ -618,33 +635,47 @@ class ElasticTensorExpansion(TensorCollection):
 
         Args:
             temperature (float): Temperature in kelvin, if not specified
-                will return non-cv-normalized value
+                will return non-cv-normalized value. An array of
+                temperatures returns an array of TGTs.
             structure (float): Structure to be used in directional heat
                 capacity determination, only necessary if temperature
                 is specified
             quad (dict): quadrature for integration, should be
                 dictionary with "points" and "weights" keys defaults
                 to quadpy.sphere.Lebedev(19) as read from file
+
+        Returns:
+            SquareTensor, or Nx3x3 array for N temperatures
         """
-        if temperature and not structure:
+        temperatures = np.atleast_1d(
+            temperature if temperature is not None else 0.).astype(float)
+        if temperatures.any() and not structure:
             raise ValueError("If using temperature input, you must also "
                              "include structure")
 
         quad = quad if quad else DEFAULT_QUAD
-        points = quad['points']
-        weights = quad['weights']
-        num, denom, c = np.zeros((3, 3)), 0, 1
-        for p, w in zip(points, weights):
-            gk = ElasticTensor(self[0]).green_kristoffel(p)
-            rho_wsquareds, us = np.linalg.eigh(gk)
-            us = [u / np.linalg.norm(u) for u in np.transpose(us)]
-            for u in us:
-                # TODO: this should be benchmarked
-                if temperature:
-                    c = self.get_heat_capacity(temperature, structure, p, u)
-                num += c * self.get_ggt(p, u) * w
-                denom += c * w
-        return SquareTensor(num / denom)
+        points = np.array(quad['points'])
+        weights = np.array(quad['weights'])
+        # the three polarizations of each quadrature point, as rows
+        gk = ElasticTensor(self[0]).green_kristoffel(points)
+        rho_wsquareds, us = np.linalg.eigh(gk)
+        us = np.transpose(us, (0, 2, 1))
+        us = us / np.linalg.norm(us, axis=-1, keepdims=True)
+        ns = np.repeat(points[:, None, :], 3, axis=1)
+        ggts = self.get_ggt(ns, us)
+
+        # heat capacity weights of each mode, or 1 without temperature
+        c = np.ones((len(temperatures),) + us.shape[:2])
+        has_t = temperatures != 0
+        if has_t.any():
+            c[has_t] = self.get_heat_capacity(
+                temperatures[has_t, None, None], structure, ns, us)
+        cw = c * weights[:, None]
+        tgt = np.einsum("tpm,pmij->tij", cw, ggts) / \
+            cw.sum(axis=(1, 2))[:, None, None]
+        if np.ndim(temperature) == 0:
+            return SquareTensor(tgt[0])
+        return tgt
 
     def get_gruneisen_parameter(self, temperature=None, structure=None,
                                 quad=None):
@@ -653,7 +684,8 @@ class ElasticTensorExpansion(TensorCollection):
 
         Args:
             temperature (float): Temperature in kelvin, if not specified
-                will return non-cv-normalized value
+                will return non-cv-normalized value. An array of
+                temperatures returns an array of parameters.
             structure (float): Structure to be used in directional heat
                 capacity determination, only necessary if temperature
                 is specified
@@ -661,7 +693,8 @@ class ElasticTensorExpansion(TensorCollection):
                 dictionary with "points" and "weights" keys defaults
                 to quadpy.sphere.Lebedev(19) as read from file
         """
-        return np.trace(self.get_tgt(temperature, structure, quad)) / 3.
+        return np.trace(self.get_tgt(temperature, structure, quad),
+                        axis1=-2, axis2=-1) / 3.
 
     def get_heat_capacity(self, temperature, structure, n, u, cutoff=1e2):
         """
@@ -669,22 +702,25 @@ class ElasticTensorExpansion(TensorCollection):
         expansion as a function of direction and polarization.
 
         Args:
-            temperature (float): Temperature in kelvin
+            temperature (float): Temperature in kelvin, or array of
+                temperatures broadcastable against the directions
             structure (float): Structure to be used in directional heat
                 capacity determination
-            n (3x1 array-like): direction for Cv determination
+            n (3x1 array-like): direction for Cv determination, or
+                Nx3 array of directions
             u (3x1 array-like): polarization direction, note that
-                no attempt for verification of eigenvectors is made
+                no attempt for verification of eigenvectors is made,
+                or Nx3 array of polarizations
             cutoff (float): cutoff for scale of kt / (hbar * omega)
                 if lower than this value, returns 0
         """
         k = 1.38065e-23
-        kt = k * temperature
+        kt = k * np.asarray(temperature, dtype=float)
         hbar_w = 1.05457e-34 * self.omega(structure, n, u)
-        if hbar_w > kt * cutoff:
-            return 0.0
-        c = k * (hbar_w / kt) ** 2
-        c *= np.exp(hbar_w / kt) / (np.exp(hbar_w / kt) - 1) ** 2
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            c = k * (hbar_w / kt) ** 2
+            c *= np.exp(hbar_w / kt) / (np.exp(hbar_w / kt) - 1) ** 2
+        c = np.where(hbar_w > kt * cutoff, 0.0, c)
         return c * 6.022e23
 
     def omega(self, structure, n, u):
@@ -695,15 +731,19 @@ class ElasticTensorExpansion(TensorCollection):
         Args:
             structure (Structure): Structure to be used in directional heat
                 capacity determination
-            n (3x1 array-like): direction for Cv determination
+            n (3x1 array-like): direction for Cv determination, or Nx3
+                array of directions
             u (3x1 array-like): polarization direction, note that
-                no attempt for verification of eigenvectors is made
+                no attempt for verification of eigenvectors is made,
+                or Nx3 array of polarizations
         """
-        l0 = np.dot(np.sum(structure.lattice.matrix, axis=0), n)
+        n, u = np.asarray(n), np.asarray(u)
+        l0 = np.dot(n, np.sum(structure.lattice.matrix, axis=0))
         l0 *= 1e-10  # in A
         weight = float(structure.composition.weight) * 1.66054e-27  # in kg
         vol = structure.volume * 1e-30  # in m^3
-        vel = (1e9 * self[0].einsum_sequence([n, u, n, u])
+        vel = (1e9 * np.einsum("ijkl,...i,...j,...k,...l->...", self[0],
+                               n, u, n, u)
                / (weight / vol)) ** 0.5
         return vel / l0
 
@@ -713,7 +753,8 @@ class ElasticTensorExpansion(TensorCollection):
 
         Args:
             temperature (float): Temperature in kelvin, if not specified
-                will return non-cv-normalized value
+                will return non-cv-normalized value. An array of
+                temperatures returns an Nx3x3 array of coefficients.
             structure (Structure): Structure to be used in directional heat
                 capacity determination, only necessary if temperature
                 is specified
@@ -722,21 +763,26 @@ class ElasticTensorExpansion(TensorCollection):
         """
         soec = ElasticTensor(self[0])
         v0 = (structure.volume * 1e-30 / structure.num_sites)
+        temperatures = np.atleast_1d(temperature).astype(float)
         if mode == "debye":
             td = soec.debye_temperature(structure)
-            t_ratio = temperature / td
+            t_ratios = temperatures / td
 
             def integrand(x):
                 return (x ** 4 * np.exp(x)) / (np.exp(x) - 1) ** 2
-            cv = 9 * 8.314 * t_ratio ** 3 * quad(integrand, 0, t_ratio ** -1)[0]
+            cv = np.array([9 * 8.314 * t_ratio ** 3 *
+                           quad(integrand, 0, t_ratio ** -1)[0]
+                           for t_ratio in t_ratios])
         elif mode == "dulong-petit":
-            cv = 3 * 8.314
+            cv = np.full(len(temperatures), 3 * 8.314)
         else:
             raise ValueError("Mode must be debye or dulong-petit")
-        tgt = self.get_tgt(temperature, structure)
-        alpha = np.einsum('ijkl,ij', soec.compliance_tensor, tgt)
-        alpha *= cv / (1e9 * v0 * 6.022e23)
-        return SquareTensor(alpha)
+        tgt = self.get_tgt(temperatures, structure)
+        alpha = np.einsum('ijkl,tij->tkl', soec.compliance_tensor, tgt)
+        alpha *= (cv / (1e9 * v0 * 6.022e23))[:, None, None]
+        if np.ndim(temperature) == 0:
+            return SquareTensor(alpha[0])
+        return alpha
 
     def get_compliance_expansion(self):
         """
@@ -750,17 +796,18 @@ class ElasticTensorExpansion(TensorCollection):
         ce_exp = [ElasticTensor(self[0]).compliance_tensor]
         einstring = "ijpq,pqrsuv,rskl,uvmn->ijklmn"
         ce_exp.append(np.einsum(einstring, -ce_exp[-1], self[1],
-                                ce_exp[-1], ce_exp[-1]))
+                                ce_exp[-1], ce_exp[-1], optimize=True))
         if self.order == 4:
             # Four terms in the Fourth-Order compliance tensor
             einstring_1 = "pqab,cdij,efkl,ghmn,abcdefgh"
             tensors_1 = [ce_exp[0]] * 4 + [self[-1]]
-            temp = -np.einsum(einstring_1, *tensors_1)
+            temp = -np.einsum(einstring_1, *tensors_1, optimize=True)
             einstring_2 = "pqab,abcdef,cdijmn,efkl"
             einstring_3 = "pqab,abcdef,efklmn,cdij"
             einstring_4 = "pqab,abcdef,cdijkl,efmn"
             for es in [einstring_2, einstring_3, einstring_4]:
-                temp -= np.einsum(es, ce_exp[0], self[-2], ce_exp[1], ce_exp[0])
+                temp -= np.einsum(es, ce_exp[0], self[-2], ce_exp[1], ce_exp[0],
+                                  optimize=True)
             ce_exp.append(temp)
         return TensorCollection(ce_exp)
 
@@ -908,13 +955,52 @@ def diff_fit(strains, stresses, eq_stress=None, order=2, tol=1e-10):
 
     m, absent = generate_pseudo(list(strain_state_dict.keys()), order)
     for i in range(1, order):
-        cvec, carr = get_symbol_list(i + 1)
         svec = np.ravel(dei_dsi[i - 1].T)
-        cmap = dict(zip(cvec, np.dot(m[i - 1], svec)))
-        c_list.append(v_subs(carr, cmap))
+        cvals = np.dot(m[i - 1], svec)
+        c_list.append(cvals[_get_voigt_symbol_indices(i + 1)])
     return [Tensor.from_voigt(c) for c in c_list]
 
 
+def diff_fit_batch(strains_list, stresses_list, eq_stresses=None, order=2,
+                   tol=1e-10, nproc=None):
+    """
+    Fits the elastic constants of many materials with diff_fit. The
+    pseudoinverses are cached per set of strain states, so that materials
+    computed with the same deformations share them.
+
+    Args:
+        strains_list (list): list of the Nx3x3 strains of each material
+        stresses_list (list): list of the Nx3x3 (PK2) stresses of each
+            material
+        eq_stresses (list): equilibrium stress of each material, None
+            entries are looked up in the strains and stresses as in diff_fit
+        order (int): order of the elastic tensor set to return
+        tol (float): value for which strains below are ignored in
+            identifying strain states
+        nproc (int): number of processes to spread the materials over,
+            defaults to None, i.e. serial
+
+    Returns:
+        list of the diff_fit results of each material
+    """
+    if eq_stresses is None:
+        eq_stresses = [None] * len(strains_list)
+    args = [(strains, stresses, eq_stress, order, tol) for strains, stresses,
+            eq_stress in zip(strains_list, stresses_list, eq_stresses)]
+    if nproc and nproc > 1:
+        with multiprocessing.Pool(nproc) as p:
+            return p.map(_diff_fit, args)
+    return [_diff_fit(a) for a in args]
+
+
+def _diff_fit(args):
+    """
+    Pool worker for diff_fit_batch.
+    """
+    strains, stresses, eq_stress, order, tol = args
+    return diff_fit(strains, stresses, eq_stress=eq_stress, order=order, tol=tol)
+
+
 def find_eq_stress(strains, stresses, tol=1e-10):
     """
     Finds stress corresponding to zero strain state in stress-strain list
@@ -1021,30 +1107,53 @@ def generate_pseudo(strain_states, order=3):
         absent_syms: symbols of the tensor absent from the PI
             expression
     """
-    s = sp.Symbol('s')
-    nstates = len(strain_states)
-    ni = np.array(strain_states) * s
+    strain_states = tuple(tuple(ss) for ss in strain_states)
+    mis, absent_syms = _get_pseudo(strain_states, order)
+    return [mi.copy() for mi in mis], [set(a) for a in absent_syms]
+
+
+@lru_cache()
+def _get_pseudo(strain_states, order):
+    """
+    Cached numerical evaluation of generate_pseudo. The stress derivative
+    of order (degree - 1) along a strain state ni is C_ij...k ni_j ... ni_k,
+    which is linear in the distinct constants of C, so the design matrix
+    is the contraction of the one-hot representation of each constant with
+    the strain states.
+    """
+    ni = np.array(strain_states, dtype=float)
     mis, absent_syms = [], []
     for degree in range(2, order + 1):
-        cvec, carr = get_symbol_list(degree)
-        sarr = np.zeros((nstates, 6), dtype=object)
+        cvec, _ = get_symbol_list(degree)
+        indices = _get_voigt_symbol_indices(degree)
+        onehot = (indices == np.arange(len(cvec)).reshape(
+            (-1,) + (1,) * degree)).astype(float)
+        m = np.zeros((len(ni), 6, len(cvec)))
         for n, strain_v in enumerate(ni):
-            # Get expressions
-            exps = carr.copy()
+            exps = onehot
             for i in range(degree - 1):
                 exps = np.dot(exps, strain_v)
-            exps /= np.math.factorial(degree - 1)
-            sarr[n] = [sp.diff(exp, s, degree - 1) for exp in exps]
-        svec = sarr.ravel()
-        present_syms = set.union(*[exp.atoms(sp.Symbol) for exp in svec])
-        absent_syms += [set(cvec) - present_syms]
-        m = np.zeros((6 * nstates, len(cvec)))
-        for n, c in enumerate(cvec):
-            m[:, n] = v_diff(svec, c)
+            m[n] = exps.T
+        m = m.reshape(6 * len(ni), len(cvec))
+        absent_syms += [set(cvec[~m.any(axis=0)])]
         mis.append(np.linalg.pinv(m))
     return mis, absent_syms
 
 
+@lru_cache()
+def _get_voigt_symbol_indices(rank, dim=6):
+    """
+    Returns the index into the distinct indices of get_symbol_list of
+    each entry of the voigt-notation tensor of a given rank.
+    """
+    indices = np.zeros([dim] * rank, dtype=int)
+    for n, idx in enumerate(
+            itertools.combinations_with_replacement(range(dim), r=rank)):
+        for perm in itertools.permutations(idx):
+            indices[perm] = n
+    return indices
+
+
 def get_symbol_list(rank, dim=6):
     """
     Returns a symbolic representation of the voigt-notation
@@ -10,7 +10,7 @@ from copy import deepcopy
 
 from pymatgen.analysis.elasticity.elastic import ElasticTensor, \
     ElasticTensorExpansion, NthOrderElasticTensor, ComplianceTensor, \
-    find_eq_stress, generate_pseudo, diff_fit, get_diff_coeff, \
+    find_eq_stress, generate_pseudo, diff_fit, diff_fit_batch, get_diff_coeff, \
     get_strain_state_dict
 from pymatgen.analysis.elasticity.strain import Strain, Deformation
 from pymatgen.analysis.elasticity.stress import Stress
@@ -108,6 +108,9 @@ class ElasticTensorTest(PymatgenTest):
                                self.elastic_tensor_1.voigt[0, 0])
         self.assertAlmostEqual(self.elastic_tensor_1.directional_elastic_mod([1, 1, 1]),
                                73.624444444)
+        # arrays of directions
+        mods = self.elastic_tensor_1.directional_elastic_mod([[1, 0, 0], [1, 1, 1]])
+        self.assertArrayAlmostEqual(mods, [self.elastic_tensor_1.voigt[0, 0], 73.624444444])
 
     def test_compliance_tensor(self):
         stress = self.elastic_tensor_1.calculate_stress([0.01] + [0] * 5)
@@ -118,6 +121,12 @@ class ElasticTensorTest(PymatgenTest):
     def test_directional_poisson_ratio(self):
         v_12 = self.elastic_tensor_1.directional_poisson_ratio([1, 0, 0], [0, 1, 0])
         self.assertAlmostEqual(v_12, 0.321, places=3)
+        ns, ms = [[1, 0, 0], [0, 1, 1]], [[0, 1, 0], [1, 0, 0]]
+        vs = self.elastic_tensor_1.directional_poisson_ratio(ns, ms)
+        for n, m, v in zip(ns, ms, vs):
+            self.assertAlmostEqual(self.elastic_tensor_1.directional_poisson_ratio(n, m), v)
+        self.assertRaises(ValueError, self.elastic_tensor_1.directional_poisson_ratio,
+                          ns, [[0, 1, 0], [0, 1, 0]])
 
     def test_structure_based_methods(self):
         # trans_velocity
@@ -298,6 +307,18 @@ class ElasticTensorExpansionTest(PymatgenTest):
         self.assertAlmostEqual(gp, 2.59631832)
         gpt = self.exp_cu.get_gruneisen_parameter(temperature=200, structure=self.cu)
 
+        # arrays of directions and temperatures
+        ns, us = [[1, 0, 0], [0, 0, 1]], [[0, 1, 0], [0, 1, 0]]
+        ggts = self.exp_cu.get_ggt(ns, us)
+        cs = self.exp_cu.get_heat_capacity(300, self.cu, ns, us)
+        for n, u, ggt, c in zip(ns, us, ggts, cs):
+            self.assertArrayAlmostEqual(ggt, self.exp_cu.get_ggt(n, u))
+            self.assertAlmostEqual(c, self.exp_cu.get_heat_capacity(300, self.cu, n, u))
+        temps = [0, 200, 300]
+        gps = self.exp_cu.get_gruneisen_parameter(temperature=temps, structure=self.cu)
+        self.assertArrayAlmostEqual(gps, [gp, gpt, self.exp_cu.get_gruneisen_parameter(
+            temperature=300, structure=self.cu)])
+
     def test_thermal_expansion_coeff(self):
         # TODO get rid of duplicates
         alpha_dp = self.exp_cu.thermal_expansion_coeff(self.cu, 300,
@@ -307,6 +328,10 @@ class ElasticTensorExpansionTest(PymatgenTest):
         alpha_comp = 5.9435148e-7 * np.ones((3, 3))
         alpha_comp[np.diag_indices(3)] = 21.4533472e-06
         self.assertArrayAlmostEqual(alpha_comp, alpha_debye)
+        alphas = self.exp_cu.thermal_expansion_coeff(self.cu, [300, 300, 500])
+        self.assertEqual(alphas.shape, (3, 3, 3))
+        self.assertArrayAlmostEqual(alphas[0], alpha_debye)
+        self.assertArrayAlmostEqual(alphas[2], self.exp_cu.thermal_expansion_coeff(self.cu, 500))
 
     def test_get_compliance_expansion(self):
         ce_exp = self.exp_cu.get_compliance_expansion()
@@ -444,6 +469,25 @@ class DiffFitTest(PymatgenTest):
         m2, abs = generate_pseudo(strain_states, order=2)
         m3, abs = generate_pseudo(strain_states, order=3)
         m4, abs = generate_pseudo(strain_states, order=4)
+        # each distinct second order constant only enters its own stress
+        self.assertEqual(m2[0].shape, (21, 36))
+        self.assertEqual(abs[0], set())
+
+    def test_diff_fit_batch(self):
+        reduced = [(e, pk) for e, pk in zip(self.strains, self.pk_stresses)
+                   if not (abs(abs(e) - 0.05) < 1e-10).any()]
+        r_strains, r_pk_stresses = zip(*reduced)
+        strains_list = [self.strains, r_strains]
+        stresses_list = [self.pk_stresses, r_pk_stresses]
+        eq_stresses = [self.data_dict["eq_stress"]] * 2
+        for nproc in (None, 2):
+            fits = diff_fit_batch(strains_list, stresses_list, eq_stresses,
+                                  order=3, nproc=nproc)
+            for strains, stresses, fit in zip(strains_list, stresses_list, fits):
+                for c, c_ref in zip(fit, diff_fit(strains, stresses,
+                                                  self.data_dict["eq_stress"],
+                                                  order=3)):
+                    self.assertArrayAlmostEqual(c, c_ref)
 
     def test_fit(self):
         cdf = diff_fit(self.strains, self.pk_stresses,
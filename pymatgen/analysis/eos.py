@@ -13,6 +13,7 @@ Note: Most of the code were initially adapted from ASE and deltafactor by
 from copy import deepcopy
 from abc import ABCMeta, abstractmethod
 import logging
+import multiprocessing
 import warnings
 
 import numpy as np
@@ -66,7 +67,7 @@ class EOSBase(metaclass=ABCMeta):
 
         vmin, vmax = min(self.volumes), max(self.volumes)
 
-        if not vmin < v0 and v0 < vmax:
+        if not vmin < v0 < vmax:
             raise EOSError('The minimum volume of a fitted parabola is '
                            'not in the input volumes\n.')
 
@@ -87,6 +88,120 @@ class EOSBase(metaclass=ABCMeta):
         if ierr not in [1, 2, 3, 4]:
             raise EOSError("Optimal parameters not found")
 
+    @classmethod
+    def fit_batch(cls, volumes, energies, nproc=None, maxiter=200,
+                  tol=1.49012e-08):
+        """
+        Fit the equation of state to many (volumes, energies) datasets at
+        once. The Levenberg-Marquardt iterations are vectorized across the
+        datasets, starting from the same quadratic guess as fit. Datasets
+        whose initial guess fails or whose fit does not converge get nan
+        parameters instead of raising an EOSError.
+
+        Args:
+            volumes (list): List of volumes (in Ang^3) of each dataset. The
+                datasets may have different lengths.
+            energies (list): List of energies (in eV) of each dataset.
+            nproc (int): Number of processes the datasets are split over.
+                Defaults to None, i.e., serial.
+            maxiter (int): Maximum number of iterations.
+            tol (float): Relative tolerance on the sum of squared residuals
+                and on the parameters.
+
+        Returns:
+            dict of numpy arrays with the e0, b0, b1 and v0 of each dataset,
+            their standard errors (e0_err, b0_err, b1_err, v0_err), the rms
+            of the fit residuals and whether the fit converged.
+        """
+        if not len(volumes):
+            raise ValueError("fit_batch requires at least one dataset.")
+        if nproc and nproc > 1:
+            chunks = np.array_split(np.arange(len(volumes)), nproc)
+            with multiprocessing.Pool(nproc) as p:
+                results = p.map(_fit_eos_batch, [
+                    (cls, [volumes[i] for i in c], [energies[i] for i in c],
+                     maxiter, tol) for c in chunks])
+            return {k: np.concatenate([r[k] for r in results])
+                    for k in results[0]}
+
+        ndata = np.array([len(v) for v in volumes])
+        mask = np.arange(ndata.max()) < ndata[:, None]
+        # pad the datasets to a common length with copies of their last point
+        v = np.array([np.pad(np.asarray(x, dtype=float), (0, ndata.max() - len(x)),
+                             mode="edge") for x in volumes])
+        e = np.array([np.pad(np.asarray(x, dtype=float), (0, ndata.max() - len(x)),
+                             mode="edge") for x in energies])
+        eos = cls.__new__(cls)
+
+        def get_residuals(p, rows):
+            with np.errstate(all="ignore"):
+                return (e[rows] - eos._func(v[rows], p.T[:, :, None])) * mask[rows]
+
+        # quadratic fit of the volume scaled data for the initial guess
+        scale = (v * mask).sum(axis=1) / ndata
+        x = v / scale[:, None]
+        basis = np.stack([x ** 2, x, np.ones_like(x)], axis=1) * mask[:, None]
+        a, b, c = np.einsum("mkl,ml->mk",
+                            np.linalg.pinv(np.einsum("mkn,mln->mkl", basis, basis)),
+                            np.einsum("mkn,mn->mk", basis, e)).T
+        a, b = a / scale ** 2, b / scale
+        with np.errstate(all="ignore"):
+            v0 = -b / (2 * a)
+        params = np.stack([a * v0 ** 2 + b * v0 + c, 2 * a * v0,
+                           np.full(len(v0), 4.), v0], axis=1)
+        # discard the datasets whose parabola has its minimum outside of the
+        # volume range, which is what _initial_guess intends to reject
+        vmin = np.where(mask, v, np.inf).min(axis=1)
+        vmax = np.where(mask, v, -np.inf).max(axis=1)
+        active = (vmin < v0) & (v0 < vmax) & np.isfinite(params).all(axis=1)
+
+        rss = np.sum(get_residuals(params, slice(None)) ** 2, axis=1)
+        lam = np.full(len(v), 1e-3)
+        converged = np.zeros(len(v), dtype=bool)
+        for _ in range(maxiter):
+            rows = np.flatnonzero(active & ~converged)
+            if not len(rows):
+                break
+            p = params[rows]
+            r = get_residuals(p, rows)
+            jac = _get_jacobian(get_residuals, p, rows, r)
+            jtj = np.einsum("mkn,mln->mkl", jac, jac)
+            # drop the datasets whose model can no longer be evaluated
+            finite = np.isfinite(jtj).all(axis=(1, 2))
+            active[rows[~finite]] = False
+            rows, p, r, jac, jtj = (a[finite] for a in (rows, p, r, jac, jtj))
+            damping = lam[rows, None] * np.einsum("mkk->mk", jtj)
+            step = np.einsum("mkl,ml->mk",
+                             np.linalg.pinv(jtj + damping[:, :, None] * np.eye(4)),
+                             -np.einsum("mkn,mn->mk", jac, r))
+            new_rss = np.sum(get_residuals(p + step, rows) ** 2, axis=1)
+            better = new_rss < rss[rows]
+            params[rows[better]] += step[better]
+            # converged once the residuals or parameters no longer change,
+            # or no step along the gradient reduces the residuals
+            converged[rows] = (better & (
+                (rss[rows] - new_rss <= tol * rss[rows]) |
+                np.all(np.abs(step) <= tol * np.abs(p), axis=1))) | \
+                (lam[rows] > 1e16)
+            rss[rows[better]] = new_rss[better]
+            lam[rows] *= np.where(better, 0.1, 10.)
+
+        converged &= active
+        params[~converged] = np.nan
+        r = get_residuals(params, slice(None))
+        errors = np.full(params.shape, np.nan)
+        rows = np.flatnonzero(converged & (ndata > 4))
+        if len(rows):
+            jac = _get_jacobian(get_residuals, params[rows], rows, r[rows])
+            cov = np.linalg.pinv(np.einsum("mkn,mln->mkl", jac, jac)) * \
+                (rss[rows] / (ndata[rows] - 4))[:, None, None]
+            errors[rows] = np.sqrt(np.einsum("mkk->mk", cov))
+        results = dict(zip(("e0", "b0", "b1", "v0"), params.T))
+        results.update(zip(("e0_err", "b0_err", "b1_err", "v0_err"), errors.T))
+        results["rms"] = np.sqrt(np.sum(r ** 2, axis=1) / ndata)
+        results["converged"] = converged
+        return results
+
     @abstractmethod
     def _func(self, volume, params):
         """
@@ -271,6 +386,48 @@ class EOSBase(metaclass=ABCMeta):
         return fig
 
 
+def _get_jacobian(get_residuals, params, rows, residuals):
+    """
+    Forward difference jacobian of the residuals of EOSBase.fit_batch.
+
+    Returns:
+        numpy array of shape (number of datasets, 4, number of volumes)
+    """
+    h = np.sqrt(np.finfo(float).eps) * np.where(params == 0, 1, np.abs(params))
+    jac = []
+    for i in range(params.shape[1]):
+        p = params.copy()
+        p[:, i] += h[:, i]
+        jac.append((get_residuals(p, rows) - residuals) / h[:, i, None])
+    return np.stack(jac, axis=1)
+
+
+def _fit_eos_batch(args):
+    """
+    Pool worker fitting a chunk of datasets with EOSBase.fit_batch.
+    """
+    model, volumes, energies, maxiter, tol = args
+    return model.fit_batch(volumes, energies, maxiter=maxiter, tol=tol)
+
+
+def _fit_eos(args):
+    """
+    Pool worker fitting a single dataset for PolynomialEOS.fit_batch.
+
+    Returns:
+        ([e0, b0, b1, v0], rms of the residuals), with nan if the fit fails.
+    """
+    model, volumes, energies, kwargs = args
+    try:
+        eos = model(np.array(volumes), np.array(energies))
+        eos.fit(**kwargs)
+        rms = np.sqrt(np.mean((eos.func(eos.volumes) - eos.energies) ** 2))
+        return [float(p) for p in eos._params], rms
+    except Exception:
+        logger.debug("EOS fit failed", exc_info=True)
+        return [np.nan] * 4, np.nan
+
+
 class Murnaghan(EOSBase):
     """
     Murnaghan EOS.
@@ -371,6 +528,42 @@ class PolynomialEOS(EOSBase):
         self.eos_params = np.polyfit(self.volumes, self.energies, order)
         self._set_params()
 
+    @classmethod
+    def fit_batch(cls, volumes, energies, nproc=None, **kwargs):
+        """
+        Fit the equation of state to many (volumes, energies) datasets. The
+        polynomial fits are done one dataset at a time, optionally spread
+        over a process pool. Datasets whose fit fails get nan parameters
+        instead of raising an error.
+
+        Args:
+            volumes (list): List of volumes (in Ang^3) of each dataset.
+            energies (list): List of energies (in eV) of each dataset.
+            nproc (int): Number of processes. Defaults to None, i.e., serial.
+            kwargs: Passed to fit.
+
+        Returns:
+            dict of numpy arrays with the e0, b0, b1 and v0 of each dataset,
+            the rms of the fit residuals and whether the fit succeeded. The
+            standard errors (e0_err, b0_err, b1_err, v0_err) of the
+            polynomial fits are not available and set to nan.
+        """
+        if not len(volumes):
+            raise ValueError("fit_batch requires at least one dataset.")
+        args = [(cls, v, e, kwargs) for v, e in zip(volumes, energies)]
+        if nproc and nproc > 1:
+            with multiprocessing.Pool(nproc) as p:
+                fits = p.map(_fit_eos, args, chunksize=-(-len(args) // nproc))
+        else:
+            fits = [_fit_eos(a) for a in args]
+        params = np.array([f[0] for f in fits], dtype=float).reshape(-1, 4)
+        results = dict(zip(("e0", "b0", "b1", "v0"), params.T))
+        results.update((k, np.full(len(fits), np.nan))
+                       for k in ("e0_err", "b0_err", "b1_err", "v0_err"))
+        results["rms"] = np.array([f[1] for f in fits], dtype=float)
+        results["converged"] = np.isfinite(params).all(axis=1)
+        return results
+
     def _set_params(self):
         """
         Use the fit polynomial to compute the parameter e0, b0, b1 and v0
@@ -614,6 +807,25 @@ class EOS:
         eos_fit.fit()
         return eos_fit
 
+    def fit_batch(self, volumes, energies, nproc=None, **kwargs):
+        """
+        Fit energies as function of volumes for many datasets at once. See
+        EOSBase.fit_batch (vectorized across datasets) and
+        PolynomialEOS.fit_batch (process pool) for details.
+
+        Args:
+            volumes (list): List of volumes of each dataset.
+            energies (list): List of energies of each dataset.
+            nproc (int): Number of processes. Defaults to None, i.e., serial.
+            kwargs: Passed to the fit_batch method of the model.
+
+        Returns:
+            dict of numpy arrays with the e0, b0, b1, v0 of each dataset, their
+            standard errors, the rms of the fit residuals and whether the fit
+            converged.
+        """
+        return self.model.fit_batch(volumes, energies, nproc=nproc, **kwargs)
+
 
 class EOSError(Exception):
     """
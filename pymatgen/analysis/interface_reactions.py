@@ -7,11 +7,12 @@ This module provides class to generate and analyze interfacial reactions.
 """
 
 import warnings
+import weakref
 import numpy as np
 import matplotlib.pylab as plt
 
 from pymatgen import Composition
-from pymatgen.analysis.phase_diagram import GrandPotentialPhaseDiagram
+from pymatgen.analysis.phase_diagram import PhaseDiagram, GrandPotentialPhaseDiagram
 from pymatgen.analysis.reaction_calculator import Reaction
 
 __author__ = "Yihan Xiao"
@@ -23,6 +24,44 @@ __status__ = "Production"
 __date__ = "Aug 15 2017"
 
 
+# Precomputed data of phase diagrams, shared between all InterfacialReactivity
+# objects built from the same phase diagram.
+_PD_DATA = weakref.WeakKeyDictionary()  # type: weakref.WeakKeyDictionary
+
+
+def _get_pd_data(pd):
+    """
+    Returns data of a phase diagram used to evaluate many compositions at
+    once, computed once per phase diagram:
+
+    - "entry_energies": lowest energy per atom of the qhull entries, keyed
+      by fractional composition.
+    - "facets", "energies": vertex indices and energies per atom of the
+      facets, as (n_facets, dim) arrays.
+    - "aug", "aug_inv": augmented matrices of the facet simplexes and their
+      inverses, as (n_facets, dim, dim) arrays.
+    """
+    if pd in _PD_DATA:
+        return _PD_DATA[pd]
+
+    entry_energies = {}
+    for entry in pd.qhull_entries:
+        comp = entry.composition.fractional_composition
+        if comp not in entry_energies or entry.energy_per_atom < entry_energies[comp]:
+            entry_energies[comp] = entry.energy_per_atom
+    data = {"entry_energies": entry_energies}
+
+    if pd.dim > 1:
+        facets = np.array(pd.facets, dtype=int)
+        data["facets"] = facets
+        data["energies"] = np.array([e.energy_per_atom for e in pd.qhull_entries])[facets]
+        data["aug"] = np.array([s._aug for s in pd.simplexes])
+        data["aug_inv"] = np.array([s._aug_inv for s in pd.simplexes])
+
+    _PD_DATA[pd] = data
+    return data
+
+
 class InterfacialReactivity:
     """
     An object encompassing all relevant data for interface reactions.
@@ -83,6 +122,8 @@ class InterfacialReactivity:
         self.pd = pd
         self.pd_non_grand = pd_non_grand
         self.use_hull_energy = use_hull_energy
+        # Kinks are computed once, by get_kinks.
+        self._kinks = None
 
         # Factor is the compositional ratio between composition self.c1 and
         # processed composition self.comp1. E.g., factor for
@@ -151,11 +192,10 @@ class InterfacialReactivity:
         Returns:
             The lowest entry energy among entries matching the composition.
         """
-        candidate = [i.energy_per_atom for i in pd.qhull_entries if
-                     i.composition.fractional_composition ==
-                     composition.fractional_composition]
+        min_entry_energy = _get_pd_data(pd)["entry_energies"].get(
+            composition.fractional_composition)
 
-        if not candidate:
+        if min_entry_energy is None:
             warnings.warn("The reactant " + composition.reduced_formula +
                           " has no matching entry with negative formation"
                           " energy, instead convex hull energy for this"
@@ -163,7 +203,6 @@ class InterfacialReactivity:
                           "calculation. ")
             return pd.get_hull_energy(composition)
         else:
-            min_entry_energy = min(candidate)
             return min_entry_energy * composition.num_atoms
 
     def _get_grand_potential(self, composition):
@@ -205,19 +244,134 @@ class InterfacialReactivity:
         """
         return self.pd.get_hull_energy(self.comp1 * x + self.comp2 * (1 - x)) - self.e1 * x - self.e2 * (1 - x)
 
-    def _get_reaction(self, x):
+    def _get_decompositions(self, xs):
+        """
+        Computes the decompositions at many mixing ratios x : (1-x) for
+        self.comp1 : self.comp2 at once, using the same facet search as
+        PhaseDiagram.get_decomposition.
+
+        Args:
+            xs ([float]): Mixing ratios x of reactants, floats between 0 and 1.
+
+        Returns:
+            Tuple of arrays (number of atoms of the mixtures, index of the
+            facet containing each mixture, decomposition amounts in that
+            facet with amounts below PhaseDiagram.numerical_tol set to zero).
+        """
+        data = _get_pd_data(self.pd)
+        xs = np.asarray(xs, dtype=float)
+        amt1 = np.array([self.comp1[el] for el in self.pd.elements])
+        amt2 = np.array([self.comp2[el] for el in self.pd.elements])
+        amounts = np.outer(xs, amt1) + np.outer(1 - xs, amt2)
+        num_atoms = np.abs(amounts).sum(axis=1)
+        coords = np.abs(amounts[:, 1:]) / num_atoms[:, None]
+        aug_coords = np.concatenate([coords, np.ones((len(xs), 1))], axis=1)
+
+        aug_inv = data["aug_inv"]
+        facet_inds = np.zeros(len(xs), dtype=int)
+        barys = np.zeros((len(xs), aug_inv.shape[-1]))
+        # Limits the size of the (facets, points, dim) array
+        chunk = max(1, 2 ** 20 // aug_inv.size)
+        for start in range(0, len(xs), chunk):
+            sl = slice(start, start + chunk)
+            bary = np.matmul(aug_coords[None, sl], aug_inv)
+            inside = np.all(bary >= -PhaseDiagram.numerical_tol / 10, axis=-1)
+            if not inside.any(axis=0).all():
+                i = start + np.where(~inside.any(axis=0))[0][0]
+                raise RuntimeError("No facet found for comp = {}".format(
+                    self.comp1 * xs[i] + self.comp2 * (1 - xs[i])))
+            inds = np.argmax(inside, axis=0)
+            facet_inds[sl] = inds
+            barys[sl] = bary[inds, np.arange(len(inds))]
+        barys[np.abs(barys) <= PhaseDiagram.numerical_tol] = 0
+        return num_atoms, facet_inds, barys
+
+    def _get_energies(self, xs):
+        """
+        Computes reaction energies at many mixing ratios x : (1-x) for
+        self.comp1 : self.comp2 at once. Equivalent to calling _get_energy
+        for each x.
+
+        Args:
+            xs ([float]): Mixing ratios x of reactants, floats between 0 and 1.
+
+        Returns:
+            Array of reaction energies.
+        """
+        if self.pd.dim == 1:
+            return np.array([self._get_energy(x) for x in xs])
+        xs = np.asarray(xs, dtype=float)
+        num_atoms, facet_inds, barys = self._get_decompositions(xs)
+        energies = _get_pd_data(self.pd)["energies"][facet_inds]
+        hull_energies = np.sum(energies * barys, axis=1) * num_atoms
+        return hull_energies - self.e1 * xs - self.e2 * (1 - xs)
+
+    def _get_critical_ratios(self):
+        """
+        Finds the mixing ratios x : (1-x) of the normalized compositions
+        self.comp1 : self.comp2 at which the decomposition products change,
+        i.e. the intersections of the tie line with the facets of the phase
+        diagram. Vectorized equivalent of PhaseDiagram.get_critical_compositions
+        over all facets.
+
+        Returns:
+            Array of mixing ratios in increasing order.
+        """
+        data = _get_pd_data(self.pd)
+        c1 = self.pd.pd_coords(self.comp1)
+        c2 = self.pd.pd_coords(self.comp2)
+        aug_inv, aug = data["aug_inv"], data["aug"]
+        dim = aug_inv.shape[-1]
+
+        # Intersections of the line with each simplex, as in
+        # Simplex.line_intersection
+        b1 = np.matmul(np.append(c1, 1), aug_inv)
+        b2 = np.matmul(np.append(c2, 1), aug_inv)
+        l = b1 - b2
+        valid = np.abs(l) > 1e-10
+        ratio = b1 / np.where(valid, l, 1)
+        possible = b1[:, None, :] - ratio[:, :, None] * l[:, None, :]
+        found = valid & np.all(possible >= -1e-8, axis=-1)
+        # don't use duplicate points within a simplex
+        for j in range(1, dim):
+            for k in range(j):
+                dup = found[:, k] & np.all(
+                    np.abs(possible[:, j] - possible[:, k]) < 1e-8, axis=-1)
+                found[:, j] &= ~dup
+        points = np.einsum("fjd,fde->fje", possible, aug[:, :, :-1])[found]
+        intersections = np.concatenate([[c1, c2], points])
+
+        # find position along line, as in get_critical_compositions
+        tol = self.pd.numerical_tol
+        l = (c2 - c1)
+        l /= np.sum(l ** 2) ** 0.5
+        proj = np.dot(intersections - c1, l)
+        proj = proj[np.logical_and(proj > -tol, proj < proj[1] + tol)]
+        proj.sort()
+        valid = np.ones(len(proj), dtype=bool)
+        valid[1:] = proj[1:] > proj[:-1] + tol
+        proj = proj[valid]
+
+        coords = c1 + l * proj[:, None]
+        xs = np.linalg.norm(coords - c2, axis=1) / np.linalg.norm(c1 - c2)
+        return xs[::-1]
+
+    def _get_reaction(self, x, decomp=None):
         """
         Generates balanced reaction at mixing ratio x : (1-x) for
         self.comp1 : self.comp2.
 
         Args:
             x (float): Mixing ratio x of reactants, a float between 0 and 1.
+            decomp (dict): Decomposition {Entry: amount} at the mixing ratio,
+                if already known. Computed from the phase diagram if None.
 
         Returns:
             Reaction object.
         """
         mix_comp = self.comp1 * x + self.comp2 * (1 - x)
-        decomp = self.pd.get_decomposition(mix_comp)
+        if decomp is None:
+            decomp = self.pd.get_decomposition(mix_comp)
 
         # Uses original composition for reactants.
         if np.isclose(x, 0):
@@ -317,12 +471,13 @@ class InterfacialReactivity:
                                   reaction energy per mol of reaction
                                   formula in kJ/mol).
         """
+        if self._kinks is not None:
+            return zip(*self._kinks)
+
         c1_coord = self.pd.pd_coords(self.comp1)
         c2_coord = self.pd.pd_coords(self.comp2)
         n1 = self.comp1.num_atoms
         n2 = self.comp2.num_atoms
-        critical_comp = self.pd.get_critical_compositions(self.comp1,
-                                                          self.comp2)
         x_kink, energy_kink, react_kink, energy_per_rxt_formula = \
             [], [], [], []
         if all(c1_coord == c2_coord):
@@ -338,32 +493,59 @@ class InterfacialReactivity:
                                       InterfacialReactivity.EV_TO_KJ_PER_MOL
                                       for i in range(2)]
         else:
-            for i in reversed(critical_comp):
-                # Gets mixing ratio x at kinks.
-                c = self.pd.pd_coords(i)
-                x = np.linalg.norm(c - c2_coord) / np.linalg.norm(c1_coord - c2_coord)
-                # Modifies mixing ratio in case compositions self.comp1 and
-                # self.comp2 are not normalized.
-                x = x * n2 / (n1 + x * (n2 - n1))
+            # Gets mixing ratios x at kinks, modified in case compositions
+            # self.comp1 and self.comp2 are not normalized.
+            xs = self._get_critical_ratios()
+            xs = xs * n2 / (n1 + xs * (n2 - n1))
+            # Gets reaction energies and decompositions at all kinks at once.
+            energies = self._get_energies(xs)
+            _, facet_inds, barys = self._get_decompositions(xs)
+            facets = _get_pd_data(self.pd)["facets"]
+            for x, normalized_energy, facet_ind, bary in zip(
+                    xs.tolist(), energies.tolist(), facet_inds, barys):
                 n_atoms = x * self.comp1.num_atoms + (1 - x) * self.comp2.num_atoms
                 # Converts mixing ratio in comp1 - comp2 tie line to that in
                 # c1 - c2 tie line.
                 x_converted = InterfacialReactivity._convert(
                     x, self.factor1, self.factor2)
                 x_kink.append(x_converted)
-                # Gets reaction energy at kinks
-                normalized_energy = self._get_energy(x)
                 energy_kink.append(normalized_energy)
                 # Gets balanced reaction at kinks
-                rxt = self._get_reaction(x)
+                decomp = {self.pd.qhull_entries[f]: amt
+                          for f, amt in zip(facets[facet_ind], bary) if amt != 0}
+                rxt = self._get_reaction(x, decomp)
                 react_kink.append(rxt)
                 rxt_energy = normalized_energy * self._get_elmt_amt_in_rxt(rxt) / n_atoms
                 energy_per_rxt_formula.append(
                     rxt_energy *
                     InterfacialReactivity.EV_TO_KJ_PER_MOL)
-        index_kink = range(1, len(critical_comp) + 1)
-        return zip(index_kink, x_kink, energy_kink, react_kink,
-                   energy_per_rxt_formula)
+        index_kink = list(range(1, len(x_kink) + 1))
+        self._kinks = (index_kink, x_kink, energy_kink, react_kink,
+                       energy_per_rxt_formula)
+        return zip(*self._kinks)
+
+    @classmethod
+    def get_kinks_for_pairs(cls, pairs, pd, **kwargs):
+        """
+        Finds the kinks of many pairs of reactants against one shared phase
+        diagram. The facet data of the phase diagram is computed once and
+        reused for all pairs, and the reaction energies along each tie line
+        are evaluated at once.
+
+        Args:
+            pairs ([(Composition, Composition)]): Pairs of reactant
+                compositions (c1, c2).
+            pd (PhaseDiagram): PhaseDiagram object or
+                GrandPotentialPhaseDiagram object built from all elements in
+                the compositions.
+            **kwargs: Other arguments passed to InterfacialReactivity, e.g.,
+                norm or pd_non_grand.
+
+        Returns:
+            List with the kinks of each pair, in the same format as the
+            tuples returned by get_kinks.
+        """
+        return [list(cls(c1, c2, pd, **kwargs).get_kinks()) for c1, c2 in pairs]
 
     def get_critical_original_kink_ratio(self):
         """
@@ -436,7 +618,7 @@ class InterfacialReactivity:
         # self.comp1 - self.comp2 tie line.
         xs_reverse_converted = InterfacialReactivity._reverse_convert(
             xs, self.factor1, self.factor2)
-        energies = [self._get_energy(x) for x in xs_reverse_converted]
+        energies = self._get_energies(xs_reverse_converted)
         plt.plot(xs, energies, 'k-')
 
         # Marks kinks and minimum energy point.
@@ -12,18 +12,21 @@ import math
 import warnings
 import os
 import json
+import weakref
 
 import ruamel.yaml as yaml
 import numpy as np
 
+from contextlib import contextmanager
 from copy import deepcopy
-from math import pow, pi, asin, sqrt, exp, sin, cos, acos, fabs, atan2
-from collections import namedtuple, defaultdict
+from math import pow, pi, asin, sqrt, exp, sin, cos
+from collections import namedtuple, defaultdict, OrderedDict
 from functools import lru_cache
 from typing import Union, List, Optional
 from bisect import bisect_left
 
 from scipy.spatial import Voronoi
+from scipy.special import sph_harm
 from monty.dev import deprecated
 from monty.dev import requires
 from monty.serialization import loadfn
@@ -33,6 +36,7 @@ from pymatgen.analysis.bond_valence import BV_PARAMS, BVAnalyzer
 from pymatgen.core.structure import PeriodicNeighbor
 from pymatgen.analysis.molecule_structure_comparator import CovalentRadius
 from pymatgen.core.sites import PeriodicSite, Site
+from pymatgen.util.coord import get_structure_fingerprint
 
 try:
     from openbabel import openbabel as ob
@@ -216,6 +220,143 @@ class ValenceIonicRadiusEvaluator:
         return valences
 
 
+class _NeighborCache:
+    """
+    Cache of the neighbors and Voronoi polyhedra of the sites of the most
+    recently used structures. It is shared by all the NearNeighbors
+    instances, so that applying several strategies to the same structure
+    does the neighbor search of each site only once.
+
+    Structures are identified by their identity together with a fingerprint
+    of their lattice, coordinates and species, such that modifying a
+    structure in place invalidates its cached data. Loops over all the sites
+    of a structure pin it (see pinned), so that the fingerprint is computed
+    once rather than for every site. The neighbors of a site found within
+    some radius are reused for any smaller radius.
+    """
+
+    def __init__(self, maxsize=4):
+        """
+        Args:
+            maxsize (int): Maximum number of structures kept in the cache.
+        """
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._pinned = None
+
+    def clear(self):
+        """
+        Removes all cached data.
+        """
+        self._entries.clear()
+
+    @contextmanager
+    def pinned(self, structure):
+        """
+        Context in which the structure is assumed not to be modified, such
+        that its cache entry is looked up without recomputing its fingerprint.
+
+        Args:
+            structure (Structure): input structure.
+        """
+        previous = self._pinned
+        if isinstance(structure, IStructure) and \
+                (previous is None or previous[0] is not structure):
+            self._pinned = (structure, self._get_entry(structure))
+        try:
+            yield
+        finally:
+            self._pinned = previous
+
+    def _get_entry(self, structure):
+        if self._pinned is not None and self._pinned[0] is structure:
+            return self._pinned[1]
+        fingerprint = get_structure_fingerprint(structure)
+        key = id(structure)
+        entry = self._entries.get(key)
+        if entry is None or entry["ref"]() is not structure or \
+                entry["fingerprint"] != fingerprint:
+            entry = {"ref": weakref.ref(structure), "fingerprint": fingerprint,
+                     "neighbors": {}, "voronoi": {}, "all_voronoi": {}}
+            self._entries[key] = entry
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        return entry
+
+    def get_neighbors(self, structure, n, r):
+        """
+        Get the neighbors of a site within a sphere of radius r, as given by
+        structure.get_neighbors.
+
+        Args:
+            structure (Structure): input structure.
+            n (int): index of the site.
+            r (float): radius of the sphere.
+
+        Returns:
+            [PeriodicNeighbor]
+        """
+        if not isinstance(structure, IStructure):
+            return structure.get_neighbors(structure[n], r)
+        site_neighbors = self._get_entry(structure)["neighbors"]
+        if n in site_neighbors and site_neighbors[n][0] >= r:
+            radius, neighbors = site_neighbors[n]
+            if radius == r:
+                return list(neighbors)
+            # Same numerical tolerance as in Structure.get_all_neighbors
+            return [nn for nn in neighbors if nn.nn_distance <= r + 1e-8]
+        neighbors = structure.get_neighbors(structure[n], r)
+        site_neighbors[n] = (r, neighbors)
+        return list(neighbors)
+
+    def get_voronoi_polyhedra(self, structure, key, n, func):
+        """
+        Get the Voronoi polyhedron of a site, computing it with func if needed.
+
+        Args:
+            structure (Structure): input structure.
+            key (tuple): parameters of the tessellation.
+            n (int): index of the site.
+            func (callable): function computing the polyhedron of site n.
+
+        Returns:
+            Copy of the polyhedron (dict of {index: facet statistics}).
+        """
+        entry = self._get_entry(structure)
+        if (key, n) not in entry["voronoi"]:
+            entry["voronoi"][(key, n)] = func()
+        return self._copy_polyhedra(entry["voronoi"][(key, n)])
+
+    def get_all_voronoi_polyhedra(self, structure, key, func):
+        """
+        Get the Voronoi polyhedra of all the sites, computing them with func if
+        needed.
+
+        Args:
+            structure (Structure): input structure.
+            key (tuple): parameters of the tessellation.
+            func (callable): function computing the polyhedra of all sites.
+
+        Returns:
+            List of copies of the polyhedra.
+        """
+        entry = self._get_entry(structure)
+        if key not in entry["all_voronoi"]:
+            entry["all_voronoi"][key] = func()
+        return [self._copy_polyhedra(polyhedra)
+                for polyhedra in entry["all_voronoi"][key]]
+
+    @staticmethod
+    def _copy_polyhedra(polyhedra):
+        # The statistics dicts are modified by VoronoiNN._extract_nn_info
+        return {k: dict(v) for k, v in polyhedra.items()}
+
+
+_neighbor_cache = _NeighborCache()
+
+
 class NearNeighbors:
     """
     Base class to determine near neighbors that typically include nearest
@@ -387,7 +528,8 @@ class NearNeighbors:
                 entry has the same format as `get_nn_info`
         """
 
-        return [self.get_nn_info(structure, n) for n in range(len(structure))]
+        with _neighbor_cache.pinned(structure):
+            return [self.get_nn_info(structure, n) for n in range(len(structure))]
 
     def get_nn_shell_info(self, structure, site_idx, shell):
         """Get a certain nearest neighbor shell for a certain site.
@@ -536,6 +678,11 @@ class NearNeighbors:
     def _get_original_site(structure, site):
         """Private convenience method for get_nn_info,
         gives original site index from ProvidedPeriodicSite."""
+        # Neighbors from Structure.get_neighbors know the index of their site
+        index = getattr(site, "index", None)
+        if isinstance(index, (int, np.integer)) and 0 <= index < len(structure) and \
+                site.is_periodic_image(structure[index]):
+            return int(index)
         for i, s in enumerate(structure):
             if site.is_periodic_image(s):
                 return i
@@ -688,6 +835,25 @@ class VoronoiNN(NearNeighbors):
                 - volume - Volume of Voronoi cell for this face
                 - n_verts - Number of vertices on the facet
         """
+        return _neighbor_cache.get_voronoi_polyhedra(
+            structure, self._get_tessellation_key(), n,
+            lambda: self._get_voronoi_polyhedra(structure, n))
+
+    def _get_tessellation_key(self):
+        """
+        Returns the parameters of VoronoiNN that determine the polyhedra, used
+        to share tessellations through the neighbor cache.
+        """
+        targets = self.targets
+        if isinstance(targets, (list, tuple)):
+            targets = tuple(targets)
+        return targets, self.cutoff, self.compute_adj_neighbors, \
+            self.allow_pathological
+
+    def _get_voronoi_polyhedra(self, structure, n):
+        """
+        Computes the Voronoi polyhedron of site n (see get_voronoi_polyhedra).
+        """
 
         # Assemble the list of neighbors used in the tessellation
         #   Gets all atoms within a certain radius
@@ -760,6 +926,15 @@ class VoronoiNN(NearNeighbors):
         if len(structure) == 1:
             return [self.get_voronoi_polyhedra(structure, 0)]
 
+        return _neighbor_cache.get_all_voronoi_polyhedra(
+            structure, self._get_tessellation_key(),
+            lambda: self._get_all_voronoi_polyhedra(structure))
+
+    def _get_all_voronoi_polyhedra(self, structure):
+        """
+        Computes the Voronoi polyhedra of all sites from a single tessellation
+        (see get_all_voronoi_polyhedra).
+        """
         # Assemble the list of neighbors used in the tessellation
         if self.targets is None:
             targets = structure.composition.elements
@@ -1163,7 +1338,7 @@ class JmolNN(NearNeighbors):
         min_rad = min(bonds.values())
 
         siw = []
-        for nn in structure.get_neighbors(site, max_rad):
+        for nn in _neighbor_cache.get_neighbors(structure, n, max_rad):
             dist = nn.nn_distance
             # Confirm neighbor based on bond length specific to atom pair
             if dist <= (bonds[(site.specie, nn.specie)]) and (
@@ -1241,8 +1416,7 @@ class MinimumDistanceNN(NearNeighbors):
                 and its weight.
         """
 
-        site = structure[n]
-        neighs_dists = structure.get_neighbors(site, self.cutoff)
+        neighs_dists = _neighbor_cache.get_neighbors(structure, n, self.cutoff)
 
         siw = []
         if self.get_all_sites:
@@ -1648,7 +1822,7 @@ class MinimumOKeeffeNN(NearNeighbors):
         """
 
         site = structure[n]
-        neighs_dists = structure.get_neighbors(site, self.cutoff)
+        neighs_dists = _neighbor_cache.get_neighbors(structure, n, self.cutoff)
         try:
             eln = site.specie.element
         except Exception:
@@ -1732,8 +1906,7 @@ class MinimumVIRENN(NearNeighbors):
                 and its weight.
         """
         vire = _get_vire(structure)
-        site = vire.structure[n]
-        neighs_dists = vire.structure.get_neighbors(site, self.cutoff)
+        neighs_dists = _neighbor_cache.get_neighbors(vire.structure, n, self.cutoff)
         rn = vire.radii[vire.structure[n].species_string]
 
         reldists_neighs = []
@@ -1858,7 +2031,7 @@ def get_okeeffe_params(el_symbol):
     """
 
     el = Element(el_symbol)
-    if el not in list(BV_PARAMS.keys()):
+    if el not in BV_PARAMS:
         raise RuntimeError("Could not find O'Keeffe parameters for element"
                            " \"{}\" in \"BV_PARAMS\"dictonary"
                            " provided by pymatgen".format(el_symbol))
@@ -2018,6 +2191,15 @@ def gramschmidt(vin, uin):
     return vin - (vin_uin / uin_uin) * uin
 
 
+def _dot3(a, b):
+    """
+    Dot products of the 3-vectors along the last axes of two arrays.  The
+    components are summed explicitly, such that every element is evaluated
+    in the same way irrespective of the array shapes.
+    """
+    return a[..., 0] * b[..., 0] + a[..., 1] * b[..., 1] + a[..., 2] * b[..., 2]
+
+
 class LocalStructOrderParams:
     """
     This class permits the calculation of various types of local
@@ -2034,6 +2216,14 @@ class LocalStructOrderParams:
         "T", "cuboct", "cuboct_max", "see_saw_rect", "bcc", "q2", "q4", "q6",
         "oct_max",
         "hex_plan_max", "sq_face_cap_trig_pris")
+    __geometric_types = (
+        "tet", "oct", "bcc", "sq_pyr", "sq_pyr_legacy",
+        "tri_bipyr", "sq_bipyr", "oct_legacy", "tri_plan",
+        "sq_plan", "pent_plan", "tri_pyr", "pent_pyr", "hex_pyr",
+        "pent_bipyr", "hex_bipyr", "T", "cuboct", "oct_max", "tet_max",
+        "tri_plan_max", "sq_plan_max", "pent_plan_max", "cuboct_max",
+        "bent", "see_saw_rect", "hex_plan_max",
+        "sq_face_cap_trig_pris")
 
     def __init__(self, types, parameters=None, cutoff=-10.0):
         """
@@ -2154,7 +2344,7 @@ class LocalStructOrderParams:
             else:
                 self._params.append(deepcopy(parameters[i]))
 
-        self._computerijs = self._computerjks = self._geomops = False
+        self._computerijs = self._geomops = False
         self._geomops2 = self._boops = False
         self._max_trig_order = -1
 
@@ -2162,18 +2352,12 @@ class LocalStructOrderParams:
         if "sgl_bd" in self._types:
             self._computerijs = True
         if not set(self._types).isdisjoint(
-                ["tet", "oct", "bcc", "sq_pyr", "sq_pyr_legacy",
-                 "tri_bipyr", "sq_bipyr", "oct_legacy", "tri_plan",
-                 "sq_plan", "pent_plan", "tri_pyr", "pent_pyr", "hex_pyr",
-                 "pent_bipyr", "hex_bipyr", "T", "cuboct", "oct_max", "tet_max",
-                 "tri_plan_max", "sq_plan_max", "pent_plan_max", "cuboct_max",
-                 "bent", "see_saw_rect", "hex_plan_max",
-                 "sq_face_cap_trig_pris"]):
+                LocalStructOrderParams.__geometric_types):
             self._computerijs = self._geomops = True
         if "sq_face_cap_trig_pris" in self._types:
             self._comp_azi = True
         if not set(self._types).isdisjoint(["reg_tri", "sq"]):
-            self._computerijs = self._computerjks = self._geomops2 = True
+            self._computerijs = self._geomops2 = True
         if not set(self._types).isdisjoint(["q2", "q4", "q6"]):
             self._computerijs = self._boops = True
         if "q2" in self._types:
@@ -2648,51 +2832,363 @@ class LocalStructOrderParams:
                              " order parameter calculation out-of-bounds!")
         return self._params[index]
 
-    def get_order_parameters(self, structure, n, indices_neighs=None, tol=0.0, target_spec=None):
+    def _compute_geometric_ops(self, ops, rijnorm, dist):
         """
-        Compute all order parameters of site n.
+        Computes the Peters-style OPs that are tailor-made to recognize
+        common structural motifs
+        (Peters, J. Chem. Phys., 131, 244103, 2009;
+         Zimmermann et al., J. Am. Chem. Soc., under revision, 2015)
+        of a batch of sites with the same number of neighbors and stores
+        them in ops.  Neighbor j is put to the North pole and the part of
+        the bond to neighbor k orthogonal to it defines the prime meridian.
+        The contributions of all (j, k) pairs and of all further neighbors
+        m are evaluated at once on (site, j, k) and (site, j, k, m) arrays.
 
         Args:
-            structure (Structure): input structure.
-            n (int): index of site in input structure,
-                for which OPs are to be
-                calculated.  Note that we do not use the sites iterator
-                here, but directly access sites via struct[index].
-            indices_neighs ([int]): list of indices of those neighbors
-                in Structure object
-                structure that are to be considered for OP computation.
-                This optional argument overwrites the way neighbors are
-                to be determined as defined in the constructor (i.e.,
-                Voronoi coordination finder via negative cutoff radius
-                vs constant cutoff radius if cutoff was positive).
-                We do not use information about the underlying
-                structure lattice if the neighbor indices are explicitly
-                provided.  This has two important consequences.  First,
-                the input Structure object can, in fact, be a
-                simple list of Site objects.  Second, no nearest images
-                of neighbors are determined when providing an index list.
-                Note furthermore that this neighbor
-                determination type ignores the optional target_spec
-                argument.
-            tol (float): threshold of weight
-                (= solid angle / maximal solid angle)
-                to determine if a particular pair is
-                considered neighbors; this is relevant only in the case
-                when Voronoi polyhedra are used to determine coordination
-            target_spec (Specie): target species to be considered
-                when calculating the order
-                parameters of site n; None includes all species of input
-                structure.
+            ops (numpy array): (number of sites, num_ops) array of OPs that
+                is updated in place; OPs that cannot be computed are NaN.
+            rijnorm (numpy array): (number of sites, number of neighbors, 3)
+                array of normalized vectors from the central sites to
+                their neighbors.
+            dist (numpy array): (number of sites, number of neighbors)
+                array of distances to the neighbors.
+        """
+
+        nneigh = rijnorm.shape[1]
+        # The following threshold has to be adapted to non-Angstrom units.
+        very_small = 1.0e-12
+        fac_bcc = 1.0 / exp(-0.5)
+        ipi = 1.0 / pi
+        piover2 = pi / 2.0
+        onethird = 1.0 / 3.0
+        twothird = 2.0 / 3.0
+
+        def gauss(x):
+            return np.exp(-0.5 * x * x)
+
+        def sum_over_m(mask, values):
+            return np.sum(np.where(mask, values, 0.0), axis=3)
+
+        # Polar angles of bonds k (or m) with bond j being the North pole.
+        # Bonds at right angles up to rounding errors are made exactly
+        # orthogonal, such that the side of pi/2 they are on (which decides
+        # the sign of their "bcc" contribution) is well defined.
+        dots = _dot3(rijnorm[:, :, None, :], rijnorm[:, None, :, :])
+        dots[np.abs(dots) < very_small] = 0.0
+        theta = np.arccos(np.clip(dots, -1.0, 1.0))
+        thetak = theta[:, :, :, None]
+        thetam = theta[:, :, None, :]
+        thk = theta * ipi
+        thm = thetam * ipi
+
+        # Prime meridians (x axes) from Gram-Schmidt orthogonalization of
+        # bond k with respect to bond j, and the angles phi between the
+        # x axes of bonds k and m.
+        uin_uin = _dot3(rijnorm, rijnorm)
+        xaxes = rijnorm[:, None, :, :] - \
+            (dots / uin_uin[:, :, None])[:, :, :, None] * rijnorm[:, :, None, :]
+        xlens = np.sqrt(_dot3(xaxes, xaxes))
+        no_xaxis = xlens < very_small
+        xaxes = xaxes / np.where(no_xaxis, 1.0, xlens)[:, :, :, None]
+        cosphi = _dot3(xaxes[:, :, :, None, :], xaxes[:, :, None, :, :])
+        phi = np.arccos(np.clip(cosphi, -1.0, 1.0))
+        if self._comp_azi:
+            yaxes = np.cross(rijnorm[:, :, None, :], xaxes)
+            ylens = np.sqrt(_dot3(yaxes, yaxes))
+            no_yaxis = ylens <= very_small
+            yaxes = yaxes / np.where(no_yaxis, 1.0, ylens)[:, :, :, None]
+            phi2 = np.arctan2(
+                _dot3(yaxes[:, :, :, None, :], xaxes[:, :, None, :, :]), cosphi)
+
+        # (j, k) pairs and (j, k, m) triplets that contribute.
+        idx = np.arange(nneigh)
+        pairs = idx[:, None] != idx[None, :]
+        upper = idx[:, None] < idx[None, :]
+        triplets = (pairs[:, :, None] & pairs[:, None, :] &
+                    pairs[None, :, :]) & ~no_xaxis[:, :, :, None]
+        with_phi = triplets & ~no_xaxis[:, :, None, :]
+
+        for i, t in enumerate(self._types):
+            if t not in self.__geometric_types:
+                continue
+            p = self._params[i]
+            q = np.zeros(theta.shape)
+            norm = np.zeros(theta.shape)
+            if t in ["bent", "sq_pyr_legacy"]:
+                q += gauss(p['IGW_TA'] * (thk - p['TA']))
+                norm += 1
+            elif t in ["tri_plan", "tri_plan_max", "tet", "tet_max"]:
+                gaussthetak = gauss(p['IGW_TA'] * (thk - p['TA']))
+                if t in ["tri_plan_max", "tet_max"]:
+                    q += gaussthetak
+                    norm += 1
+                    gaussthetak = np.ones_like(gaussthetak)
+                values = gaussthetak[:, :, :, None] * \
+                    gauss(p['IGW_TA'] * (thm - p['TA'])) * \
+                    np.cos(p['fac_AA'] * phi) ** p['exp_cos_AA']
+                q += sum_over_m(with_phi, values)
+                norm += np.sum(with_phi, axis=3)
+            elif t in ["T", "tri_pyr", "sq_pyr", "pent_pyr", "hex_pyr"]:
+                q += gauss(p['IGW_EP'] * (thk - 0.5))
+                norm += 1
+                values = np.cos(p['fac_AA'] * phi) ** p['exp_cos_AA'] * \
+                    gauss(p['IGW_EP'] * (thm - 0.5))
+                q += sum_over_m(with_phi, values)
+                norm += np.sum(with_phi, axis=3)
+            elif t in ["sq_plan", "oct", "oct_legacy", "cuboct",
+                       "cuboct_max"]:
+                south = theta >= p['min_SPP']
+                q += np.where(south, p['w_SPP'] * gauss(
+                    p['IGW_SPP'] * (thk - 1.0)), 0.0)
+                norm += np.where(south, p['w_SPP'], 0.0)
+                if t in ["sq_plan", "oct", "oct_legacy"]:
+                    mask = with_phi & (thetak < p['min_SPP']) & \
+                        (thetam < p['min_SPP'])
+                    tmp = np.cos(p['fac_AA'] * phi) ** p['exp_cos_AA']
+                    values = tmp * gauss(p['IGW_EP'] * (thm - 0.5))
+                    if t == "oct_legacy":
+                        values = values - tmp * p[6] * p[7]
+                    q += sum_over_m(mask, values)
+                    norm += np.sum(mask, axis=3)
+                else:
+                    mask = with_phi & (thetam < p['min_SPP']) & \
+                        (thetak > p[4]) & (thetak < p[2])
+                    equator = mask & (thetam > p[4]) & (thetam < p[2])
+                    north = mask & (thetam < p[4])
+                    south = mask & (thetam > p[2])
+                    values = np.cos(phi) ** 2 * gauss(p[5] * (thm - 0.5))
+                    q += sum_over_m(equator, values)
+                    tmp = gauss(0.0556 * (np.cos(phi - 0.5 * pi) - 0.81649658))
+                    q += sum_over_m(north, tmp * gauss(p[6] * (thm - onethird)))
+                    q += sum_over_m(south, tmp * gauss(p[6] * (thm - twothird)))
+                    norm += np.sum(equator | north | south, axis=3)
+            elif t in ["see_saw_rect", "tri_bipyr", "sq_bipyr", "pent_bipyr",
+                       "hex_bipyr", "oct_max", "sq_plan_max",
+                       "hex_plan_max"]:
+                equator = theta < p['min_SPP']
+                tmp = p['IGW_EP'] * (thk - 0.5) if t != "hex_plan_max" else \
+                    p['IGW_TA'] * (np.fabs(thk - 0.5) - p['TA'])
+                q += np.where(equator, gauss(tmp), 0.0)
+                norm += equator
+                mask = with_phi & (thetam < p['min_SPP']) & \
+                    (thetak < p['min_SPP'])
+                if t == "see_saw_rect":
+                    mask &= phi < 0.75 * pi
+                tmp = p['IGW_EP'] * (thm - 0.5) if t != "hex_plan_max" else \
+                    p['IGW_TA'] * (np.fabs(thm - 0.5) - p['TA'])
+                values = np.cos(p['fac_AA'] * phi) ** p['exp_cos_AA'] * \
+                    gauss(tmp)
+                q += sum_over_m(mask, values)
+                norm += np.sum(mask, axis=3)
+            elif t in ["pent_plan", "pent_plan_max"]:
+                tmp = np.where(theta <= p['TA'] * pi, 0.4, 0.8)
+                gaussthetak = gauss(p['IGW_TA'] * (thk - tmp))
+                if t == "pent_plan_max":
+                    q += gaussthetak
+                    norm += 1
+                    gaussthetak = np.ones_like(gaussthetak)
+                tmp = np.where(thetam <= p['TA'] * pi, 0.4, 0.8)
+                values = gaussthetak[:, :, :, None] * \
+                    gauss(p['IGW_TA'] * (thm - tmp)) * np.cos(phi) ** 2
+                q += sum_over_m(with_phi, values)
+                norm += np.sum(with_phi, axis=3)
+            elif t == "bcc":
+                south = upper & (theta >= p['min_SPP'])
+                q += np.where(south, p['w_SPP'] * gauss(
+                    p['IGW_SPP'] * (thk - 1.0)), 0.0)
+                norm += np.where(south, p['w_SPP'], 0.0)
+                mask = with_phi & upper[:, :, None] & (thetak < p['min_SPP'])
+                fac = np.where(thetak > piover2, 1.0, -1.0)
+                tmp = (thetam - piover2) / asin(1 / 3)
+                values = fac * np.cos(3.0 * phi) * fac_bcc * tmp * gauss(tmp)
+                q += sum_over_m(mask, values)
+                norm += np.sum(mask, axis=3)
+            elif t == "sq_face_cap_trig_pris":
+                cap = theta < p['TA3']
+                q += np.where(cap, gauss(p['IGW_TA1'] * (thk - p['TA1'])), 0.0)
+                norm += cap
+                mask = with_phi & ~no_yaxis[:, :, :, None] & \
+                    (thetak < p['TA3'])
+                values = np.where(
+                    thetam < p['TA3'],
+                    np.cos(p['fac_AA1'] * phi2) ** p['exp_cos_AA1'] *
+                    gauss(p['IGW_TA1'] * (thm - p['TA1'])),
+                    np.cos(p['fac_AA2'] * (phi2 + p['shift_AA2'])) **
+                    p['exp_cos_AA2'] * gauss(p['IGW_TA2'] * (thm - p['TA2'])))
+                q += sum_over_m(mask, values)
+                norm += np.sum(mask, axis=3)
+
+            # South pole contributions of m.  For historical reasons, these
+            # are only added to the last OP in the list of types.
+            if i == len(self._types) - 1 and t in [
+                    "tri_bipyr", "sq_bipyr", "pent_bipyr", "hex_bipyr",
+                    "oct_max", "sq_plan_max", "hex_plan_max", "see_saw_rect"]:
+                mask = triplets & (thetam >= p['min_SPP'])
+                q += sum_over_m(mask, gauss(p['IGW_SPP'] * (thm - 1.0)))
+                norm += np.sum(mask, axis=3)
+
+            # Normalize.
+            q = q[:, pairs]
+            norm = norm[:, pairs]
+            if t in ["tri_plan", "tet", "bent", "sq_plan",
+                     "oct", "oct_legacy", "cuboct", "pent_plan"]:
+                tmp_norm = np.sum(norm, axis=1)
+                ops[:, i] = np.where(
+                    tmp_norm > 1.0e-12,
+                    np.sum(q, axis=1) / np.where(tmp_norm > 1.0e-12, tmp_norm, 1.0),
+                    np.nan)
+            elif t == "bcc":
+                ops[:, i] = np.sum(q, axis=1) / float(0.5 * float(
+                    nneigh * (6 + (nneigh - 2) * (nneigh - 3)))) \
+                    if nneigh > 3 else np.nan
+            elif t == "sq_pyr_legacy":
+                if nneigh > 1:
+                    acc = np.sum(gauss(p[2] * (
+                        dist - np.mean(dist, axis=1)[:, None])), axis=1)
+                    ops[:, i] = acc * np.max(q, axis=1) / float(nneigh)
+                else:
+                    ops[:, i] = np.nan
+            else:
+                if nneigh > 1:
+                    ops[:, i] = np.max(np.where(
+                        norm > 1.0e-12, q / np.where(norm > 1.0e-12, norm, 1.0),
+                        0.0), axis=1)
+                else:
+                    ops[:, i] = np.nan
+
+    @staticmethod
+    def _get_boop(l, thetas, phis):
+        """
+        Computes the bond orientational OP of weight l (Steinhardt et al.,
+        Phys. Rev. B, 28, 784-805, 1983) of a batch of sites with the same
+        number of neighbors, same as get_q2, get_q4 and get_q6.
+
+        Args:
+            l (int): weight of the OP.
+            thetas (numpy array): (number of sites, number of neighbors)
+                array of polar angles of the bonds in radians.
+            phis (numpy array): azimuth angles of the bonds in radians.
 
         Returns:
-            [floats]: representing order parameters.  Should it not be
-            possible to compute a given OP for a conceptual reason, the
-            corresponding entry is None instead of a float.  For Steinhardt
-            et al.'s bond orientational OPs and the other geometric OPs
-            ("tet", "oct", "bcc", etc.),
-            this can happen if there is a single
-            neighbor around site n in the structure because that
-            does not permit calculation of angles between multiple
+            numpy array of the OPs of the sites.
+        """
+        m = np.arange(-l, l + 1)[:, None, None]
+        qlm = np.sum(sph_harm(m, l, phis[None], thetas[None]), axis=2)
+        return np.sqrt(4.0 * pi * np.sum(np.abs(qlm) ** 2, axis=0) /
+                       (2 * l + 1)) / thetas.shape[1]
+
+    def _compute_ops(self, centvecs, neighcoords):
+        """
+        Computes all OPs of a batch of sites with the same number of
+        neighbors.
+
+        Args:
+            centvecs (numpy array): (number of sites, 3) array of the
+                Cartesian coordinates of the central sites.
+            neighcoords (numpy array): (number of sites, number of
+                neighbors, 3) array of the Cartesian coordinates of the
+                neighbors.
+
+        Returns:
+            numpy array of shape (number of sites, num_ops).  OPs that
+            cannot be computed are NaN.
+        """
+
+        left_of_unity = 1.0 - 1.0e-12
+        nneigh = neighcoords.shape[1]
+        ops = np.zeros((len(centvecs), self.num_ops))
+
+        # All bond vectors and neighbor-neighbor distances at once.
+        if self._computerijs:
+            rij = neighcoords - centvecs[:, None, :]
+            dist = np.sqrt(_dot3(rij, rij))
+            rijnorm = rij / dist[:, :, None]
+
+        # First, coordination number and distance-based OPs.
+        for i, t in enumerate(self._types):
+            if t == "cn":
+                ops[:, i] = nneigh / self._params[i]['norm']
+            elif t == "sgl_bd":
+                if nneigh == 1:
+                    ops[:, i] = 1.0
+                elif nneigh > 1:
+                    dist_sorted = np.sort(dist, axis=1)
+                    ops[:, i] = 1.0 - dist_sorted[:, 0] / dist_sorted[:, 1]
+
+        # Then, bond orientational OPs based on spherical harmonics
+        # according to Steinhardt et al., Phys. Rev. B, 28, 784-805, 1983.
+        if self._boops:
+            # z is North pole --> theta between vec and (0, 0, 1)^T.
+            # Because vec is normalized, dot product is simply vec[2].
+            thetas = np.arccos(np.clip(rijnorm[:, :, 2], -1.0, 1.0))
+            phis = np.zeros(thetas.shape)
+
+            # Compute phi only if it is not (almost) perfectly
+            # aligned with z-axis.  x is prime meridian --> phi between
+            # projection of vec into x-y plane and (1, 0, 0)^T.
+            mask = (-left_of_unity < rijnorm[:, :, 2]) & \
+                (rijnorm[:, :, 2] < left_of_unity)
+            vecs = rijnorm[mask]
+            phis[mask] = np.arccos(np.clip(vecs[:, 0] / np.sqrt(
+                vecs[:, 0] * vecs[:, 0] + vecs[:, 1] * vecs[:, 1]), -1.0, 1.0))
+            phis[mask & (rijnorm[:, :, 1] < 0.0)] *= -1.0
+
+            # NaN flags that we have too few neighbors for calculating
+            # BOOPS.
+            for i, t in enumerate(self._types):
+                if t in ["q2", "q4", "q6"]:
+                    ops[:, i] = self._get_boop(int(t[1]), thetas, phis) \
+                        if nneigh > 0 else np.nan
+
+        # Then, deal with the Peters-style OPs that are tailor-made
+        # to recognize common structural motifs.
+        if self._geomops:
+            self._compute_geometric_ops(ops, rijnorm, dist)
+
+        # Then, deal with the new-style OPs that require vectors between
+        # neighbors.
+        if self._geomops2:
+            # Compute all (unique) angles and sort them.
+            js, ks = np.triu_indices(nneigh, 1)
+            aijs = np.sort(np.arccos(np.clip(
+                _dot3(rijnorm[:, js], rijnorm[:, ks]), -1.0, 1.0)), axis=1)
+
+            # Compute height, side and diagonal length estimates.
+            neighscent = np.mean(neighcoords, axis=1) if nneigh > 0 \
+                else np.zeros(centvecs.shape)
+            h = np.linalg.norm(neighscent - centvecs, axis=1)
+            distjk_unique = np.linalg.norm(
+                neighcoords[:, ks] - neighcoords[:, js], axis=2)
+            b = np.min(distjk_unique, axis=1) if len(js) > 0 else 0
+            dhalf = np.max(distjk_unique, axis=1) / 2.0 if len(js) > 0 else 0
+
+            for i, t in enumerate(self._types):
+                if t == "reg_tri" or t == "sq":
+                    if nneigh < 3:
+                        ops[:, i] = np.nan
+                        continue
+                    if t == "reg_tri":
+                        a = 2.0 * np.arcsin(b / (2.0 * np.sqrt(h * h + (b / (
+                            2.0 * cos(3.0 * pi / 18.0))) ** 2.0)))
+                        nmax = 3
+                    else:
+                        a = 2.0 * np.arcsin(
+                            b / (2.0 * np.sqrt(h * h + dhalf * dhalf)))
+                        nmax = 4
+                    ops[:, i] = np.prod(np.exp(-0.5 * ((
+                        aijs[:, :min(nneigh, nmax)] - a[:, None]) *
+                        self._params[i][0]) ** 2), axis=1)
+
+        return ops
+
+    def _get_neighbor_coords(self, structure, n, indices_neighs=None, tol=0.0,
+                             target_spec=None):
+        """
+        Finds the neighbors of site n as described in get_order_parameters.
+
+        Returns:
+            (numpy array, numpy array): Cartesian coordinates of site n and
+            (number of neighbors, 3) array of the coordinates of its
             neighbors.
         """
 
@@ -2708,11 +3204,6 @@ class LocalStructOrderParams:
         if tol < 0.0:
             raise ValueError("Negative tolerance for weighted solid angle!")
 
-        left_of_unity = 1.0 - 1.0e-12
-        # The following threshold has to be adapted to non-Angstrom units.
-        very_small = 1.0e-12
-        fac_bcc = 1.0 / exp(-0.5)
-
         # Find central site and its neighbors.
         # Note that we adopt the same way of accessing sites here as in
         # VoronoiNN; that is, not via the sites iterator.
@@ -2735,440 +3226,116 @@ class LocalStructOrderParams:
                 neighsites = list(neighsitestmp)
             else:
                 neighsites[:] = [site for site in neighsitestmp if site.specie.symbol == target_spec]
-        nneigh = len(neighsites)
-        self._last_nneigh = nneigh
-
-        # Prepare angle calculations, if applicable.
-        rij = []
-        rjk = []
-        rijnorm = []
-        rjknorm = []
-        dist = []
-        distjk_unique = []
-        distjk = []
-        centvec = centsite.coords
-        if self._computerijs:
-            for j, neigh in enumerate(neighsites):
-                rij.append((neigh.coords - centvec))
-                dist.append(np.linalg.norm(rij[j]))
-                rijnorm.append((rij[j] / dist[j]))
-        if self._computerjks:
-            for j, neigh in enumerate(neighsites):
-                rjk.append([])
-                rjknorm.append([])
-                distjk.append([])
-                kk = 0
-                for k in range(len(neighsites)):
-                    if j != k:
-                        rjk[j].append(neighsites[k].coords - neigh.coords)
-                        distjk[j].append(np.linalg.norm(rjk[j][kk]))
-                        if k > j:
-                            distjk_unique.append(distjk[j][kk])
-                        rjknorm[j].append(rjk[j][kk] / distjk[j][kk])
-                        kk = kk + 1
-        # Initialize OP list and, then, calculate OPs.
-        ops = [0.0 for t in self._types]
-        # norms = [[[] for j in range(nneigh)] for t in self._types]
+        neighcoords = np.array([neigh.coords for neigh in neighsites],
+                               dtype=float).reshape(len(neighsites), 3)
+        return np.array(centsite.coords, dtype=float), neighcoords
 
-        # First, coordination number and distance-based OPs.
-        for i, t in enumerate(self._types):
-            if t == "cn":
-                ops[i] = nneigh / self._params[i]['norm']
-            elif t == "sgl_bd":
-                dist_sorted = sorted(dist)
-                if len(dist_sorted) == 1:
-                    ops[i] = 1.0
-                elif len(dist_sorted) > 1:
-                    ops[i] = 1.0 - dist_sorted[0] / dist_sorted[1]
+    def get_all_order_parameters(self, structure, indices=None, tol=0.0,
+                                 target_spec=None):
+        """
+        Compute all order parameters of several sites of a structure.  The
+        neighbors are determined site by site as in get_order_parameters,
+        after which the OPs of all sites with the same number of neighbors
+        are computed together on arrays.
 
-        # Then, bond orientational OPs based on spherical harmonics
-        # according to Steinhardt et al., Phys. Rev. B, 28, 784-805, 1983.
-        if self._boops:
-            thetas = []
-            phis = []
-            for j, vec in enumerate(rijnorm):
-
-                # z is North pole --> theta between vec and (0, 0, 1)^T.
-                # Because vec is normalized, dot product is simply vec[2].
-                thetas.append(acos(max(-1.0, min(vec[2], 1.0))))
-                tmpphi = 0.0
-
-                # Compute phi only if it is not (almost) perfectly
-                # aligned with z-axis.
-                if -left_of_unity < vec[2] < left_of_unity:
-                    # x is prime meridian --> phi between projection of vec
-                    # into x-y plane and (1, 0, 0)^T
-                    tmpphi = acos(max(-1.0, min(vec[0] / (sqrt(
-                        vec[0] * vec[0] + vec[1] * vec[1])), 1.0)))
-                    if vec[1] < 0.0:
-                        tmpphi = -tmpphi
-                phis.append(tmpphi)
-
-            # Note that None flags that we have too few neighbors
-            # for calculating BOOPS.
-            for i, t in enumerate(self._types):
-                if t == "q2":
-                    ops[i] = self.get_q2(thetas, phis) if len(
-                        thetas) > 0 else None
-                elif t == "q4":
-                    ops[i] = self.get_q4(thetas, phis) if len(
-                        thetas) > 0 else None
-                elif t == "q6":
-                    ops[i] = self.get_q6(thetas, phis) if len(
-                        thetas) > 0 else None
+        Args:
+            structure (Structure): input structure.
+            indices ([int]): indices of the sites for which OPs are to be
+                calculated; all sites are considered if None (default).
+            tol (float): threshold of weight
+                (= solid angle / maximal solid angle)
+                to determine if a particular pair is
+                considered neighbors (see get_order_parameters).
+            target_spec (Specie): target species to be considered
+                when calculating the order parameters; None includes all
+                species of input structure.
 
-        # Then, deal with the Peters-style OPs that are tailor-made
-        # to recognize common structural motifs
-        # (Peters, J. Chem. Phys., 131, 244103, 2009;
-        #  Zimmermann et al., J. Am. Chem. Soc., under revision, 2015).
-        if self._geomops:
-            gaussthetak = [0.0 for t in self._types]  # not used by all OPs
-            qsptheta = [[[] for j in range(nneigh)] for t in self._types]
-            norms = [[[] for j in range(nneigh)] for t in self._types]
-            ipi = 1.0 / pi
-            piover2 = pi / 2.0
-            onethird = 1.0 / 3.0
-            twothird = 2.0 / 3.0
-            for j in range(nneigh):  # Neighbor j is put to the North pole.
-                zaxis = rijnorm[j]
-                kc = 0
-                for k in range(nneigh):  # From neighbor k, we construct
-                    if j != k:  # the prime meridian.
-                        for i in range(len(self._types)):
-                            qsptheta[i][j].append(0.0)
-                            norms[i][j].append(0)
-                        tmp = max(
-                            -1.0, min(np.inner(zaxis, rijnorm[k]), 1.0))
-                        thetak = acos(tmp)
-                        xaxis = gramschmidt(rijnorm[k], zaxis)
-                        if np.linalg.norm(xaxis) < very_small:
-                            flag_xaxis = True
-                        else:
-                            xaxis = xaxis / np.linalg.norm(xaxis)
-                            flag_xaxis = False
-                        if self._comp_azi:
-                            flag_yaxis = True
-                            yaxis = np.cross(zaxis, xaxis)
-                            if np.linalg.norm(yaxis) > very_small:
-                                yaxis = yaxis / np.linalg.norm(yaxis)
-                                flag_yaxis = False
-
-                        # Contributions of j-i-k angles, where i represents the
-                        # central atom and j and k two of the neighbors.
-                        for i, t in enumerate(self._types):
-                            if t in ["bent", "sq_pyr_legacy"]:
-                                tmp = self._params[i]['IGW_TA'] * (
-                                        thetak * ipi - self._params[i]['TA'])
-                                qsptheta[i][j][kc] += exp(-0.5 * tmp * tmp)
-                                norms[i][j][kc] += 1
-                            elif t in ["tri_plan", "tri_plan_max", "tet",
-                                       "tet_max"]:
-                                tmp = self._params[i]['IGW_TA'] * (
-                                        thetak * ipi - self._params[i]['TA'])
-                                gaussthetak[i] = exp(-0.5 * tmp * tmp)
-                                if t in ["tri_plan_max", "tet_max"]:
-                                    qsptheta[i][j][kc] += gaussthetak[i]
-                                    norms[i][j][kc] += 1
-                            elif t in ["T", "tri_pyr", "sq_pyr", "pent_pyr",
-                                       "hex_pyr"]:
-                                tmp = self._params[i]['IGW_EP'] * (
-                                        thetak * ipi - 0.5)
-                                qsptheta[i][j][kc] += exp(-0.5 * tmp * tmp)
-                                norms[i][j][kc] += 1
-                            elif t in ["sq_plan", "oct", "oct_legacy",
-                                       "cuboct", "cuboct_max"]:
-                                if thetak >= self._params[i]['min_SPP']:
-                                    tmp = self._params[i]['IGW_SPP'] * (
-                                            thetak * ipi - 1.0)
-                                    qsptheta[i][j][kc] += (
-                                            self._params[i]['w_SPP'] *
-                                            exp(-0.5 * tmp * tmp))
-                                    norms[i][j][kc] += self._params[i]['w_SPP']
-                            elif t in ["see_saw_rect", "tri_bipyr", "sq_bipyr",
-                                       "pent_bipyr", "hex_bipyr", "oct_max",
-                                       "sq_plan_max", "hex_plan_max"]:
-                                if thetak < self._params[i]['min_SPP']:
-                                    tmp = self._params[i]['IGW_EP'] * (
-                                            thetak * ipi - 0.5) if t != "hex_plan_max" else \
-                                        self._params[i]['IGW_TA'] * (
-                                                fabs(thetak * ipi - 0.5) -
-                                                self._params[i]['TA'])
-                                    qsptheta[i][j][kc] += exp(
-                                        -0.5 * tmp * tmp)
-                                    norms[i][j][kc] += 1
-                            elif t in ["pent_plan", "pent_plan_max"]:
-                                tmp = 0.4 if thetak <= self._params[i][
-                                    'TA'] * pi \
-                                    else 0.8
-                                tmp2 = self._params[i]['IGW_TA'] * (
-                                        thetak * ipi - tmp)
-                                gaussthetak[i] = exp(-0.5 * tmp2 * tmp2)
-                                if t == "pent_plan_max":
-                                    qsptheta[i][j][kc] += gaussthetak[i]
-                                    norms[i][j][kc] += 1
-                            elif t == "bcc" and j < k:
-                                if thetak >= self._params[i]['min_SPP']:
-                                    tmp = self._params[i]['IGW_SPP'] * (
-                                            thetak * ipi - 1.0)
-                                    qsptheta[i][j][kc] += (
-                                            self._params[i]['w_SPP'] *
-                                            exp(-0.5 * tmp * tmp))
-                                    norms[i][j][kc] += self._params[i]['w_SPP']
-                            elif t == "sq_face_cap_trig_pris":
-                                if thetak < self._params[i]['TA3']:
-                                    tmp = self._params[i]['IGW_TA1'] * (thetak * ipi - self._params[i]['TA1'])
-                                    qsptheta[i][j][kc] += exp(-0.5 * tmp * tmp)
-                                    norms[i][j][kc] += 1
-
-                        for m in range(nneigh):
-                            if (m != j) and (m != k) and (not flag_xaxis):
-                                tmp = max(-1.0, min(np.inner(zaxis, rijnorm[m]), 1.0))
-                                thetam = acos(tmp)
-                                xtwoaxistmp = gramschmidt(rijnorm[m], zaxis)
-                                l = np.linalg.norm(xtwoaxistmp)
-                                if l < very_small:
-                                    flag_xtwoaxis = True
-                                else:
-                                    xtwoaxis = xtwoaxistmp / l
-                                    phi = acos(max(-1.0, min(np.inner(xtwoaxis, xaxis), 1.0)))
-                                    flag_xtwoaxis = False
-                                    if self._comp_azi:
-                                        phi2 = atan2(np.dot(xtwoaxis, yaxis), np.dot(xtwoaxis, xaxis))
-                                # South pole contributions of m.
-                                if t in ["tri_bipyr", "sq_bipyr", "pent_bipyr",
-                                         "hex_bipyr", "oct_max", "sq_plan_max",
-                                         "hex_plan_max", "see_saw_rect"]:
-                                    if thetam >= self._params[i]['min_SPP']:
-                                        tmp = self._params[i]['IGW_SPP'] * (
-                                                thetam * ipi - 1.0)
-                                        qsptheta[i][j][kc] += exp(
-                                            -0.5 * tmp * tmp)
-                                        norms[i][j][kc] += 1
-
-                                # Contributions of j-i-m angle and
-                                # angles between plane j-i-k and i-m vector.
-                                if not flag_xaxis and not flag_xtwoaxis:
-                                    for i, t in enumerate(self._types):
-                                        if t in ["tri_plan", "tri_plan_max",
-                                                 "tet", "tet_max"]:
-                                            tmp = self._params[i]['IGW_TA'] * (thetam * ipi - self._params[i]['TA'])
-                                            tmp2 = cos(self._params[i]['fac_AA'] * phi) ** self._params[i]['exp_cos_AA']
-                                            tmp3 = 1 if t in ["tri_plan_max", "tet_max"] else gaussthetak[i]
-                                            qsptheta[i][j][kc] += tmp3 * exp(-0.5 * tmp * tmp) * tmp2
-                                            norms[i][j][kc] += 1
-                                        elif t in ["pent_plan",
-                                                   "pent_plan_max"]:
-                                            tmp = 0.4 if thetam <= self._params[i]['TA'] * pi else 0.8
-                                            tmp2 = self._params[i]['IGW_TA'] * (thetam * ipi - tmp)
-                                            tmp3 = cos(phi)
-                                            tmp4 = 1 if t == "pent_plan_max" else gaussthetak[i]
-                                            qsptheta[i][j][kc] += tmp4 * exp(-0.5 * tmp2 * tmp2) * tmp3 * tmp3
-                                            norms[i][j][kc] += 1
-                                        elif t in ["T", "tri_pyr", "sq_pyr",
-                                                   "pent_pyr", "hex_pyr"]:
-                                            tmp = cos(self._params[i]['fac_AA'] * phi) ** self._params[i]['exp_cos_AA']
-                                            tmp3 = self._params[i]['IGW_EP'] * (thetam * ipi - 0.5)
-                                            qsptheta[i][j][kc] += tmp * exp(
-                                                -0.5 * tmp3 * tmp3)
-                                            norms[i][j][kc] += 1
-                                        elif t in ["sq_plan", "oct",
-                                                   "oct_legacy"]:
-                                            if thetak < self._params[i]['min_SPP'] and \
-                                                    thetam < self._params[i]['min_SPP']:
-                                                tmp = cos(self._params[i]['fac_AA'] * phi) ** self._params[i][
-                                                    'exp_cos_AA']
-                                                tmp2 = self._params[i]['IGW_EP'] * (thetam * ipi - 0.5)
-                                                qsptheta[i][j][kc] += tmp * exp(-0.5 * tmp2 * tmp2)
-                                                if t == "oct_legacy":
-                                                    qsptheta[i][j][kc] -= tmp * self._params[i][6] * self._params[i][7]
-                                                norms[i][j][kc] += 1
-                                        elif t in ["tri_bipyr", "sq_bipyr",
-                                                   "pent_bipyr",
-                                                   "hex_bipyr", "oct_max",
-                                                   "sq_plan_max",
-                                                   "hex_plan_max"]:
-                                            if thetam < self._params[i]['min_SPP']:
-                                                if thetak < self._params[i]['min_SPP']:
-                                                    tmp = cos(self._params[i][
-                                                                  'fac_AA'] *
-                                                              phi) ** \
-                                                          self._params[i][
-                                                              'exp_cos_AA']
-                                                    tmp2 = self._params[i][
-                                                               'IGW_EP'] * (
-                                                                   thetam * ipi - 0.5) if t != "hex_plan_max" else \
-                                                        self._params[i][
-                                                            'IGW_TA'] * (
-                                                                fabs(
-                                                                    thetam * ipi - 0.5) -
-                                                                self._params[i][
-                                                                    'TA'])
-                                                    qsptheta[i][j][
-                                                        kc] += tmp * exp(
-                                                        -0.5 * tmp2 * tmp2)
-                                                    norms[i][j][kc] += 1
-                                        elif t == "bcc" and j < k:
-                                            if thetak < self._params[i]['min_SPP']:
-                                                if thetak > piover2:
-                                                    fac = 1.0
-                                                else:
-                                                    fac = -1.0
-                                                tmp = (thetam - piover2) / asin(
-                                                    1 / 3)
-                                                qsptheta[i][j][kc] += fac * cos(3.0 * phi) * fac_bcc * \
-                                                    tmp * exp(-0.5 * tmp * tmp)
-                                                norms[i][j][kc] += 1
-                                        elif t == "see_saw_rect":
-                                            if thetam < self._params[i]['min_SPP']:
-                                                if thetak < self._params[i]['min_SPP'] and phi < 0.75 * pi:
-                                                    tmp = cos(self._params[i][
-                                                                  'fac_AA'] *
-                                                              phi) ** \
-                                                          self._params[i][
-                                                              'exp_cos_AA']
-                                                    tmp2 = self._params[i][
-                                                               'IGW_EP'] * (
-                                                                   thetam * ipi - 0.5)
-                                                    qsptheta[i][j][kc] += tmp * exp(-0.5 * tmp2 * tmp2)
-                                                    norms[i][j][kc] += 1.0
-                                        elif t in ["cuboct", "cuboct_max"]:
-                                            if thetam < self._params[i]['min_SPP'] and \
-                                                    thetak > self._params[i][4] and \
-                                                    thetak < self._params[i][2]:
-                                                if thetam > self._params[i][4] and thetam < self._params[i][2]:
-                                                    tmp = cos(phi)
-                                                    tmp2 = self._params[i][
-                                                               5] * (
-                                                                   thetam * ipi - 0.5)
-                                                    qsptheta[i][j][
-                                                        kc] += tmp * tmp * exp(
-                                                        -0.5 * tmp2 * tmp2)
-                                                    norms[i][j][kc] += 1.0
-                                                elif thetam < self._params[i][4]:
-                                                    tmp = 0.0556 * (cos(phi - 0.5 * pi) - 0.81649658)
-                                                    tmp2 = self._params[i][6] * (thetam * ipi - onethird)
-                                                    qsptheta[i][j][kc] += exp(
-                                                        -0.5 * tmp * tmp) * exp(-0.5 * tmp2 * tmp2)
-                                                    norms[i][j][kc] += 1.0
-                                                elif thetam > self._params[i][2]:
-                                                    tmp = 0.0556 * (cos(phi - 0.5 * pi) - 0.81649658)
-                                                    tmp2 = self._params[i][6] * (
-                                                                   thetam * ipi - twothird)
-                                                    qsptheta[i][j][kc] += exp(
-                                                        -0.5 * tmp * tmp) * exp(-0.5 * tmp2 * tmp2)
-                                                    norms[i][j][kc] += 1.0
-                                        elif t == "sq_face_cap_trig_pris" and not flag_yaxis:
-                                            if thetak < self._params[i]['TA3']:
-                                                if thetam < self._params[i]['TA3']:
-                                                    tmp = cos(self._params[i]['fac_AA1'] * phi2) ** \
-                                                        self._params[i]['exp_cos_AA1']
-                                                    tmp2 = self._params[i]['IGW_TA1'] * (thetam * ipi -
-                                                                                         self._params[i]['TA1'])
-                                                else:
-                                                    tmp = cos(self._params[i]['fac_AA2'] *
-                                                              (phi2 + self._params[i]['shift_AA2'])) ** \
-                                                          self._params[i]['exp_cos_AA2']
-                                                    tmp2 = self._params[i][
-                                                               'IGW_TA2'] * (
-                                                                   thetam * ipi -
-                                                                   self._params[
-                                                                       i][
-                                                                       'TA2'])
-
-                                                qsptheta[i][j][kc] += tmp * exp(
-                                                    -0.5 * tmp2 * tmp2)
-                                                norms[i][j][kc] += 1
-
-                        kc += 1
-
-            # Normalize Peters-style OPs.
-            for i, t in enumerate(self._types):
-                if t in ["tri_plan", "tet", "bent", "sq_plan",
-                         "oct", "oct_legacy", "cuboct", "pent_plan"]:
-                    ops[i] = tmp_norm = 0.0
-                    for j in range(nneigh):
-                        ops[i] += sum(qsptheta[i][j])
-                        tmp_norm += float(sum(norms[i][j]))
-                    ops[i] = ops[i] / tmp_norm if tmp_norm > 1.0e-12 else None
-                elif t in ["T", "tri_pyr", "see_saw_rect", "sq_pyr",
-                           "tri_bipyr",
-                           "sq_bipyr", "pent_pyr", "hex_pyr", "pent_bipyr",
-                           "hex_bipyr", "oct_max", "tri_plan_max", "tet_max",
-                           "sq_plan_max", "pent_plan_max", "cuboct_max",
-                           "hex_plan_max",
-                           "sq_face_cap_trig_pris"]:
-                    ops[i] = None
-                    if nneigh > 1:
-                        for j in range(nneigh):
-                            for k in range(len(qsptheta[i][j])):
-                                qsptheta[i][j][k] = qsptheta[i][j][k] / norms[i][j][k] \
-                                    if norms[i][j][k] > 1.0e-12 else 0.0
-                            ops[i] = max(qsptheta[i][j]) if j == 0 \
-                                else max(ops[i], max(qsptheta[i][j]))
-                elif t == "bcc":
-                    ops[i] = 0.0
-                    for j in range(nneigh):
-                        ops[i] += sum(qsptheta[i][j])
-                    ops[i] = ops[i] / float(0.5 * float(
-                        nneigh * (6 + (nneigh - 2) * (nneigh - 3)))) \
-                        if nneigh > 3 else None
-                elif t == "sq_pyr_legacy":
-                    if nneigh > 1:
-                        dmean = np.mean(dist)
-                        acc = 0.0
-                        for d in dist:
-                            tmp = self._params[i][2] * (d - dmean)
-                            acc = acc + exp(-0.5 * tmp * tmp)
-                        for j in range(nneigh):
-                            ops[i] = max(qsptheta[i][j]) if j == 0 \
-                                else max(ops[i], max(qsptheta[i][j]))
-                        ops[i] = acc * ops[i] / float(nneigh)
-                        # nneigh * (nneigh - 1))
-                    else:
-                        ops[i] = None
+        Returns:
+            numpy array of shape (number of sites, num_ops) whose rows are
+            the order parameters of the sites as obtained from
+            get_order_parameters.  OPs that cannot be computed (None in
+            get_order_parameters) are NaN.
+        """
+
+        if indices is None:
+            indices = range(len(structure))
+        indices = list(indices)
+        centvecs = np.zeros((len(indices), 3))
+        neighcoords = []
+        groups = defaultdict(list)
+        with _neighbor_cache.pinned(structure):
+            for i, n in enumerate(indices):
+                centvecs[i], coords = self._get_neighbor_coords(
+                    structure, n, tol=tol, target_spec=target_spec)
+                neighcoords.append(coords)
+                groups[len(coords)].append(i)
+
+        ops = np.full((len(indices), self.num_ops), np.nan)
+        for nneigh, rows in groups.items():
+            # bound the size of the (site, j, k, m) arrays
+            chunksize = max(1, 2 ** 18 // max(1, nneigh) ** 3)
+            for start in range(0, len(rows), chunksize):
+                chunk = rows[start:start + chunksize]
+                ops[chunk] = self._compute_ops(
+                    centvecs[chunk],
+                    np.array([neighcoords[i] for i in chunk]).reshape(
+                        len(chunk), nneigh, 3))
+        return ops
 
-        # Then, deal with the new-style OPs that require vectors between
-        # neighbors.
-        if self._geomops2:
-            # Compute all (unique) angles and sort the resulting list.
-            aij = []
-            for ir, r in enumerate(rijnorm):
-                for j in range(ir + 1, len(rijnorm)):
-                    aij.append(
-                        acos(max(-1.0, min(np.inner(r, rijnorm[j]), 1.0))))
-            aijs = sorted(aij)
+    def get_order_parameters(self, structure, n, indices_neighs=None, tol=0.0, target_spec=None):
+        """
+        Compute all order parameters of site n.
 
-            # Compute height, side and diagonal length estimates.
-            neighscent = np.array([0.0, 0.0, 0.0])
-            for j, neigh in enumerate(neighsites):
-                neighscent = neighscent + neigh.coords
-            if nneigh > 0:
-                neighscent = (neighscent / float(nneigh))
-            h = np.linalg.norm(neighscent - centvec)
-            b = min(distjk_unique) if len(distjk_unique) > 0 else 0
-            dhalf = max(distjk_unique) / 2.0 if len(distjk_unique) > 0 else 0
+        Args:
+            structure (Structure): input structure.
+            n (int): index of site in input structure,
+                for which OPs are to be
+                calculated.  Note that we do not use the sites iterator
+                here, but directly access sites via struct[index].
+            indices_neighs ([int]): list of indices of those neighbors
+                in Structure object
+                structure that are to be considered for OP computation.
+                This optional argument overwrites the way neighbors are
+                to be determined as defined in the constructor (i.e.,
+                Voronoi coordination finder via negative cutoff radius
+                vs constant cutoff radius if cutoff was positive).
+                We do not use information about the underlying
+                structure lattice if the neighbor indices are explicitly
+                provided.  This has two important consequences.  First,
+                the input Structure object can, in fact, be a
+                simple list of Site objects.  Second, no nearest images
+                of neighbors are determined when providing an index list.
+                Note furthermore that this neighbor
+                determination type ignores the optional target_spec
+                argument.
+            tol (float): threshold of weight
+                (= solid angle / maximal solid angle)
+                to determine if a particular pair is
+                considered neighbors; this is relevant only in the case
+                when Voronoi polyhedra are used to determine coordination
+            target_spec (Specie): target species to be considered
+                when calculating the order
+                parameters of site n; None includes all species of input
+                structure.
 
-            for i, t in enumerate(self._types):
-                if t == "reg_tri" or t == "sq":
-                    if nneigh < 3:
-                        ops[i] = None
-                    else:
-                        ops[i] = 1.0
-                        if t == "reg_tri":
-                            a = 2.0 * asin(b / (2.0 * sqrt(h * h + (b / (
-                                    2.0 * cos(3.0 * pi / 18.0))) ** 2.0)))
-                            nmax = 3
-                        elif t == "sq":
-                            a = 2.0 * asin(
-                                b / (2.0 * sqrt(h * h + dhalf * dhalf)))
-                            nmax = 4
-                        for j in range(min([nneigh, nmax])):
-                            ops[i] = ops[i] * exp(-0.5 * ((
-                                                                  aijs[j] - a) *
-                                                          self._params[i][
-                                                              0]) ** 2)
+        Returns:
+            [floats]: representing order parameters.  Should it not be
+            possible to compute a given OP for a conceptual reason, the
+            corresponding entry is None instead of a float.  For Steinhardt
+            et al.'s bond orientational OPs and the other geometric OPs
+            ("tet", "oct", "bcc", etc.),
+            this can happen if there is a single
+            neighbor around site n in the structure because that
+            does not permit calculation of angles between multiple
+            neighbors.
+        """
 
-        return ops
+        centvec, neighcoords = self._get_neighbor_coords(
+            structure, n, indices_neighs=indices_neighs, tol=tol,
+            target_spec=target_spec)
+        self._last_nneigh = len(neighcoords)
+        ops = self._compute_ops(centvec[None, :], neighcoords[None, :, :])[0]
+        return [None if np.isnan(op) else float(op) for op in ops]
 
 
 class BrunnerNN_reciprocal(NearNeighbors):
@@ -3221,8 +3388,7 @@ class BrunnerNN_reciprocal(NearNeighbors):
                 of which represents a coordinated site, its image location,
                 and its weight.
         """
-        site = structure[n]
-        neighs_dists = structure.get_neighbors(site, self.cutoff)
+        neighs_dists = _neighbor_cache.get_neighbors(structure, n, self.cutoff)
         ds = [i.nn_distance for i in neighs_dists]
         ds.sort()
 
@@ -3292,8 +3458,7 @@ class BrunnerNN_relative(NearNeighbors):
                 of which represents a coordinated site, its image location,
                 and its weight.
         """
-        site = structure[n]
-        neighs_dists = structure.get_neighbors(site, self.cutoff)
+        neighs_dists = _neighbor_cache.get_neighbors(structure, n, self.cutoff)
         ds = [i.nn_distance for i in neighs_dists]
         ds.sort()
 
@@ -3363,8 +3528,7 @@ class BrunnerNN_real(NearNeighbors):
                 of which represents a coordinated site, its image location,
                 and its weight.
         """
-        site = structure[n]
-        neighs_dists = structure.get_neighbors(site, self.cutoff)
+        neighs_dists = _neighbor_cache.get_neighbors(structure, n, self.cutoff)
         ds = [i.nn_distance for i in neighs_dists]
         ds.sort()
 
@@ -3459,7 +3623,7 @@ class EconNN(NearNeighbors):
                 and its weight.
         """
         site = structure[n]
-        neighbors = structure.get_neighbors(site, self.cutoff)
+        neighbors = _neighbor_cache.get_neighbors(structure, n, self.cutoff)
 
         if self.cation_anion and hasattr(site.specie, "oxi_state"):
             # filter out neighbor of like charge (except for neutral sites)
@@ -4052,7 +4216,7 @@ class CutOffDictNN(NearNeighbors):
         """
         site = structure[n]
 
-        neighs_dists = structure.get_neighbors(site, self._max_dist)
+        neighs_dists = _neighbor_cache.get_neighbors(structure, n, self._max_dist)
 
         nn_info = []
         for nn in neighs_dists:
@@ -10,7 +10,9 @@ This module provides some useful functions for dealing with magnetic Structures
 import warnings
 import numpy as np
 import os
+import json
 import logging
+import multiprocessing
 
 from enum import Enum, unique
 from collections import namedtuple
@@ -30,6 +32,7 @@ from pymatgen.transformations.advanced_transformations import (
 )
 from pymatgen.symmetry.groups import SpaceGroup
 from monty.serialization import loadfn
+from monty.json import MontyEncoder
 
 from typing import Union, List, Dict, Tuple, Optional, Any
 from pymatgen.util.typing import Vector3Like
@@ -604,19 +607,22 @@ class CollinearMagneticStructureAnalyzer:
             symprec=symprec, angle_tolerance=angle_tolerance
         )
 
-    def matches_ordering(self, other: Structure) -> bool:
-        """Compares the magnetic orderings of one structure with another.
-
-        Args:
-          other: Structure to compare
-
-        Returns: True or False
+    def _get_normalized_structure_with_spin(self) -> Structure:
+        """Returns the structure with normalized magnetic moments as spins,
+        as used by matches_ordering.
         """
-
-        a = CollinearMagneticStructureAnalyzer(
+        return CollinearMagneticStructureAnalyzer(
             self.structure, overwrite_magmom_mode="normalize"
         ).get_structure_with_spin()
 
+    @staticmethod
+    def _get_normalized_structures_with_spin(
+        other: Structure,
+    ) -> Tuple[Structure, Structure]:
+        """Returns the structure with normalized magnetic moments as spins,
+        and the same structure with all spins flipped, as used by
+        matches_ordering.
+        """
         # sign of spins doesn't matter, so we're comparing both
         # positive and negative versions of the structure
         # this code is possibly redundant, but is included out of
@@ -634,8 +640,19 @@ class CollinearMagneticStructureAnalyzer:
             b_negative, overwrite_magmom_mode="normalize", make_primitive=False
         )
 
-        b_positive = b_positive.get_structure_with_spin()
-        b_negative = b_negative.get_structure_with_spin()
+        return b_positive.get_structure_with_spin(), b_negative.get_structure_with_spin()
+
+    def matches_ordering(self, other: Structure) -> bool:
+        """Compares the magnetic orderings of one structure with another.
+
+        Args:
+          other: Structure to compare
+
+        Returns: True or False
+        """
+
+        a = self._get_normalized_structure_with_spin()
+        b_positive, b_negative = self._get_normalized_structures_with_spin(other)
 
         if a.matches(b_positive) or a.matches(
             b_negative
@@ -672,6 +689,73 @@ class CollinearMagneticStructureAnalyzer:
         return "\n".join(outs)
 
 
+# Ordered structures generated by MagOrderingTransformation, keyed by the
+# enumeration problem (see _get_enumeration_key), shared between enumerators.
+_ENUMERATION_CACHE: Dict[Tuple[str, str, int], List[Structure]] = {}
+_ENUMERATION_CACHE_SIZE = 256
+
+
+def _get_enumeration_key(
+    structure: Structure, trans: MagOrderingTransformation, num_orderings: int
+) -> Tuple[str, str, int]:
+    """Returns a key identifying an enumeration problem: the input structure
+    (including site properties used by the constraints), the magnetic
+    sublattice constraints, the enumeration settings (e.g. cell size) and
+    the number of orderings requested.
+    """
+    return (
+        json.dumps(structure.as_dict(), sort_keys=True, cls=MontyEncoder),
+        json.dumps(
+            [trans.mag_species_spin, trans.order_parameter,
+             trans.energy_model, trans.enum_kwargs],
+            sort_keys=True,
+            cls=MontyEncoder,
+        ),
+        num_orderings,
+    )
+
+
+def _apply_mag_ordering_transformation(args) -> Tuple[Any, bool]:
+    """Applies a MagOrderingTransformation to a structure. Used as a
+    process pool worker by MagneticStructureEnumerator.
+
+    Returns: List of Structures, or the TimeoutError if enumlib timed out,
+    and whether every enumlib run completed, i.e. whether the result
+    can be cached
+    """
+    trans, structure, num_orderings = args
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        try:
+            structures = trans.apply_transformation(structure, return_ranked_list=num_orderings)
+        except TimeoutError as exc:
+            structures = exc
+    # enumerations that failed for some cell sizes are only warned about
+    complete = not isinstance(structures, TimeoutError) and not any(
+        str(w.message).startswith("Unable to enumerate") for w in caught
+    )
+    for w in caught:
+        warnings.warn_explicit(w.message, w.category, w.filename, w.lineno)
+    if isinstance(structures, TimeoutError):
+        return structures, False
+    if not structures:
+        return [], complete
+    if isinstance(structures, Structure):
+        structures = [structures]
+    return [s["structure"] if isinstance(s, dict) else s for s in structures], complete
+
+
+def _get_matching_fingerprint(structure: Structure) -> Tuple[Any, int]:
+    """Returns the fractional composition and the number of sites after
+    niggli and primitive cell reduction of a structure. Two structures
+    with different fingerprints never match using Structure.matches
+    with default settings, so this is used to skip expensive comparisons.
+    """
+    primitive = structure.get_reduced_structure(reduction_algo="niggli")
+    primitive = primitive.get_primitive_structure()
+    return structure.composition.fractional_composition, len(primitive)
+
+
 class MagneticStructureEnumerator:
     """Combines MagneticStructureAnalyzer and MagOrderingTransformation to
     automatically generate a set of transformations for a given structure
@@ -695,6 +779,7 @@ class MagneticStructureEnumerator:
         automatic: bool = True,
         truncate_by_symmetry: bool = True,
         transformation_kwargs: Optional[Dict] = None,
+        ncpus: Optional[int] = None,
     ):
         """
         This class will try generated different collinear
@@ -721,6 +806,10 @@ class MagneticStructureEnumerator:
                 orderings that are likely physically implausible
             transformation_kwargs: keyword arguments to pass to
                 MagOrderingTransformation, to change automatic cell size limits, etc.
+            ncpus: number of processes used to run the enumeration strategies
+                in parallel, default of None means serial processing. Results
+                of each enumeration are also cached, so repeating an identical
+                enumeration problem does not call enumlib again.
         """
 
         self.logger = logging.getLogger(self.__class__.__name__)
@@ -741,6 +830,7 @@ class MagneticStructureEnumerator:
         # other settings
         self.num_orderings = 64
         self.max_unique_sites = 8
+        self.ncpus = ncpus
 
         # kwargs to pass to transformation (ultimately to enumlib)
         default_transformation_kwargs = {"check_ordered_symmetry": False, "timeout": 5}
@@ -1100,28 +1190,83 @@ class MagneticStructureEnumerator:
 
             return ordered_structures, ordered_structures_origins
 
+        # re-use cached enumerations, and run the remaining ones in parallel
+        generated_structures = {}
+        to_enumerate = []
         for origin, trans in self.transformations.items():
-            structures_to_add = trans.apply_transformation(
-                self.sanitized_structure, return_ranked_list=self.num_orderings
+            key = _get_enumeration_key(
+                self.sanitized_structure, trans, self.num_orderings
             )
+            if key in _ENUMERATION_CACHE:
+                self.logger.info("Using cached ordered structures: {}".format(origin))
+                generated_structures[origin] = [
+                    s.copy() for s in _ENUMERATION_CACHE[key]
+                ]
+            else:
+                to_enumerate.append((origin, key, trans))
+
+        args = [
+            (trans, self.sanitized_structure, self.num_orderings)
+            for _, _, trans in to_enumerate
+        ]
+        if self.ncpus and self.ncpus > 1 and len(args) > 1:
+            with multiprocessing.Pool(min(self.ncpus, len(args))) as pool:
+                results = pool.map(_apply_mag_ordering_transformation, args, chunksize=1)
+        else:
+            results = [_apply_mag_ordering_transformation(arg) for arg in args]
+
+        # only complete enumerations are cached, timed out or partially
+        # failed enumlib runs are repeated next time
+        for (origin, key, _), (structures, complete) in zip(to_enumerate, results):
+            if complete:
+                if len(_ENUMERATION_CACHE) >= _ENUMERATION_CACHE_SIZE:
+                    _ENUMERATION_CACHE.pop(next(iter(_ENUMERATION_CACHE)))
+                _ENUMERATION_CACHE[key] = [s.copy() for s in structures]
+            generated_structures[origin] = structures
+        for structures in generated_structures.values():
+            if isinstance(structures, TimeoutError):
+                raise structures
+
+        for origin in self.transformations:
             ordered_structures, ordered_structures_origins = _add_structures(
                 ordered_structures,
                 ordered_structures_origins,
-                structures_to_add,
+                generated_structures[origin],
                 origin=origin,
             )
 
-        # in case we've introduced duplicates, let's remove them
+        # in case we've introduced duplicates, let's remove them, this is
+        # equivalent to calling matches_ordering on every pair of structures,
+        # but the normalized structures are only generated once and pairs
+        # which cannot match are skipped
         self.logger.info("Pruning duplicate structures.")
+        reference_structures = [
+            CollinearMagneticStructureAnalyzer(
+                s, overwrite_magmom_mode="none"
+            )._get_normalized_structure_with_spin()
+            for s in ordered_structures
+        ]
+        candidate_structures = [
+            CollinearMagneticStructureAnalyzer._get_normalized_structures_with_spin(s)
+            for s in ordered_structures
+        ]
+        reference_fingerprints = [
+            _get_matching_fingerprint(s) for s in reference_structures
+        ]
+        candidate_fingerprints = [
+            [_get_matching_fingerprint(s) for s in candidates]
+            for candidates in candidate_structures
+        ]
         structures_to_remove: List[int] = []
-        for idx, ordered_structure in enumerate(ordered_structures):
+        for idx, reference in enumerate(reference_structures):
             if idx not in structures_to_remove:
-                duplicate_checker = CollinearMagneticStructureAnalyzer(
-                    ordered_structure, overwrite_magmom_mode="none"
-                )
-                for check_idx, check_structure in enumerate(ordered_structures):
+                for check_idx, candidates in enumerate(candidate_structures):
                     if check_idx not in structures_to_remove and check_idx != idx:
-                        if duplicate_checker.matches_ordering(check_structure):
+                        if reference_fingerprints[idx] not in candidate_fingerprints[check_idx]:
+                            continue
+                        if reference.matches(candidates[0]) or reference.matches(
+                            candidates[1]
+                        ):
                             structures_to_remove.append(check_idx)
 
         if len(structures_to_remove):
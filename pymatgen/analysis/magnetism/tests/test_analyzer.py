@@ -5,6 +5,8 @@
 from pymatgen.core import Specie, Element, Lattice, Structure
 from pymatgen.io.cif import CifParser
 from pymatgen.analysis.magnetism import *
+from pymatgen.analysis.magnetism.analyzer import _ENUMERATION_CACHE, \
+    _apply_mag_ordering_transformation
 
 from monty.os.path import which
 
@@ -303,6 +305,44 @@ class MagneticStructureEnumeratorTest(unittest.TestCase):
         )
         self.assertEqual(enumerator.input_origin, "afm_by_motif_2a")
 
+    @unittest.skipIf(not enumlib_present, "enumlib not present")
+    def test_parallel_and_cached_enumeration(self):
+        structure = Structure.from_file(
+            os.path.join(test_dir, "magnetic_orderings/Cr2NiO4.json"))
+        serial = MagneticStructureEnumerator(structure)
+        cached = MagneticStructureEnumerator(structure)
+        self.assertEqual(cached.ordered_structure_origins,
+                         serial.ordered_structure_origins)
+        _ENUMERATION_CACHE.clear()
+        parallel = MagneticStructureEnumerator(structure, ncpus=2)
+        self.assertEqual(parallel.ordered_structure_origins,
+                         serial.ordered_structure_origins)
+        self.assertEqual(parallel.input_origin, "ferri_by_Cr")
+        for s1, s2 in zip(serial.ordered_structures, parallel.ordered_structures):
+            self.assertEqual(s1, s2)
+
+    def test_incomplete_enumerations(self):
+        # timed out or partially failed enumerations are flagged, so that
+        # they are not cached
+        structure = Structure(Lattice.cubic(3), ["Fe"], [[0, 0, 0]])
+
+        class TimedOut:
+            def apply_transformation(self, structure, return_ranked_list):
+                raise TimeoutError("Enumeration took too long.")
+
+        class PartiallyFailed:
+            def apply_transformation(self, structure, return_ranked_list):
+                warnings.warn("Unable to enumerate for max_cell_size = 1")
+                return [{"structure": structure}]
+
+        structures, complete = _apply_mag_ordering_transformation((TimedOut(), structure, 4))
+        self.assertIsInstance(structures, TimeoutError)
+        self.assertFalse(complete)
+        with self.assertWarns(UserWarning):
+            structures, complete = _apply_mag_ordering_transformation((PartiallyFailed(), structure, 4))
+        self.assertEqual(structures, [structure])
+        self.assertFalse(complete)
+
 
 class MagneticDeformationTest(unittest.TestCase):
 
@@ -10,10 +10,11 @@ following work::
 """
 
 from abc import ABCMeta
+import itertools
 import math
 import logging
 from scipy.interpolate import interp1d
-import scipy.signal
+from scipy.spatial import cKDTree
 import scipy.stats
 import numpy as np
 import numpy.linalg as la
@@ -379,38 +380,26 @@ class StaticPotential(metaclass=ABCMeta):
         """
         # Since scaling factor in fractional coords is not isotropic, have to
         # have different radii in 3 directions
-        a_lat = self.__s.lattice.a
-        b_lat = self.__s.lattice.b
-        c_lat = self.__s.lattice.c
-
-        # Conversion factors for discretization of v
+        lattice = self.__s.lattice
         v_dim = self.__v.shape
-        r_frac = (r / a_lat, r / b_lat, r / c_lat)
-        r_disc = (int(math.ceil(r_frac[0] * v_dim[0])),
-                  int(math.ceil(r_frac[1] * v_dim[1])),
-                  int(math.ceil(r_frac[2] * v_dim[2])))
-
-        # Apply smearing
-        # Gaussian filter
-        gauss_dist = np.zeros(
-            (r_disc[0] * 4 + 1, r_disc[1] * 4 + 1, r_disc[2] * 4 + 1))
-        for g_a in np.arange(-2.0 * r_disc[0], 2.0 * r_disc[0] + 1, 1.0):
-            for g_b in np.arange(-2.0 * r_disc[1], 2.0 * r_disc[1] + 1, 1.0):
-                for g_c in np.arange(-2.0 * r_disc[2], 2.0 * r_disc[2] + 1,
-                                     1.0):
-                    g = np.array(
-                        [g_a / v_dim[0], g_b / v_dim[1], g_c / v_dim[2]]).T
-                    gauss_dist[int(g_a + r_disc[0])][int(g_b + r_disc[1])][int(
-                        g_c + r_disc[2])] = la.norm(
-                            np.dot(self.__s.lattice.matrix, g)) / r
-        gauss = scipy.stats.norm.pdf(gauss_dist)
+        r_disc = [int(math.ceil(r / length * n))
+                  for length, n in zip(lattice.abc, v_dim)]
+
+        # Gaussian filter over the grid offsets up to 2 r away, evaluated on
+        # the lattice metric and wrapped onto the periodic grid.
+        offsets = np.array(np.meshgrid(
+            *[np.arange(-2 * rd, 2 * rd + 1) for rd in r_disc],
+            indexing="ij")).reshape(3, -1).T
+        gauss_dist = la.norm(lattice.get_cartesian_coords(offsets / v_dim),
+                             axis=1) / r
+        gauss = np.zeros(v_dim)
+        np.add.at(gauss, tuple(np.mod(offsets, v_dim).T),
+                  scipy.stats.norm.pdf(gauss_dist))
         gauss = gauss / np.sum(gauss, dtype=float)
-        padded_v = np.pad(self.__v,
-                          ((r_disc[0], r_disc[0]), (r_disc[1], r_disc[1]),
-                           (r_disc[2], r_disc[2])),
-                          mode='wrap')
-        smeared_v = scipy.signal.convolve(padded_v, gauss, mode='valid')
-        self.__v = smeared_v
+
+        # Apply smearing as a periodic convolution via FFT
+        self.__v = np.fft.irfftn(np.fft.rfftn(self.__v) * np.fft.rfftn(gauss),
+                                 s=v_dim)
 
 
 class ChgcarPotential(StaticPotential):
@@ -462,16 +451,27 @@ class FreeVolumePotential(StaticPotential):
 
     @staticmethod
     def __add_gaussians(s, dim, r=1.5):
-        gauss_dist = np.zeros(dim)
-        for a_d in np.arange(0.0, dim[0], 1.0):
-            for b_d in np.arange(0.0, dim[1], 1.0):
-                for c_d in np.arange(0.0, dim[2], 1.0):
-                    coords_f = np.array(
-                        [a_d / dim[0], b_d / dim[1], c_d / dim[2]])
-                    d_f = sorted(s.get_sites_in_sphere(coords_f, s.lattice.a),
-                                 key=lambda x: x[1])[0][1]
-                    # logger.debug(d_f)
-                    gauss_dist[int(a_d)][int(b_d)][int(c_d)] = d_f / r
+        """
+        Gaussian of width r of the distance from each grid point to the
+        nearest atom, found with a single KD-tree query over all grid points.
+        """
+        lattice = s.lattice
+        # Every grid point is within the cell diameter of some image of each
+        # site, so the images within that distance of the cell are enough.
+        corners = lattice.get_cartesian_coords(
+            list(itertools.product([0, 1], repeat=3)))
+        diameter = np.max(la.norm(corners[:, None] - corners[None, :], axis=2))
+        recip_lengths = la.norm(
+            lattice.reciprocal_lattice_crystallographic.matrix, axis=1)
+        images = np.array(list(itertools.product(
+            *[range(-n, n + 1) for n in np.ceil(diameter * recip_lengths).astype(int)])))
+        image_fcoords = np.mod(s.frac_coords, 1)[None, :, :] + images[:, None, :]
+        kdtree = cKDTree(lattice.get_cartesian_coords(image_fcoords.reshape(-1, 3)))
+
+        grid_fcoords = np.array(np.meshgrid(
+            *[np.arange(n) / n for n in dim], indexing="ij")).reshape(3, -1).T
+        d_f, _ = kdtree.query(lattice.get_cartesian_coords(grid_fcoords))
+        gauss_dist = d_f.reshape(tuple(dim)) / r
         v = scipy.stats.norm.pdf(gauss_dist)
         return v
 
@@ -19,7 +19,8 @@ import numpy as np
 import itertools
 import re
 from copy import deepcopy
-from functools import cmp_to_key, partial, lru_cache
+from functools import cmp_to_key, lru_cache
+from collections import defaultdict
 from monty.json import MSONable, MontyDecoder
 
 from multiprocessing import Pool
@@ -427,6 +428,39 @@ def ion_or_solid_comp_object(formula):
 ELEMENTS_HO = {Element('H'), Element('O')}
 
 
+# State of the worker processes used to generate MultiEntries in parallel
+_multientry_worker_state = {}
+
+
+def _init_multientry_worker(entries, prod_comp):
+    """
+    Initializer of the worker processes generating MultiEntries, which
+    receive the entries only once.
+
+    Args:
+        entries ([PourbaixEntry]): list of entries
+        prod_comp (Composition): composition constraint of the MultiEntries
+    """
+    _multientry_worker_state.update({"entries": entries,
+                                     "prod_comp": prod_comp})
+
+
+def _get_multientry_weights_worker(combos):
+    """
+    Finds the weights of the MultiEntries of a chunk of combinations of
+    entries in a worker process.
+
+    Args:
+        combos ([tuple]): combinations of indices of entries
+
+    Returns:
+        ([(tuple, [float])]) valid combinations along with their weights
+    """
+    return PourbaixDiagram.get_multientry_weights(
+        _multientry_worker_state["entries"], combos,
+        _multientry_worker_state["prod_comp"])
+
+
 # TODO: the solids filter breaks some of the functionality of the
 #       heatmap plotter, because the reference states for decomposition
 #       don't include oxygen/hydrogen in the OER/HER regions
@@ -533,6 +567,51 @@ class PourbaixDiagram(MSONable):
         self._stable_domains, self._stable_domain_vertices = \
             self.get_pourbaix_domains(self._processed_entries)
 
+        # Coefficients of the normalized energies of the stable entries
+        # as linear functions of pH and V, such that stability maps over
+        # whole (pH, V) grids can be evaluated at once.
+        self._stable_entries = list(self._stable_domains.keys())
+        self._stable_coeffs = self._get_energy_coefficients(
+            self._stable_entries)
+        self._pbx_comp = Composition(self._elt_comp).fractional_composition
+
+    @staticmethod
+    def _get_energy_coefficients(pourbaix_entries):
+        """
+        Args:
+            pourbaix_entries ([PourbaixEntry]): list of pourbaix entries
+
+        Returns:
+            array of shape (len(pourbaix_entries), 3) with the rows
+            [e0, npH * PREFAC, nPhi] * normalization_factor, such that the
+            normalized energy of an entry at a pH, V condition is
+            e0' + npH' * pH + nPhi' * V
+        """
+        coeffs = [[entry.energy, entry.npH * PREFAC, entry.nPhi]
+                  for entry in pourbaix_entries]
+        norms = [[entry.normalization_factor] for entry in pourbaix_entries]
+        return np.reshape(np.array(coeffs, dtype=float) * norms, (-1, 3))
+
+    @staticmethod
+    def _get_energies_from_coefficients(coeffs, pH, V):
+        """
+        Evaluates normalized energies from the coefficients obtained with
+        _get_energy_coefficients.
+
+        Args:
+            coeffs (array): energy coefficients of n entries
+            pH (float or [float]): pH at which to find the energies
+            V (float or [float]): V at which to find the energies
+
+        Returns:
+            array of shape (n,) + shape of the broadcast pH and V arrays
+        """
+        pH, V = np.broadcast_arrays(np.asarray(pH, dtype=float),
+                                    np.asarray(V, dtype=float))
+        energies = coeffs[:, 0, None] + coeffs[:, 1, None] * pH.ravel() + \
+            coeffs[:, 2, None] * V.ravel()
+        return energies.reshape((len(coeffs),) + pH.shape)
+
     def _convert_entries_to_points(self, pourbaix_entries):
         """
         Args:
@@ -635,42 +714,64 @@ class PourbaixDiagram(MSONable):
         tot_comp = Composition(self._elt_comp)
 
         min_entries, valid_facets = self._get_hull_in_nph_nphi_space(entries)
+        combos = self._get_facet_combos(valid_facets)
 
-        combos = []
-        for facet in valid_facets:
-            for i in range(1, self.dim + 2):
-                these_combos = list()
-                for combo in itertools.combinations(facet, i):
-                    these_entries = [min_entries[i] for i in combo]
-                    these_combos.append(frozenset(these_entries))
-                combos.append(these_combos)
+        return self._process_multientries(min_entries, combos, tot_comp,
+                                          nproc=nproc)
 
-        all_combos = set(itertools.chain.from_iterable(combos))
+    def _get_facet_combos(self, facets):
+        """
+        Generates all combinations of entries that lie on a common facet
+        of the hull in nph-nphi-composition space, i. e. the only
+        combinations that can be stable.
 
-        list_combos = []
-        for i in all_combos:
-            list_combos.append(list(i))
-        all_combos = list_combos
+        Args:
+            facets ([[int]]): facets of the hull, as obtained from
+                _get_hull_in_nph_nphi_space
 
-        multi_entries = []
+        Returns:
+            ([tuple]) sorted list of unique tuples of entry indices
+        """
+        combos = set()
+        for facet in facets:
+            facet = sorted(int(i) for i in facet)
+            for i in range(1, self.dim + 2):
+                combos.update(itertools.combinations(facet, i))
+        return sorted(combos)
+
+    def _process_multientries(self, entries, combos, prod_comp, nproc=None):
+        """
+        Creates the MultiEntries of all valid combinations of entries.
 
-        # Parallel processing of multi-entry generation
+        Args:
+            entries ([PourbaixEntry]): list of PourbaixEntries
+            combos ([tuple]): combinations of indices of entries
+            prod_comp (Composition): composition constraint for setting
+                weights of MultiEntries
+            nproc (int): number of processes to be used in parallel
+                treatment of entry combos, which are dispatched in chunks
+                such that the entries are only sent once to each process
+
+        Returns:
+            ([MultiEntry]) list of MultiEntries
+        """
         if nproc is not None:
-            f = partial(self.process_multientry, prod_comp=tot_comp)
-            with Pool(nproc) as p:
-                multi_entries = list(tqdm(p.imap(f, all_combos),
-                                          total=len(all_combos)))
-            multi_entries = list(filter(bool, multi_entries))
+            chunksize = max(1, int(np.ceil(len(combos) / (4 * nproc))))
+            chunks = [combos[i:i + chunksize]
+                      for i in range(0, len(combos), chunksize)]
+            with Pool(nproc, initializer=_init_multientry_worker,
+                      initargs=(entries, prod_comp)) as p:
+                results = list(tqdm(p.imap(_get_multientry_weights_worker,
+                                           chunks), total=len(chunks)))
+            weighted_combos = list(itertools.chain.from_iterable(results))
         else:
-            # Serial processing of multi-entry generation
-            for combo in tqdm(all_combos):
-                multi_entry = self.process_multientry(combo, prod_comp=tot_comp)
-                if multi_entry:
-                    multi_entries.append(multi_entry)
-
-        return multi_entries
+            weighted_combos = self.get_multientry_weights(
+                entries, combos, prod_comp)
+        return [MultiEntry([entries[i] for i in combo], weights=weights)
+                for combo, weights in weighted_combos]
 
-    def _generate_multielement_entries(self, entries, nproc=None):
+    def _generate_multielement_entries(self, entries, nproc=None,
+                                       prune=True):
         """
         Create entries for multi-element Pourbaix construction.
 
@@ -683,42 +784,108 @@ class PourbaixDiagram(MSONable):
                 to process into MultiEntries
             nproc (int): number of processes to be used in parallel
                 treatment of entry combos
+            prune (bool): whether to only consider the combinations
+                of entries that lie on a facet of the convex hull in
+                nph-nphi-composition space, which are the only ones that
+                can be stable.  If False, all combinations of entries are
+                enumerated, which quickly becomes intractable for systems
+                with more than two elements.
         """
 
         N = len(self._elt_comp)  # No. of elements
         total_comp = Composition(self._elt_comp)
 
-        # generate all combinations of compounds that have all elements
-        entry_combos = [itertools.combinations(
-            entries, j + 1) for j in range(N)]
-        entry_combos = itertools.chain.from_iterable(entry_combos)
-
-        entry_combos = filter(lambda x: total_comp < MultiEntry(x).composition,
-                              entry_combos)
+        if prune:
+            entries, valid_facets = self._get_hull_in_nph_nphi_space(entries)
+            entry_combos = self._get_facet_combos(valid_facets)
+        else:
+            # generate all combinations of compounds that have all elements
+            total = sum([comb(len(entries), j + 1)
+                         for j in range(N)])
+            if total > 1e6:
+                warnings.warn("Your pourbaix diagram includes {} entries and may "
+                              "take a long time to generate.".format(total))
+            entry_combos = itertools.chain.from_iterable(
+                [itertools.combinations(range(len(entries)), j + 1)
+                 for j in range(N)])
+            entry_combos = [
+                combo for combo in entry_combos
+                if total_comp < MultiEntry([entries[i] for i in combo]).composition]
+
+        return self._process_multientries(entries, entry_combos, total_comp,
+                                          nproc=nproc)
 
-        # Generate and filter entries
-        processed_entries = []
-        total = sum([comb(len(entries), j + 1)
-                     for j in range(N)])
-        if total > 1e6:
-            warnings.warn("Your pourbaix diagram includes {} entries and may "
-                          "take a long time to generate.".format(total))
+    @staticmethod
+    def get_multientry_weights(entries, combos, prod_comp,
+                               coeff_threshold=1e-4):
+        """
+        Finds the weights of the MultiEntries of many combinations of
+        entries at once, with the same result as calling process_multientry
+        for each combination.  The composition balances of all combinations
+        whose entries have linearly independent compositions are solved
+        together as stacked linear systems; the remaining (degenerate)
+        combinations are treated with process_multientry.
 
-        # Parallel processing of multi-entry generation
-        if nproc is not None:
-            f = partial(self.process_multientry, prod_comp=total_comp)
-            with Pool(nproc) as p:
-                processed_entries = list(tqdm(p.imap(f, entry_combos),
-                                              total=total))
-            processed_entries = list(filter(bool, processed_entries))
-        # Serial processing of multi-entry generation
-        else:
-            for entry_combo in entry_combos:
-                processed_entry = self.process_multientry(entry_combo, total_comp)
-                if processed_entry is not None:
-                    processed_entries.append(processed_entry)
+        Args:
+            entries ([PourbaixEntry]): list of entries
+            combos ([tuple]): combinations of indices of entries
+            prod_comp (Composition): composition constraint for setting
+                weights of MultiEntries
+            coeff_threshold (float): threshold of stoichiometric
+                coefficients to filter, if weights are lower than
+                this value, the combination is discarded
 
-        return processed_entries
+        Returns:
+            ([(tuple, [float])]) combinations of indices of entries for
+                which a valid MultiEntry exists, along with its weights
+        """
+        # Only the non-H/O elements have to be balanced, H and O are
+        # supplied by water
+        elts = sorted(set(itertools.chain.from_iterable(
+            [e.composition.elements for e in entries] +
+            [prod_comp.elements])) - ELEMENTS_HO)
+        comps = np.array([[e.composition[el] for el in elts]
+                          for e in entries]).reshape(len(entries), len(elts))
+        b = np.array([prod_comp[el] for el in elts])
+        # Reaction cannot tell an entry apart from the product if the
+        # compositions are equal
+        like_product = [e.composition == prod_comp for e in entries]
+        tol = Reaction.TOLERANCE
+        # If the product is farther than this from the span of the entry
+        # compositions, any balanced reaction has a product coefficient
+        # below coeff_threshold
+        max_residual = max(1e-3, 1e-7 / coeff_threshold)
+
+        weighted_combos = {}
+        fallback = []
+        by_size = defaultdict(list)
+        for combo in combos:
+            by_size[len(combo)].append(tuple(combo))
+        for size, size_combos in by_size.items():
+            idx = np.array(size_combos)
+            mats = np.transpose(comps[idx], (0, 2, 1))
+            ranks = np.linalg.matrix_rank(mats)
+            weights = np.matmul(np.linalg.pinv(mats), b)
+            residuals = np.linalg.norm(
+                np.matmul(mats, weights[..., None])[..., 0] - b, axis=1)
+            for combo, rank, w, res in zip(size_combos, ranks, weights,
+                                           residuals):
+                if res > max_residual:
+                    continue
+                if rank < size or any(like_product[i] for i in combo) or \
+                        res > 1e-10 or np.any(np.abs(w) <= tol):
+                    fallback.append(combo)
+                elif np.all(w > coeff_threshold):
+                    weighted_combos[combo] = w.tolist()
+
+        for combo in fallback:
+            multi_entry = PourbaixDiagram.process_multientry(
+                [entries[i] for i in combo], prod_comp,
+                coeff_threshold=coeff_threshold)
+            if multi_entry:
+                weighted_combos[combo] = multi_entry.weights
+        return [(tuple(combo), weighted_combos[tuple(combo)])
+                for combo in combos if tuple(combo) in weighted_combos]
 
     @staticmethod
     def process_multientry(entry_list, prod_comp, coeff_threshold=1e-4):
@@ -852,9 +1019,7 @@ class PourbaixDiagram(MSONable):
         Returns:
 
         """
-        energies_at_conditions = [e.normalized_energy_at_conditions(pH, V)
-                                  for e in self.stable_entries]
-        return self.stable_entries[np.argmin(energies_at_conditions)]
+        return self.get_stable_entry(pH, V)
 
     def get_decomposition_energy(self, entry, pH, V):
         """
@@ -862,32 +1027,42 @@ class PourbaixDiagram(MSONable):
         supports vectorized inputs for pH and V
 
         Args:
-            entry (PourbaixEntry): PourbaixEntry corresponding to
-                compound to find the decomposition for
+            entry (PourbaixEntry or [PourbaixEntry]): PourbaixEntry
+                corresponding to compound to find the decomposition for,
+                or a list of PourbaixEntries that are all evaluated
+                against the same hull energies
             pH (float, [float]): pH at which to find the decomposition
             V (float, [float]): voltage at which to find the decomposition
 
         Returns:
             Decomposition energy for the entry, i. e. the energy above
-                the "pourbaix hull" in eV/atom at the given conditions
-        """
-
-        # Check composition consistency between entry and Pourbaix diagram:
-        pbx_comp = Composition(self._elt_comp).fractional_composition
-        entry_pbx_comp = Composition(
-            {elt: coeff for elt, coeff in entry.composition.items()
-             if elt not in ELEMENTS_HO}).fractional_composition
-        if entry_pbx_comp != pbx_comp:
-            raise ValueError("Composition of stability entry does not match "
-                             "Pourbaix Diagram")
-        entry_normalized_energy = entry.normalized_energy_at_conditions(pH, V)
+                the "pourbaix hull" in eV/atom at the given conditions.
+                For a list of entries, an array whose first axis
+                corresponds to the entries is returned.
+        """
+        entries = [entry] if isinstance(entry, PourbaixEntry) else list(entry)
+
+        # Check composition consistency between entries and Pourbaix diagram:
+        for e in entries:
+            entry_pbx_comp = Composition(
+                {elt: coeff for elt, coeff in e.composition.items()
+                 if elt not in ELEMENTS_HO}).fractional_composition
+            if entry_pbx_comp != self._pbx_comp:
+                raise ValueError("Composition of stability entry does not match "
+                                 "Pourbaix Diagram")
+        entry_normalized_energies = self._get_energies_from_coefficients(
+            self._get_energy_coefficients(entries), pH, V)
         hull_energy = self.get_hull_energy(pH, V)
-        decomposition_energy = entry_normalized_energy - hull_energy
+        decomposition_energies = entry_normalized_energies - hull_energy
 
         # Convert to eV/atom instead of eV/normalized formula unit
-        decomposition_energy /= entry.normalization_factor
-        decomposition_energy /= entry.composition.num_atoms
-        return decomposition_energy
+        factors = np.array([e.normalization_factor * e.composition.num_atoms
+                            for e in entries])
+        decomposition_energies /= factors.reshape(
+            (-1,) + (1,) * (decomposition_energies.ndim - 1))
+        if isinstance(entry, PourbaixEntry):
+            return decomposition_energies[0]
+        return decomposition_energies
 
     def get_hull_energy(self, pH, V):
         """
@@ -902,10 +1077,26 @@ class PourbaixDiagram(MSONable):
             (float or [float]) minimum pourbaix energy at conditions
 
         """
-        all_gs = np.array([e.normalized_energy_at_conditions(
-            pH, V) for e in self.stable_entries])
-        base = np.min(all_gs, axis=0)
-        return base
+        all_gs = self._get_energies_from_coefficients(
+            self._stable_coeffs, pH, V)
+        return np.min(all_gs, axis=0)
+
+    def get_stable_entry_indices(self, pH, V):
+        """
+        Gets the indices of the stable entries at pH, V conditions.
+        Vectorized, e. g. to compute stability maps over (pH, V) grids.
+
+        Args:
+            pH (float or [float]): pH at which to find the stable entries
+            V (float or [float]): V at which to find the stable entries
+
+        Returns:
+            (int or [int]) indices in stable_entries of the minimum energy
+                entries at the conditions
+        """
+        all_gs = self._get_energies_from_coefficients(
+            self._stable_coeffs, pH, V)
+        return np.argmin(all_gs, axis=0)
 
     def get_stable_entry(self, pH, V):
         """
@@ -921,16 +1112,14 @@ class PourbaixDiagram(MSONable):
                 pH, V condition
 
         """
-        all_gs = np.array([e.normalized_energy_at_conditions(
-            pH, V) for e in self.stable_entries])
-        return self.stable_entries[np.argmin(all_gs)]
+        return self._stable_entries[int(self.get_stable_entry_indices(pH, V))]
 
     @property
     def stable_entries(self):
         """
         Returns the stable entries in the Pourbaix diagram.
         """
-        return list(self._stable_domains.keys())
+        return list(self._stable_entries)
 
     @property
     def unstable_entries(self):
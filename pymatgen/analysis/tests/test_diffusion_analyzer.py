@@ -11,6 +11,7 @@ import numpy as np
 import csv
 import scipy.constants as const
 
+from pymatgen.analysis import diffusion_analyzer
 from pymatgen.analysis.diffusion_analyzer import DiffusionAnalyzer, \
     get_conversion_factor, fit_arrhenius
 from pymatgen.core.structure import Structure
@@ -322,6 +323,54 @@ class DiffusionAnalyzerTest(PymatgenTest):
                                                          [0.21, 0.21, 0.21],
                                                          [0.40, 0.40, 0.40]]))
 
+        # Generators of structures are consumed as a stream.
+        d2 = DiffusionAnalyzer.from_structures(
+            (s for s in structures), specie='Li', temperature=500.0,
+            time_step=2.0, step_skip=1, smoothed=None)
+        self.assertArrayAlmostEqual(d2.disp, d.disp)
+        self.assertArrayAlmostEqual(d2.lattices, d.lattices)
+
+    def test_chunks_and_ncores(self):
+        with open(os.path.join(test_dir, "DiffusionAnalyzer.json")) as f:
+            d = DiffusionAnalyzer.from_dict(json.load(f))
+        dc = d.corrected_displacements
+        li = [i for i, site in enumerate(d.structure)
+              if site.specie.symbol == "Li"]
+        for smoothed in ["max", "constant", False]:
+            d2 = DiffusionAnalyzer(d.structure, d.disp, "Li", d.temperature,
+                                   d.time_step, d.step_skip,
+                                   smoothed=smoothed, avg_nsteps=50)
+            # brute force msd at timestep n
+            i = len(d2.dt) // 2
+            n = int(round(d2.dt[i] / (d.time_step * d.step_skip)))
+            if smoothed == "max":
+                dx = dc[:, n:] - dc[:, :-n]
+            elif smoothed == "constant":
+                dx = dc[:, n:n + 50] - dc[:, :50]
+            else:
+                dx = dc[:, n:n + 1]
+            self.assertAlmostEqual(
+                d2.msd[i], np.average(np.sum(dx[li] ** 2, axis=2)))
+            self.assertAlmostEqual(
+                d2.mscd[i], np.average(np.sum(np.sum(dx[li], axis=0) ** 2,
+                                              axis=1)) / len(li))
+            self.assertArrayAlmostEqual(
+                d2.msd_components[i], np.average(dx[li] ** 2, axis=(0, 1)))
+
+            old_chunk_size = diffusion_analyzer.MSD_CHUNK_SIZE
+            try:
+                diffusion_analyzer.MSD_CHUNK_SIZE = 3 * d.disp.shape[1] * 7
+                d3 = DiffusionAnalyzer(d.structure, d.disp, "Li",
+                                       d.temperature, d.time_step,
+                                       d.step_skip, smoothed=smoothed,
+                                       avg_nsteps=50, ncores=2)
+            finally:
+                diffusion_analyzer.MSD_CHUNK_SIZE = old_chunk_size
+            for k in ["msd", "mscd", "msd_components", "sq_disp_ions",
+                      "max_ion_displacements", "drift"]:
+                self.assertArrayAlmostEqual(getattr(d3, k), getattr(d2, k))
+            self.assertAlmostEqual(d3.diffusivity, d2.diffusivity)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -6,7 +6,7 @@
 import numpy as np
 import unittest
 
-from pymatgen.analysis.eos import EOS, NumericalEOS
+from pymatgen.analysis.eos import EOS, EOSError, NumericalEOS
 from pymatgen.util.testing import PymatgenTest
 
 
@@ -419,6 +419,55 @@ class EOSTest(PymatgenTest):
              "b1": self.num_eos_fit.b1, "v0": self.num_eos_fit.v0}
         self.assertDictEqual(self.num_eos_fit.results, d)
 
+    def test_fit_batch(self):
+        volumes = [self.volumes, self.volumes[2:-3],
+                   [v * 1.1 for v in self.volumes]]
+        energies = [self.energies, self.energies[2:-3],
+                    [e * 0.9 for e in self.energies]]
+        for eos_name in EOS.MODELS:
+            eos = EOS(eos_name=eos_name)
+            results = eos.fit_batch(volumes, energies)
+            self.assertTrue(all(results["converged"]))
+            for i, (v, e) in enumerate(zip(volumes, energies)):
+                fit = eos.fit(v, e)
+                for param in ('e0', 'b0', 'b1', 'v0'):
+                    self.assertAlmostEqual(results[param][i] / fit.results[param],
+                                           1, 5)
+                self.assertAlmostEqual(
+                    results["rms"][i],
+                    np.sqrt(np.mean((fit(v) - np.array(e)) ** 2)), 6)
+            if eos_name in ("deltafactor", "numerical_eos"):
+                self.assertTrue(np.isnan(results["b0_err"]).all())
+            else:
+                self.assertTrue((results["b0_err"] > 0).all())
+                self.assertTrue((results["v0_err"] < 0.1).all())
+
+        # failed fits, including initial parabolas with their minimum outside
+        # of the volume range, give nan instead of raising
+        vols = np.array(self.volumes)
+        results = EOS(eos_name="vinet").fit_batch(
+            [self.volumes, self.volumes, self.volumes],
+            [self.energies, self.volumes, (vols - 1.2 * vols.max()) ** 2])
+        self.assertEqual(results["converged"].tolist(), [True, False, False])
+        self.assertTrue(np.isnan(results["v0"][1:]).all())
+
+        # fit rejects parabolas with their minimum above the volume range
+        # just like fit_batch
+        self.assertRaises(EOSError, EOS(eos_name="vinet").fit, self.volumes,
+                          (vols - 1.2 * vols.max()) ** 2)
+
+        for eos_name in ("vinet", "numerical_eos"):
+            self.assertRaises(ValueError, EOS(eos_name=eos_name).fit_batch,
+                              [], [])
+
+        # datasets can be split over processes
+        for eos_name in ("birch_murnaghan", "numerical_eos"):
+            eos = EOS(eos_name=eos_name)
+            results = eos.fit_batch(volumes, energies)
+            results_pool = eos.fit_batch(volumes, energies, nproc=2)
+            for k, v in results.items():
+                self.assertArrayEqual(v, results_pool[k])
+
 
 if __name__ == "__main__":
     unittest.main()
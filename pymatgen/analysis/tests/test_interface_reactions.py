@@ -191,6 +191,41 @@ class InterfaceReactionTest(unittest.TestCase):
         self.assertTrue(test4,
                         '_get_energy: gets error. ')
 
+    def test_get_energies(self):
+        xs = np.linspace(0, 1, 21)
+        for ir in self.ir:
+            energies = ir._get_energies(xs)
+            self.assertTrue(np.allclose(energies,
+                                        [ir._get_energy(x) for x in xs]))
+
+    def test_get_kinks_for_pairs(self):
+        pairs = [(Composition('O2'), Composition('Mn')),
+                 (Composition('Li2O2'), Composition('MnO2')),
+                 (Composition('Mn'), Composition('Mn'))]
+        # Li is the open element of the grand potential phase diagram
+        for pd, kwargs, pd_pairs in [
+                (self.pd, dict(norm=0),
+                 pairs + [(Composition('Li2O2'), Composition('Li'))]),
+                (self.gpd, dict(norm=1, pd_non_grand=self.pd,
+                                use_hull_energy=False), pairs)]:
+            kinks = InterfacialReactivity.get_kinks_for_pairs(pd_pairs, pd,
+                                                              **kwargs)
+            self.assertEqual(len(kinks), len(pd_pairs))
+            for (c1, c2), pair_kinks in zip(pd_pairs, kinks):
+                # same output as a separate InterfacialReactivity per pair
+                expected = list(InterfacialReactivity(c1, c2, pd,
+                                                      **kwargs).get_kinks())
+                self.assertEqual(len(pair_kinks), len(expected))
+                for k, e in zip(pair_kinks, expected):
+                    self.assertEqual(k[0], e[0])
+                    self.assertEqual(str(k[3]), str(e[3]))
+                    self.assertTrue(np.allclose([k[1], k[2], k[4]],
+                                                [e[1], e[2], e[4]]))
+        kinks = InterfacialReactivity.get_kinks_for_pairs(pairs[:1], self.pd,
+                                                          norm=0)
+        self.assertEqual([str(k[3]) for k in kinks[0]],
+                         ['Mn -> Mn', '0.5 O2 + 0.5 Mn -> 0.5 MnO2', 'O2 -> O2'])
+
     def test_get_reaction(self):
         test1 = str(self.ir[0]._get_reaction(0.5)) == '0.5 O2 + 0.5 Mn -> ' \
                                                       '0.5 MnO2'
@@ -16,7 +16,7 @@ from pymatgen.analysis.local_env import ValenceIonicRadiusEvaluator, \
     get_neighbors_of_site_with_index, site_is_of_motif_type, \
     NearNeighbors, LocalStructOrderParams, BrunnerNN_reciprocal, \
     BrunnerNN_real, BrunnerNN_relative, EconNN, CrystalNN, CutOffDictNN, \
-    Critic2NN, solid_angle
+    Critic2NN, solid_angle, _neighbor_cache
 from pymatgen import Element, Molecule, Structure, Lattice
 from pymatgen.util.testing import PymatgenTest
 
@@ -572,6 +572,77 @@ class NearNeighborTest(PymatgenTest):
         del self.diamond
 
 
+class NeighborCacheTest(PymatgenTest):
+
+    def setUp(self):
+        _neighbor_cache.clear()
+
+    def tearDown(self):
+        _neighbor_cache.clear()
+
+    def test_shared_neighbors(self):
+        s = self.get_structure("LiFePO4")
+        strategies = [MinimumDistanceNN(), MinimumOKeeffeNN(), JmolNN(),
+                      BrunnerNN_real(), EconNN(), VoronoiNN()]
+        # Reference results, computed without the cache
+        ref = []
+        for nn in strategies:
+            ref.append([])
+            for i in range(len(s)):
+                _neighbor_cache.clear()
+                ref[-1].append(sorted((d["site_index"], d["image"], round(d["weight"], 8))
+                                      for d in nn.get_nn_info(s, i)))
+        _neighbor_cache.clear()
+        for nn, nn_ref in zip(strategies, ref):
+            for i in range(len(s)):
+                nn_info = nn.get_nn_info(s, i)
+                self.assertEqual(sorted((d["site_index"], d["image"], round(d["weight"], 8))
+                                        for d in nn_info), nn_ref[i])
+        # Neighbors found within a larger radius are reused
+        neighbors = _neighbor_cache.get_neighbors(s, 0, 10.0)
+        self.assertEqual(len(_neighbor_cache.get_neighbors(s, 0, 3.0)),
+                         len(s.get_neighbors(s[0], 3.0)))
+        self.assertIn(_neighbor_cache.get_neighbors(s, 0, 3.0)[0], neighbors)
+        # Returned polyhedra can be modified without affecting the cache
+        poly = VoronoiNN().get_voronoi_polyhedra(s, 0)
+        poly.clear()
+        self.assertGreater(len(VoronoiNN().get_voronoi_polyhedra(s, 0)), 0)
+
+    def test_invalidation(self):
+        s = self.get_structure("LiFePO4")
+        nn = MinimumDistanceNN()
+        cn = nn.get_cn(s, 4)
+        s.replace(4, "Fe", [0.5, 0.5, 0.5])
+        cn_ref = nn.get_cn(s.copy(), 4)
+        self.assertEqual(nn.get_cn(s, 4), cn_ref)
+        self.assertNotEqual(cn, cn_ref)
+        s2 = s.copy()
+        s.apply_strain(0.1)
+        self.assertNotEqual(nn.get_nn_info(s, 4)[0]["site"].nn_distance,
+                            nn.get_nn_info(s2, 4)[0]["site"].nn_distance)
+
+    def test_tessellation_key(self):
+        # tessellations are not shared between instances that handle
+        # infinite Voronoi vertices differently
+        self.assertNotEqual(VoronoiNN()._get_tessellation_key(),
+                            VoronoiNN(allow_pathological=True)._get_tessellation_key())
+
+    def test_pinned(self):
+        s = self.get_structure("LiFePO4")
+        nn = MinimumDistanceNN()
+        with _neighbor_cache.pinned(s):
+            entry = _neighbor_cache._get_entry(s)
+            nn.get_cn(s, 4)
+            self.assertIs(_neighbor_cache._get_entry(s), entry)
+            self.assertIn(4, entry["neighbors"])
+        self.assertIsNone(_neighbor_cache._pinned)
+        # the fingerprint is checked again outside of the context
+        s.apply_strain(0.1)
+        self.assertIsNot(_neighbor_cache._get_entry(s), entry)
+        self.assertEqual([len(i) for i in nn.get_all_nn_info(s)],
+                         [nn.get_cn(s.copy(), i) for i in range(len(s))])
+
+
 class LocalStructOrderParamsTest(PymatgenTest):
     def setUp(self):
         self.single_bond = Structure(
@@ -957,6 +1028,42 @@ class LocalStructOrderParamsTest(PymatgenTest):
         with self.assertRaises(ValueError):
             ops_101.get_order_parameters(self.bcc, 0, indices_neighs=[2])
 
+    def test_get_all_order_parameters(self):
+        op_types = ["cn", "oct", "tet", "bcc", "q4", "sq_pyr_legacy",
+                    "cuboct", "see_saw_rect", "sq_face_cap_trig_pris"]
+        s = self.get_structure("LiFePO4")
+        ref = {-10.0: [15, 0.144055, 0.026847, -0.016007, 0.249962, 0.002601,
+                       0.460494, 0.450147, 0.298762],
+               3.2: [7, 0.386067, 0.032659, 0.015838, 0.55541, 0.49987,
+                     0.396455, 0.703514, 0.365558]}
+        for cutoff, ref_vals in ref.items():
+            ops = LocalStructOrderParams(op_types, cutoff=cutoff)
+            op_vals = ops.get_all_order_parameters(s)
+            self.assertEqual(op_vals.shape, (len(s), len(op_types)))
+            self.assertArrayAlmostEqual(op_vals[4], ref_vals, decimal=5)
+            for i in range(len(s)):
+                self.assertArrayAlmostEqual(
+                    op_vals[i], ops.get_order_parameters(s, i))
+            self.assertArrayAlmostEqual(
+                ops.get_all_order_parameters(s, indices=[4, 0]),
+                op_vals[[4, 0]])
+
+        # OPs that cannot be computed are NaN.
+        ops = LocalStructOrderParams(["cn", "tet"], cutoff=1.01)
+        op_vals = ops.get_all_order_parameters(self.single_bond, indices=[1])
+        self.assertEqual(op_vals[0, 0], 1)
+        self.assertTrue(np.isnan(op_vals[0, 1]))
+
+        # Bonds at right angles put the "bcc" OP of the O sites of SrTiO3
+        # on a tie, which the batched evaluation may resolve differently
+        # from the per-pair loop it replaced; the values agree to within a
+        # few thousandths.
+        s = self.get_structure("SrTiO3")
+        op_vals = LocalStructOrderParams(["bcc"]).get_all_order_parameters(s)
+        ref_vals = [-0.002097, 0.333333, 0.001138, 0.007103, 0.010822]
+        self.assertTrue(np.all(np.abs(op_vals[:, 0] - ref_vals) < 0.005))
+        self.assertAlmostEqual(op_vals[1, 0], 1 / 3)
+
     def tearDown(self):
         del self.single_bond
         del self.linear
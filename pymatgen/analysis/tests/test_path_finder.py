@@ -4,10 +4,12 @@
 import os
 import unittest
 
-from pymatgen.analysis.path_finder import NEBPathfinder, ChgcarPotential
+from pymatgen.analysis.path_finder import NEBPathfinder, ChgcarPotential, \
+    FreeVolumePotential, StaticPotential
 from pymatgen.io.vasp import Poscar, Chgcar
 from pymatgen.core.periodic_table import Element
 from numpy import mean
+import numpy as np
 
 __author__ = 'Ziqin (Shaun) Rong'
 __version__ = '0.1'
@@ -51,5 +53,35 @@ class PathFinderTest(unittest.TestCase):
         self.assertTrue(abs(min(dists) - max(dists)) / mean(dists) < 0.02)
 
 
+class PotentialTest(unittest.TestCase):
+
+    def setUp(self):
+        module_dir = os.path.dirname(os.path.abspath(__file__))
+        test_file_dir = os.path.join(module_dir, "..", "..", "..", "test_files",
+                                     "path_finder")
+        self.s = Poscar.from_file(os.path.join(test_file_dir, 'LFP_POSCAR_s')).structure
+
+    def test_free_volume(self):
+        dim = (10, 6, 5)
+        v = FreeVolumePotential(self.s, dim, normalize=False).get_v()
+        self.assertEqual(v.shape, dim)
+        for idx in [(0, 0, 0), (3, 2, 1), (9, 5, 4)]:
+            fcoords = np.array(idx) / dim
+            d = self.s.lattice.get_all_distances([fcoords], self.s.frac_coords).min()
+            self.assertAlmostEqual(v[idx], np.exp(-0.5 * (d / 1.5) ** 2) / np.sqrt(2 * np.pi))
+
+    def test_gaussian_smear(self):
+        v = np.zeros((10, 6, 5))
+        v[0, 0, 0] = 1
+        pot = StaticPotential(self.s, v)
+        pot.gaussian_smear(2.0)
+        smeared = pot.get_v()
+        self.assertEqual(smeared.shape, v.shape)
+        self.assertAlmostEqual(np.sum(smeared), 1)
+        self.assertEqual(np.argmax(smeared), 0)
+        # periodic and symmetric about the smeared point
+        self.assertAlmostEqual(smeared[1, 0, 0], smeared[-1, 0, 0])
+
+
 if __name__ == '__main__':
     unittest.main()
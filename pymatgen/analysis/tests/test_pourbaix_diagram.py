@@ -7,6 +7,7 @@ import unittest
 import os
 from monty.serialization import loadfn
 import warnings
+import itertools
 import numpy as np
 import multiprocessing
 import logging
@@ -15,6 +16,7 @@ from pymatgen.analysis.pourbaix_diagram import PourbaixDiagram, PourbaixEntry, \
     PourbaixPlotter, IonEntry, MultiEntry
 from pymatgen.entries.computed_entries import ComputedEntry
 from pymatgen.core.ion import Ion
+from pymatgen.core.composition import Composition
 from pymatgen import SETTINGS
 
 test_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..",
@@ -191,10 +193,33 @@ class PourbaixDiagramTest(unittest.TestCase):
         ph, v = np.meshgrid(np.linspace(0, 14), np.linspace(-3, 3))
         self.pbx.get_decomposition_energy(entry, ph, v)
 
+        # Test a list of entries on a grid
+        entries = [self.test_data['Zn'][11], self.test_data['Zn'][12]]
+        result = self.pbx.get_decomposition_energy(entries, ph, v)
+        self.assertEqual(result.shape, (2,) + ph.shape)
+        for e, r in zip(entries, result):
+            np.testing.assert_array_almost_equal(
+                r, self.pbx.get_decomposition_energy(e, ph, v))
+        self.assertAlmostEqual(self.pbx.get_decomposition_energy(
+            entries, -3, -2)[0], 3.6979147983333)
+
     def test_get_stable_entry(self):
         entry = self.pbx.get_stable_entry(0, 0)
         self.assertEqual(entry.entry_id, "ion-0")
 
+        # Stable entries and hull energies over a grid
+        ph, v = np.meshgrid(np.linspace(-2, 16, 20), np.linspace(-3, 3, 15))
+        indices = self.pbx.get_stable_entry_indices(ph, v)
+        hull_energies = self.pbx.get_hull_energy(ph, v)
+        self.assertEqual(indices.shape, ph.shape)
+        for i, j in itertools.product(range(15), range(20)):
+            gs = [e.normalized_energy_at_conditions(ph[i, j], v[i, j])
+                  for e in self.pbx.stable_entries]
+            self.assertEqual(indices[i, j], np.argmin(gs))
+            self.assertAlmostEqual(hull_energies[i, j], min(gs))
+            self.assertEqual(self.pbx.find_stable_entry(ph[i, j], v[i, j]),
+                             self.pbx.stable_entries[indices[i, j]])
+
     def test_multielement_parallel(self):
         # Simple test to ensure that multiprocessing is working
         test_entries = self.test_data["Ag-Te-N"]
@@ -202,6 +227,33 @@ class PourbaixDiagramTest(unittest.TestCase):
         pbx = PourbaixDiagram(test_entries, filter_solids=True, nproc=nproc)
         self.assertEqual(len(pbx.stable_entries), 49)
 
+    def test_multientry_weights(self):
+        pbx = PourbaixDiagram(self.test_data['Ag-Te'], filter_solids=True,
+                              comp_dict={"Ag": 0.5, "Te": 0.5})
+        entries = pbx._filtered_entries
+        prod_comp = Composition({"Ag": 0.5, "Te": 0.5})
+        combos = list(itertools.chain(itertools.combinations(range(len(entries)), 1),
+                                      itertools.combinations(range(len(entries)), 2)))
+        weighted_combos = dict(PourbaixDiagram.get_multientry_weights(
+            entries, combos, prod_comp))
+        for combo in combos:
+            multi_entry = PourbaixDiagram.process_multientry(
+                [entries[i] for i in combo], prod_comp)
+            if multi_entry is None:
+                self.assertNotIn(combo, weighted_combos)
+            else:
+                np.testing.assert_array_almost_equal(
+                    weighted_combos[combo], multi_entry.weights)
+
+        # Pruning by the hull only keeps the candidates of the diagram
+        all_multi_entries = pbx._generate_multielement_entries(entries, prune=False)
+        multi_entries = pbx._generate_multielement_entries(entries)
+        self.assertEqual(len(all_multi_entries), 153)
+        self.assertEqual(len(multi_entries), len(pbx.all_entries))
+        names = {frozenset(e.name.split(" + ")) for e in all_multi_entries}
+        self.assertTrue(all(frozenset(e.name.split(" + ")) in names
+                            for e in multi_entries))
+
     def test_solid_filter(self):
         entries = self.test_data['Zn']
         pbx = PourbaixDiagram(entries, filter_solids=False)
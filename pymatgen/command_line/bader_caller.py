@@ -8,7 +8,10 @@ Fortran code for calculating a Bader charge analysis.
 
 This module depends on a compiled bader executable available in the path.
 Please download the library at http://theory.cm.utexas.edu/vasp/bader/ and
-follow the instructions to compile the executable.
+follow the instructions to compile the executable. Alternatively,
+BaderAnalysis.from_chgcar partitions an in-memory Chgcar with a NumPy
+implementation of the on-grid steepest ascent method, which does not need
+the executable.
 
 If you use this module, please cite the following:
 
@@ -17,6 +20,8 @@ Bader decomposition of charge density", Comput. Mater. Sci. 36, 254-360 (2006).
 """
 
 import os
+import itertools
+import multiprocessing
 import subprocess
 import shutil
 import warnings
@@ -39,6 +44,127 @@ __date__ = "4/5/13"
 
 BADEREXE = which("bader") or which("bader.exe")
 
+# Offsets (in grid points) of the 26 neighbors of a grid point
+_NEIGHBOR_OFFSETS = np.array([d for d in itertools.product((-1, 0, 1), repeat=3)
+                              if d != (0, 0, 0)])
+
+
+def _get_centered_density(data, frac_coords, dim):
+    """
+    Centers the charge density of an atom in the data array and slices out
+    the central window holding all its charge.
+
+    Args:
+        data (np.ndarray): Charge density belonging to the atom.
+        frac_coords: Fractional coordinates of the atom.
+        dim: Dimension of the original charge density map.
+
+    Returns:
+        Dict with the sliced charge density, the shift used to center it and
+        the original dimension.
+    """
+    # Find the index of the atom in the charge density atom
+    index = np.round(np.multiply(frac_coords, data.shape))
+
+    # Find the shift vector in the array
+    shift = (np.divide(data.shape, 2) - index).astype(int)
+
+    # Shift the data so that the atomic charge density to the center for easier manipulation
+    shifted_data = np.roll(data, shift, axis=(0, 1, 2))
+
+    # Slices a central window from the data array
+    def slice_from_center(data, xwidth, ywidth, zwidth):
+        x, y, z = data.shape
+        startx = x // 2 - (xwidth // 2)
+        starty = y // 2 - (ywidth // 2)
+        startz = z // 2 - (zwidth // 2)
+        return data[startx:startx + xwidth, starty:starty + ywidth, startz:startz + zwidth]
+
+    # Finds the central encompassing volume which holds all the data within a precision
+    def find_encompassing_vol(data, prec=1e-3):
+        total = np.sum(data)
+        for i in range(np.max(data.shape)):
+            sliced_data = slice_from_center(data, i, i, i)
+            if total - np.sum(sliced_data) < 0.1:
+                return sliced_data
+        return None
+
+    return {
+        "data": find_encompassing_vol(shifted_data),
+        "shift": shift,
+        "dim": dim
+    }
+
+
+def _get_ascent_directions(args):
+    """
+    Finds the steepest ascent neighbor of every grid point in a slab of the
+    charge density.
+
+    Args:
+        args: (slab, inv_dists) tuple. The slab is padded with one layer of
+            (periodic) neighbors on both sides along the first axis and
+            inv_dists are the inverse distances to the _NEIGHBOR_OFFSETS.
+
+    Returns:
+        Index into _NEIGHBOR_OFFSETS of the steepest ascent neighbor of each
+        unpadded grid point, or -1 for local maxima.
+    """
+    slab, inv_dists = args
+    n = slab.shape[0] - 2
+    center = slab[1:-1]
+    best = np.zeros(center.shape)
+    directions = np.full(center.shape, -1, dtype=np.int8)
+    for i, (d, inv_dist) in enumerate(zip(_NEIGHBOR_OFFSETS, inv_dists)):
+        neighbor = np.roll(slab[1 + d[0]:1 + d[0] + n], (-d[1], -d[2]),
+                           axis=(1, 2))
+        grad = (neighbor - center) * inv_dist
+        mask = grad > best
+        best[mask] = grad[mask]
+        directions[mask] = i
+    return directions
+
+
+def _get_ascent_maxima(rho, lattice, nproc=None):
+    """
+    Follows the on-grid steepest ascent path of every grid point of a
+    periodic charge density up to a local maximum.
+
+    Args:
+        rho (np.ndarray): Charge density on a 3D grid.
+        lattice (Lattice): Lattice of the charge density.
+        nproc (int): Number of processes used to find the ascent directions.
+            Defaults to None, i.e., serial.
+
+    Returns:
+        Flat index of the maximum reached from each (flattened) grid point.
+    """
+    dim = np.array(rho.shape)
+    inv_dists = 1 / np.linalg.norm(
+        lattice.get_cartesian_coords(_NEIGHBOR_OFFSETS / dim), axis=1)
+    bounds = np.linspace(0, dim[0], min(nproc or 1, dim[0]) + 1).astype(int)
+    args = [(np.take(rho, range(start - 1, stop + 1), axis=0, mode="wrap"),
+             inv_dists) for start, stop in zip(bounds[:-1], bounds[1:])]
+    if nproc and nproc > 1:
+        with multiprocessing.Pool(nproc) as p:
+            directions = p.map(_get_ascent_directions, args)
+    else:
+        directions = [_get_ascent_directions(a) for a in args]
+    directions = np.concatenate(directions).ravel()
+
+    indices = np.indices(rho.shape).reshape(3, -1)
+    steps = _NEIGHBOR_OFFSETS[directions].T
+    targets = np.ravel_multi_index(tuple((indices + steps) % dim[:, None]),
+                                   rho.shape)
+    maxima = np.where(directions < 0, np.arange(directions.size), targets)
+    # Ascent paths strictly increase the density, so jumping along the
+    # pointers converges to the maxima in log(path length) passes
+    while True:
+        jumped = maxima[maxima]
+        if np.array_equal(jumped, maxima):
+            return maxima
+        maxima = jumped
+
 
 class BaderAnalysis:
     """
@@ -191,45 +317,100 @@ class BaderAnalysis:
                 atom_chgcars = [Chgcar.from_file("BvAt{}.dat".format(str(i).zfill(4))) for i in
                                 range(1, len(self.chgcar.structure) + 1)]
 
-                atomic_densities = []
-                # For each atom in the structure
-                for atom, loc, chg in zip(self.chgcar.structure,
-                                          self.chgcar.structure.frac_coords,
-                                          atom_chgcars):
-                    # Find the index of the atom in the charge density atom
-                    index = np.round(np.multiply(loc, chg.dim))
-
-                    data = chg.data['total']
-                    # Find the shift vector in the array
-                    shift = (np.divide(chg.dim, 2) - index).astype(int)
-
-                    # Shift the data so that the atomic charge density to the center for easier manipulation
-                    shifted_data = np.roll(data, shift, axis=(0, 1, 2))
-
-                    # Slices a central window from the data array
-                    def slice_from_center(data, xwidth, ywidth, zwidth):
-                        x, y, z = data.shape
-                        startx = x // 2 - (xwidth // 2)
-                        starty = y // 2 - (ywidth // 2)
-                        startz = z // 2 - (zwidth // 2)
-                        return data[startx:startx + xwidth, starty:starty + ywidth, startz:startz + zwidth]
-
-                    # Finds the central encompassing volume which holds all the data within a precision
-                    def find_encompassing_vol(data, prec=1e-3):
-                        total = np.sum(data)
-                        for i in range(np.max(data.shape)):
-                            sliced_data = slice_from_center(data, i, i, i)
-                            if total - np.sum(sliced_data) < 0.1:
-                                return sliced_data
-                        return None
-
-                    d = {
-                        "data": find_encompassing_vol(shifted_data),
-                        "shift": shift,
-                        "dim": self.chgcar.dim
-                    }
-                    atomic_densities.append(d)
-                self.atomic_densities = atomic_densities
+                self.atomic_densities = [
+                    _get_centered_density(chg.data['total'], loc, self.chgcar.dim)
+                    for loc, chg in zip(self.chgcar.structure.frac_coords,
+                                        atom_chgcars)]
+
+    @classmethod
+    def from_chgcar(cls, chgcar, potcar=None, chgref=None,
+                    parse_atomic_densities=False, vacuum_tol=1e-3, nproc=None):
+        """
+        Performs the Bader analysis of an in-memory Chgcar with a NumPy
+        implementation of the on-grid steepest ascent method of Henkelman et
+        al., i.e., without calling the bader executable or writing any
+        files. Every grid point is assigned to the nearest atom of the local
+        maximum its steepest ascent path ends in. The resulting object has
+        the same data fields as a BaderAnalysis parsed from the executable's
+        output, with the version set to None.
+
+        Args:
+            chgcar (Chgcar): Charge density to integrate.
+            potcar (Potcar): Optional: the corresponding Potcar. Used for
+                calculating the charge transfer.
+            chgref (Chgcar): Optional: reference charge density used to
+                partition the grid, e.g. AECCAR0 + AECCAR2. Must be on the
+                same grid as the chgcar.
+            parse_atomic_densities (bool): Optional. turns on atomic
+                partition of the charge density.
+            vacuum_tol (float): Grid points with a charge density (in
+                e/Angstrom^3) below this value are assigned to the vacuum, as
+                bader's "-vac auto" option. None disables the vacuum.
+            nproc (int): Number of processes used to label the grid points.
+                Defaults to None, i.e., serial.
+        """
+        structure = chgcar.structure
+        total = chgcar.data["total"]
+        rho = chgref.data["total"] if chgref is not None else total
+        if rho.shape != total.shape:
+            raise ValueError("The reference charge density must be on the "
+                             "same grid as the CHGCAR.")
+
+        total = total.ravel()
+        maxima = _get_ascent_maxima(rho, structure.lattice, nproc=nproc)
+        labels = np.full(total.size, -1)
+        is_vacuum = np.zeros(total.size, dtype=bool) if vacuum_tol is None \
+            else total / structure.volume < vacuum_tol
+        # Assign each maximum to the nearest atom
+        unique_maxima, inverse = np.unique(maxima[~is_vacuum],
+                                           return_inverse=True)
+        frac_maxima = np.array(np.unravel_index(unique_maxima, rho.shape)).T \
+            / rho.shape
+        dists = structure.lattice.get_all_distances(frac_maxima,
+                                                    structure.frac_coords)
+        labels[~is_vacuum] = np.argmin(dists, axis=1)[inverse]
+        labels = labels.reshape(rho.shape)
+
+        ngridpts = total.size
+        natoms = len(structure)
+        charges = np.bincount(labels.ravel()[~is_vacuum],
+                              weights=total[~is_vacuum],
+                              minlength=natoms) / ngridpts
+        volumes = np.bincount(labels.ravel()[~is_vacuum],
+                              minlength=natoms) * structure.volume / ngridpts
+
+        # Distance from each atom to the closest point of its Bader surface
+        is_surface = np.zeros(rho.shape, dtype=bool)
+        for axis in range(3):
+            for shift in (-1, 1):
+                is_surface |= labels != np.roll(labels, shift, axis=axis)
+        min_dists = []
+        for i, frac_coords in enumerate(structure.frac_coords):
+            points = np.argwhere(is_surface & (labels == i)) / rho.shape
+            min_dists.append(
+                structure.lattice.get_all_distances(frac_coords, points).min()
+                if len(points) else float("nan"))
+
+        ba = cls.__new__(cls)
+        ba.chgcar = chgcar
+        ba.potcar = potcar
+        ba.natoms = chgcar.poscar.natoms
+        ba.reference_used = chgref is not None
+        ba.parse_atomic_densities = parse_atomic_densities
+        ba.version = None
+        headers = ('x', 'y', 'z', 'charge', 'min_dist', 'atomic_vol')
+        ba.data = [dict(zip(headers, vals)) for vals in
+                   zip(*structure.cart_coords.T, charges, min_dists, volumes)]
+        ba.vacuum_charge = total[is_vacuum].sum() / ngridpts
+        ba.vacuum_volume = is_vacuum.sum() * structure.volume / ngridpts
+        ba.nelectrons = total.sum() / ngridpts
+        if parse_atomic_densities:
+            ba.atomic_densities = [
+                _get_centered_density(
+                    np.where(labels == i, chgcar.data["total"], 0),
+                    frac_coords, chgcar.dim)
+                for i, frac_coords in enumerate(structure.frac_coords)]
+        return ba
 
     def get_charge(self, atom_index):
         """
@@ -362,7 +543,7 @@ class BaderAnalysis:
                    chgref_filename=chgref_filename)
 
 
-def bader_analysis_from_path(path, suffix=''):
+def bader_analysis_from_path(path, suffix='', nproc=None):
     """
     Convenience method to run Bader analysis on a folder containing
     typical VASP output files.
@@ -378,6 +559,8 @@ def bader_analysis_from_path(path, suffix=''):
 
     :param path: path to folder to search in
     :param suffix: specific suffix to look for (e.g. '.relax1' for 'CHGCAR.relax1.gz'
+    :param nproc: number of processes used by the in-process analysis, if
+        the bader executable is not in the path
     :return: summary dict
     """
 
@@ -408,10 +591,12 @@ def bader_analysis_from_path(path, suffix=''):
     potcar_path = _get_filepath('POTCAR', 'Could not find POTCAR, cannot calculate charge transfer.')
     potcar = Potcar.from_file(potcar_path) if potcar_path else None
 
-    return bader_analysis_from_objects(chgcar, potcar, aeccar0, aeccar2)
+    return bader_analysis_from_objects(chgcar, potcar, aeccar0, aeccar2,
+                                       nproc=nproc)
 
 
-def bader_analysis_from_objects(chgcar, potcar=None, aeccar0=None, aeccar2=None):
+def bader_analysis_from_objects(chgcar, potcar=None, aeccar0=None, aeccar2=None,
+                                nproc=None):
     """
     Convenience method to run Bader analysis from a set
     of pymatgen Chgcar and Potcar objects.
@@ -423,13 +608,36 @@ def bader_analysis_from_objects(chgcar, potcar=None, aeccar0=None, aeccar2=None)
     2. Runs Bader analysis twice: once for charge, and a second time
     for the charge difference (magnetization density).
 
+    If the bader executable is not in the path, the analysis is performed
+    in-process with BaderAnalysis.from_chgcar instead, with a warning.
+
     :param chgcar: Chgcar object
     :param potcar: (optional) Potcar object
     :param aeccar0: (optional) Chgcar object from aeccar0 file
     :param aeccar2: (optional) Chgcar object from aeccar2 file
+    :param nproc: (optional) number of processes used by the in-process
+        analysis
     :return: summary dict
     """
 
+    if not BADEREXE:
+        warnings.warn("The bader executable is not in the path. Performing "
+                      "the analysis in-process with BaderAnalysis.from_chgcar "
+                      "instead.")
+        chgref = aeccar0.linear_add(aeccar2) if aeccar0 and aeccar2 else None
+        ba = BaderAnalysis.from_chgcar(chgcar, potcar=potcar, chgref=chgref,
+                                       nproc=nproc)
+        summary = ba.summary
+        if chgcar.is_spin_polarized:
+            # integrate the magnetization density over the Bader volumes of
+            # the charge density, without discarding its negative parts
+            chgcar_mag = Chgcar(chgcar.poscar, {"total": chgcar.data["diff"]})
+            ba = BaderAnalysis.from_chgcar(
+                chgcar_mag, chgref=chgcar if chgref is None else chgref,
+                vacuum_tol=None, nproc=nproc)
+            summary["magmom"] = [d['charge'] for d in ba.data]
+        return summary
+
     with ScratchDir(".") as temp_dir:
 
         if aeccar0 and aeccar2:
@@ -102,5 +102,55 @@ class BaderAnalysisTest(unittest.TestCase):
                                np.sum([np.sum(d['data']) for d in analysis.atomic_densities]))
 
 
+class BaderAnalysisFromChgcarTest(unittest.TestCase):
+
+    def setUp(self):
+        test_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..",
+                                'test_files')
+        self.chgcar = Chgcar.from_file(os.path.join(test_dir, "chgden",
+                                                    "CHGCAR.FePO4"))
+
+    def test_from_chgcar(self):
+        analysis = BaderAnalysis.from_chgcar(self.chgcar)
+        self.assertEqual(len(analysis.data), 24)
+        self.assertIsNone(analysis.version)
+        self.assertFalse(analysis.reference_used)
+        self.assertAlmostEqual(analysis.vacuum_charge, 0)
+        charges = [analysis.get_charge(i) for i in range(24)]
+        self.assertAlmostEqual(sum(charges) + analysis.vacuum_charge,
+                               analysis.nelectrons)
+        self.assertAlmostEqual(sum(d["atomic_vol"] for d in analysis.data),
+                               self.chgcar.structure.volume)
+        # symmetrically equivalent atoms get the same charge
+        for i in range(4):
+            self.assertAlmostEqual(charges[i], charges[0], 3)
+            self.assertAlmostEqual(charges[4 + i], charges[4], 3)
+        self.assertTrue(charges[0] > charges[4] > charges[8])
+        self.assertTrue(all(0 < d["min_dist"] < 1 for d in analysis.data))
+
+        # labeling the grid in parallel gives the same partition
+        analysis2 = BaderAnalysis.from_chgcar(self.chgcar, nproc=2)
+        self.assertEqual(analysis.data, analysis2.data)
+
+        # the reference density only changes the partition
+        analysis3 = BaderAnalysis.from_chgcar(self.chgcar, chgref=self.chgcar)
+        self.assertTrue(analysis3.reference_used)
+        self.assertEqual(analysis.data, analysis3.data)
+
+    def test_atom_parsing(self):
+        analysis = BaderAnalysis.from_chgcar(self.chgcar,
+                                             parse_atomic_densities=True)
+        self.assertEqual(len(analysis.atomic_densities), 24)
+        self.assertAlmostEqual(np.sum(self.chgcar.data['total']),
+                               np.sum([np.sum(d['data']) for d in analysis.atomic_densities]))
+
+    @unittest.skipIf(which('bader'), "bader executable present.")
+    def test_bader_analysis_from_objects(self):
+        with self.assertWarns(UserWarning):
+            summary = bader_analysis_from_objects(self.chgcar)
+        self.assertIsNone(summary["bader_version"])
+        self.assertAlmostEqual(sum(summary["charge"]), 282.9014578, 4)
+
+
 if __name__ == '__main__':
     unittest.main()
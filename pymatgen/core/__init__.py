@@ -7,10 +7,39 @@ This package contains core modules and classes for representing structures and
 operations on them.
 """
 
-from .periodic_table import Element, Specie, DummySpecie
-from .composition import Composition
-from .structure import Structure, IStructure, Molecule, IMolecule
-from .lattice import Lattice
-from .sites import Site, PeriodicSite
-from .operations import SymmOp
-from .units import Unit, FloatWithUnit, ArrayWithUnit
+import sys
+
+from pymatgen import _lazy_getattr
+
+# Imported lazily on first access, see pymatgen/__init__.py.
+_LAZY_IMPORTS = {
+    "Element": "pymatgen.core.periodic_table",
+    "Specie": "pymatgen.core.periodic_table",
+    "DummySpecie": "pymatgen.core.periodic_table",
+    "Composition": "pymatgen.core.composition",
+    "Structure": "pymatgen.core.structure",
+    "IStructure": "pymatgen.core.structure",
+    "Molecule": "pymatgen.core.structure",
+    "IMolecule": "pymatgen.core.structure",
+    "Lattice": "pymatgen.core.lattice",
+    "Site": "pymatgen.core.sites",
+    "PeriodicSite": "pymatgen.core.sites",
+    "SymmOp": "pymatgen.core.operations",
+    "Unit": "pymatgen.core.units",
+    "FloatWithUnit": "pymatgen.core.units",
+    "ArrayWithUnit": "pymatgen.core.units",
+}
+
+
+def __getattr__(name):
+    return _lazy_getattr(globals(), _LAZY_IMPORTS, name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
+
+if sys.version_info < (3, 7):
+    # Module level __getattr__ is not supported. Import everything eagerly.
+    for _name in _LAZY_IMPORTS:
+        __getattr__(_name)
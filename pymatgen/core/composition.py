@@ -14,7 +14,7 @@ from itertools import combinations_with_replacement, product
 import os
 import re
 from typing import Tuple, List
-from functools import total_ordering
+from functools import total_ordering, lru_cache
 
 from monty.serialization import loadfn
 from monty.fractions import gcd, gcd_float
@@ -117,7 +117,7 @@ class Composition(collections.abc.Hashable, collections.abc.Mapping, MSONable):
         # it's much faster to recognize a composition and use the elmap than
         # to pass the composition to dict()
         if len(args) == 1 and isinstance(args[0], Composition):
-            elmap = args[0]
+            elmap = args[0]._data
         elif len(args) == 1 and isinstance(args[0], str):
             elmap = self._parse_formula(args[0])
         else:
@@ -129,14 +129,28 @@ class Composition(collections.abc.Hashable, collections.abc.Mapping, MSONable):
                 raise CompositionError("Amounts in Composition cannot be "
                                        "negative!")
             if abs(v) >= Composition.amount_tolerance:
-                elamt[get_el_sp(k)] = v
+                if not isinstance(k, (Element, Specie)):
+                    k = get_el_sp(k)
+                elamt[k] = v
                 self._natoms += abs(v)
         self._data = elamt
         if strict and not self.valid:
             raise ValueError("Composition is not valid, contains: {}"
                              .format(", ".join(map(str, self.elements))))
 
+    def _get_cached(self, key, func):
+        """
+        Returns func(), memoized on this Composition under key. Compositions
+        are immutable, so derived properties only have to be computed once.
+        """
+        cache = self.__dict__.setdefault("_cache", {})
+        if key not in cache:
+            cache[key] = func()
+        return cache[key]
+
     def __getitem__(self, item):
+        if isinstance(item, (Element, Specie)):
+            return self._data.get(item, 0)
         try:
             sp = get_el_sp(item)
             return self._data.get(sp, 0)
@@ -166,6 +180,12 @@ class Composition(collections.abc.Hashable, collections.abc.Mapping, MSONable):
         #  compositions elements
         if len(self) != len(other):
             return False
+        if isinstance(other, Composition):
+            other_data = other._data
+            for el, v in self._data.items():
+                if abs(v - other_data.get(el, 0)) > Composition.amount_tolerance:
+                    return False
+            return True
         for el, v in self.items():
             if abs(v - other[el]) > Composition.amount_tolerance:
                 return False
@@ -176,10 +196,13 @@ class Composition(collections.abc.Hashable, collections.abc.Mapping, MSONable):
         Defines >= for Compositions. Should ONLY be used for defining a sort
         order (the behavior is probably not what you'd expect)
         """
-        for el in sorted(set(self.elements + other.elements)):
-            if other[el] - self[el] >= Composition.amount_tolerance:
+        self_data = self._data
+        other_data = other._data
+        for el in sorted(set(self_data).union(other_data)):
+            diff = self_data.get(el, 0) - other_data.get(el, 0)
+            if -diff >= Composition.amount_tolerance:
                 return False
-            if self[el] - other[el] >= Composition.amount_tolerance:
+            if diff >= Composition.amount_tolerance:
                 return True
         return True
 
@@ -220,7 +243,7 @@ class Composition(collections.abc.Hashable, collections.abc.Mapping, MSONable):
         """
         if not isinstance(other, numbers.Number):
             return NotImplemented
-        return Composition({el: self[el] * other for el in self},
+        return Composition({el: amt * other for el, amt in self._data.items()},
                            allow_negative=self.allow_negative)
 
     __rmul__ = __mul__
@@ -228,7 +251,7 @@ class Composition(collections.abc.Hashable, collections.abc.Mapping, MSONable):
     def __truediv__(self, other):
         if not isinstance(other, numbers.Number):
             return NotImplemented
-        return Composition({el: self[el] / other for el in self},
+        return Composition({el: amt / other for el, amt in self._data.items()},
                            allow_negative=self.allow_negative)
 
     __div__ = __truediv__
@@ -236,13 +259,17 @@ class Composition(collections.abc.Hashable, collections.abc.Mapping, MSONable):
     def __hash__(self):
         """
         Minimally effective hash function that just distinguishes between
-        Compositions with different elements.
+        Compositions with different elements. Amounts cannot be part of the
+        hash since equality is only defined up to amount_tolerance.
         """
-        hashcode = 0
-        for el, amt in self.items():
-            if abs(amt) > Composition.amount_tolerance:
-                hashcode += el.Z
-        return hashcode
+        def get_hash():
+            hashcode = 0
+            for el, amt in self.items():
+                if abs(amt) > Composition.amount_tolerance:
+                    hashcode += el.Z
+            return hashcode
+
+        return self._get_cached("hash", get_hash)
 
     @property
     def average_electroneg(self) -> float:
@@ -295,10 +322,13 @@ class Composition(collections.abc.Hashable, collections.abc.Mapping, MSONable):
         Returns a formula string, with elements sorted by electronegativity,
         e.g., Li4 Fe4 P4 O16.
         """
-        sym_amt = self.get_el_amt_dict()
-        syms = sorted(sym_amt.keys(), key=lambda sym: get_el_sp(sym).X)
-        formula = [s + formula_double_format(sym_amt[s], False) for s in syms]
-        return " ".join(formula)
+        def get_formula():
+            sym_amt = self.get_el_amt_dict()
+            syms = sorted(sym_amt.keys(), key=lambda sym: get_el_sp(sym).X)
+            formula = [s + formula_double_format(sym_amt[s], False) for s in syms]
+            return " ".join(formula)
+
+        return self._get_cached("formula", get_formula)
 
     @property
     def alphabetical_formula(self) -> str:
@@ -346,7 +376,8 @@ class Composition(collections.abc.Hashable, collections.abc.Mapping, MSONable):
         Returns:
             Normalized composition which the number of species sum to 1.
         """
-        return self / self._natoms
+        return self._get_cached(("fractional_composition", self.allow_negative),
+                                lambda: self / self._natoms)
 
     @property
     def reduced_composition(self) -> 'Composition':
@@ -365,8 +396,12 @@ class Composition(collections.abc.Hashable, collections.abc.Mapping, MSONable):
             A normalized composition and a multiplicative factor, i.e.,
             Li4Fe4P4O16 returns (Composition("LiFePO4"), 4).
         """
-        factor = self.get_reduced_formula_and_factor()[1]
-        return self / factor, factor
+        def get_reduced():
+            factor = self.get_reduced_formula_and_factor()[1]
+            return self / factor, factor
+
+        return self._get_cached(("reduced_composition", self.allow_negative),
+                                get_reduced)
 
     def get_reduced_formula_and_factor(self, iupac_ordering=False) -> Tuple[str, float]:
         """
@@ -386,19 +421,23 @@ class Composition(collections.abc.Hashable, collections.abc.Mapping, MSONable):
             A pretty normalized formula and a multiplicative factor, i.e.,
             Li4Fe4P4O16 returns (LiFePO4, 4).
         """
-        all_int = all(abs(x - round(x)) < Composition.amount_tolerance
-                      for x in self.values())
-        if not all_int:
-            return self.formula.replace(" ", ""), 1
-        d = {k: int(round(v)) for k, v in self.get_el_amt_dict().items()}
-        (formula, factor) = reduce_formula(
-            d, iupac_ordering=iupac_ordering)
+        def get_reduced():
+            all_int = all(abs(x - round(x)) < Composition.amount_tolerance
+                          for x in self.values())
+            if not all_int:
+                return self.formula.replace(" ", ""), 1
+            d = {k: int(round(v)) for k, v in self.get_el_amt_dict().items()}
+            (formula, factor) = reduce_formula(
+                d, iupac_ordering=iupac_ordering)
 
-        if formula in Composition.special_formulas:
-            formula = Composition.special_formulas[formula]
-            factor /= 2
+            if formula in Composition.special_formulas:
+                formula = Composition.special_formulas[formula]
+                factor /= 2
+
+            return formula, factor
 
-        return formula, factor
+        return self._get_cached(("reduced_formula", bool(iupac_ordering)),
+                                get_reduced)
 
     def get_integer_formula_and_factor(self, max_denominator=10000,
                                        iupac_ordering=False):
@@ -486,7 +525,9 @@ class Composition(collections.abc.Hashable, collections.abc.Mapping, MSONable):
         """
         Total molecular weight of Composition
         """
-        return Mass(sum([amount * el.atomic_mass for el, amount in self.items()]), "amu")
+        return self._get_cached(
+            "weight",
+            lambda: Mass(sum([amount * el.atomic_mass for el, amount in self.items()]), "amu"))
 
     def get_atomic_fraction(self, el):
         """
@@ -553,33 +594,7 @@ class Composition(collections.abc.Hashable, collections.abc.Mapping, MSONable):
             In the case of Metallofullerene formula (e.g. Y3N@C80),
             the @ mark will be dropped and passed to parser.
         """
-        # for Metallofullerene like "Y3N@C80"
-        formula = formula.replace("@", "")
-
-        def get_sym_dict(f, factor):
-            sym_dict = collections.defaultdict(float)
-            for m in re.finditer(r"([A-Z][a-z]*)\s*([-*\.e\d]*)", f):
-                el = m.group(1)
-                amt = 1
-                if m.group(2).strip() != "":
-                    amt = float(m.group(2))
-                sym_dict[el] += amt * factor
-                f = f.replace(m.group(), "", 1)
-            if f.strip():
-                raise CompositionError("{} is an invalid formula!".format(f))
-            return sym_dict
-
-        m = re.search(r"\(([^\(\)]+)\)\s*([\.e\d]*)", formula)
-        if m:
-            factor = 1
-            if m.group(2) != "":
-                factor = float(m.group(2))
-            unit_sym_dict = get_sym_dict(m.group(1), factor)
-            expanded_sym = "".join(["{}{}".format(el, amt)
-                                    for el, amt in unit_sym_dict.items()])
-            expanded_formula = formula.replace(m.group(), expanded_sym)
-            return self._parse_formula(expanded_formula)
-        return get_sym_dict(formula, 1)
+        return collections.defaultdict(float, _parse_formula(formula))
 
     @property
     def anonymized_formula(self):
@@ -645,10 +660,14 @@ class Composition(collections.abc.Hashable, collections.abc.Mapping, MSONable):
             Dict with element symbol and (unreduced) amount e.g.,
             {"Fe": 4.0, "O":6.0} or {"Fe3+": 4.0, "O2-":6.0}
         """
-        d = collections.defaultdict(float)
-        for e, a in self.items():
-            d[e.symbol] += a
-        return d
+        def get_el_amt():
+            d = {}
+            for e, a in self.items():
+                d[e.symbol] = d.get(e.symbol, 0.0) + a
+            return d
+
+        # Return a copy since callers are free to modify the dict.
+        return collections.defaultdict(float, self._get_cached("el_amt_dict", get_el_amt))
 
     def as_dict(self):
         """
@@ -1130,6 +1149,48 @@ class Composition(collections.abc.Hashable, collections.abc.Mapping, MSONable):
                         yield match
 
 
+@lru_cache(maxsize=4096)
+def _parse_formula(formula):
+    """
+    Process-wide bounded LRU cache of parsed formula strings. The same
+    formulas tend to be parsed over and over again, e.g., when reading
+    entries or building reactions.
+
+    Args:
+        formula (str): A string formula, e.g. Fe2O3, Li3Fe2(PO4)3
+
+    Returns:
+        Tuple of (symbol, amount) pairs.
+    """
+    # for Metallofullerene like "Y3N@C80"
+    formula = formula.replace("@", "")
+
+    def get_sym_dict(f, factor):
+        sym_dict = collections.defaultdict(float)
+        for m in re.finditer(r"([A-Z][a-z]*)\s*([-*\.e\d]*)", f):
+            el = m.group(1)
+            amt = 1
+            if m.group(2).strip() != "":
+                amt = float(m.group(2))
+            sym_dict[el] += amt * factor
+            f = f.replace(m.group(), "", 1)
+        if f.strip():
+            raise CompositionError("{} is an invalid formula!".format(f))
+        return sym_dict
+
+    m = re.search(r"\(([^\(\)]+)\)\s*([\.e\d]*)", formula)
+    if m:
+        factor = 1
+        if m.group(2) != "":
+            factor = float(m.group(2))
+        unit_sym_dict = get_sym_dict(m.group(1), factor)
+        expanded_sym = "".join(["{}{}".format(el, amt)
+                                for el, amt in unit_sym_dict.items()])
+        expanded_formula = formula.replace(m.group(), expanded_sym)
+        return _parse_formula(expanded_formula)
+    return tuple(get_sym_dict(formula, 1).items())
+
+
 def reduce_formula(sym_amt, iupac_ordering=False):
     """
     Helper method to reduce a sym_amt dict to a reduced formula and factor.
@@ -22,9 +22,23 @@ from pymatgen.core.units import Mass, Length, FloatWithUnit, Unit, \
 from pymatgen.util.string import formula_double_format
 from monty.json import MSONable
 
-# Loads element data from json file
-with open(str(Path(__file__).absolute().parent / "periodic_table.json"), "rt") as f:
-    _pt_data = json.load(f)
+_pt_data = {}  # type: dict
+
+
+def _load_pt_data():
+    """
+    Loads (once) the element data from periodic_table.json. The data is only
+    read when element properties are first accessed, which keeps importing
+    pymatgen fast.
+
+    Returns:
+        dict of {symbol: element data}.
+    """
+    if not _pt_data:
+        with open(str(Path(__file__).absolute().parent / "periodic_table.json"), "rt") as f:
+            _pt_data.update(json.load(f))
+    return _pt_data
+
 
 _pt_row_sizes = (2, 8, 8, 18, 18, 32, 32)
 
@@ -413,7 +427,14 @@ class Element(Enum):
             {oxidation state: ionic radii}. Radii are given in ang.
         """
         self.symbol = "%s" % symbol
-        d = _pt_data[symbol]
+
+    def _load_data(self):
+        """
+        Loads the data of the element. Called on first access of any of
+        the data attributes (see __getattr__), after which the attributes are
+        plain instance attributes.
+        """
+        d = _load_pt_data()[self.symbol]
 
         # Store key variables for quick access
         self.Z = d["Atomic no"]
@@ -456,6 +477,10 @@ class Element(Enum):
         return self._atomic_mass
 
     def __getattr__(self, item):
+        if item in ("Z", "long_name", "_data", "_atomic_radius", "_atomic_mass") \
+                and "_data" not in self.__dict__:
+            self._load_data()
+            return getattr(self, item)
         if item in ["mendeleev_no", "electrical_resistivity",
                     "velocity_of_sound", "reflectivity",
                     "refractive_index", "poissons_ratio", "molar_volume",
@@ -790,7 +815,7 @@ class Element(Enum):
         Returns:
             Element with atomic number z.
         """
-        for sym, data in _pt_data.items():
+        for sym, data in _load_pt_data().items():
             if data["Atomic no"] == z:
                 return Element(sym)
         raise ValueError("No element with this atomic number %s" % z)
@@ -807,7 +832,7 @@ class Element(Enum):
         .. note::
             The 18 group number system is used, i.e., Noble gases are group 18.
         """
-        for sym in _pt_data.keys():
+        for sym in _load_pt_data().keys():
             el = Element(sym)
             if el.row == row and el.group == group:
                 return el
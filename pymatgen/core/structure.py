@@ -681,18 +681,34 @@ class IStructure(SiteCollection, MSONable):
         else:
             self._lattice = Lattice(lattice)
 
+        if coords_are_cartesian and len(coords) > 0:
+            # Convert all coordinates in one shot rather than per site.
+            coords = self._lattice.get_fractional_coords(coords)
+            coords_are_cartesian = False
+
         sites = []
+        # Species are usually repeated many times. Cache the Composition
+        # built for each distinct (hashable) species so that the parsing of
+        # the species is only done once.
+        species_cache = {}  # type: Dict
         for i, sp in enumerate(species):
             prop = None
             if site_properties:
                 prop = {k: v[i]
                         for k, v in site_properties.items()}
-
-            sites.append(
-                PeriodicSite(sp, coords[i], self._lattice,
-                             to_unit_cell,
-                             coords_are_cartesian=coords_are_cartesian,
-                             properties=prop))
+            try:
+                comp = species_cache.get(sp)
+                cacheable = True
+            except TypeError:
+                # Unhashable input, e.g., a dict of species and occupancies.
+                comp, cacheable = None, False
+            site = PeriodicSite(sp if comp is None else comp, coords[i],
+                                self._lattice, to_unit_cell,
+                                coords_are_cartesian=coords_are_cartesian,
+                                properties=prop)
+            if cacheable and comp is None:
+                species_cache[sp] = site.species
+            sites.append(site)
         self._sites = tuple(sites)
         if validate_proximity and not self.is_valid():
             raise StructureError(("Structure contains sites that are ",
@@ -1004,11 +1004,15 @@ class SquareTensor(Tensor):
 
 
 def get_uvec(vec):
-    """ Gets a unit vector parallel to input vector"""
-    l = np.linalg.norm(vec)
-    if l < 1e-8:
+    """
+    Gets a unit vector parallel to input vector, or the unit vectors
+    parallel to each row of an Nx3 array of vectors
+    """
+    vec = np.asarray(vec)
+    l = np.linalg.norm(vec, axis=-1, keepdims=True)
+    if vec.ndim == 1 and l < 1e-8:
         return vec
-    return vec / l
+    return np.where(l < 1e-8, vec, vec / np.where(l < 1e-8, 1, l))
 
 
 def symmetry_reduce(tensors, structure, tol=1e-8, **kwargs):
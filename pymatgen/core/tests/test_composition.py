@@ -286,6 +286,29 @@ class CompositionTest(PymatgenTest):
             self.serialize_with_pickle(c, test_eq=True)
             self.serialize_with_pickle(c.to_data_dict, test_eq=True)
 
+    def test_cached_properties(self):
+        c = Composition("Li3Fe2(PO4)3")
+        self.assertIs(c.reduced_composition, c.reduced_composition)
+        self.assertEqual(hash(c), hash(Composition(c.as_dict())))
+        # Modifying returned dicts must not corrupt the cache.
+        d = c.get_el_amt_dict()
+        d["Fe"] = 100
+        self.assertEqual(c.get_el_amt_dict()["Fe"], 2)
+        self.assertEqual(c.reduced_formula, "Li3Fe2(PO4)3")
+        self.assertEqual(c.get_reduced_formula_and_factor(iupac_ordering=True)[0],
+                         "Li3Fe2(PO4)3")
+        # Parsed formulas are shared, but each Composition gets its own data.
+        c2 = Composition("Li3Fe2(PO4)3")
+        self.assertIsNot(c._data, c2._data)
+        self.assertEqual(c, c2)
+        self.assertRaises(CompositionError, Composition, "Li3Fe2((PO4)3")
+        self.assertRaises(CompositionError, Composition, "Li3Fe2((PO4)3")
+        # Composition-valued properties follow allow_negative.
+        neg = Composition("Li2O", allow_negative=True)
+        self.assertTrue(neg.fractional_composition.allow_negative)
+        neg.allow_negative = False
+        self.assertFalse(neg.fractional_composition.allow_negative)
+
     def test_to_data_dict(self):
         comp = Composition('Fe0.00009Ni0.99991')
         d = comp.to_data_dict
@@ -7,6 +7,8 @@ import unittest
 import pickle
 import warnings
 import math
+import subprocess
+import sys
 import numpy as np
 
 from pymatgen.util.testing import PymatgenTest
@@ -406,5 +408,40 @@ class FuncTest(unittest.TestCase):
                          [Specie("Li", 1), Specie("Mn", 3)])
 
 
+class ImportTimeTest(unittest.TestCase):
+
+    # Generous budget for the cumulative import time of pymatgen.core in
+    # seconds, measured with python -X importtime in a fresh interpreter.
+    import_budget = 3
+
+    def test_import_time(self):
+        out = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c",
+             "import pymatgen.core.periodic_table"],
+            stderr=subprocess.PIPE, universal_newlines=True, check=True).stderr
+        times = {}
+        for line in out.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative) / 1e6
+        self.assertLess(times["pymatgen.core.periodic_table"],
+                        self.import_budget)
+        # Heavy submodules must stay lazy. Third party imports (e.g. ruamel
+        # via monty.json) are not checked.
+        for name in times:
+            self.assertFalse(name.startswith("pymatgen.ext"), name)
+            self.assertFalse(name.startswith("pymatgen.analysis"), name)
+            self.assertFalse(name.startswith("pymatgen.io"), name)
+            self.assertFalse(name.startswith("pymatgen.core.structure"), name)
+
+    def test_lazy_element_data(self):
+        code = ("from pymatgen.core.periodic_table import Element, _pt_data;"
+                "assert not _pt_data; el = Element('Fe');"
+                "assert not _pt_data; assert el.Z == 26; assert _pt_data")
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+
 if __name__ == "__main__":
     unittest.main()
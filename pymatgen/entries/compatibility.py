@@ -8,7 +8,9 @@ functionals.
 
 import os
 import abc
+import time
 import warnings
+import multiprocessing
 
 from collections import defaultdict
 from typing import Sequence, Union, Optional
@@ -19,6 +21,7 @@ from monty.json import MSONable
 from pymatgen.io.vasp.sets import MITRelaxSet, MPRelaxSet
 from pymatgen.core.periodic_table import Element
 from pymatgen.analysis.structure_analyzer import oxide_type, sulfide_type
+from pymatgen.util.coord import get_structure_fingerprint
 from pymatgen.entries.computed_entries import ComputedEntry, \
     ConstantEnergyAdjustment, CompositionEnergyAdjustment, TemperatureEnergyAdjustment
 
@@ -42,6 +45,18 @@ class CompatibilityError(Exception):
     pass
 
 
+def _anion_type_worker(args):
+    """
+    Pool worker for AnionCorrection.precompute. Returns the sulfide type
+    and the (oxide type, number of bonds) of a structure, or None for the
+    analyses that were not requested.
+    """
+    structure, need_sulfide, need_oxide = args
+    sf_type = sulfide_type(structure) if need_sulfide else None
+    ox_type = oxide_type(structure, 1.05, return_nbonds=True) if need_oxide else None
+    return sf_type, ox_type
+
+
 class Correction(metaclass=abc.ABCMeta):
     """
     A Correction class is a pre-defined scheme for correction a computed
@@ -66,6 +81,25 @@ class Correction(metaclass=abc.ABCMeta):
         """
         return
 
+    def precompute(self, entries, nproc=None):
+        """
+        Pre-computes and caches any expensive analyses needed by
+        get_correction for a batch of entries. The default implementation
+        does nothing.
+
+        Args:
+            entries: List of ComputedEntry objects.
+            nproc (int): Number of processes to use. Defaults to serial.
+        """
+        pass
+
+    def clear_cache(self):
+        """
+        Drops the analyses cached by precompute. The default implementation
+        does nothing.
+        """
+        pass
+
     def correct_entry(self, entry):
         """
         Corrects a single entry.
@@ -129,6 +163,7 @@ class PotcarCorrection(Correction):
 
         self.input_set = input_set
         self.check_hash = check_hash
+        self._expected_potcars = {}
 
     def get_correction(self, entry) -> float:
         """
@@ -153,8 +188,12 @@ class PotcarCorrection(Correction):
                                     for sym in entry.parameters[
                                         "potcar_symbols"] if sym])
 
-        if {self.valid_potcars.get(str(el))
-                for el in entry.composition.elements} != psp_settings:
+        elements = frozenset(str(el) for el in entry.composition.elements)
+        expected = self._expected_potcars.get(elements)
+        if expected is None:
+            expected = {self.valid_potcars.get(el) for el in elements}
+            self._expected_potcars[elements] = expected
+        if expected != psp_settings:
             raise CompatibilityError('Incompatible potcar')
         return 0
 
@@ -216,6 +255,81 @@ class AnionCorrection(Correction):
             float))
         self.name = c['Name']
         self.correct_peroxide = correct_peroxide
+        # Results of sulfide_type and oxide_type keyed by structure fingerprint.
+        # Only filled by precompute and emptied by clear_cache, so that the
+        # caches do not grow beyond a single batch of entries.
+        self._sulfide_types = {}
+        self._oxide_types = {}
+
+    def _needs_analysis(self, entry):
+        """
+        Returns whether get_correction needs sulfide_type and oxide_type
+        analyses of the entry structure.
+        """
+        comp = entry.composition
+        if len(comp) == 1 or not hasattr(entry, "structure"):
+            return False, False
+        need_sulfide = Element("S") in comp and not entry.data.get("sulfide_type")
+        need_oxide = Element("O") in comp and self.correct_peroxide and not entry.data.get("oxide_type")
+        return need_sulfide, need_oxide
+
+    def _get_sulfide_type(self, structure):
+        key = get_structure_fingerprint(structure)
+        if key in self._sulfide_types:
+            return self._sulfide_types[key]
+        return sulfide_type(structure)
+
+    def _get_oxide_type(self, structure):
+        key = get_structure_fingerprint(structure)
+        if key in self._oxide_types:
+            return self._oxide_types[key]
+        return oxide_type(structure, 1.05, return_nbonds=True)
+
+    def precompute(self, entries, nproc=None):
+        """
+        Runs the sulfide_type and oxide_type analyses of all entry structures
+        that are not yet cached, optionally in a process pool. Identical
+        structures are only analyzed once.
+
+        Args:
+            entries: List of ComputedEntry objects.
+            nproc (int): Number of processes to use. Defaults to serial.
+        """
+        todo = {}
+        for entry in entries:
+            need_sulfide, need_oxide = self._needs_analysis(entry)
+            if not (need_sulfide or need_oxide):
+                continue
+            key = get_structure_fingerprint(entry.structure)
+            need_sulfide = need_sulfide and key not in self._sulfide_types
+            need_oxide = need_oxide and key not in self._oxide_types
+            if need_sulfide or need_oxide:
+                _, prev_sulfide, prev_oxide = todo.get(key, (None, False, False))
+                todo[key] = (entry.structure, need_sulfide or prev_sulfide, need_oxide or prev_oxide)
+        if not todo:
+            return
+
+        keys = list(todo.keys())
+        args = [todo[k] for k in keys]
+        if nproc is not None and nproc > 1 and len(args) > 1:
+            with multiprocessing.Pool(nproc) as pool:
+                results = pool.map(_anion_type_worker, args,
+                                   chunksize=max(1, len(args) // (4 * nproc)))
+        else:
+            results = [_anion_type_worker(a) for a in args]
+
+        for key, (_, need_sulfide, need_oxide), (sf_type, ox_type) in zip(keys, args, results):
+            if need_sulfide:
+                self._sulfide_types[key] = sf_type
+            if need_oxide:
+                self._oxide_types[key] = ox_type
+
+    def clear_cache(self):
+        """
+        Drops the sulfide_type and oxide_type analyses cached by precompute.
+        """
+        self._sulfide_types.clear()
+        self._oxide_types.clear()
 
     def get_correction(self, entry) -> float:
         """
@@ -233,7 +347,7 @@ class AnionCorrection(Correction):
             if entry.data.get("sulfide_type"):
                 sf_type = entry.data["sulfide_type"]
             elif hasattr(entry, "structure"):
-                sf_type = sulfide_type(entry.structure)
+                sf_type = self._get_sulfide_type(entry.structure)
             if sf_type in self.sulfide_correction:
                 correction += self.sulfide_correction[sf_type] * comp["S"]
 
@@ -250,8 +364,7 @@ class AnionCorrection(Correction):
                         correction += ox_corr * comp["O"]
 
                 elif hasattr(entry, "structure"):
-                    ox_type, nbonds = oxide_type(entry.structure, 1.05,
-                                                 return_nbonds=True)
+                    ox_type, nbonds = self._get_oxide_type(entry.structure)
                     if ox_type in self.oxide_correction:
                         correction += self.oxide_correction[ox_type] * \
                                       nbonds
@@ -455,7 +568,29 @@ class Compatibility(MSONable, metaclass=abc.ABCMeta):
         else:
             return None
 
-    def process_entries(self, entries: Union[ComputedEntry, list], clean: bool = False):
+    def precompute(self, entries, nproc: Optional[int] = None):
+        """
+        Pre-computes and caches any expensive analyses needed by
+        get_adjustments for a batch of entries. Called by process_entries
+        before the entries are processed. The default implementation does
+        nothing.
+
+        Args:
+            entries: List of ComputedEntry objects.
+            nproc (int): Number of processes to use. Defaults to serial.
+        """
+        pass
+
+    def clear_cache(self):
+        """
+        Drops the analyses cached by precompute. Called by process_entries
+        once the entries are processed. The default implementation does
+        nothing.
+        """
+        pass
+
+    def process_entries(self, entries: Union[ComputedEntry, list], clean: bool = False,
+                        nproc: Optional[int] = None):
         """
         Process a sequence of entries with the chosen Compatibility scheme.
 
@@ -464,6 +599,8 @@ class Compatibility(MSONable, metaclass=abc.ABCMeta):
             clean: bool, whether to remove any previously-applied energy adjustments.
                 If True, all EnergyAdjustment are removed prior to processing the Entry.
                 Default is False.
+            nproc (int): Number of processes used to pre-compute expensive
+                structure analyses (see precompute). Defaults to serial.
 
         Returns:
             A list of adjusted entries.  Entries in the original list which
@@ -472,7 +609,20 @@ class Compatibility(MSONable, metaclass=abc.ABCMeta):
         # convert input arg to a list if not already
         if isinstance(entries, ComputedEntry):
             entries = [entries]
+        else:
+            entries = list(entries)
+
+        self.precompute(entries, nproc=nproc)
+        try:
+            return self._process_entries(entries, clean=clean)
+        finally:
+            self.clear_cache()
 
+    def _process_entries(self, entries, clean=False):
+        """
+        Applies the energy adjustments to a list of entries. See
+        process_entries.
+        """
         processed_entry_list = []
 
         for entry in entries:
@@ -564,8 +714,54 @@ class CorrectionsList(Compatibility):
             corrections: List of corrections to apply.
         """
         self.corrections = corrections
+        # Cumulative time in seconds spent in each correction, keyed by
+        # correction name. Reset by process_entries.
+        self.timings = defaultdict(float)
         super().__init__()
 
+    def precompute(self, entries, nproc: Optional[int] = None):
+        """
+        Pre-computes and caches the expensive analyses of all corrections for
+        a batch of entries.
+
+        Args:
+            entries: List of ComputedEntry objects.
+            nproc (int): Number of processes to use. Defaults to serial.
+        """
+        for c in self.corrections:
+            t0 = time.perf_counter()
+            c.precompute(entries, nproc=nproc)
+            self.timings[str(c)] += time.perf_counter() - t0
+
+    def clear_cache(self):
+        """
+        Drops the analyses cached by precompute in all corrections.
+        """
+        for c in self.corrections:
+            c.clear_cache()
+
+    def process_entries(self, entries: Union[ComputedEntry, list], clean: bool = False,
+                        nproc: Optional[int] = None):
+        """
+        Process a sequence of entries with the chosen Compatibility scheme.
+        The time spent in each correction is available in self.timings
+        afterwards.
+
+        Args:
+            entries: ComputedEntry or [ComputedEntry]
+            clean: bool, whether to remove any previously-applied energy adjustments.
+                If True, all EnergyAdjustment are removed prior to processing the Entry.
+                Default is False.
+            nproc (int): Number of processes used to pre-compute expensive
+                structure analyses (see precompute). Defaults to serial.
+
+        Returns:
+            A list of adjusted entries.  Entries in the original list which
+            are not compatible are excluded.
+        """
+        self.timings = defaultdict(float)
+        return super().process_entries(entries, clean=clean, nproc=nproc)
+
     def get_adjustments(self, entry):
         """
         Get the list of energy adjustments to be applied to an entry.
@@ -573,10 +769,11 @@ class CorrectionsList(Compatibility):
         adjustment_list = []
         # try:
         corrections = self.get_corrections_dict(entry)
+        cls = self.as_dict() if corrections else None
         for k, v in corrections.items():
             adjustment_list.append(ConstantEnergyAdjustment(v,
                                                             name=k,
-                                                            cls=self.as_dict(),
+                                                            cls=cls,
                                                             )
                                    )
 
@@ -594,8 +791,12 @@ class CorrectionsList(Compatibility):
         """
         corrections = {}
         for c in self.corrections:
-            val = c.get_correction(entry)
-            corrections[str(c)] = val
+            name = str(c)
+            t0 = time.perf_counter()
+            try:
+                corrections[name] = c.get_correction(entry)
+            finally:
+                self.timings[name] += time.perf_counter() - t0
         return corrections
 
     def get_explanation_dict(self, entry):
@@ -962,7 +1163,8 @@ class MaterialsProjectAqueousCompatibility(Compatibility):
 
         return adjustments
 
-    def process_entries(self, entries: Union[ComputedEntry, list], clean: bool = False):
+    def process_entries(self, entries: Union[ComputedEntry, list], clean: bool = False,
+                        nproc: Optional[int] = None):
         """
         Process a sequence of entries with the chosen Compatibility scheme.
 
@@ -971,6 +1173,8 @@ class MaterialsProjectAqueousCompatibility(Compatibility):
             clean: bool, whether to remove any previously-applied energy adjustments.
                 If True, all EnergyAdjustment are removed prior to processing the Entry.
                 Default is False.
+            nproc (int): Number of processes used by the solid compatibility
+                scheme to pre-compute structure analyses. Defaults to serial.
 
         Returns:
             A list of adjusted entries.  Entries in the original list which
@@ -979,10 +1183,12 @@ class MaterialsProjectAqueousCompatibility(Compatibility):
         # convert input arg to a list if not already
         if isinstance(entries, ComputedEntry):
             entries = [entries]
+        else:
+            entries = list(entries)
 
         # pre-process entries with the given solid compatibility class
         if self.solid_compat:
-            entries = self.solid_compat.process_entries(entries, clean=True)
+            entries = self.solid_compat.process_entries(entries, clean=True, nproc=nproc)
 
         # extract the DFT energies of oxygen and water from the list of entries, if present
         if not self.o2_energy:
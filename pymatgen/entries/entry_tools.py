@@ -16,7 +16,6 @@ __email__ = "shyuep@gmail.com"
 __date__ = "Feb 24, 2012"
 
 import logging
-import json
 import datetime
 import collections
 import itertools
@@ -28,7 +27,7 @@ from pymatgen.core.periodic_table import Element
 from pymatgen.core.composition import Composition
 from pymatgen.analysis.phase_diagram import PDEntry
 from pymatgen.entries.computed_entries import ComputedEntry, ComputedStructureEntry
-from monty.json import MontyEncoder, MontyDecoder, MSONable
+from monty.json import MSONable
 from monty.string import unicode2str
 
 from pymatgen.analysis.structure_matcher import StructureMatcher, \
@@ -46,37 +45,159 @@ def _get_host(structure, species_to_remove):
         return structure
 
 
-def _perform_grouping(args):
-    (entries_json, hosts_json, ltol, stol, angle_tol,
-     primitive_cell, scale, comparator, groups) = args
-
-    entries = json.loads(entries_json, cls=MontyDecoder)
-    hosts = json.loads(hosts_json, cls=MontyDecoder)
-    unmatched = list(zip(entries, hosts))
-    while len(unmatched) > 0:
-        ref_host = unmatched[0][1]
-        logger.info(
-            "Reference tid = {}, formula = {}".format(unmatched[0][0].entry_id,
-                                                      ref_host.formula)
-        )
-        ref_formula = ref_host.composition.reduced_formula
-        logger.info("Reference host = {}".format(ref_formula))
-        matches = [unmatched[0]]
-        for i in range(1, len(unmatched)):
-            test_host = unmatched[i][1]
-            logger.info("Testing tid = {}, formula = {}"
-                        .format(unmatched[i][0].entry_id, test_host.formula))
-            test_formula = test_host.composition.reduced_formula
-            logger.info("Test host = {}".format(test_formula))
-            m = StructureMatcher(ltol=ltol, stol=stol, angle_tol=angle_tol,
-                                 primitive_cell=primitive_cell, scale=scale,
-                                 comparator=comparator)
-            if m.fit(ref_host, test_host):
-                logger.info("Fit found")
-                matches.append(unmatched[i])
-        groups.append(json.dumps([m[0] for m in matches], cls=MontyEncoder))
-        unmatched = list(filter(lambda x: x not in matches, unmatched))
-        logger.info("{} unmatched remaining".format(len(unmatched)))
+def _get_num_reduced_sites(args):
+    """
+    Returns the number of sites of a host after the niggli and primitive cell
+    reductions done by StructureMatcher. Hosts with different numbers of
+    reduced sites never match without supercell or subset matching, so this
+    is used as an exact pre-bucketing fingerprint.
+    """
+    host, primitive_cell = args
+    if primitive_cell:
+        host = host.get_reduced_structure(reduction_algo="niggli")
+        return len(host.get_primitive_structure())
+    return len(host)
+
+
+def _assign_to_groups(args):
+    """
+    Greedily assigns hosts to groups. Each host is matched against the
+    reference host (the first member) of every group in creation order and
+    joins the first group it fits, otherwise it becomes the reference of a
+    new group.
+
+    Returns:
+        List of group indices, where indices >= len(ref_hosts) refer to new
+        groups in order of creation.
+    """
+    ref_hosts, hosts, matcher = args
+    ref_hosts = list(ref_hosts)
+    assignments = []
+    for host in hosts:
+        for i, ref_host in enumerate(ref_hosts):
+            if matcher.fit(ref_host, host):
+                logger.debug("Fit found for {}".format(host.formula))
+                assignments.append(i)
+                break
+        else:
+            assignments.append(len(ref_hosts))
+            ref_hosts.append(host)
+    return assignments
+
+
+def _enumerate_task(args):
+    i, task = args
+    return i, _assign_to_groups(task)
+
+
+class StructureGrouper:
+    """
+    Groups ComputedStructureEntries by structural similarity. Entries can be
+    added in several batches, in which case new entries are merged into the
+    existing groups without re-matching the already grouped entries; the
+    result is the same as grouping all entries at once.
+
+    Only entries whose hosts have the same comparator hash and the same number
+    of sites after primitive cell reduction can match, so entries are first
+    bucketed by these invariants and StructureMatcher.fit is only called
+    within a bucket. Buckets are independent and can be processed in parallel.
+    """
+
+    def __init__(self, species_to_remove=None, ltol=0.2, stol=.4, angle_tol=5,
+                 primitive_cell=True, scale=True,
+                 comparator=SpeciesComparator()):
+        """
+        Args:
+            species_to_remove: Sometimes you want to compare a host framework
+                (e.g., in Li-ion battery analysis). This allows you to specify
+                species to remove before structural comparison.
+            ltol (float): Fractional length tolerance. Default is 0.2.
+            stol (float): Site tolerance in Angstrom. Default is 0.4 Angstrom.
+            angle_tol (float): Angle tolerance in degrees. Default is 5 degrees.
+            primitive_cell (bool): If true: input structures will be reduced to
+                primitive cells prior to matching. Defaults to True.
+            scale: Input structures are scaled to equivalent volume if true;
+                For exact matching, set to False.
+            comparator: A comparator object implementing an equals method that
+                declares equivalency of sites. Default is SpeciesComparator,
+                which implies rigid species mapping.
+        """
+        self.species_to_remove = species_to_remove
+        self.primitive_cell = primitive_cell
+        self.comparator = comparator
+        self.matcher = StructureMatcher(ltol=ltol, stol=stol, angle_tol=angle_tol,
+                                        primitive_cell=primitive_cell, scale=scale,
+                                        comparator=comparator)
+        self.groups = []  # type: List[List[ComputedStructureEntry]]
+        # Reference hosts and group indices, keyed by bucket fingerprint.
+        self._refs = collections.defaultdict(list)
+
+    def add_entries(self, entries, ncpus=None):
+        """
+        Adds entries to the groups.
+
+        Args:
+            entries: Sequence of ComputedStructureEntries.
+            ncpus: Number of cpus to use. Default of None means serial
+                processing.
+
+        Returns:
+            The groups, i.e. a list of lists of entries.
+        """
+        entries = list(entries)
+        hosts = [_get_host(entry.structure, self.species_to_remove)
+                 for entry in entries]
+        pool = None
+        if ncpus and ncpus > 1 and len(entries) > 1:
+            import multiprocessing as mp
+            logger.info("Using {} cpus".format(ncpus))
+            pool = mp.Pool(ncpus)
+        try:
+            args = [(host, self.primitive_cell) for host in hosts]
+            if pool:
+                nsites = pool.map(_get_num_reduced_sites, args,
+                                  chunksize=max(1, len(args) // (4 * ncpus)))
+            else:
+                nsites = [_get_num_reduced_sites(a) for a in args]
+
+            buckets = collections.defaultdict(list)
+            for i, (host, n) in enumerate(zip(hosts, nsites)):
+                buckets[(self.comparator.get_hash(host.composition), n)].append(i)
+
+            # Largest buckets first, so that a single large bucket does not
+            # end up being processed last.
+            keys = sorted(buckets.keys(), key=lambda k: -len(buckets[k]))
+            tasks = [([h for h, _ in self._refs[k]], [hosts[i] for i in buckets[k]],
+                      self.matcher) for k in keys]
+            if pool:
+                # chunksize of 1 lets idle workers pick up the remaining buckets
+                results = dict(pool.imap_unordered(_enumerate_task,
+                                                   enumerate(tasks), chunksize=1))
+                assignments = [results[i] for i in range(len(tasks))]
+            else:
+                assignments = [_assign_to_groups(t) for t in tasks]
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+
+        # Create the new groups in order of their first entry, as if the
+        # entries had been matched one at a time.
+        new_groups = []
+        for k, assigned in zip(keys, assignments):
+            refs = self._refs[k]
+            local_groups = {}
+            for i, a in zip(buckets[k], assigned):
+                if a < len(refs):
+                    self.groups[refs[a][1]].append(entries[i])
+                else:
+                    local_groups.setdefault(a, []).append(i)
+            for a in sorted(local_groups):
+                new_groups.append((k, local_groups[a]))
+        for k, members in sorted(new_groups, key=lambda g: g[1][0]):
+            self._refs[k].append((hosts[members[0]], len(self.groups)))
+            self.groups.append([entries[i] for i in members])
+        return self.groups
 
 
 def group_entries_by_structure(entries, species_to_remove=None,
@@ -86,7 +207,8 @@ def group_entries_by_structure(entries, species_to_remove=None,
                                ncpus=None):
     """
     Given a sequence of ComputedStructureEntries, use structure fitter to group
-    them by structural similarity.
+    them by structural similarity. See StructureGrouper to merge further
+    entries into the groups later on.
 
     Args:
         entries: Sequence of ComputedStructureEntries.
@@ -112,35 +234,11 @@ def group_entries_by_structure(entries, species_to_remove=None,
     """
     start = datetime.datetime.now()
     logger.info("Started at {}".format(start))
-    entries_host = [(entry, _get_host(entry.structure, species_to_remove))
-                    for entry in entries]
-    if ncpus:
-        symm_entries = collections.defaultdict(list)
-        for entry, host in entries_host:
-            symm_entries[comparator.get_structure_hash(host)].append((entry,
-                                                                      host))
-        import multiprocessing as mp
-        logging.info("Using {} cpus".format(ncpus))
-        manager = mp.Manager()
-        groups = manager.list()
-        p = mp.Pool(ncpus)
-        # Parallel processing only supports Python primitives and not objects.
-        p.map(_perform_grouping,
-              [(json.dumps([e[0] for e in eh], cls=MontyEncoder),
-                json.dumps([e[1] for e in eh], cls=MontyEncoder),
-                ltol, stol, angle_tol, primitive_cell, scale,
-                comparator, groups)
-               for eh in symm_entries.values()])
-    else:
-        groups = []
-        hosts = [host for entry, host in entries_host]
-        _perform_grouping((json.dumps(entries, cls=MontyEncoder),
-                           json.dumps(hosts, cls=MontyEncoder),
-                           ltol, stol, angle_tol, primitive_cell, scale,
-                           comparator, groups))
-    entry_groups = []
-    for g in groups:
-        entry_groups.append(json.loads(g, cls=MontyDecoder))
+    grouper = StructureGrouper(species_to_remove=species_to_remove, ltol=ltol,
+                               stol=stol, angle_tol=angle_tol,
+                               primitive_cell=primitive_cell, scale=scale,
+                               comparator=comparator)
+    entry_groups = grouper.add_entries(entries, ncpus=ncpus)
     logging.info("Finished at {}".format(datetime.datetime.now()))
     logging.info("Took {}".format(datetime.datetime.now() - start))
     return entry_groups
@@ -9,11 +9,12 @@ import pytest
 
 from monty.json import MontyDecoder
 from pymatgen.entries.compatibility import Compatibility, MaterialsProjectCompatibility, \
-    MITCompatibility, AqueousCorrection, MITAqueousCompatibility, MaterialsProjectAqueousCompatibility, \
-    CompatibilityError, MU_H2O
+    MITCompatibility, AqueousCorrection, AnionCorrection, MITAqueousCompatibility, \
+    MaterialsProjectAqueousCompatibility, CompatibilityError, MU_H2O
 from pymatgen.entries.computed_entries import ComputedEntry, \
     ComputedStructureEntry, ConstantEnergyAdjustment
 from pymatgen import Composition, Lattice, Structure, Element
+from pymatgen.util.coord import get_structure_fingerprint
 
 
 # abstract Compatibility tests
@@ -183,6 +184,10 @@ class MaterialsProjectCompatibilityTest(unittest.TestCase):
                                          'hash': '7a25bc5b9a5393f46600a4939d357982'}]})
         self.assertIsNotNone(self.compat.process_entry(entry))
 
+    def test_process_entries_generator(self):
+        processed = self.compat.process_entries(e for e in [self.entry1])
+        self.assertEqual(len(processed), 1)
+
     def test_correction_values(self):
         # test_corrections
         self.assertAlmostEqual(self.compat.process_entry(self.entry1).correction,
@@ -584,6 +589,48 @@ class OxideTypeCorrectionTest(unittest.TestCase):
         lio2_entry_corrected = self.compat.process_entry(lio2_entry)
         self.assertAlmostEqual(lio2_entry_corrected.energy, -3 - 0.13893 * 4, 4)
 
+    def test_process_entries_nproc(self):
+        latt = Lattice([[3.985034, 0.0, 0.0],
+                        [0.0, 4.881506, 0.0],
+                        [0.0, 0.0, 2.959824]])
+        coords = [[0.500000, 0.500000, 0.500000],
+                  [0.0, 0.0, 0.0],
+                  [0.632568, 0.085090, 0.500000],
+                  [0.367432, 0.914910, 0.500000],
+                  [0.132568, 0.414910, 0.000000],
+                  [0.867432, 0.585090, 0.000000]]
+        struct = Structure(latt, ["Li", "Li", "O", "O", "O", "O"], coords)
+        params = {'is_hubbard': False, 'hubbards': None, 'run_type': 'GGA',
+                  'potcar_spec': [{'titel': 'PAW_PBE Li 17Jan2003',
+                                   'hash': '65e83282d1707ec078c1012afbd05be8'},
+                                  {'titel': 'PAW_PBE O 08Apr2002',
+                                   'hash': '7a25bc5b9a5393f46600a4939d357982'}]}
+        structs = [struct]
+        for scale in [1.01, 1.02]:
+            structs.append(struct.copy())
+            structs[-1].scale_lattice(struct.volume * scale)
+        entries = [ComputedStructureEntry(s.copy(), -3, parameters=params)
+                   for s in structs * 2]
+
+        processed = self.compat.process_entries(entries, nproc=2)
+        self.assertEqual(len(processed), 6)
+        for e in processed:
+            self.assertAlmostEqual(e.energy, -3 - 0.13893 * 4, 4)
+        self.assertEqual(set(self.compat.timings.keys()),
+                         {str(c) for c in self.compat.corrections})
+
+        anion_corr = [c for c in self.compat.corrections if isinstance(c, AnionCorrection)][0]
+        self.assertEqual(anion_corr._oxide_types, {})
+        anion_corr.precompute(entries)
+        for s in structs:
+            self.assertEqual(anion_corr._oxide_types[get_structure_fingerprint(s)][0], "superoxide")
+        anion_corr.clear_cache()
+        self.assertEqual(anion_corr._oxide_types, {})
+
+        # generators are consumed only once
+        processed = self.compat.process_entries(e for e in entries)
+        self.assertEqual(len(processed), 6)
+
     def test_process_entry_peroxide(self):
         latt = Lattice.from_parameters(3.159597, 3.159572, 7.685205, 89.999884, 89.999674, 60.000510)
         el_li = Element("Li")
@@ -775,6 +822,11 @@ class TestMaterialsProjectAqueousCompatibility():
         h2o_form_e = 3 * h2o_entry_2.energy_per_atom - 2 * h2_entry_2.energy_per_atom - o2_entry_1.energy_per_atom
         assert h2o_form_e == pytest.approx(MU_H2O)
 
+    def test_process_entries_generator(self):
+        compat = MaterialsProjectAqueousCompatibility(o2_energy=-4.9276, h2o_energy=-5.195, h2o_adjustments=-0.234)
+        entries = [ComputedEntry(Composition("H2O"), -16), ComputedEntry(Composition("H2"), -16)]
+        assert len(compat.process_entries(e for e in entries)) == 2
+
     def test_h_h2o_energy_no_args(self):
 
         with pytest.warns(UserWarning, match="You did not provide the required O2 and H2O energies."):
@@ -8,7 +8,7 @@ from pathlib import Path
 from monty.serialization import loadfn, dumpfn
 import os
 from pymatgen.core.periodic_table import Element
-from pymatgen.entries.entry_tools import group_entries_by_structure, EntrySet
+from pymatgen.entries.entry_tools import group_entries_by_structure, EntrySet, StructureGrouper
 
 test_dir = Path(__file__).absolute().parent / ".." / ".." / ".." / 'test_files'
 
@@ -24,6 +24,20 @@ class FuncTest(unittest.TestCase):
         # Make sure no entries are left behind
         self.assertEqual(sum([len(g) for g in groups]), len(entries))
 
+        groups_par = group_entries_by_structure(entries, ncpus=2)
+        self.assertEqual([[e.entry_id for e in g] for g in groups_par],
+                         [[e.entry_id for e in g] for g in groups])
+
+    def test_structure_grouper(self):
+        entries = loadfn(str(test_dir / "TiO2_entries.json"))
+        groups = group_entries_by_structure(entries)
+        grouper = StructureGrouper()
+        grouper.add_entries(entries[:7])
+        self.assertEqual(sum([len(g) for g in grouper.groups]), 7)
+        grouper.add_entries(entries[7:])
+        self.assertEqual([[e.entry_id for e in g] for g in grouper.groups],
+                         [[e.entry_id for e in g] for g in groups])
+
 
 class EntrySetTest(unittest.TestCase):
 
@@ -4,6 +4,9 @@
 
 import unittest
 import os
+import tempfile
+
+import numpy as np
 
 from pymatgen.core.structure import Molecule
 from pymatgen.io.xyz import XYZ
@@ -166,6 +169,37 @@ O 9.405548 4.550379 1.231183
 O 9.960184 1.516793 1.393875"""
         self.assertEqual(str(xyz), ans)
 
+    def test_frame_index(self):
+        filepath = os.path.join(test_dir, 'multiple_frame_xyz.xyz')
+        mxyz = XYZ.from_file(filepath)
+        offsets = XYZ.get_frame_offsets(filepath)
+        self.assertEqual(len(offsets), 302)
+        for i in [0, 17, -1]:
+            species, coords = XYZ.read_frame(filepath, i, offsets=offsets)
+            mol = mxyz.all_molecules[i]
+            self.assertEqual(species, [site.species_string for site in mol])
+            self.assertTrue(np.array_equal(coords, mol.cart_coords))
+        frames = list(XYZ.iter_frames(filepath))
+        self.assertEqual(len(frames), 302)
+        self.assertTrue(np.array_equal(frames[-1][1],
+                                       mxyz.molecule.cart_coords))
+
+    def test_write_frames(self):
+        coords = np.array([m.cart_coords for m in self.multi_mols])
+        species = [site.species_string for site in self.mol]
+        with tempfile.TemporaryDirectory() as d:
+            fname = os.path.join(d, "traj.xyz")
+            XYZ.write_frames(fname, species, coords, coord_precision=3)
+            with open(fname) as f:
+                self.assertEqual(f.read().strip(),
+                                 str(XYZ(self.multi_mols, coord_precision=3)))
+            frames = list(XYZ.iter_frames(fname))
+            self.assertEqual(len(frames), 2)
+            self.assertEqual(frames[1][0], species)
+            self.assertTrue(np.allclose(frames[1][1], coords[1], atol=1e-3))
+            self.assertRaises(ValueError, XYZ.write_frames, fname,
+                              species[:2], coords)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -15,12 +15,15 @@ import logging
 import math
 import json
 import glob
+import pickle
 import subprocess
 
 import numpy as np
 
 from numpy.linalg import det
 from collections import OrderedDict, namedtuple
+from copy import deepcopy
+from functools import lru_cache
 from hashlib import md5
 
 from monty.io import zopen
@@ -136,8 +139,13 @@ class Poscar(MSONable):
                 site_properties["velocities"] = velocities
             if predictor_corrector:
                 site_properties["predictor_corrector"] = predictor_corrector
-            structure = Structure.from_sites(structure)
-            self.structure = structure.copy(site_properties=site_properties)
+            props = structure.site_properties
+            props.update(site_properties)
+            # Build the (mutable) copy in a single pass.
+            self.structure = Structure(structure.lattice,
+                                       structure.species_and_occu,
+                                       structure.frac_coords,
+                                       site_properties=props)
             if sort_structure:
                 self.structure = self.structure.get_sorted_structure()
             self.true_names = true_names
@@ -404,15 +412,18 @@ class Poscar(MSONable):
                     "Defaulting to false names %s." % " ".join(atomic_symbols)
                 )
 
-        # read the atomic coordinates
-        coords = []
-        selective_dynamics = list() if sdynamics else None
-        for i in range(nsites):
-            toks = lines[ipos + 1 + i].split()
-            crd_scale = scale if cart else 1
-            coords.append([float(j) * crd_scale for j in toks[:3]])
-            if sdynamics:
-                selective_dynamics.append([tok.upper()[0] == "T" for tok in toks[3:6]])
+        # read the atomic coordinates in a single numeric conversion
+        ntoks = 6 if sdynamics else 3
+        toks = np.array([l.split()[:ntoks] for l in lines[ipos + 1: ipos + 1 + nsites]])
+        if toks.shape != (nsites, ntoks):
+            raise ValueError("Invalid coordinates block in POSCAR.")
+        coords = toks[:, :3].astype(float)
+        if cart:
+            coords *= scale
+        selective_dynamics = None
+        if sdynamics:
+            flags = np.char.upper(toks[:, 3:6])
+            selective_dynamics = np.char.startswith(flags, "T").tolist()
 
         struct = Structure(
             lattice,
@@ -500,28 +511,36 @@ class Poscar(MSONable):
         for v in latt.matrix:
             lines.append(" ".join([format_str.format(c) for c in v]))
 
+        species = [site.specie for site in self.structure]
+        groups = [(sym, len(tuple(g))) for sym, g in
+                  itertools.groupby([sp.symbol for sp in species])]
         if self.true_names and not vasp4_compatible:
-            lines.append(" ".join(self.site_symbols))
-        lines.append(" ".join([str(x) for x in self.natoms]))
+            lines.append(" ".join([g[0] for g in groups]))
+        lines.append(" ".join([str(g[1]) for g in groups]))
         if self.selective_dynamics:
             lines.append("Selective dynamics")
         lines.append("direct" if direct else "cartesian")
 
+        # The whole coordinates block is formatted with a single
+        # interpolation of a per-site template.
+        fmt = "%.{0}f".format(significant_figures)
+        xyz_fmt = " ".join([fmt] * 3)
         selective_dynamics = self.selective_dynamics
-        for (i, site) in enumerate(self.structure):
-            coords = site.frac_coords if direct else site.coords
-            line = " ".join([format_str.format(c) for c in coords])
+        template = []
+        for (i, sp) in enumerate(species):
+            line = xyz_fmt
             if selective_dynamics is not None:
                 sd = ["T" if j else "F" for j in selective_dynamics[i]]
                 line += " %s %s %s" % (sd[0], sd[1], sd[2])
-            line += " " + site.species_string
-            lines.append(line)
+            line += " " + str(sp).replace("%", "%%")
+            template.append(line)
+        coords = self.structure.frac_coords if direct else self.structure.cart_coords
+        lines.append("\n".join(template) % tuple(coords.ravel()))
 
         if self.velocities:
             try:
                 lines.append("")
-                for v in self.velocities:
-                    lines.append(" ".join([format_str.format(i) for i in v]))
+                lines.append(_format_block(self.velocities, fmt))
             except Exception:
                 warnings.warn("Velocities are missing or corrupted.")
 
@@ -531,8 +550,7 @@ class Poscar(MSONable):
                 lines.append(self.predictor_corrector_preamble)
                 pred = np.array(self.predictor_corrector)
                 for col in range(3):
-                    for z in pred[:, col]:
-                        lines.append(" ".join([format_str.format(i) for i in z]))
+                    lines.append(_format_block(pred[:, col], fmt))
             else:
                 warnings.warn(
                     "Preamble information missing or corrupt. "
@@ -1613,6 +1631,23 @@ class Kpoints(MSONable):
         )
 
 
+def _format_block(data, fmt):
+    """
+    Formats a 2D array of floats as lines of space separated values with a
+    single string interpolation.
+
+    Args:
+        data: 2D array-like of floats.
+        fmt: %-style format for each value, e.g., "%.6f".
+
+    Returns:
+        String with one line per row of data.
+    """
+    data = np.asarray(data, dtype=float)
+    line = " ".join([fmt] * data.shape[1])
+    return "\n".join([line] * data.shape[0]) % tuple(data.ravel())
+
+
 def _parse_string(s):
     return "{}".format(s.strip())
 
@@ -1859,6 +1894,17 @@ class PotcarSingle:
     def __str__(self):
         return self.data + "\n"
 
+    def copy(self) -> "PotcarSingle":
+        """
+        :return: A copy of the PotcarSingle that does not share the parsed
+            keywords with the original, without parsing the data again.
+        """
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
+        new.keywords = deepcopy(self.keywords)
+        new.PSCTR = deepcopy(self.PSCTR)
+        return new
+
     @property
     def electron_configuration(self):
         """
@@ -1918,7 +1964,11 @@ class PotcarSingle:
     @staticmethod
     def from_symbol_and_functional(symbol: str, functional: str = None):
         """
-        Makes a PotcarSingle from a symbol and functional.
+        Makes a PotcarSingle from a symbol and functional. Parsed POTCARs
+        are kept in a process-wide LRU cache keyed on the file path and
+        modification time, so repeated calls only copy the cached
+        PotcarSingle (and hash validation warnings are only issued on the
+        first call).
 
         :param symbol: Symbol, e.g., Li_sv
         :param functional: E.g., PBE
@@ -1940,17 +1990,123 @@ class PotcarSingle:
             os.path.join(d, funcdir, "POTCAR.{}".format(symbol)),
             os.path.join(d, funcdir, symbol, "POTCAR"),
         ]
+        index = _load_potcar_index(d)
+        if index is not None:
+            relpath = index["paths"].get((funcdir, symbol))
+            if relpath is not None:
+                paths_to_try.insert(0, os.path.join(d, relpath))
         for p in paths_to_try:
             p = os.path.expanduser(p)
             p = zpath(p)
-            if os.path.exists(p):
-                psingle = PotcarSingle.from_file(p)
-                return psingle
+            try:
+                mtime = os.stat(p).st_mtime
+            except OSError:
+                continue
+            return _load_potcar_single(p, mtime).copy()
         raise IOError(
             "You do not have the right POTCAR with functional "
             + "{} and label {} in your VASP_PSP_DIR".format(functional, symbol)
         )
 
+    @staticmethod
+    def build_index(psp_dir: str = None, filename: str = None) -> dict:
+        """
+        Indexes all the POTCARs in a POTCAR library into a compact binary
+        (pickle) file. The index is picked up automatically by
+        from_symbol_and_functional when it is located at the default
+        location, avoiding the search for POTCAR files. It also maps the
+        hashes of all POTCARs to their symbols and functionals for O(1)
+        identification of POTCARs from the local library, see
+        lookup_hash. Rebuild the index if POTCARs are added to the library;
+        hash entries of POTCAR files modified since indexing are ignored.
+
+        Args:
+            psp_dir (str): POTCAR library directory. Defaults to the
+                PMG_VASP_PSP_DIR setting.
+            filename (str): Output filename. Defaults to
+                POTCAR_INDEX_FILENAME in psp_dir.
+
+        Returns:
+            The index as a dict with keys "paths", mapping (functional
+            directory, symbol) to a path relative to psp_dir, "hashes",
+            mapping POTCAR data hashes to lists of (symbol, functional,
+            path), and "mtimes", mapping paths to the modification times
+            of the files when they were indexed.
+        """
+        psp_dir = psp_dir or SETTINGS.get("PMG_VASP_PSP_DIR")
+        if psp_dir is None:
+            raise ValueError("No POTCAR library specified. Please set the "
+                             "PMG_VASP_PSP_DIR environment in .pmgrc.yaml.")
+        psp_dir = os.path.expanduser(psp_dir)
+        paths = {}
+        hashes = {}  # type: dict
+        mtimes = {}
+        for funcdir in sorted(set(PotcarSingle.functional_dir.values())):
+            for p in sorted(glob.glob(os.path.join(psp_dir, funcdir, "*"))):
+                name = os.path.basename(p)
+                if name.startswith("POTCAR."):
+                    symbol = name[len("POTCAR."):]
+                    for ext in (".gz", ".GZ", ".bz2", ".BZ2", ".z", ".Z"):
+                        if symbol.endswith(ext):
+                            symbol = symbol[:-len(ext)]
+                            break
+                elif os.path.isdir(p):
+                    symbol = name
+                    p = zpath(os.path.join(p, "POTCAR"))
+                    if not os.path.exists(p):
+                        continue
+                else:
+                    continue
+                if (funcdir, symbol) in paths:
+                    continue
+                relpath = os.path.relpath(p, psp_dir)
+                paths[(funcdir, symbol)] = relpath
+                mtimes[relpath] = os.stat(p).st_mtime
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    potcar_hash = PotcarSingle.from_file(p).hash
+                for functional, d in PotcarSingle.functional_dir.items():
+                    if d == funcdir:
+                        hashes.setdefault(potcar_hash, []).append(
+                            (symbol, functional, relpath))
+        index = {"paths": paths, "hashes": hashes, "mtimes": mtimes}
+        filename = filename or os.path.join(psp_dir, POTCAR_INDEX_FILENAME)
+        with open(filename, "wb") as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        _read_potcar_index.cache_clear()
+        return index
+
+    @staticmethod
+    def lookup_hash(potcar_hash: str, psp_dir: str = None) -> list:
+        """
+        Looks up the POTCARs of a POTCAR library with a given data hash
+        (PotcarSingle.hash) in the index built by build_index. POTCAR files
+        that were modified after the index was built are skipped.
+
+        Args:
+            potcar_hash (str): POTCAR data hash.
+            psp_dir (str): POTCAR library directory. Defaults to the
+                PMG_VASP_PSP_DIR setting.
+
+        Returns:
+            List of (symbol, functional) of the matching POTCARs. Empty if
+            there are none or the library has not been indexed.
+        """
+        psp_dir = psp_dir or SETTINGS.get("PMG_VASP_PSP_DIR")
+        index = _load_potcar_index(psp_dir) if psp_dir else None
+        if index is None:
+            return []
+        matches = []
+        for symbol, functional, relpath in index["hashes"].get(potcar_hash, []):
+            try:
+                mtime = os.stat(os.path.join(os.path.expanduser(psp_dir),
+                                             relpath)).st_mtime
+            except OSError:
+                continue
+            if mtime == index["mtimes"][relpath]:
+                matches.append((symbol, functional))
+        return matches
+
     @property
     def element(self):
         """
@@ -2096,18 +2252,21 @@ class PotcarSingle:
                                                 by univie."}
                         }
 
-        cwd = os.path.abspath(os.path.dirname(__file__))
-
         if mode == 'data':
-            hash_db = loadfn(os.path.join(cwd, "vasp_potcar_pymatgen_hashes.json"))
             potcar_hash = self.hash
         elif mode == 'file':
-            hash_db = loadfn(os.path.join(cwd, "vasp_potcar_file_hashes.json"))
             potcar_hash = self.file_hash
         else:
             raise ValueError("Bad 'mode' argument. Specify 'data' or 'file'.")
+        hash_db = _load_potcar_hash_db(mode)
 
         identity = hash_db.get(potcar_hash)
+        if not identity and mode == 'data':
+            # fall back to the index of the local POTCAR library, if any
+            matches = PotcarSingle.lookup_hash(potcar_hash)
+            if matches:
+                return (sorted(set(m[1] for m in matches)),
+                        sorted(set(m[0] for m in matches)))
 
         if identity:
             # convert the potcar_functionals from the .json dict into the functional
@@ -2179,6 +2338,80 @@ class PotcarSingle:
             raise AttributeError(a)
 
 
+POTCAR_INDEX_FILENAME = "pmg_potcar_index.pickle"
+
+
+@lru_cache(maxsize=None)
+def _load_potcar_hash_db(mode):
+    """
+    Loads (once) the database of known POTCAR hashes.
+
+    Args:
+        mode (str): 'data' or 'file', see PotcarSingle.identify_potcar.
+
+    Returns:
+        dict of hash: identity.
+    """
+    fname = "vasp_potcar_pymatgen_hashes.json" if mode == "data" \
+        else "vasp_potcar_file_hashes.json"
+    return loadfn(os.path.join(os.path.dirname(os.path.abspath(__file__)), fname))
+
+
+@lru_cache(maxsize=256)
+def _load_potcar_single(path, mtime):
+    """
+    Process-wide bounded LRU cache of parsed PotcarSingles. The modification
+    time is part of the key so that updated POTCAR files are re-read.
+
+    Args:
+        path (str): Path to POTCAR file.
+        mtime (float): Modification time of the file.
+
+    Returns:
+        PotcarSingle
+    """
+    return PotcarSingle.from_file(path)
+
+
+def _load_potcar_index(psp_dir):
+    """
+    Loads the index built by PotcarSingle.build_index for a POTCAR library,
+    if present. The index is re-read when the index file is modified.
+
+    Args:
+        psp_dir (str): POTCAR library directory.
+
+    Returns:
+        The index dict, or None if the library has not been indexed.
+    """
+    fname = os.path.join(os.path.expanduser(psp_dir), POTCAR_INDEX_FILENAME)
+    try:
+        mtime = os.stat(fname).st_mtime
+    except OSError:
+        return None
+    return _read_potcar_index(fname, mtime)
+
+
+@lru_cache(maxsize=8)
+def _read_potcar_index(fname, mtime):
+    """
+    Cached reading of a POTCAR library index. The modification time is
+    part of the key so that rebuilt indices are re-read.
+
+    Args:
+        fname (str): Path to the index file.
+        mtime (float): Modification time of the file.
+
+    Returns:
+        The index dict, or None if the file cannot be read.
+    """
+    try:
+        with open(fname, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
 class Potcar(list, MSONable):
     """
     Object for reading and writing POTCAR files for calculations. Consists of a
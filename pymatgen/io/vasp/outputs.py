@@ -2950,6 +2950,9 @@ class VolumetricData(MSONable):
         # lazy init the spin data since this is not always needed.
         self._spin_data = {}
         self._distance_matrix = {} if not distance_matrix else distance_matrix
+        # planar and macroscopic averages, cached per data key and direction
+        # together with the data array they were computed from
+        self._averages = {}
         self.xpoints = np.linspace(0.0, 1.0, num=self.dim[0])
         self.ypoints = np.linspace(0.0, 1.0, num=self.dim[1])
         self.zpoints = np.linspace(0.0, 1.0, num=self.dim[2])
@@ -3209,18 +3212,21 @@ class VolumetricData(MSONable):
         Get a data value from self.data at a given point (x, y, z) in terms 
         of fractional lattice parameters. Will be interpolated using a 
         RegularGridInterpolator on self.data if (x, y, z) is not in the original 
-        set of data points.
+        set of data points. x, y and z may also be arrays, in which case all
+        the points are interpolated in one call.
 
         Args:
-            x (float): Fraction of lattice vector a.
-            y (float): Fraction of lattice vector b.
-            z (float): Fraction of lattice vector c.
+            x (float/array): Fraction of lattice vector a.
+            y (float/array): Fraction of lattice vector b.
+            z (float/array): Fraction of lattice vector c.
 
         Returns:
             Value from self.data (potentially interpolated) correspondisng to 
-            the point (x, y, z).
+            the point (x, y, z), or an array of values if arrays were given.
         """
-        return self.interpolator([x, y, z])[0]
+        if np.ndim(x) == 0 and np.ndim(y) == 0 and np.ndim(z) == 0:
+            return self.interpolator([x, y, z])[0]
+        return self.interpolator(np.stack(np.broadcast_arrays(x, y, z), axis=-1))
 
     def linear_slice(self, p1, p2, n=100):
         """
@@ -3241,13 +3247,12 @@ class VolumetricData(MSONable):
         xpts = np.linspace(p1[0], p2[0], num=n)
         ypts = np.linspace(p1[1], p2[1], num=n)
         zpts = np.linspace(p1[2], p2[2], num=n)
-        return [self.value_at(xpts[i], ypts[i], zpts[i]) for i in range(n)]
+        return list(self.value_at(xpts, ypts, zpts))
 
     def get_integrated_diff(self, ind, radius, nbins=1):
         """
-        Get integrated difference of atom index ind up to radius. This can be
-        an extremely computationally intensive process, depending on how many
-        grid points are in the VolumetricData.
+        Get integrated difference of atom index ind up to radius. See
+        get_sphere_integrals to integrate around many atoms at once.
 
         Args:
             ind (int): Index of atom.
@@ -3262,48 +3267,88 @@ class VolumetricData(MSONable):
             ...]. Format is for ease of plotting. E.g., plt.plot(data[:,0],
             data[:,1])
         """
-        # For non-spin-polarized runs, this is zero by definition.
-        if not self.is_spin_polarized:
-            radii = [radius / nbins * (i + 1) for i in range(nbins)]
-            data = np.zeros((nbins, 2))
-            data[:, 0] = radii
-            return data
-
-        struct = self.structure
-        a = self.dim
-        if ind not in self._distance_matrix or \
-                self._distance_matrix[ind]["max_radius"] < radius:
-            coords = []
-            for (x, y, z) in itertools.product(*[list(range(i)) for i in a]):
-                coords.append([x / a[0], y / a[1], z / a[2]])
-            sites_dist = struct.lattice.get_points_in_sphere(
-                coords, struct[ind].coords, radius)
-            self._distance_matrix[ind] = {"max_radius": radius,
-                                          "data": np.array(sites_dist)}
-
-        data = self._distance_matrix[ind]["data"]
-
-        # Use boolean indexing to find all charges within the desired distance.
-        inds = data[:, 1] <= radius
-        dists = data[inds, 1]
-        data_inds = np.rint(np.mod(list(data[inds, 0]), 1) *
-                            np.tile(a, (len(dists), 1))).astype(int)
-        vals = [self.data["diff"][x, y, z] for x, y, z in data_inds]
-
-        hist, edges = np.histogram(dists, bins=nbins,
-                                   range=[0, radius],
-                                   weights=vals)
         data = np.zeros((nbins, 2))
-        data[:, 0] = edges[1:]
-        data[:, 1] = [sum(hist[0:i + 1]) / self.ngridpts
-                      for i in range(nbins)]
+        data[:, 0] = [radius / nbins * (i + 1) for i in range(nbins)]
+        # For non-spin-polarized runs, this is zero by definition.
+        if self.is_spin_polarized:
+            data[:, 1] = self.get_sphere_integrals(radius, nbins=nbins, inds=[ind])[0]
         return data
 
+    def get_sphere_integrals(self, radius, nbins=1, inds=None, data_key="diff"):
+        """
+        Integrates the volumetric data in spheres around atoms, e.g., the
+        magnetization ("diff") or charge ("total") around every site. All
+        grid points (including periodic images) within radius of a site are
+        found with a stencil of grid offsets that is computed once for the
+        lattice and grid, see _get_sphere_stencil.
+
+        Args:
+            radius (float): Radius of integration.
+            nbins (int): Number of bins. Defaults to 1. This allows one to
+                obtain the cumulative integration values for radii
+                [radius/nbins, 2 * radius/nbins, ....].
+            inds ([int]): Indices of the sites to integrate around. Defaults
+                to all sites.
+            data_key (str): Key of self.data to integrate. Defaults to "diff".
+
+        Returns:
+            np.array of shape (len(inds), nbins) with the cumulative
+            integrated values, normalized by the number of grid points as for
+            the data in CHGCAR files.
+        """
+        inds = range(len(self.structure)) if inds is None else inds
+        values = self.data[data_key]
+        a = np.array(self.dim)
+        stencil = self._get_sphere_stencil(radius)
+        offsets, vectors = stencil["offsets"], stencil["vectors"]
+        voxel = self.structure.lattice.matrix / a[:, None]
+
+        integrals = np.zeros((len(inds), nbins))
+        for i, ind in enumerate(inds):
+            # split the site position into a grid point and the offset from it
+            grid_coords = self.structure[ind].frac_coords * a
+            base = np.floor(grid_coords)
+            dists = np.linalg.norm(vectors - np.dot(grid_coords - base, voxel), axis=1)
+            within = dists <= radius
+            grid_inds = np.mod(offsets[within] + base.astype(int), a)
+            vals = values[grid_inds[:, 0], grid_inds[:, 1], grid_inds[:, 2]]
+            hist, edges = np.histogram(dists[within], bins=nbins,
+                                       range=[0, radius], weights=vals)
+            integrals[i] = np.cumsum(hist) / self.ngridpts
+        return integrals
+
+    def _get_sphere_stencil(self, radius):
+        """
+        Returns the integer grid offsets (and their cartesian vectors) of all
+        grid points that can be within radius of a point in the voxel spanned
+        by the origin grid point, i.e., all offsets within radius plus the
+        voxel diagonal. This depends only on the lattice and grid, so the
+        stencil is computed once and shared with copies and sums through
+        self._distance_matrix.
+        """
+        stencil = self._distance_matrix.get("stencil")
+        if stencil is None or stencil["max_radius"] < radius:
+            a = np.array(self.dim)
+            lattice = self.structure.lattice
+            voxel = lattice.matrix / a[:, None]
+            corners = np.array(list(itertools.product([0, 1], repeat=3)))
+            cutoff = radius + np.max(np.linalg.norm(np.dot(corners, voxel), axis=1))
+            recip_lengths = np.linalg.norm(lattice.reciprocal_lattice_crystallographic.matrix, axis=1)
+            nmax = np.ceil(cutoff * recip_lengths * a).astype(int)
+            offsets = np.array(np.meshgrid(*[np.arange(-n, n + 1) for n in nmax],
+                                           indexing="ij")).reshape(3, -1).T
+            vectors = np.dot(offsets, voxel)
+            within = np.linalg.norm(vectors, axis=1) <= cutoff
+            stencil = {"max_radius": radius, "offsets": offsets[within],
+                       "vectors": vectors[within]}
+            self._distance_matrix["stencil"] = stencil
+        return stencil
+
     def get_average_along_axis(self, ind):
         """
         Get the averaged total of the volumetric data a certain axis direction.
         For example, useful for visualizing Hartree Potentials from a LOCPOT
-        file.
+        file. The average is cached, see get_planar_average.
 
         Args:
             ind (int): Index of axis.
@@ -3311,15 +3356,119 @@ class VolumetricData(MSONable):
         Returns:
             Average total along axis
         """
-        m = self.data["total"]
-        ng = self.dim
-        if ind == 0:
-            total = np.sum(np.sum(m, axis=1), 1)
-        elif ind == 1:
-            total = np.sum(np.sum(m, axis=0), 1)
-        else:
-            total = np.sum(np.sum(m, axis=0), 0)
-        return total / ng[(ind + 1) % 3] / ng[(ind + 2) % 3]
+        return self.get_planar_average(ind)
+
+    def get_planar_average(self, axis, data_key="total"):
+        """
+        Get the planar average of the volumetric data along a lattice
+        direction. Averages are cached per data key and direction, so
+        repeated calls (e.g. for work functions and defect potential
+        alignments) only average the grid once. The cache is refreshed when
+        a new array is assigned to self.data[data_key], but not when the
+        array is modified in place, so replace the array instead, e.g.
+        ``vd.data["total"] = vd.data["total"] * 2``.
+
+        Args:
+            axis (int or tuple): Either the index of a lattice vector, in
+                which case the data is averaged over the planes spanned by the
+                two other lattice vectors (same as get_average_along_axis), or
+                the Miller indices (h, k, l) of the planes to average over.
+                Averages over Miller planes are obtained from the Fourier
+                components of the data along the plane normal.
+            data_key (str): Key of the data to average, e.g., "total" or
+                "diff".
+
+        Returns:
+            Planar averages of equally spaced planes, from the origin up to
+            the interplanar spacing d_hkl. For a lattice vector index, there
+            is one plane per grid point along that axis.
+        """
+        hkl = self._get_miller_index(axis)
+
+        def get_average(m):
+            if hkl.count(0) == 2:
+                ind = int(np.flatnonzero(hkl))
+                others = tuple(i for i in range(3) if i != ind)
+                avg = m.sum(axis=others) / self.dim[others[0]] \
+                    / self.dim[others[1]]
+                if hkl[ind] < 0:
+                    avg = avg[-np.arange(len(avg))]
+            else:
+                # sample as many planes as the grid resolves without aliasing
+                npts = min(n // abs(i) for n, i in zip(self.dim, hkl) if i)
+                freqs = np.rint(np.fft.fftfreq(npts) * npts).astype(int)
+                coeffs = np.fft.fftn(m)[tuple(np.outer(hkl, freqs)
+                                              % np.array(self.dim)[:, None])]
+                avg = np.fft.ifft(coeffs).real * npts / self.ngridpts
+            return avg
+
+        return self._get_cached_average((data_key, hkl), get_average)
+
+    def get_macroscopic_average(self, axis, window, data_key="total"):
+        """
+        Get the macroscopic average of the volumetric data along a lattice
+        direction, i.e., the planar average convolved with a box-car window
+        along the plane normal. The convolution is performed with FFTs and
+        the result is cached per data array, direction and window, with the
+        same limitation as get_planar_average.
+
+        Args:
+            axis (int or tuple): Index of a lattice vector or Miller indices
+                of the averaging planes. See get_planar_average.
+            window (float or list): Width of the window in Angstrom,
+                typically the interlayer spacing. Several widths (e.g. the
+                interlayer spacings on both sides of an interface) are applied
+                successively.
+            data_key (str): Key of the data to average, e.g., "total" or
+                "diff".
+
+        Returns:
+            Macroscopic averages on the same planes as get_planar_average.
+        """
+        hkl = self._get_miller_index(axis)
+        windows = tuple(np.atleast_1d(window).tolist())
+
+        def get_average(m):
+            planar = self.get_planar_average(hkl, data_key=data_key)
+            spacing = self.structure.lattice.d_hkl(hkl) / len(planar)
+            freqs = np.fft.fftfreq(len(planar), spacing)
+            transfer = np.prod([np.sinc(freqs * w) for w in windows], axis=0)
+            return np.fft.ifft(np.fft.fft(planar) * transfer).real
+
+        return self._get_cached_average((data_key, hkl, windows), get_average)
+
+    def _get_cached_average(self, key, get_average):
+        """
+        Returns a copy of the cached average for key, where key[0] is the data
+        key, or computes it with get_average(data) if the cache is empty or
+        holds an average of an array that has since been replaced. The array
+        itself is kept with the average and compared by identity, which
+        cannot be fooled by recycled ids as long as the array is referenced.
+        """
+        data = self.data[key[0]]
+        cached = self._averages.get(key)
+        if cached is None or cached[0] is not data:
+            # forget all averages of the replaced array so it can be freed
+            self._averages = {k: v for k, v in self._averages.items()
+                              if k[0] != key[0] or v[0] is data}
+            cached = (data, get_average(data))
+            self._averages[key] = cached
+        return cached[1].copy()
+
+    @staticmethod
+    def _get_miller_index(axis):
+        """
+        Converts a lattice vector index or Miller indices to the Miller
+        indices, without common factor, of the averaging planes.
+        """
+        if np.ndim(axis) == 0:
+            hkl = [0, 0, 0]
+            hkl[axis] = 1
+            return tuple(hkl)
+        hkl = np.array(axis, dtype=int)
+        if not hkl.any():
+            raise ValueError("Miller indices cannot all be zero.")
+        return tuple((hkl // np.gcd.reduce(hkl)).tolist())
 
     def to_hdf5(self, filename):
         """
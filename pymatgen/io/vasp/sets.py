@@ -46,6 +46,7 @@ import re
 import shutil
 import warnings
 from copy import deepcopy
+from functools import lru_cache
 from itertools import chain
 from pathlib import Path
 from typing import List, Union, Optional
@@ -244,8 +245,13 @@ class VaspInputSet(MSONable, metaclass=abc.ABCMeta):
         return d
 
 
+@lru_cache(maxsize=None)
+def _load_yaml_file(fname):
+    return loadfn(str(MODULE_DIR / ("%s.yaml" % fname)))
+
+
 def _load_yaml_config(fname):
-    config = loadfn(str(MODULE_DIR / ("%s.yaml" % fname)))
+    config = deepcopy(_load_yaml_file(fname))
     if "PARENT" in config:
         parent_config = _load_yaml_config(config["PARENT"])
         for k, v in parent_config.items():
@@ -398,7 +404,7 @@ class DictSet(VaspInputSet):
             )
 
         if self.vdw:
-            vdw_par = loadfn(str(MODULE_DIR / "vdW_parameters.yaml"))
+            vdw_par = _load_yaml_file("vdW_parameters")
             try:
                 self._config_dict["INCAR"].update(vdw_par[self.vdw])
             except KeyError:
@@ -864,7 +870,7 @@ class MPScanRelaxSet(DictSet):
                     "with SCAN is not supported at this time. "
                 )
                 # delete any vdw parameters that may have been added to the INCAR
-                vdw_par = loadfn(str(MODULE_DIR / "vdW_parameters.yaml"))
+                vdw_par = _load_yaml_file("vdW_parameters")
                 for k, v in vdw_par[self.vdw].items():
                     try:
                         del self._config_dict["INCAR"][k]
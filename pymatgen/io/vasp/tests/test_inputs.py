@@ -4,8 +4,10 @@
 
 import unittest
 import pytest  # type: ignore
+from _pytest.monkeypatch import MonkeyPatch  # type: ignore
 import pickle
 import os
+import shutil
 import numpy as np
 import warnings
 import scipy.constants as const
@@ -14,8 +16,9 @@ from pathlib import Path
 from monty.tempfile import ScratchDir
 from pymatgen.util.testing import PymatgenTest
 from pymatgen.io.vasp.inputs import Incar, Poscar, Kpoints, Potcar, \
-    PotcarSingle, VaspInput, BadIncarWarning, UnknownPotcarWarning
-from pymatgen import Composition, Structure
+    PotcarSingle, VaspInput, BadIncarWarning, UnknownPotcarWarning, \
+    POTCAR_INDEX_FILENAME
+from pymatgen import Composition, Structure, SETTINGS
 from pymatgen.electronic_structure.core import Magmom
 from monty.io import zopen
 
@@ -322,6 +325,24 @@ direct
                                     p.structure.lattice.abc, 5)
         tempfname.unlink()
 
+    def test_round_trip(self):
+        np.random.seed(0)
+        for natoms in [10, 100, 1000]:
+            species = ["Fe"] * (natoms // 2) + ["O"] * (natoms - natoms // 2)
+            struct = Structure(np.diag([10.0, 11.0, 12.0]), species,
+                               np.random.rand(natoms, 3))
+            sd = np.random.rand(natoms, 3) > 0.5
+            poscar = Poscar(struct, selective_dynamics=sd.tolist())
+            for direct in [True, False]:
+                p = Poscar.from_string(poscar.get_string(direct=direct))
+                self.assertEqual(p.site_symbols, ["Fe", "O"])
+                self.assertEqual(p.natoms, [natoms // 2, natoms - natoms // 2])
+                self.assertArrayAlmostEqual(p.structure.cart_coords,
+                                            struct.cart_coords, 5)
+                self.assertEqual(p.selective_dynamics, sd.tolist())
+                self.assertEqual(p.get_string(direct=direct),
+                                 poscar.get_string(direct=direct))
+
 
 class IncarTest(PymatgenTest):
     def setUp(self):
@@ -796,6 +817,46 @@ class PotcarSingleTest(PymatgenTest):
         with pytest.warns(UnknownPotcarWarning, match="following"):
             PotcarSingle.from_file(filename)
 
+    def test_from_symbol_and_functional_cache(self):
+        with MonkeyPatch().context() as m:
+            m.setitem(SETTINGS, "PMG_VASP_PSP_DIR", str(self.TEST_FILES_DIR))
+            p1 = PotcarSingle.from_symbol_and_functional("Fe_pv", "PBE")
+            p2 = PotcarSingle.from_symbol_and_functional("Fe_pv", "PBE")
+            self.assertIsNot(p1, p2)
+            self.assertIsNot(p1.keywords, p2.keywords)
+            self.assertEqual(p1.hash, p2.hash)
+            self.assertEqual(p1.enmax, 293.238)
+            p1.keywords["ENMAX"] = 0
+            p3 = PotcarSingle.from_symbol_and_functional("Fe_pv", "PBE")
+            self.assertEqual(p3.enmax, 293.238)
+
+    def test_build_index(self):
+        with ScratchDir("."):
+            shutil.copytree(self.TEST_FILES_DIR / "POT_GGA_PAW_PBE",
+                            "POT_GGA_PAW_PBE")
+            os.makedirs(os.path.join("POT_GGA_PAW_PBE", "Mn_sv"))
+            shutil.copy(self.TEST_FILES_DIR / "POT_GGA_PAW_PBE" / "POTCAR.Mn_pv.gz",
+                        os.path.join("POT_GGA_PAW_PBE", "Mn_sv", "POTCAR.gz"))
+            index = PotcarSingle.build_index(psp_dir=os.getcwd())
+            self.assertTrue(os.path.exists(POTCAR_INDEX_FILENAME))
+            self.assertEqual(index["paths"][("POT_GGA_PAW_PBE", "Fe_pv")],
+                             os.path.join("POT_GGA_PAW_PBE", "POTCAR.Fe_pv.gz"))
+            self.assertEqual(index["paths"][("POT_GGA_PAW_PBE", "Mn_sv")],
+                             os.path.join("POT_GGA_PAW_PBE", "Mn_sv", "POTCAR.gz"))
+            with MonkeyPatch().context() as m:
+                m.setitem(SETTINGS, "PMG_VASP_PSP_DIR", os.getcwd())
+                p = PotcarSingle.from_symbol_and_functional("Mn_sv", "PBE")
+                self.assertEqual(p.symbol, "Mn_pv")
+                self.assertEqual(sorted(PotcarSingle.lookup_hash(p.hash)),
+                                 [("Mn_pv", "PBE"), ("Mn_sv", "PBE")])
+
+                # modified POTCARs are no longer identified from the index
+                mn_sv = os.path.join("POT_GGA_PAW_PBE", "Mn_sv", "POTCAR.gz")
+                mtime = os.stat(mn_sv).st_mtime
+                os.utime(mn_sv, (mtime + 10, mtime + 10))
+                self.assertEqual(PotcarSingle.lookup_hash(p.hash),
+                                 [("Mn_pv", "PBE")])
+
     # def test_default_functional(self):
     #     p = PotcarSingle.from_symbol_and_functional("Fe")
     #     self.assertEqual(p.functional_class, 'GGA')
@@ -1079,6 +1079,43 @@ class LocpotTest(PymatgenTest):
         self.assertAlmostEqual(locpot.get_axis_grid(1)[-1], 2.87629, 2)
         self.assertAlmostEqual(locpot.get_axis_grid(2)[-1], 2.87629, 2)
 
+    def test_averages(self):
+        filepath = self.TEST_FILES_DIR / 'LOCPOT'
+        locpot = Locpot.from_file(filepath)
+        data = locpot.data["total"]
+        avg = locpot.get_planar_average(2)
+        self.assertArrayAlmostEqual(avg, data.mean(axis=(0, 1)))
+        self.assertArrayAlmostEqual(avg, locpot.get_average_along_axis(2))
+        self.assertArrayAlmostEqual(avg, locpot.get_planar_average((0, 0, 2)))
+        self.assertArrayAlmostEqual(avg[-np.arange(len(avg))],
+                                    locpot.get_planar_average((0, 0, -1)))
+        # Miller planes are averaged from the Fourier components
+        avg = locpot.get_planar_average((1, 1, 0))
+        self.assertEqual(len(avg), min(locpot.dim[:2]))
+        self.assertAlmostEqual(avg.mean(), data.mean())
+        self.assertRaises(ValueError, locpot.get_planar_average, (0, 0, 0))
+
+        # a window as wide as the period flattens the average
+        d = locpot.structure.lattice.d_hkl((1, 0, 0))
+        avg = locpot.get_macroscopic_average(0, d)
+        self.assertArrayAlmostEqual(avg, np.full(len(avg), data.mean()))
+        avg = locpot.get_macroscopic_average(0, [d / 2, d / 3])
+        self.assertAlmostEqual(avg.mean(), data.mean())
+        self.assertTrue(np.ptp(avg) < np.ptp(locpot.get_planar_average(0)))
+
+        # averages are cached and copies are returned
+        self.assertIn(("total", (1, 0, 0), (d,)), locpot._averages)
+        avg[:] = 0
+        self.assertNotEqual(locpot.get_macroscopic_average(0, [d / 2, d / 3])[0], 0)
+        # and recomputed whenever the data is replaced, even if the new array
+        # reuses the memory of the old one
+        expected = data.mean(axis=(0, 1))
+        for _ in range(20):
+            locpot.data["total"] = locpot.data["total"] * 2
+            expected = expected * 2
+            self.assertArrayAlmostEqual(locpot.get_planar_average(2), expected)
+        self.assertEqual(len(locpot._averages), 1)
+
 
 class ChgcarTest(PymatgenTest):
 
@@ -1113,6 +1150,15 @@ class ChgcarTest(PymatgenTest):
         myans = self.chgcar_fe3o4.get_integrated_diff(0, 3, 6)
         self.assertTrue(np.allclose(myans[:, 1], ans))
 
+    def test_get_sphere_integrals(self):
+        integrals = self.chgcar_spin.get_sphere_integrals(1, nbins=3)
+        self.assertEqual(integrals.shape, (len(self.chgcar_spin.structure), 3))
+        self.assertAlmostEqual(integrals[0, -1], -0.0043896932237534022)
+        self.assertArrayAlmostEqual(integrals[0], self.chgcar_spin.get_integrated_diff(0, 1, 3)[:, 1])
+        # a sphere larger than the cell counts periodic images
+        total = self.chgcar_spin.get_sphere_integrals(3, inds=[0], data_key="total")
+        self.assertGreater(total[0, 0], np.sum(self.chgcar_spin.data["total"]) / self.chgcar_spin.ngridpts)
+
     def test_write(self):
         self.chgcar_spin.write_file("CHGCAR_pmg")
         with open("CHGCAR_pmg") as f:
@@ -1219,6 +1265,8 @@ class ElfcarTest(PymatgenTest):
         elfcar = Elfcar.from_file(self.TEST_FILES_DIR / 'ELFCAR.gz')
         self.assertAlmostEqual(0.0918471, elfcar.value_at(0.4, 0.5, 0.6))
         self.assertEqual(100, len(elfcar.linear_slice([0.0, 0.0, 0.0], [1.0, 1.0, 1.0])))
+        self.assertArrayAlmostEqual(elfcar.value_at([0.4, 0.1], 0.5, [0.6, 0.2]),
+                                    [elfcar.value_at(0.4, 0.5, 0.6), elfcar.value_at(0.1, 0.5, 0.2)])
 
 
 class ProcarTest(PymatgenTest):
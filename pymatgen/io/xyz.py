@@ -8,9 +8,11 @@ Module implementing an XYZ file object class.
 
 import re
 
-from pymatgen.core.structure import Molecule
+import numpy as np
 from monty.io import zopen
 
+from pymatgen.core.structure import Molecule
+
 
 class XYZ:
     """
@@ -57,22 +59,7 @@ class XYZ:
         """
         lines = contents.split("\n")
         num_sites = int(lines[0])
-        coords = []
-        sp = []
-        coord_patt = re.compile(
-            r"(\w+)\s+([0-9\-\+\.*^eEdD]+)\s+([0-9\-\+\.*^eEdD]+)\s+"
-            r"([0-9\-\+\.*^eEdD]+)")
-        for i in range(2, 2 + num_sites):
-            m = coord_patt.search(lines[i])
-            if m:
-                sp.append(m.group(1))  # this is 1-indexed
-                # this is 0-indexed
-                # in case of 0.0D+00 or 0.00d+01 old double precision writing
-                # replace d or D by e for ten power exponent,
-                # and some files use *^ convention in place of e
-                xyz = [val.lower().replace("d", "e").replace('*^', 'e') for val
-                       in m.groups()[1:4]]
-                coords.append([float(val) for val in xyz])
+        sp, coords = XYZ._parse_frame_lines(lines[2:2 + num_sites])
         return Molecule(sp, coords)
 
     @staticmethod
@@ -115,12 +102,23 @@ class XYZ:
         with zopen(filename) as f:
             return XYZ.from_string(f.read())
 
+    @staticmethod
+    def _frame_template(species, precision):
+        """
+        Returns a %-style template for the coordinate block of a frame, so
+        that a whole frame can be formatted with a single interpolation of
+        its flattened coordinates.
+        """
+        line = " %.{0}f %.{0}f %.{0}f".format(precision)
+        return "\n".join([str(sp).replace("%", "%%") + line for sp in species])
+
     def _frame_str(self, frame_mol):
-        output = [str(len(frame_mol)), frame_mol.composition.formula]
-        fmtstr = "{{}} {{:.{0}f}} {{:.{0}f}} {{:.{0}f}}".format(self.precision)
-        for site in frame_mol:
-            output.append(fmtstr.format(site.specie, site.x, site.y, site.z))
-        return "\n".join(output)
+        header = "%d\n%s" % (len(frame_mol), frame_mol.composition.formula)
+        if len(frame_mol) == 0:
+            return header
+        template = self._frame_template([site.specie for site in frame_mol],
+                                        self.precision)
+        return header + "\n" + template % tuple(frame_mol.cart_coords.ravel())
 
     def __str__(self):
         return "\n".join([self._frame_str(mol) for mol in self._mols])
@@ -134,3 +132,155 @@ class XYZ:
         """
         with zopen(filename, "wt") as f:
             f.write(self.__str__())
+
+    @staticmethod
+    def _parse_frame_lines(lines):
+        """
+        Vectorized parse of the atom lines of a single frame.
+
+        Args:
+            lines: List of atom lines (str), i.e., without the number of
+                atoms and comment lines.
+
+        Returns:
+            (species, coords) with species a list of str and coords a
+            (natoms, 3) array of floats.
+        """
+        rows = [l.split(None, 4)[:4] for l in lines]
+        if not rows:
+            return [], np.zeros((0, 3))
+        tokens = np.array(rows)
+        if tokens.ndim != 2 or tokens.shape[1] != 4:
+            raise ValueError("Invalid XYZ frame: each atom line must contain "
+                             "a species and three coordinates.")
+        coords = tokens[:, 1:]
+        try:
+            coords = coords.astype(float)
+        except ValueError:
+            # Old double precision (0.0D+00) or Mathematica (*^) exponents.
+            coords = np.char.replace(np.char.lower(coords), "d", "e")
+            coords = np.char.replace(coords, "*^", "e").astype(float)
+        return tokens[:, 0].tolist(), coords
+
+    @staticmethod
+    def get_frame_offsets(filename):
+        """
+        Builds an index of the byte offsets at which each frame of a
+        (multi-frame) XYZ file starts. Only the number of atoms line of each
+        frame is parsed, so this is cheap even for very long trajectories.
+        The offsets can be passed to :meth:`read_frame` for random access.
+
+        Args:
+            filename: XYZ filename.
+
+        Returns:
+            numpy array of int64 offsets, one per frame.
+        """
+        offsets = []
+        with zopen(filename, "rb") as f:
+            while True:
+                pos = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                offsets.append(pos)
+                for _ in range(int(line) + 1):
+                    f.readline()
+        return np.array(offsets, dtype=np.int64)
+
+    @staticmethod
+    def _read_frame_at(f):
+        line = f.readline()
+        while line and not line.strip():
+            line = f.readline()
+        if not line:
+            return None
+        natoms = int(line)
+        f.readline()
+        lines = [f.readline().decode() for _ in range(natoms)]
+        if natoms and not lines[-1]:
+            raise ValueError("Truncated XYZ frame.")
+        return XYZ._parse_frame_lines(lines)
+
+    @staticmethod
+    def read_frame(filename, index, offsets=None):
+        """
+        Random access to a single frame of a multi-frame XYZ file.
+
+        Args:
+            filename: XYZ filename.
+            index: Index of the frame to read. Negative indices are
+                supported.
+            offsets: Frame offsets from :meth:`get_frame_offsets`. If None,
+                the index is built on the fly. Pass a precomputed index when
+                reading many frames from the same file.
+
+        Returns:
+            (species, coords) with species a list of str and coords a
+            (natoms, 3) array of floats.
+        """
+        if offsets is None:
+            offsets = XYZ.get_frame_offsets(filename)
+        with zopen(filename, "rb") as f:
+            f.seek(int(offsets[index]))
+            return XYZ._read_frame_at(f)
+
+    @staticmethod
+    def iter_frames(filename):
+        """
+        Iterates over the frames of a multi-frame XYZ file without loading
+        the whole file in memory.
+
+        Args:
+            filename: XYZ filename.
+
+        Yields:
+            (species, coords) with species a list of str and coords a
+            (natoms, 3) array of floats.
+        """
+        with zopen(filename, "rb") as f:
+            while True:
+                frame = XYZ._read_frame_at(f)
+                if frame is None:
+                    return
+                yield frame
+
+    @staticmethod
+    def write_frames(filename, species, coords, comments=None,
+                     coord_precision=6):
+        """
+        Bulk writer for trajectories with a fixed list of species. All
+        frames are formatted from a single template, which is much faster
+        than building a Molecule per frame.
+
+        Args:
+            filename: File name of output file.
+            species: Sequence of species (str, Element or Specie) of length
+                natoms.
+            coords: Array-like of cartesian coordinates with shape
+                (nframes, natoms, 3).
+            comments: Optional sequence of comment lines, one per frame.
+                Defaults to the formula of the species.
+            coord_precision: Precision to be used for coordinates.
+        """
+        coords = np.asarray(coords, dtype=float)
+        if coords.ndim == 2:
+            coords = coords[None, :, :]
+        nframes, natoms = coords.shape[:2]
+        if coords.shape[2] != 3 or natoms != len(species):
+            raise ValueError("coords must have shape (nframes, %d, 3)"
+                             % len(species))
+        if comments is None:
+            formula = Molecule(species, coords[0]).composition.formula \
+                if natoms else ""
+            comments = [formula] * nframes
+        elif len(comments) != nframes:
+            raise ValueError("Number of comments must equal number of frames.")
+        block = XYZ._frame_template(species, coord_precision)
+        with zopen(filename, "wt") as f:
+            for i in range(nframes):
+                f.write("%d\n%s\n" % (natoms, comments[i]))
+                if natoms:
+                    f.write(block % tuple(coords[i].ravel()) + "\n")
@@ -353,6 +353,23 @@ def get_angle(v1, v2, units="degrees"):
         raise ValueError("Invalid units {}".format(units))
 
 
+def get_structure_fingerprint(structure):
+    """
+    Returns a hashable key that identifies a structure exactly, i.e., its
+    lattice matrix, fractional coordinates and site species. Useful for
+    caching analyses of structures that are not themselves hashable.
+
+    Args:
+        structure: Structure or IStructure.
+
+    Returns:
+        Tuple of (lattice bytes, fractional coordinates bytes, species strings).
+    """
+    return (structure.lattice.matrix.tobytes(),
+            structure.frac_coords.tobytes(),
+            tuple(site.species_string for site in structure))
+
+
 class Simplex:
     """
     A generalized simplex object. See http://en.wikipedia.org/wiki/Simplex.
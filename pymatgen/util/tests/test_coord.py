@@ -212,6 +212,18 @@ class CoordUtilsTest(PymatgenTest):
         self.assertAlmostEqual(get_angle(v1, v2, units="radians"),
                                0.9553166181245092)
 
+    def test_get_structure_fingerprint(self):
+        s = self.get_structure("Li2O")
+        fingerprint = get_structure_fingerprint(s)
+        self.assertEqual(fingerprint, get_structure_fingerprint(s.copy()))
+        self.assertEqual(hash(fingerprint), hash(get_structure_fingerprint(s.copy())))
+        s2 = s.copy()
+        s2.translate_sites([0], [0.01, 0, 0])
+        self.assertNotEqual(fingerprint, get_structure_fingerprint(s2))
+        s2 = s.copy()
+        s2.replace(0, "Na")
+        self.assertNotEqual(fingerprint, get_structure_fingerprint(s2))
+
 
 class SimplexTest(PymatgenTest):
 